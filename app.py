@@ -1,7 +1,12 @@
-from dataManager import DataManager
+from dataManager import DataManager, PAK_COMPRESSION_METHODS, INSTALL_MODES
+from assetTypeRules import RULE_KINDS
+from buildWorker import BuildWorker
+from archiveWriter import ArchiveWriter
+from packAnalysis import PackAnalysis
 from customComponents import *
 from PIL import Image
 import customtkinter
+import threading
 import os
 import gc
 
@@ -15,7 +20,7 @@ CURRENT_FILE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # app
 class App(customtkinter.CTk):
-	def __init__(self, basePath: PathLike[str] | None, unrealPakPath = PathLike[str] | None) -> None:
+	def __init__(self, basePath: PathLike[str] | None, unrealPakPath = PathLike[str] | None, profile: bool = False, catalogPath: PathLike[str] | None = None) -> None:
 		super().__init__()
 
 		# define theme
@@ -30,7 +35,11 @@ class App(customtkinter.CTk):
 			,os.path.join(CURRENT_FILE_DIR, './settings/assetTypeTable.json')
 			,os.path.join(CURRENT_FILE_DIR, './settings/packAdditions/')
 			,unrealPakPath
+			,os.path.join(CURRENT_FILE_DIR, './settings/assetTypeRules.json')
 			)
+		self.dataManager.enableProfiling(profile)
+		if catalogPath != None:
+			self.dataManager.enableCatalog(catalogPath)
 
 		# define default dim
 		self.defaultDim = '600x800'
@@ -48,9 +57,15 @@ class App(customtkinter.CTk):
 		self.components: Mapping[str, Any] = {}
 
 		self.unknownFiles = None
+		self.packAnalysis = None
+		self.analysisResult: list[PackAnalysis | Exception] = [] # set by the analysis thread (see exportSizesCB)
+		self.fileTypeModel = None
+		self.extraScreenshotPaths = []
 		self.unfinishedJobCount = 0
+		self.buildWorker: BuildWorker | None = None
 
 		self.registerValidators()
+		self.protocol('WM_DELETE_WINDOW', self.closeWindowCB)
 
 		# display first window content
 		self.displayInfoInput()
@@ -135,6 +150,22 @@ class App(customtkinter.CTk):
 		self.components['selectThumbnail'] = ImageFilePickerComponent(frame2, 'Select a tumbnail image (64x64)', self.inputVars['thumbnailImagePath'], self.dataManager.basePath, 'tumbnail picker', (64, 64), self.customColors['grayButton'])
 		self.components['selectThumbnail'].grid(column=1, row=0, padx=20, pady=(0,10), sticky='nw')
 
+		# additional screenshots, listed after the one above
+		self.extraScreenshotPaths = []
+		frame2b = self.components['frame2b'] = customtkinter.CTkFrame(master=frame2, fg_color='transparent')
+		frame2b.grid(column=1, row=1, padx=20, pady=(0,10), sticky='nw')
+
+		self.components['labelExtraScreenshots'] = customtkinter.CTkLabel(master=frame2b, text='Additional screenshots: 0', justify='left')
+		self.components['labelExtraScreenshots'].grid(column=0, row=0, columnspan=2, padx=10, pady=(0,5), sticky='nw')
+
+		self.components['addScreenshots'] = customtkinter.CTkButton(master=frame2b, text='Add Files', width=100, command=self.addScreenshotsCB)
+		self.components['addScreenshots'].configure(True, **self.customColors['grayButton'])
+		self.components['addScreenshots'].grid(column=0, row=1, padx=(10,0), pady=0, sticky='nw')
+
+		self.components['clearScreenshots'] = customtkinter.CTkButton(master=frame2b, text='Clear', width=60, command=self.clearScreenshotsCB)
+		self.components['clearScreenshots'].configure(True, **self.customColors['grayButton'])
+		self.components['clearScreenshots'].grid(column=1, row=1, padx=(10,0), pady=0, sticky='nw')
+
 		# ---
 		self.components['sep2'] = separatorComponent(master=self.currentMainFrame)
 		self.components['sep2'].grid(column=0, row=8, padx=20, pady=5, sticky='ew')
@@ -177,39 +208,50 @@ class App(customtkinter.CTk):
 		self.components['labelDesc'] = customtkinter.CTkLabel(master=self.currentMainFrame, text='Unable to determine the asset types for the following files\nmanualy set types (optional):', justify='left')
 		self.components['labelDesc'].grid(column=0, row=2, padx=20, pady=(10,10), sticky='nw')
 
-		# 16 is an estimate an may be subject to change
-		if len(self.unknownFiles) >= 16:
-			assetListFrame = customtkinter.CTkScrollableFrame(master=self.currentMainFrame)
-		else:
-			assetListFrame = customtkinter.CTkFrame(master=self.currentMainFrame)
+		# prep data
+		assetTypeList = ['other']
+		assetTypeList.extend(list(self.dataManager.assetTypeTable.values()))
+
+		# apply to all matching (saved to the rules file)
+		ruleFrame = self.components['ruleFrame'] = customtkinter.CTkFrame(master=self.currentMainFrame, fg_color='transparent')
+		ruleFrame.grid(column=0, row=3, padx=20, pady=0, sticky='ew')
+		ruleFrame.columnconfigure(1, weight=1)
+
+		self.components['selectRuleKind'] = customtkinter.CTkOptionMenu(master=ruleFrame, values=list(RULE_KINDS), width=70)
+		self.components['selectRuleKind'].configure(True, **self.customColors['customOptionMenu'])
+		self.components['selectRuleKind'].grid(column=0, row=0, padx=0, pady=0, sticky='w')
+
+		self.components['inputRulePattern'] = customtkinter.CTkEntry(master=ruleFrame, placeholder_text='pattern (ie: Legacy/**/*_D.uasset)')
+		self.components['inputRulePattern'].grid(column=1, row=0, padx=(10,0), pady=0, sticky='ew')
+
+		self.components['selectRuleType'] = customtkinter.CTkOptionMenu(master=ruleFrame, values=assetTypeList, width=120)
+		self.components['selectRuleType'].configure(True, **self.customColors['customOptionMenu'])
+		self.components['selectRuleType'].grid(column=2, row=0, padx=(10,0), pady=0, sticky='e')
+
+		self.components['applyRule'] = customtkinter.CTkButton(master=ruleFrame, text='apply to all matching', width=140, command=self.fileTypeRuleApplyCB)
+		self.components['applyRule'].configure(True, **self.customColors['grayButton'])
+		self.components['applyRule'].grid(column=0, row=1, columnspan=3, padx=0, pady=(10,0), sticky='e')
+
+		# only the visible rows have widgets, the chosen types live in the model
+		self.fileTypeModel = FileTypeListModel(self.unknownFiles, 'other')
+		self.components['assetList'] = VirtualFileTypeList(self.currentMainFrame, self.fileTypeModel, assetTypeList, self.customColors['customOptionMenu'])
 
 		# layout
-		assetListFrame.grid(column=0, row=3, padx=20, pady=(10,0), sticky='nsew')
-		assetListFrame.columnconfigure(0, weight=1)
-		self.currentMainFrame.rowconfigure(3, weight=1)
+		self.components['assetList'].grid(column=0, row=4, padx=20, pady=(10,0), sticky='nsew')
+		self.currentMainFrame.rowconfigure(4, weight=1)
 
 		# bottom buttons
 		self.components['actionButtons'] = ButtonRowComponent(self.currentMainFrame, ('cancel', 'skip', 'confirm'), (self.cancelButtonCB, self.infoFileTypeInputSkipCB, self.infoFileTypeInputConfirmCB), (self.customColors['grayButton'], self.customColors['grayButton'], self.customColors['blueButton']))
-		self.components['actionButtons'].grid(column=0, row=4 ,padx=20, pady=(0,10), sticky='se')
-
-		# prep data
-		rowIndex = 0
-		assetTypeList = ['other']
-		assetTypeList.extend(list(self.dataManager.assetTypeTable.values()))
-
-		for filename in self.unknownFiles:
-			self.components[filename] = OptionMenuWithLabel(assetListFrame, filename, assetTypeList, self.customColors['customOptionMenu'])
-			self.components[filename].grid(column=0, row=rowIndex, padx=20, pady=(10,0), sticky='ne')
-			rowIndex += 1
+		self.components['actionButtons'].grid(column=0, row=5 ,padx=20, pady=(0,10), sticky='se')
 
 
 #-
 	def displayExportOptions(self) -> None:
 		self.resetMainFrame()
-		self.geometry('600x400')
+		self.geometry('600x510')
 
 		self.currentMainFrame.columnconfigure(0, weight=1)
-		self.currentMainFrame.rowconfigure(6, weight=1)
+		self.currentMainFrame.rowconfigure(9, weight=1)
 
 		self.components['labelTitle'] = customtkinter.CTkLabel(master=self.currentMainFrame, text='Export options:', justify='left', font=customtkinter.CTkFont(size=25, weight= 'bold'))
 		self.components['labelTitle'].grid(column=0, row=0, padx=20, pady=(15,5), sticky='sw')
@@ -223,19 +265,88 @@ class App(customtkinter.CTk):
 
 		checkboxMargin = 30
 
-		self.components['selectZipped'] = customtkinter.CTkCheckBox(master=self.currentMainFrame, text='Export Zipped pack')
-		self.components['selectZipped'].grid(column=0, row=3, padx=(20+checkboxMargin,20), pady=10, sticky='ew')
+		frame0 = self.components['frame0'] = customtkinter.CTkFrame(master=self.currentMainFrame, fg_color='transparent')
+		frame0.grid(column=0, row=3, padx=(20+checkboxMargin,20), pady=10, sticky='ew')
+		frame0.columnconfigure(0, weight=1)
+
+		self.components['selectZipped'] = customtkinter.CTkCheckBox(master=frame0, text='Export compressed pack')
+		self.components['selectZipped'].grid(column=0, row=0, padx=0, pady=0, sticky='ew')
+
+		archiveFormats = ArchiveWriter.getAvailableFormats()
+		self.components['selectArchiveFormat'] = customtkinter.CTkOptionMenu(master=frame0, values=archiveFormats, width=110, command=self.archiveFormatSelectCB)
+		self.components['selectArchiveFormat'].configure(True, **self.customColors['customOptionMenu'])
+		self.components['selectArchiveFormat'].set(self.dataManager.packInfo['packArchiveFormat'])
+		self.components['selectArchiveFormat'].grid(column=1, row=0, padx=(10,0), pady=0, sticky='e')
+
+		self.components['selectArchivePreset'] = customtkinter.CTkOptionMenu(master=frame0, values=ArchiveWriter.getPresets(self.dataManager.packInfo['packArchiveFormat']), width=100)
+		self.components['selectArchivePreset'].configure(True, **self.customColors['customOptionMenu'])
+		self.components['selectArchivePreset'].set(self.dataManager.packInfo['packArchivePreset'])
+		self.components['selectArchivePreset'].grid(column=2, row=0, padx=(10,0), pady=0, sticky='e')
 
 		self.components['selectUnpacked'] = customtkinter.CTkCheckBox(master=self.currentMainFrame, text='Export full unpacked file structure')
 		self.components['selectUnpacked'].grid(column=0, row=4, padx=(20+checkboxMargin,20), pady=10, sticky='ew')
 
 		engineVersion = self.dataManager.UEDir.split('\\')[-1]
-		self.components['selectInstall'] = customtkinter.CTkCheckBox(master=self.currentMainFrame, text=f'Install pack to current engine version ({engineVersion})')
-		self.components['selectInstall'].grid(column=0, row=5, padx=(20+checkboxMargin,20), pady=10, sticky='ew')
+		frame2 = self.components['frame2'] = customtkinter.CTkFrame(master=self.currentMainFrame, fg_color='transparent')
+		frame2.grid(column=0, row=5, padx=(20+checkboxMargin,20), pady=10, sticky='ew')
+		frame2.columnconfigure(0, weight=1)
+
+		self.components['selectInstall'] = customtkinter.CTkCheckBox(master=frame2, text=f'Install pack to current engine version ({engineVersion})')
+		self.components['selectInstall'].grid(column=0, row=0, padx=0, pady=0, sticky='ew')
+
+		self.components['selectInstallMode'] = customtkinter.CTkOptionMenu(master=frame2, values=list(INSTALL_MODES), width=100)
+		self.components['selectInstallMode'].configure(True, **self.customColors['customOptionMenu'])
+		self.components['selectInstallMode'].set(self.dataManager.packInfo['packInstallMode'])
+		self.components['selectInstallMode'].grid(column=1, row=0, padx=(10,0), pady=0, sticky='e')
+
+		# ---
+		self.components['sep1'] = separatorComponent(master=self.currentMainFrame)
+		self.components['sep1'].grid(column=0, row=6, padx=20, pady=5, sticky='ew')
+
+		self.components['selectReproducible'] = customtkinter.CTkCheckBox(master=self.currentMainFrame, text='Reproducible output (identical input gives identical files)')
+		if self.dataManager.packInfo['packReproducible']:
+			self.components['selectReproducible'].select()
+		self.components['selectReproducible'].grid(column=0, row=7, padx=(20+checkboxMargin,20), pady=10, sticky='ew')
+
+		frame1 = self.components['frame1'] = customtkinter.CTkFrame(master=self.currentMainFrame, fg_color='transparent')
+		frame1.grid(column=0, row=8, padx=(20+checkboxMargin,20), pady=10, sticky='ew')
+		frame1.columnconfigure(0, weight=1)
+
+		self.components['labelPakCompression'] = customtkinter.CTkLabel(master=frame1, text='.upack compression (UnrealPak)', justify='left')
+		self.components['labelPakCompression'].grid(column=0, row=0, padx=0, pady=0, sticky='w')
+
+		self.components['selectPakCompression'] = customtkinter.CTkOptionMenu(master=frame1, values=list(PAK_COMPRESSION_METHODS), width=100)
+		self.components['selectPakCompression'].configure(True, **self.customColors['customOptionMenu'])
+		self.components['selectPakCompression'].set(self.dataManager.packInfo['packPakCompressionMethod'])
+		self.components['selectPakCompression'].grid(column=1, row=0, padx=(10,0), pady=0, sticky='e')
+
+		# bottom buttons
+		self.components['actionButtons'] = ButtonRowComponent(self.currentMainFrame, ('cancel', 'sizes', 'export'), (self.cancelButtonCB, self.exportSizesCB, self.exportConfirmCB), (self.customColors['grayButton'], self.customColors['grayButton'], self.customColors['blueButton']))
+		self.components['actionButtons'].grid(column=0, row=9 ,padx=20, pady=(0,10), sticky='sew')
+
+#-
+	def displaySizeSummary(self) -> None:
+		self.resetMainFrame()
+		self.geometry('600x600')
+
+		self.currentMainFrame.columnconfigure(0, weight=1)
+		self.currentMainFrame.rowconfigure(2, weight=1)
+
+		self.components['labelTitle'] = customtkinter.CTkLabel(master=self.currentMainFrame, text='Pack content sizes:', justify='left', font=customtkinter.CTkFont(size=25, weight= 'bold'))
+		self.components['labelTitle'].grid(column=0, row=0, padx=20, pady=(15,5), sticky='sw')
+
+		# ---
+		self.components['sep0'] = separatorComponent(master=self.currentMainFrame)
+		self.components['sep0'].grid(column=0, row=1, padx=20, pady=10, sticky='ew')
+
+		self.components['summary'] = customtkinter.CTkTextbox(master=self.currentMainFrame, wrap='none', font=customtkinter.CTkFont(family='Consolas', size=12))
+		self.components['summary'].insert('1.0', self.packAnalysis.getSummary())
+		self.components['summary'].configure(True, **{'state': 'disabled'})
+		self.components['summary'].grid(column=0, row=2, padx=20, pady=10, sticky='nsew')
 
 		# bottom buttons
-		self.components['actionButtons'] = ButtonRowComponent(self.currentMainFrame, ('cancel', 'export'), (self.cancelButtonCB, self.exportConfirmCB), (self.customColors['grayButton'], self.customColors['blueButton']))
-		self.components['actionButtons'].grid(column=0, row=6 ,padx=20, pady=(0,10), sticky='sew')
+		self.components['actionButtons'] = ButtonRowComponent(self.currentMainFrame, ('back', 'save report'), (self.cancelButtonCB, self.sizeReportSaveCB), (self.customColors['grayButton'], self.customColors['blueButton']))
+		self.components['actionButtons'].grid(column=0, row=3 ,padx=20, pady=(0,10), sticky='sew')
 
 #-
 	def displayPending(self) -> None:
@@ -253,6 +364,14 @@ class App(customtkinter.CTk):
 		self.components['progressBar'].grid(column=0, row=1, padx=50, pady=0, sticky='ew')
 		self.currentMainFrame.rowconfigure(1, weight=1)
 
+		# current phase
+		self.components['phaseLabel'] = customtkinter.CTkLabel(master=self.currentMainFrame, text='', font=customtkinter.CTkFont(size=12))
+		self.components['phaseLabel'].grid(column=0, row=2, padx=10, pady=(0,5), sticky='new')
+
+		# bottom buttons
+		self.components['actionButtons'] = ButtonRowComponent(self.currentMainFrame, ('cancel',), (self.exportCancelCB,), (self.customColors['grayButton'],))
+		self.components['actionButtons'].grid(column=0, row=3 ,padx=20, pady=(0,10), sticky='se')
+
 #-
 	def displayExportReport(self) -> None:
 		self.resetMainFrame()
@@ -266,7 +385,8 @@ class App(customtkinter.CTk):
 			self.geometry('400x200')
 		else:
 			noFail = False
-			windowHeight = 200 + len(failedJobTypes) * 30
+			failedJobCauses = self.dataManager.getFailedJobCauses()
+			windowHeight = 200 + len(failedJobTypes) * 30 + len(failedJobCauses) * 20
 			self.geometry(f'400x{windowHeight}')
 
 		# title
@@ -300,7 +420,7 @@ class App(customtkinter.CTk):
 			self.components['reportTitle'].grid(column=1, row=0, padx=10, pady=(0,10), sticky='')
 
 			rowIndex = 1
-			if 'robocopy' in failedJobTypes:
+			if 'robocopy' in failedJobTypes or 'copy' in failedJobTypes:
 				self.components['reportItemCopy'] = customtkinter.CTkLabel(master=frame0, text='Copying files', justify='left')
 				self.components['reportItemCopy'].grid(column=1, row=rowIndex, padx=10, pady=(0,5), sticky='nw')
 				rowIndex += 1
@@ -315,6 +435,11 @@ class App(customtkinter.CTk):
 				self.components['reportItemPak'].grid(column=1, row=rowIndex, padx=10, pady=(0,5), sticky='nw')
 				rowIndex += 1
 
+			# why (exit code, timed out, stalled...)
+			self.components['reportCauses'] = customtkinter.CTkLabel(master=frame0, text='\n'.join(failedJobCauses), justify='left', text_color='gray', font=customtkinter.CTkFont(size=11))
+			self.components['reportCauses'].grid(column=1, row=rowIndex, padx=10, pady=(0,5), sticky='nw')
+			rowIndex += 1
+
 		# bottom buttons
 		self.components['actionButtons'] = ButtonRowComponent(self.currentMainFrame, ('view in explorer', 'ok'), (self.dataManager.openOutputDir, self.destroy), (self.customColors['grayButton'], self.customColors['blueButton']))
 		self.components['actionButtons'].grid(column=0, row=3 ,padx=40, pady=(0,10), sticky='sew')
@@ -351,6 +476,21 @@ class App(customtkinter.CTk):
 				# prompt for manual add types
 				self.displayFileTypeInput()
 
+#-
+	def addScreenshotsCB(self) -> None:
+		""" Button callback. """
+		fileTypes = [('All Supported Types', ('*.png', '*.jpg', '*.jpeg', '*.jfif', '*.pjpeg', '*.pjp')), ('PNG Images', ('*.png')), ('JPEG Images', ('*.jpg', '*.jpeg', '*.jfif', '*.pjpeg', '*.pjp'))]
+		dialogResult = customtkinter.filedialog.askopenfilenames(filetypes=fileTypes, initialdir=self.dataManager.basePath, parent=self, title='screenshot picker')
+
+		self.extraScreenshotPaths.extend(dialogResult)
+		self.components['labelExtraScreenshots'].configure(True, **{'text': f'Additional screenshots: {len(self.extraScreenshotPaths)}'})
+
+#-
+	def clearScreenshotsCB(self) -> None:
+		""" Button callback. """
+		self.extraScreenshotPaths = []
+		self.components['labelExtraScreenshots'].configure(True, **{'text': 'Additional screenshots: 0'})
+
 #-
 	def infoFileTypeInputSkipCB(self) -> None:
 		""" Button callback. """
@@ -362,15 +502,37 @@ class App(customtkinter.CTk):
 	def infoFileTypeInputConfirmCB(self) -> None:
 		""" Button callback. """
 		# add user def types to currently stored ones
-		additionalTypes = set()
-		for filename in self.unknownFiles:
-			additionalTypes.add(self.components[filename].get())
-		self.dataManager.addAssetTypes(additionalTypes)
+		self.dataManager.addAssetTypes(self.fileTypeModel.getAssignedTypes())
 
 		# go to confirm
 		self.prevSteps.append(self.displayFileTypeInput)
 		self.displayExportOptions()
 
+#-
+	def fileTypeRuleApplyCB(self) -> None:
+		""" Button callback. Add a rule for all matching files, then drop them from the list. """
+		try:
+			self.dataManager.addAssetTypeRule(self.components['selectRuleKind'].get(), self.components['inputRulePattern'].get(), self.components['selectRuleType'].get(), save=True)
+		except (ValueError, OSError) as error:
+			InfoModalWindow(self, f'Unable to add the rule:\n{error}')
+			return
+
+		# only the files the new rule matches leave the list, the types already picked for the others are kept
+		matchedPaths = set()
+		for relPath in self.fileTypeModel.files:
+			assetType = self.dataManager.getAssetTypeForPath(relPath)
+			if assetType != None:
+				matchedPaths.add(relPath)
+				self.dataManager.addAssetTypes((assetType,))
+		self.fileTypeModel.removeFiles(matchedPaths)
+
+		self.unknownFiles = self.fileTypeModel.files or None
+		if self.unknownFiles == None:
+			# go to confirm, nothing left to set on this step
+			self.displayExportOptions()
+		else:
+			self.components['assetList'].refresh()
+
 #-
 	def exportConfirmCB(self) -> None:
 		""" Button callback. """
@@ -382,14 +544,122 @@ class App(customtkinter.CTk):
 		if not (exportZip or exportunpacked or InstallToEngine):
 			InfoModalWindow(self, 'Must select at least one')
 		else:
+			self.dataManager.setExportOptions(
+				archiveFormat = self.components['selectArchiveFormat'].get(),
+				archivePreset = self.components['selectArchivePreset'].get(),
+				reproducible  = bool(self.components['selectReproducible'].get()),
+				pakCompressionMethod = self.components['selectPakCompression'].get(),
+				installMode   = self.components['selectInstallMode'].get(),
+			)
 			self.export(exportZip, exportunpacked, InstallToEngine)
 
+#-
+	def exportSizesCB(self) -> None:
+		""" Button callback. Analyze the pack content, compressed sizes are estimated for the selected format / preset. """
+		self.dataManager.setExportOptions(
+			archiveFormat = self.components['selectArchiveFormat'].get(),
+			archivePreset = self.components['selectArchivePreset'].get(),
+		)
+		self.components['actionButtons'].setButtonState('sizes', True)
+		self.components['actionButtons'].setButtonState('export', True)
+		self.components['labelDesc'].configure(True, **{'text': 'Analyzing pack content...'})
+
+		# reads samples of every asset, kept off the UI thread
+		self.packAnalysis = None
+		self.analysisResult.clear()
+		threading.Thread(target=self._analyzePackContent, name='unrealPackGen_analysis', daemon=True).start()
+		self.after(100, self.pollAnalysisLoop)
+
+#-
+	def _analyzePackContent(self) -> None:
+		""" Run on the analysis thread (see exportSizesCB). """
+		try:
+			self.analysisResult.append(self.dataManager.analyzePackContent(estimateCompression=True))
+		except Exception as error:
+			self.analysisResult.append(error)
+
+#-
+	def pollAnalysisLoop(self) -> None:
+		""" Loop waiting on the analysis thread, then show its result. """
+
+		if not self.analysisResult:
+			self.after(100, self.pollAnalysisLoop)
+			return
+
+		result = self.analysisResult.pop()
+		if isinstance(result, Exception):
+			self.components['actionButtons'].setButtonState('sizes', False)
+			self.components['actionButtons'].setButtonState('export', False)
+			self.components['labelDesc'].configure(True, **{'text': 'Select export options*:'})
+			if isinstance(result, (OSError, ValueError)):
+				InfoModalWindow(self, f'Unable to analyze the pack content:\n{result}')
+			else:
+				InfoModalWindow(self, f'Unable to analyze the pack content:\n{type(result).__name__}: {result}')
+			return
+
+		self.packAnalysis = result
+		self.prevSteps.append(self.displayExportOptions)
+		self.displaySizeSummary()
+
+#-
+	def sizeReportSaveCB(self) -> None:
+		""" Button callback. """
+		try:
+			reportPaths = self.dataManager.writeSizeReports(self.packAnalysis)
+		except OSError as error:
+			InfoModalWindow(self, f'Unable to write the size report:\n{error}')
+		else:
+			InfoModalWindow(self, 'Size report written to:\n' + '\n'.join(reportPaths))
+
+#-
+	def archiveFormatSelectCB(self, archiveFormat: str) -> None:
+		""" Option menu callback. Update available presets to match the format. """
+		presets = ArchiveWriter.getPresets(archiveFormat)
+		currentPreset = self.components['selectArchivePreset'].get()
+		self.components['selectArchivePreset'].configure(True, **{'values': presets})
+		if currentPreset not in presets:
+			self.components['selectArchivePreset'].set(presets[0])
+
+#-
+	def exportCancelCB(self) -> None:
+		""" Button callback. """
+		self.components['actionButtons'].setButtonState('cancel', True)
+		self.components['phaseLabel'].configure(True, **{'text': 'Cancelling...'})
+		self.buildWorker.cancel()
+
+#-
+	def closeWindowCB(self) -> None:
+		""" Window close callback. Cancels and rolls back any running export before exiting. """
+		if self.buildWorker != None:
+			self.buildWorker.cancel()
+			# rollback happens on the worker thread and is bounded by DataManager.cancel's timeout
+			self.buildWorker.join(15)
+		self.dataManager.cleanup()
+		self.destroy()
+
 #-
 	def exportCompleteCB(self) -> None:
 		""" dataManager jobs completion callback. """
+		self.buildWorker = None
 		self.dataManager.cleanup()
 		self.displayExportReport()
 
+#-
+	def exportCancelledCB(self) -> None:
+		""" dataManager build cancelled callback. """
+		self.buildWorker = None
+		self.dataManager.cleanup()
+		# back to export options so the user can adjust and retry
+		self.displayExportOptions()
+
+#-
+	def exportErrorCB(self, error: Exception) -> None:
+		""" dataManager build error callback. """
+		self.buildWorker = None
+		self.dataManager.cleanup()
+		self.displayExportOptions()
+		InfoModalWindow(self, f'Export failed:\n{error}')
+
 #---
 # input validators
 
@@ -428,7 +698,8 @@ class App(customtkinter.CTk):
 			assetsPath     = self.inputVars['assetFolderPath'].get(),
 			tumbnailPath   = self.inputVars['thumbnailImagePath'].get(),
 			screenshotPath = self.inputVars['screenshotImagePath'].get(),
-			outputPath     = self.inputVars['outputFolderPath'].get()
+			outputPath     = self.inputVars['outputFolderPath'].get(),
+			screenshotPaths = self.extraScreenshotPaths,
 		)
 		# get all missing/invalid inputs
 		missingInfo = self.dataManager.getMissingPackInfo()
@@ -466,19 +737,51 @@ class App(customtkinter.CTk):
 	def export(self, zipped, unpacked, installToEngine) -> None:
 
 		self.displayPending()
-		self.dataManager.generateFileData()
-		self.dataManager.createPack(zipped, unpacked, installToEngine)
+		# staging / packing runs on a worker thread, the UI only drains its event queue
+		self.buildWorker = BuildWorker(self.dataManager, zipped, unpacked, installToEngine)
+		self.buildWorker.start()
 
-		self.after(100, self.pollDataManagerJobsLoop)
+		self.after(100, self.pollBuildWorkerLoop)
 
 #-
-	def pollDataManagerJobsLoop(self) -> None:
-		""" Loop for waiting on job completion. """
-
-		activeCount, pendingCount = self.dataManager.pollJobs()
-		self.unfinishedJobCount = activeCount + pendingCount
+	def pollBuildWorkerLoop(self) -> None:
+		""" Loop for processing build worker events until the build ends. """
+
+		lastPhase = None
+		for eventType, data in self.buildWorker.getEvents():
+			match eventType:
+				case 'phase':
+					lastPhase = data
+				case 'jobs':
+					self.unfinishedJobCount = data[0] + data[1]
+				case 'done':
+					self.exportCompleteCB()
+					return
+				case 'cancelled':
+					self.exportCancelledCB()
+					return
+				case 'error':
+					self.exportErrorCB(data)
+					return
+
+		# only the latest phase is worth displaying
+		if lastPhase != None and not self.buildWorker.dataManager.isCancelled():
+			self.updatePendingPhase(*lastPhase)
+
+		self.after(100, self.pollBuildWorkerLoop)
 
-		if self.unfinishedJobCount == 0:
-			self.exportCompleteCB()
+#-
+	def updatePendingPhase(self, phase: str, fraction: float | None) -> None:
+		""" Update the pending screen with the current phase and progress. """
+
+		self.components['phaseLabel'].configure(True, **{'text': phase})
+		progressBar = self.components['progressBar']
+		if fraction == None:
+			if progressBar.cget('mode') != 'indeterminate':
+				progressBar.configure(mode='indeterminate')
+				progressBar.start()
 		else:
-			self.after(500, self.pollDataManagerJobsLoop)
\ No newline at end of file
+			if progressBar.cget('mode') != 'determinate':
+				progressBar.stop()
+				progressBar.configure(mode='determinate')
+			progressBar.set(fraction)
\ No newline at end of file
@@ -0,0 +1,316 @@
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_LZMA, ZIP64_LIMIT
+from shutil import copyfileobj
+import zipfile
+import tarfile
+import hashlib
+import heapq
+import json
+import stat
+import time
+import sys
+import os
+
+# optional dependency, required for the .tar.zst format
+try:
+	import zstandard
+except ImportError:
+	zstandard = None
+
+# import type defs
+from collections.abc import Iterator, Sequence
+from typing import Any
+from os import PathLike
+
+# commandline syntax (run as a DataManager job):
+# ./archiveWriter.py <outputPath> [-format <name>] [-preset <name>] [-reproducible] [-shard <shardManifestPath> <index>] [-delta <deltaManifestPath>] [-version <packVersion>] [-root <archivePath> <sourcePath>]...
+# a file source is added as <archivePath>, a dir source has its content added under <archivePath>/
+# -shard: only write the members listed for that shard in the shard manifest (see planShards)
+# -delta: only write the added / changed members listed in a delta manifest (see PackDelta)
+# a sha256 digest of the archive is written next to it as <outputPath>.sha256
+# the size, mtime (not in reproducible mode) and blake2b digest of every member is written next to it as <outputPath>.files.json (base for delta packs)
+
+# compression method for zip zstd (method 93), only writable with python 3.14+
+ZIP_ZSTANDARD = getattr(zipfile, 'ZIP_ZSTANDARD', None)
+
+# format name: extension, compression and per preset compression level
+# 'zip' is readable everywhere, the others trade compatibility for speed / ratio
+ARCHIVE_FORMATS: dict[str, dict[str, Any]] = {
+	'zip': {
+		'extension':   '.zip',
+		'compression': ZIP_DEFLATED,
+		'presets':     {'fast': 1, 'balanced': 6, 'small': 9},
+	},
+	'zip (zstd)': {
+		'extension':   '.zip',
+		'compression': ZIP_ZSTANDARD,
+		'presets':     {'fast': 3, 'balanced': 9, 'small': 19},
+	},
+	# stands in for zip deflate64, which python's zipfile can't write
+	'zip (lzma)': {
+		'extension':   '.zip',
+		'compression': ZIP_LZMA,
+		'presets':     {'fast': 1, 'balanced': 6, 'small': 9},
+	},
+	'tar.zst': {
+		'extension':   '.tar.zst',
+		'compression': None,
+		'presets':     {'fast': 3, 'balanced': 10, 'small': 19},
+	},
+}
+DEFAULT_ARCHIVE_FORMAT = 'zip'
+DEFAULT_ARCHIVE_PRESET = 'balanced'
+
+# reproducible mode: timestamp given to every member (SOURCE_DATE_EPOCH convention, defaults to the earliest zip date)
+REPRODUCIBLE_EPOCH = int(os.environ.get('SOURCE_DATE_EPOCH', 315532800)) # 1980-01-01 00:00:00 UTC
+REPRODUCIBLE_MODE  = 0o644
+# zip 'made by' system, unix (the only one external_attr mode bits are defined for), ZipInfo defaults to the host's
+REPRODUCIBLE_CREATE_SYSTEM = 3
+
+DIGEST_EXT = '.sha256'
+FILE_MANIFEST_EXT = '.files.json'
+SHARD_MANIFEST_EXT = '.shards.json'
+# name of the delta manifest inside delta packs
+DELTA_MANIFEST_NAME = 'unrealPackGen_delta.json'
+COPY_BUFFER_SIZE = 4 * 1024 * 1024
+
+#---------------------------------------------------------------------------------------------------
+class ArchiveWriter():
+	def __init__(self, outputPath: PathLike[str] | str, archiveFormat: str = DEFAULT_ARCHIVE_FORMAT, preset: str = DEFAULT_ARCHIVE_PRESET, reproducible: bool = False) -> None:
+		""" Streams files into an archive straight from their source location, no staging copy needed.\n
+		In reproducible mode, identical input always results in a byte identical archive (normalized timestamps, permissions and owners).
+		"""
+
+		if archiveFormat not in self.getAvailableFormats():
+			raise ValueError(f'unsupported archive format: {archiveFormat}')
+		if preset not in ARCHIVE_FORMATS[archiveFormat]['presets']:
+			raise ValueError(f'unknown preset "{preset}" for archive format {archiveFormat}')
+
+		self.outputPath = os.path.abspath(outputPath)
+		self.archiveFormat = archiveFormat
+		self.preset = preset
+		self.reproducible = reproducible
+
+		self.memberCount = 0
+		self.bytesRead   = 0
+		self.digest: str | None = None
+
+		self.memberFilter: set[str] | None = None # archive paths to write, None for all (see setShard)
+		self.memberEntries: dict[str, dict[str, Any]] = {} # dict(archive path: file manifest entry), see writeFileManifest
+		self.packVersion: str | None = None # recorded in the file manifest
+
+#-
+	def setShard(self, shardManifestPath: PathLike[str] | str, shardIndex: int) -> None:
+		""" Restrict the archive to the members of one shard of a shard manifest. """
+
+		with open(shardManifestPath, 'r', encoding='utf-8') as file:
+			self.memberFilter = set(json.load(file)['shards'][shardIndex]['members'])
+
+#-
+	def setDelta(self, deltaManifestPath: PathLike[str] | str) -> None:
+		""" Restrict the archive to the added / changed members of a delta manifest, plus the delta manifest itself. """
+
+		with open(deltaManifestPath, 'r', encoding='utf-8') as file:
+			deltaManifest = json.load(file)
+		self.memberFilter = set(deltaManifest['added']) | set(deltaManifest['changed']) | {DELTA_MANIFEST_NAME}
+
+#-
+	def write(self, roots: Sequence[tuple[str, PathLike[str] | str]]) -> None:
+		""" Write all members of the given roots to the archive.\n
+		Written under a temporary name first so a killed writer never leaves a truncated archive at outputPath.
+		"""
+
+		partialPath = self.outputPath + '.partial'
+		try:
+			if self.archiveFormat == 'tar.zst':
+				self._writeTarZst(partialPath, roots)
+			else:
+				self._writeZip(partialPath, roots)
+			os.replace(partialPath, self.outputPath)
+		finally:
+			if os.path.exists(partialPath):
+				os.unlink(partialPath)
+
+		self.writeDigest()
+		self.writeFileManifest()
+
+#-
+	def writeDigest(self) -> str:
+		""" Hash the written archive and store the digest next to it (sha256sum format).\n
+		Returns the hex digest.
+		"""
+
+		hasher = hashlib.sha256()
+		buffer = memoryview(bytearray(COPY_BUFFER_SIZE))
+		with open(self.outputPath, 'rb') as file:
+			while readSize := file.readinto(buffer):
+				hasher.update(buffer[:readSize])
+
+		self.digest = hasher.hexdigest()
+		with open(self.outputPath + DIGEST_EXT, 'w', newline='\n') as file:
+			file.write(f'{self.digest} *{os.path.basename(self.outputPath)}\n')
+		return self.digest
+
+#-
+	def writeFileManifest(self) -> None:
+		""" Write the size, mtime (not in reproducible mode) and digest of every member next to the archive, used as base for delta packs (see PackDelta). """
+
+		with open(self.outputPath + FILE_MANIFEST_EXT, 'w', encoding='utf-8', newline='\n') as file:
+			json.dump({'version': self.packVersion, 'files': self.memberEntries}, file, indent=1, sort_keys=True)
+
+#-
+	def _writeZip(self, path: str, roots: Sequence[tuple[str, PathLike[str] | str]]) -> None:
+		formatInfo = ARCHIVE_FORMATS[self.archiveFormat]
+		compressLevel = formatInfo['presets'][self.preset]
+		with ZipFile(path, 'w', compression=formatInfo['compression'], compresslevel=compressLevel, allowZip64=True) as archive:
+			for archivePath, sourcePath in self.iterMembers(roots, self.memberFilter):
+				# streamed by hand rather than with archive.write, so the data can be hashed on the way
+				if not self.reproducible:
+					memberInfo = ZipInfo.from_file(sourcePath, archivePath)
+				else:
+					memberInfo = ZipInfo(archivePath, date_time=time.gmtime(REPRODUCIBLE_EPOCH)[:6])
+					memberInfo.create_system = REPRODUCIBLE_CREATE_SYSTEM
+					memberInfo.external_attr = (stat.S_IFREG | REPRODUCIBLE_MODE) << 16
+				memberInfo.compress_type = formatInfo['compression']
+				memberInfo._compresslevel = compressLevel # no public way of passing it along a ZipInfo
+				memberInfo.file_size = os.path.getsize(sourcePath)
+				with open(sourcePath, 'rb') as sourceFile, archive.open(memberInfo, 'w', force_zip64=(memberInfo.file_size > ZIP64_LIMIT)) as memberFile:
+					hasher = hashlib.blake2b()
+					copyfileobj(_HashingReader(sourceFile, hasher), memberFile, COPY_BUFFER_SIZE)
+				self._onMemberWritten(archivePath, sourcePath, hasher)
+
+#-
+	def _writeTarZst(self, path: str, roots: Sequence[tuple[str, PathLike[str] | str]]) -> None:
+		# threads=-1: one compression worker per logical core
+		compressor = zstandard.ZstdCompressor(level=ARCHIVE_FORMATS[self.archiveFormat]['presets'][self.preset], threads=-1)
+		with open(path, 'wb') as file, compressor.stream_writer(file) as compressedStream:
+			# stream mode ('w|'), the tar is never seekable / buffered as a whole
+			with tarfile.open(fileobj=compressedStream, mode='w|', format=tarfile.PAX_FORMAT) as archive:
+				for archivePath, sourcePath in self.iterMembers(roots, self.memberFilter):
+					memberInfo = archive.gettarinfo(sourcePath, archivePath)
+					if self.reproducible:
+						memberInfo.mtime = REPRODUCIBLE_EPOCH
+						memberInfo.mode  = REPRODUCIBLE_MODE
+						memberInfo.uid   = memberInfo.gid   = 0
+						memberInfo.uname = memberInfo.gname = ''
+					with open(sourcePath, 'rb') as sourceFile:
+						hasher = hashlib.blake2b()
+						archive.addfile(memberInfo, _HashingReader(sourceFile, hasher))
+					self._onMemberWritten(archivePath, sourcePath, hasher)
+
+#-
+	def _onMemberWritten(self, archivePath: str, sourcePath: str, hasher) -> None:
+		sourceStat = os.stat(sourcePath)
+		self.memberCount += 1
+		self.bytesRead += sourceStat.st_size
+		self.memberEntries[archivePath] = {'size': sourceStat.st_size, 'blake2b': hasher.hexdigest()}
+		# differs between checkouts of the same content, left out of reproducible builds (delta packs then compare hashes)
+		if not self.reproducible:
+			self.memberEntries[archivePath]['mtime_ns'] = sourceStat.st_mtime_ns
+
+#-
+	@classmethod
+	def iterMembers(cls, roots: Sequence[tuple[str, PathLike[str] | str]], memberFilter: set[str] | None = None) -> Iterator[tuple[str, str]]:
+		""" Yield tuple(archive path, source path) for every file under the given roots (tuple(archive path, source path)).\n
+		Members are yielded in a stable order (roots in the given order, then sorted), independent of the filesystem.\n
+		memberFilter: only yield members whose archive path is in the set
+		"""
+
+		for rootArchivePath, rootSourcePath in roots:
+			rootArchivePath = rootArchivePath.replace('\\', '/').strip('/')
+
+			if os.path.isfile(rootSourcePath):
+				if memberFilter == None or rootArchivePath in memberFilter:
+					yield (rootArchivePath, os.fspath(rootSourcePath))
+				continue
+
+			for dirPath, dirNames, filenames in os.walk(rootSourcePath):
+				# sorting in place also sets the order os.walk descends in
+				dirNames.sort()
+				relDirPath = os.path.relpath(dirPath, rootSourcePath).replace('\\', '/')
+				for filename in sorted(filenames):
+					archivePath = '/'.join(segment for segment in (rootArchivePath, relDirPath, filename) if segment and segment != '.')
+					if memberFilter == None or archivePath in memberFilter:
+						yield (archivePath, os.path.join(dirPath, filename))
+
+#-
+	@classmethod
+	def planShards(cls, members: Sequence[tuple[str, int]], shardCount: int) -> list[list[str]]:
+		""" Split members (tuple(archive path, size)) into shardCount groups of about the same total size.\n
+		Largest first, each going to the currently smallest group. Deterministic for identical input.\n
+		Returns the archive paths of each group, sorted.
+		"""
+
+		shards: list[list[str]] = [[] for _ in range(shardCount)]
+		shardSizes = [(0, shardIndex) for shardIndex in range(shardCount)] # heap of tuple(total size, shard index)
+		for archivePath, size in sorted(members, key=lambda member: (-member[1], member[0])):
+			totalSize, shardIndex = heapq.heappop(shardSizes)
+			shards[shardIndex].append(archivePath)
+			heapq.heappush(shardSizes, (totalSize + size, shardIndex))
+
+		return [sorted(shard) for shard in shards]
+
+#-
+	@classmethod
+	def getAvailableFormats(cls) -> list[str]:
+		""" Return the names of all formats that can be written with the installed python / packages. """
+
+		availableFormats = []
+		for formatName, formatInfo in ARCHIVE_FORMATS.items():
+			if formatName == 'tar.zst' and zstandard == None:
+				continue
+			if formatName == 'zip (zstd)' and ZIP_ZSTANDARD == None:
+				continue
+			availableFormats.append(formatName)
+		return availableFormats
+
+#-
+	@classmethod
+	def getPresets(cls, archiveFormat: str) -> list[str]:
+		return list(ARCHIVE_FORMATS[archiveFormat]['presets'])
+
+#-
+	@classmethod
+	def getExtension(cls, archiveFormat: str) -> str:
+		return ARCHIVE_FORMATS[archiveFormat]['extension']
+
+#---------------------------------------------------------------------------------------------------
+class _HashingReader():
+	def __init__(self, file, hasher) -> None:
+		""" Read only file wrapper, feeds everything read through it to hasher. """
+		self.file = file
+		self.hasher = hasher
+
+#-
+	def read(self, size: int = -1) -> bytes:
+		data = self.file.read(size)
+		self.hasher.update(data)
+		return data
+
+#---------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+	arguments = sys.argv[1:]
+
+	roots = []
+	while '-root' in arguments:
+		index = arguments.index('-root')
+		roots.append((arguments[index + 1], arguments[index + 2]))
+		del arguments[index:index + 3]
+
+	archiveFormat = DEFAULT_ARCHIVE_FORMAT
+	preset = DEFAULT_ARCHIVE_PRESET
+	if '-format' in arguments:
+		archiveFormat = arguments[arguments.index('-format') + 1]
+	if '-preset' in arguments:
+		preset = arguments[arguments.index('-preset') + 1]
+
+	writer = ArchiveWriter(arguments[0], archiveFormat, preset, reproducible=('-reproducible' in arguments))
+	if '-shard' in arguments:
+		index = arguments.index('-shard')
+		writer.setShard(arguments[index + 1], int(arguments[index + 2]))
+	if '-delta' in arguments:
+		writer.setDelta(arguments[arguments.index('-delta') + 1])
+	if '-version' in arguments:
+		writer.packVersion = arguments[arguments.index('-version') + 1]
+	writer.write(roots)
+	print(f'archived {writer.memberCount} files ({writer.bytesRead} bytes) to {writer.outputPath}')
+	print(f'sha256: {writer.digest}')
@@ -0,0 +1,257 @@
+from fnmatch import fnmatch
+import struct
+import mmap
+import os
+
+# import type defs
+from collections.abc import Sequence
+from os import PathLike
+
+# package header (FPackageFileSummary) constants
+PACKAGE_FILE_TAG = 0x9E2A83C1
+PKG_FILTER_EDITOR_ONLY = 0x80000000
+VER_UE4_SERIALIZE_TEXT_IN_PACKAGES                 = 459
+VER_UE4_NAME_HASHES_SERIALIZED                     = 504
+VER_UE4_ADDED_PACKAGE_SUMMARY_LOCALIZATION_ID      = 516
+VER_UE4_NON_OUTER_PACKAGE_IMPORT                   = 520
+VER_UE5_OPTIONAL_RESOURCES                         = 1003
+VER_UE5_ADD_SOFTOBJECTPATH_LIST                    = 1008
+VER_UE5_PACKAGE_SAVED_HASH                         = 1016
+
+PACKAGE_EXTS   = ('.uasset', '.umap')
+# split / bulk data stored next to a package, staged along with it
+COMPANION_EXTS = ('.uexp', '.ubulk', '.uptnl')
+
+#---------------------------------------------------------------------------------------------------
+class _HeaderReader():
+	def __init__(self, buffer, offset: int = 0) -> None:
+		""" Little endian reader over a (memory mapped) package header. """
+		self.buffer = buffer
+		self.offset = offset
+
+#-
+	def readInt32(self) -> int:
+		value = struct.unpack_from('<i', self.buffer, self.offset)[0]
+		self.offset += 4
+		return value
+
+#-
+	def readUInt32(self) -> int:
+		value = struct.unpack_from('<I', self.buffer, self.offset)[0]
+		self.offset += 4
+		return value
+
+#-
+	def readFString(self) -> str:
+		# length includes the null terminator, negative for UTF-16
+		length = self.readInt32()
+		if length == 0:
+			return ''
+		if length > 0:
+			data = self.buffer[self.offset:self.offset + length]
+			self.offset += length
+			return bytes(data[:-1]).decode('latin-1')
+		data = self.buffer[self.offset:self.offset - length * 2]
+		self.offset -= length * 2
+		return bytes(data[:-2]).decode('utf-16-le')
+
+#-
+	def skip(self, size: int) -> None:
+		self.offset += size
+
+#---------------------------------------------------------------------------------------------------
+class AssetDependencyGraph():
+	def __init__(self, assetsPath: PathLike[str] | str) -> None:
+		""" Package references between the assets of a pack, read from the package headers only (memory mapped, the rest of the file is never paged in).\n
+		Referenced package names (/Game/.../BASENAME/Dir/Asset) are matched to files by their path relative to the assets dir's parent.
+		"""
+
+		self.assetsPath = os.path.abspath(assetsPath)
+		self.packageFiles: dict[str, str] = {} # dict(package key (ie: BASENAME/Dir/Asset): rel path of the package file)
+		self.otherFiles: list[str] = [] # rel paths of files that are neither packages nor companions of one
+		self.companionFiles: dict[str, list[str]] = {} # dict(rel path of package file: rel paths of its companion files)
+		self.references: dict[str, set[str]] = {} # dict(rel path of package file: rel paths of the package files it references)
+		self.unreadableFiles: dict[str, str] = {} # dict(rel path of package file: reason)
+
+		self._indexFiles()
+
+#-
+	def _indexFiles(self) -> None:
+		baseName = os.path.basename(self.assetsPath)
+		stems: dict[str, str] = {} # dict(rel path without ext: rel path of package file)
+		companions: list[str] = []
+
+		for dirPath, _, filenames in os.walk(self.assetsPath):
+			for filename in filenames:
+				relPath = os.path.relpath(os.path.join(dirPath, filename), self.assetsPath)
+				stem, ext = os.path.splitext(relPath)
+				if ext.lower() in PACKAGE_EXTS:
+					self.packageFiles['/'.join([baseName] + stem.split(os.sep))] = relPath
+					stems[stem] = relPath
+				elif ext.lower() in COMPANION_EXTS:
+					companions.append(relPath)
+				else:
+					self.otherFiles.append(relPath)
+
+		for relPath in companions:
+			packageRelPath = stems.get(os.path.splitext(relPath)[0])
+			if packageRelPath == None:
+				self.otherFiles.append(relPath)
+			else:
+				self.companionFiles.setdefault(packageRelPath, []).append(relPath)
+
+#-
+	def resolvePackageName(self, packageName: str) -> str | None:
+		""" Return the rel path of the package file a package name refers to, None if it isn't part of the pack (ie: /Engine/..., /Script/...). """
+
+		# mount point and parent dirs of the pack differ from one project to the next, longest matching suffix wins
+		segments = packageName.strip('/').split('/')
+		for i in range(len(segments)):
+			relPath = self.packageFiles.get('/'.join(segments[i:]))
+			if relPath != None:
+				return relPath
+		return None
+
+#-
+	def getReachable(self, rootPatterns: Sequence[str]) -> set[str]:
+		""" Return the rel paths of all files needed by the root packages (rel path glob patterns, ie: Maps/*.umap), companions and non package files included.\n
+		Raises ValueError if a reachable package can't be read, its references would be unknown.
+		"""
+
+		rootPatterns = [pattern.replace('\\', '/') for pattern in rootPatterns]
+		pendingPaths = [relPath for relPath in self.packageFiles.values() if any(fnmatch(relPath.replace(os.sep, '/'), pattern) for pattern in rootPatterns)]
+		reachablePaths = set(pendingPaths)
+		while pendingPaths:
+			relPath = pendingPaths.pop()
+			for referencedPath in self.getReferences(relPath):
+				if referencedPath not in reachablePaths:
+					reachablePaths.add(referencedPath)
+					pendingPaths.append(referencedPath)
+
+		if self.unreadableFiles.keys() & reachablePaths:
+			raise ValueError('unable to read the references of: ' + ', '.join(f'{relPath} ({reason})' for relPath, reason in self.unreadableFiles.items() if relPath in reachablePaths))
+
+		for relPath in list(reachablePaths):
+			reachablePaths.update(self.companionFiles.get(relPath, []))
+		# not a package, can't tell if it's used
+		reachablePaths.update(self.otherFiles)
+		return reachablePaths
+
+#-
+	def getReferences(self, relPath: str) -> set[str]:
+		""" Return the rel paths of the pack's package files referenced by a package file (cached). """
+
+		if relPath not in self.references:
+			try:
+				importedNames, nameMap = self.readPackageHeader(os.path.join(self.assetsPath, relPath))
+			except (ValueError, struct.error, OSError) as error:
+				self.unreadableFiles[relPath] = str(error) or type(error).__name__
+				self.references[relPath] = set()
+				return self.references[relPath]
+
+			# hard references come from the import table, soft references (ie: TSoftObjectPtr) only show up as names
+			self.references[relPath] = set()
+			for packageName in importedNames | {name for name in nameMap if name.startswith('/')}:
+				referencedPath = self.resolvePackageName(packageName)
+				if referencedPath != None and referencedPath != relPath:
+					self.references[relPath].add(referencedPath)
+		return self.references[relPath]
+
+#-
+	@classmethod
+	def readPackageHeader(cls, path: PathLike[str] | str) -> tuple[set[str], list[str]]:
+		""" Read the package summary, name map and import table of a .uasset / .umap.\n
+		Returns (names of the imported packages, name map)
+		"""
+
+		with open(path, 'rb') as file:
+			if os.fstat(file.fileno()).st_size == 0:
+				raise ValueError('empty file')
+			with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+				reader = _HeaderReader(buffer)
+				if reader.readUInt32() != PACKAGE_FILE_TAG:
+					raise ValueError('not a package file')
+
+				legacyFileVersion = reader.readInt32()
+				if legacyFileVersion >= 0 or legacyFileVersion < -8:
+					raise ValueError(f'unsupported legacy file version {legacyFileVersion}')
+				if legacyFileVersion != -4:
+					reader.skip(4) # LegacyUE3Version
+				fileVersionUE4 = reader.readInt32()
+				fileVersionUE5 = reader.readInt32() if legacyFileVersion <= -8 else 0
+				reader.skip(4) # FileVersionLicenseeUE
+				if fileVersionUE4 == 0 and fileVersionUE5 == 0:
+					raise ValueError('unversioned package')
+
+				if legacyFileVersion <= -2:
+					customVersionCount = reader.readInt32()
+					for _ in range(customVersionCount):
+						if legacyFileVersion == -2:
+							reader.skip(8) # enum tag, version
+						elif legacyFileVersion >= -5:
+							reader.skip(20) # guid, version
+							reader.readFString() # friendly name
+						else:
+							reader.skip(20) # guid, version
+
+				if fileVersionUE5 >= VER_UE5_PACKAGE_SAVED_HASH:
+					reader.skip(20) # SavedHash
+				reader.skip(4) # TotalHeaderSize
+				reader.readFString() # PackageName
+				packageFlags = reader.readUInt32()
+				isEditorData = not (packageFlags & PKG_FILTER_EDITOR_ONLY)
+
+				nameCount = reader.readInt32()
+				nameOffset = reader.readInt32()
+				if fileVersionUE5 >= VER_UE5_ADD_SOFTOBJECTPATH_LIST:
+					reader.skip(8) # SoftObjectPathsCount / Offset
+				if isEditorData and fileVersionUE4 >= VER_UE4_ADDED_PACKAGE_SUMMARY_LOCALIZATION_ID:
+					reader.readFString() # LocalizationId
+				if fileVersionUE4 >= VER_UE4_SERIALIZE_TEXT_IN_PACKAGES:
+					reader.skip(8) # GatherableTextDataCount / Offset
+				reader.skip(8) # ExportCount / Offset
+				importCount = reader.readInt32()
+				importOffset = reader.readInt32()
+
+				# name map
+				nameMap = []
+				reader.offset = nameOffset
+				for _ in range(nameCount):
+					nameMap.append(reader.readFString())
+					if fileVersionUE4 >= VER_UE4_NAME_HASHES_SERIALIZED:
+						reader.skip(4) # case preserving / non case preserving hashes
+
+				# import table, package imports are the outermost ones (OuterIndex 0) of class Package
+				getName = lambda index: nameMap[index] if 0 <= index < len(nameMap) else ''
+				importedNames = set()
+				reader.offset = importOffset
+				for _ in range(importCount):
+					reader.skip(8) # ClassPackage
+					className = getName(reader.readInt32())
+					reader.skip(4) # ClassName number
+					outerIndex = reader.readInt32()
+					objectName = getName(reader.readInt32())
+					reader.skip(4) # ObjectName number
+					if isEditorData and fileVersionUE4 >= VER_UE4_NON_OUTER_PACKAGE_IMPORT:
+						reader.skip(8) # PackageName
+					if fileVersionUE5 >= VER_UE5_OPTIONAL_RESOURCES:
+						reader.skip(4) # bImportOptional
+					if className == 'Package' and outerIndex == 0:
+						importedNames.add(objectName)
+
+		return (importedNames, nameMap)
+
+#-
+	def prune(self, rootPatterns: Sequence[str]) -> tuple[set[str], list[str], int]:
+		""" Split the pack's files into kept / dropped ones.\n
+		Returns (rel paths to keep, rel paths dropped (sorted), total size of the dropped files)
+		"""
+
+		keptPaths = self.getReachable(rootPatterns)
+		allPaths = set(self.otherFiles) | set(self.packageFiles.values())
+		for companions in self.companionFiles.values():
+			allPaths.update(companions)
+
+		droppedPaths = sorted(allPaths - keptPaths)
+		droppedSize = sum(os.path.getsize(os.path.join(self.assetsPath, relPath)) for relPath in droppedPaths)
+		return (keptPaths, droppedPaths, droppedSize)
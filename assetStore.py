@@ -0,0 +1,155 @@
+from treeCopier import TreeCopier, DEFAULT_CHECKSUM_ALGORITHM
+from fileLock import FileLock
+from shutil import copy2
+import threading
+import uuid
+import json
+import os
+
+# import type defs
+from os import PathLike
+
+INDEX_FILENAME = 'index.json'
+LOCK_FILE_EXT  = '.lock'
+
+#---------------------------------------------------------------------------------------------------
+class AssetStore():
+	def __init__(self, storeDir: PathLike[str] | str) -> None:
+		""" Content addressed store shared by builds, identical files are stored once and hard linked into each staging tree.\n
+		Sources are only rehashed when their size / mtime changed since the last time they were staged.\n
+		NOTE: hard links need the store to be on the same volume as the staging dir (UEDir), files are copied otherwise.
+		"""
+
+		self.storeDir = os.path.abspath(storeDir)
+		self.objectsDir = os.path.join(self.storeDir, 'objects')
+		self.indexPath = os.path.join(self.storeDir, INDEX_FILENAME)
+		os.makedirs(self.objectsDir, exist_ok=True)
+
+		# serializes index / stats updates, builds of the build service share a store
+		self.lock = threading.Lock()
+		self.index: dict[str, tuple[int, int, str]] = {} # dict(abs source path: (size, mtime_ns, digest))
+		self.loadIndex()
+
+		self.stagedCount  = 0
+		self.stagedBytes  = 0
+		self.storedBytes  = 0 # bytes newly written to the store
+		self.linkedBytes  = 0 # bytes staged as hard links, no copy made
+		self.hashedBytes  = 0
+
+#-
+	def stageFile(self, sourcePath: PathLike[str] | str, destPath: PathLike[str] | str) -> bool:
+		""" Place the content of sourcePath at destPath, through the store.\n
+		Returns whether the content was already stored (nothing had to be added).
+		"""
+
+		sourcePath = os.path.abspath(sourcePath)
+		sourceStat = os.stat(sourcePath)
+
+		with self.lock:
+			indexEntry = self.index.get(sourcePath)
+		digest = None
+		if indexEntry != None and indexEntry[:2] == (sourceStat.st_size, sourceStat.st_mtime_ns) and os.path.exists(self.getObjectPath(indexEntry[2])):
+			digest = indexEntry[2]
+
+		storedSize = 0
+		if digest == None:
+			digest, storedSize = self._addObject(sourcePath)
+			with self.lock:
+				self.index[sourcePath] = (sourceStat.st_size, sourceStat.st_mtime_ns, digest)
+
+		objectPath = self.getObjectPath(digest)
+		try:
+			os.link(objectPath, destPath)
+			linked = True
+		except OSError:
+			# other volume / filesystem without hard links
+			copy2(objectPath, destPath)
+			linked = False
+
+		with self.lock:
+			self.stagedCount += 1
+			self.stagedBytes += sourceStat.st_size
+			self.storedBytes += storedSize
+			if linked:
+				self.linkedBytes += sourceStat.st_size
+		return storedSize == 0
+
+#-
+	def _addObject(self, sourcePath: str) -> tuple[str, int]:
+		""" Copy a source into the store, hashing it in the same pass.\n
+		Returns (digest, number of bytes added to the store, 0 if the content was already stored)
+		"""
+
+		partialPath = os.path.join(self.objectsDir, f'{uuid.uuid4().hex}.partial')
+		try:
+			digest = TreeCopier(DEFAULT_CHECKSUM_ALGORITHM).copyFile(sourcePath, partialPath)
+			with self.lock:
+				self.hashedBytes += os.path.getsize(partialPath)
+
+			objectPath = self.getObjectPath(digest)
+			if os.path.exists(objectPath):
+				return (digest, 0)
+			os.makedirs(os.path.dirname(objectPath), exist_ok=True)
+			addedSize = os.path.getsize(partialPath)
+			os.replace(partialPath, objectPath)
+			return (digest, addedSize)
+		finally:
+			if os.path.exists(partialPath):
+				os.unlink(partialPath)
+
+#-
+	def getObjectPath(self, digest: str) -> str:
+		# fan out, keeps dirs small enough for every filesystem
+		return os.path.join(self.objectsDir, digest[:2], digest)
+
+#---
+# index
+
+	def loadIndex(self) -> None:
+		try:
+			with open(self.indexPath, 'r') as file:
+				self.index = {path: tuple(entry) for path, entry in json.load(file).items()}
+		except (OSError, ValueError):
+			self.index = {}
+
+#-
+	def saveIndex(self) -> None:
+		""" Merge the index into the one on disk, other processes might have updated it in the meantime. """
+
+		with FileLock(self.indexPath + LOCK_FILE_EXT), self.lock:
+			try:
+				with open(self.indexPath, 'r') as file:
+					mergedIndex = json.load(file)
+			except (OSError, ValueError):
+				mergedIndex = {}
+			mergedIndex.update(self.index)
+
+			partialPath = self.indexPath + '.partial'
+			with open(partialPath, 'w') as file:
+				json.dump(mergedIndex, file)
+			os.replace(partialPath, self.indexPath)
+
+#---
+# report
+
+	def getBytesSaved(self) -> int:
+		""" Bytes that did not have to be written: everything staged as a hard link, minus what was newly added to the store. """
+		return self.linkedBytes - self.storedBytes
+
+#-
+	def getReport(self) -> str:
+		return '\n'.join([
+			f'staged {self.stagedCount} files ({self.formatSize(self.stagedBytes)}) through {self.storeDir}',
+			f'  newly stored:  {self.formatSize(self.storedBytes)}',
+			f'  hashed:        {self.formatSize(self.hashedBytes)}',
+			f'  hard linked:   {self.formatSize(self.linkedBytes)}',
+			f'  bytes saved:   {self.formatSize(self.getBytesSaved())}',
+		])
+
+#-
+	@classmethod
+	def formatSize(cls, size: int) -> str:
+		for unit in ('B', 'KiB', 'MiB', 'GiB'):
+			if size < 1024 or unit == 'GiB':
+				return f'{size:.1f} {unit}' if unit != 'B' else f'{size} B'
+			size /= 1024
@@ -0,0 +1,117 @@
+import json
+import re
+
+# import type defs
+from collections.abc import Sequence, Mapping
+from os import PathLike
+
+RULE_KINDS = ('glob', 'regex', 'dir')
+
+#---------------------------------------------------------------------------------------------------
+class AssetTypeRules():
+	def __init__(self, rules: Sequence[Mapping[str, str]] = (), path: PathLike[str] | str | None = None) -> None:
+		""" Asset type overrides matched against asset paths (rel to the assets dir, / separated), ie: {"kind": "dir", "pattern": "Legacy/Textures", "type": "Texture"}.\n
+		kind: 'glob' (ie: Props/**/*_D.uasset), 'regex' (full match) or 'dir' (everything under the dir). Glob and dir rules ignore case, the first matching rule wins.\n
+		All rules are compiled into one combined pattern, a path is matched once no matter the number of rules.\n
+		path: rules file the rules were loaded from, used by save
+		"""
+
+		self.path = path
+		self.rules: list[dict[str, str]] = []
+		self.matcher: re.Pattern | None = None
+		for rule in rules:
+			self.addRule(rule['kind'], rule['pattern'], rule['type'], compile=False)
+		self.compile()
+
+#-
+	@classmethod
+	def load(cls, path: PathLike[str] | str) -> 'AssetTypeRules':
+		""" Load a rules file (JSON list of rules), no rules if it doesn't exist yet. """
+
+		try:
+			with open(path, 'r') as file:
+				rules = json.load(file)
+		except FileNotFoundError:
+			rules = []
+		return cls(rules, path)
+
+#-
+	def save(self) -> None:
+		with open(self.path, 'w') as file:
+			json.dump(self.rules, file, indent=2)
+
+#-
+	def addRule(self, kind: str, pattern: str, assetType: str, compile: bool = True) -> None:
+		""" Add a rule, raises ValueError if it is invalid. """
+
+		if kind not in RULE_KINDS:
+			raise ValueError(f'unknown rule kind "{kind}" (expected: {", ".join(RULE_KINDS)})')
+		try:
+			re.compile(self._toRegex(kind, pattern))
+		except re.error as error:
+			raise ValueError(f'invalid {kind} pattern "{pattern}": {error}')
+
+		self.rules.append({'kind': kind, 'pattern': pattern, 'type': assetType})
+		if compile:
+			self.compile()
+
+#-
+	def compile(self) -> None:
+		# one named group per rule, the group that matched gives the rule
+		if self.rules:
+			self.matcher = re.compile('|'.join(f'(?P<r{index}>{self._toRegex(rule["kind"], rule["pattern"])})' for index, rule in enumerate(self.rules)))
+		else:
+			self.matcher = None
+
+#-
+	def _toRegex(self, kind: str, pattern: str) -> str:
+		pattern = pattern.replace('\\', '/').strip('/') if kind != 'regex' else pattern
+		match kind:
+			case 'glob':
+				return f'(?i:{self._globToRegex(pattern)})'
+			case 'dir':
+				return f'(?i:{re.escape(pattern)}/.*)'
+			case 'regex':
+				# no groups of its own, they would clash with the per rule groups
+				return f'(?:{re.sub(r"[(][?]P<[^>]*>", "(?:", pattern)})'
+
+#-
+	def _globToRegex(self, pattern: str) -> str:
+		""" ** spans dirs, * and ? stay within one, [...] is a char class. """
+
+		regex = ''
+		index = 0
+		while index < len(pattern):
+			char = pattern[index]
+			if pattern.startswith('**/', index):
+				regex += '(?:.*/)?'
+				index += 3
+				continue
+			if pattern.startswith('**', index):
+				regex += '.*'
+				index += 2
+				continue
+			if char == '*':
+				regex += '[^/]*'
+			elif char == '?':
+				regex += '[^/]'
+			elif char == '[' and ']' in pattern[index + 2:]:
+				classEnd = pattern.index(']', index + 2)
+				charClass = pattern[index + 1:classEnd].replace('\\', '\\\\')
+				regex += '[' + ('^' + charClass[1:] if charClass.startswith('!') else charClass) + ']'
+				index = classEnd
+			else:
+				regex += re.escape(char)
+			index += 1
+		return regex
+
+#-
+	def match(self, relPath: str) -> str | None:
+		""" Return the asset type of the first rule matching relPath, None if none do. """
+
+		if self.matcher == None:
+			return None
+		match = self.matcher.fullmatch(relPath.replace('\\', '/'))
+		if match == None:
+			return None
+		return self.rules[int(match.lastgroup[1:])]['type']
@@ -0,0 +1,194 @@
+import threading
+import time
+import json
+import os
+
+# import type defs
+from collections.abc import Sequence
+from typing import Any
+from os import PathLike
+
+JOURNAL_EXT = '.journal'
+# max time between a journal record and it being flushed to disk (fsync), phase / output records are synced right away
+JOURNAL_SYNC_INTERVAL = 1.0
+
+#---------------------------------------------------------------------------------------------------
+class BuildJournal():
+	def __init__(self, path: PathLike[str] | str) -> None:
+		""" Append-only record of a build's progress, kept next to its persistent staging dir (see DataManager.enableJournal).\n
+		One JSON object per line: the build record (key of the build's settings) first, then staged files, finished phases and finished outputs.\n
+		Entries are only trusted on resume if what they describe still matches the disk (size / mtime).
+		"""
+
+		self.path = os.path.abspath(path)
+		self.file = None
+		self.lock = threading.Lock()
+		self.lastSyncTime = 0.0
+		self.resumed = False
+
+		self.stagedFiles: dict[str, tuple[list[int], list[int]]] = {} # dict(abs staged path: ([source size, mtime_ns], [staged size, mtime_ns]))
+		self.outputs: dict[str, tuple[list[list[int]], str]] = {} # dict(abs path of the main output: ([size, mtime_ns] of every path of the output], inputs key))
+		self.phases: set[str] = set()
+		self.visitedFiles: set[str] = set() # staged files checked / recorded by this run
+
+#-
+	def open(self, buildKey: str, resume: bool) -> bool:
+		""" Open the journal, picking up the existing one if resume is set and it is for the same build settings (buildKey).\n
+		Returns whether the previous progress is resumed, a new journal is started otherwise.
+		"""
+
+		if resume and os.path.exists(self.path):
+			records, validSize = self._readRecords()
+			if records and records[0].get('type') == 'build' and records[0].get('key') == buildKey:
+				for record in records[1:]:
+					self._loadRecord(record)
+				self.resumed = True
+				# drop a record cut short by the crash, appends must start on a new line
+				with open(self.path, 'r+b') as file:
+					file.truncate(validSize)
+
+		self.file = open(self.path, 'a' if self.resumed else 'w', encoding='utf-8', newline='\n')
+		if not self.resumed:
+			self._append({'type': 'build', 'key': buildKey, 'time': time.time()}, sync=True)
+		return self.resumed
+
+#-
+	def close(self) -> None:
+		with self.lock:
+			if self.file != None:
+				self.file.flush()
+				os.fsync(self.file.fileno())
+				self.file.close()
+				self.file = None
+
+#-
+	def discard(self) -> None:
+		""" Close and delete the journal, the build it describes is complete. """
+
+		self.close()
+		if os.path.exists(self.path):
+			os.unlink(self.path)
+
+#---
+# records
+
+	def recordStagedFile(self, sourcePath: str, stagedPath: str) -> None:
+		stagedPath = os.path.abspath(stagedPath)
+		sourceStat = os.stat(sourcePath)
+		stagedStat = os.stat(stagedPath)
+		record = {'type': 'file', 'path': stagedPath, 'source': [sourceStat.st_size, sourceStat.st_mtime_ns], 'staged': [stagedStat.st_size, stagedStat.st_mtime_ns]}
+		self._append(record)
+		with self.lock:
+			self._loadRecord(record)
+			self.visitedFiles.add(stagedPath)
+
+#-
+	def isFileStaged(self, sourcePath: str, stagedPath: str) -> bool:
+		""" Whether a previous run already staged the current content of sourcePath at stagedPath. """
+
+		stagedPath = os.path.abspath(stagedPath)
+		with self.lock:
+			entry = self.stagedFiles.get(stagedPath)
+			self.visitedFiles.add(stagedPath)
+		if entry == None:
+			return False
+		try:
+			sourceStat = os.stat(sourcePath)
+			stagedStat = os.stat(stagedPath)
+		except OSError:
+			return False
+		return entry == ([sourceStat.st_size, sourceStat.st_mtime_ns], [stagedStat.st_size, stagedStat.st_mtime_ns])
+
+#-
+	def getUnvisitedFiles(self) -> list[str]:
+		""" Return staged files recorded by a previous run that this one did not stage (ie: deleted sources). """
+
+		with self.lock:
+			return sorted(set(self.stagedFiles) - self.visitedFiles)
+
+#-
+	def recordPhase(self, phaseName: str) -> None:
+		self._append({'type': 'phase', 'name': phaseName}, sync=True)
+		with self.lock:
+			self.phases.add(phaseName)
+
+#-
+	def isPhaseDone(self, phaseName: str) -> bool:
+		with self.lock:
+			return phaseName in self.phases
+
+#-
+	def recordOutput(self, paths: Sequence[str], inputsKey: str) -> None:
+		""" Record a finished output (ie: an archive and its sidecar files), paths[0] identifies it.\n
+		inputsKey: identifies the content the output was made from
+		"""
+
+		paths = [os.path.abspath(path) for path in paths]
+		stats = [[os.stat(path).st_size, os.stat(path).st_mtime_ns] for path in paths]
+		record = {'type': 'output', 'paths': paths, 'stats': stats, 'inputs': inputsKey}
+		self._append(record, sync=True)
+		with self.lock:
+			self._loadRecord(record)
+
+#-
+	def isOutputDone(self, paths: Sequence[str], inputsKey: str) -> bool:
+		""" Whether a previous run finished this output from the same inputs, and it is still intact on disk. """
+
+		with self.lock:
+			entry = self.outputs.get(os.path.abspath(paths[0]))
+		if entry == None or entry[1] != inputsKey or len(entry[0]) != len(paths):
+			return False
+		try:
+			return all([os.stat(path).st_size, os.stat(path).st_mtime_ns] == stat for path, stat in zip(paths, entry[0]))
+		except OSError:
+			return False
+
+#-
+	def refreshOutput(self, path: str) -> None:
+		""" Record the current size / mtime of a recorded output edited after the fact, nothing is done if it wasn't recorded. """
+
+		with self.lock:
+			entry = self.outputs.get(os.path.abspath(path))
+		if entry != None:
+			self.recordOutput([path], entry[1])
+
+#---
+# file
+
+	def _append(self, record: dict[str, Any], sync: bool = False) -> None:
+		with self.lock:
+			self.file.write(json.dumps(record) + '\n')
+			self.file.flush()
+			# a crash loses at most JOURNAL_SYNC_INTERVAL worth of records, which are redone on resume
+			if sync or time.monotonic() - self.lastSyncTime >= JOURNAL_SYNC_INTERVAL:
+				os.fsync(self.file.fileno())
+				self.lastSyncTime = time.monotonic()
+
+#-
+	def _loadRecord(self, record: dict[str, Any]) -> None:
+		match record.get('type'):
+			case 'file':
+				self.stagedFiles[record['path']] = (record['source'], record['staged'])
+			case 'phase':
+				self.phases.add(record['name'])
+			case 'output':
+				self.outputs[record['paths'][0]] = (record['stats'], record['inputs'])
+
+#-
+	def _readRecords(self) -> tuple[list[dict[str, Any]], int]:
+		""" Read all complete records, stopping at the first damaged one.\n
+		Returns (records, size of the journal up to the end of the last complete record)
+		"""
+
+		records = []
+		validSize = 0
+		with open(self.path, 'rb') as file:
+			for line in file:
+				if not line.endswith(b'\n'):
+					break
+				try:
+					records.append(json.loads(line))
+				except ValueError:
+					break
+				validSize += len(line)
+		return (records, validSize)
@@ -0,0 +1,250 @@
+from contextlib import contextmanager
+from fileLock import FileLock
+import threading
+import platform
+import uuid
+import time
+import json
+import os
+
+# import type defs
+from collections.abc import Iterator
+from typing import Any
+from os import PathLike
+
+METRIC_PREFIX = 'unrealpackgen_'
+# upper bounds (seconds) of the duration histograms' buckets, +Inf is implied
+DURATION_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+# name: (type, help)
+METRICS = {
+	'builds_total':                  ('counter',   'Builds by result.'),
+	'build_duration_seconds':        ('histogram', 'Wall time of builds.'),
+	'last_build_timestamp_seconds':  ('gauge',     'Unix time the last build ended.'),
+	'phase_duration_seconds':        ('histogram', 'Wall time of build phases.'),
+	'jobs_total':                    ('counter',   'Subprocess jobs by type and result.'),
+	'job_retries_total':             ('counter',   'Subprocess jobs retried after a transient failure (timeout, stall, failed copies), by type.'),
+	'job_duration_seconds':          ('histogram', 'Wall time of subprocess jobs (to the poll that saw them exit).'),
+	'bytes_copied_total':            ('counter',   'Bytes of assets staged.'),
+	'bytes_compressed_total':        ('counter',   'Bytes of compressed archives written.'),
+	'cache_lookups_total':           ('counter',   'Cache lookups by cache and result.'),
+}
+
+#---------------------------------------------------------------------------------------------------
+class BuildMetrics():
+	def __init__(self, eventsPath: PathLike[str] | str | None, textfilePath: PathLike[str] | str | None = None, labels: dict[str, str] | None = None) -> None:
+		""" Build telemetry (see DataManager.enableMetrics).\n
+		eventsPath: JSONL file events are appended to, one object per line with at least time, build (id) and event\n
+		textfilePath: Prometheus textfile collector output (.prom), counters and histograms accumulate over all builds writing to it\n
+		labels: added to every event (ie: pack name)
+		"""
+
+		self.eventsPath = eventsPath
+		self.textfilePath = textfilePath
+		self.buildId = uuid.uuid4().hex
+		self.labels = {'host': platform.node(), **(labels or {})}
+
+		self.lock = threading.Lock()
+		self.eventsFile = open(eventsPath, 'a', encoding='utf-8', newline='\n') if eventsPath != None else None
+		self.startTime = time.monotonic()
+		self.jobStartTimes: dict[int, float] = {} # dict(pid: spawn time)
+
+		# this build's values, merged into the textfile's totals on close
+		self.counters: dict[str, dict[str, float]] = {} # dict(metric name: dict(labels json: value))
+		self.histograms: dict[str, dict[str, list[float]]] = {} # dict(metric name: dict(labels json: [count per bucket..., +Inf count, sum]))
+
+		self.emit('build_start')
+
+#---
+# events
+
+	def emit(self, event: str, **fields: Any) -> None:
+		""" Append an event to the events file. """
+
+		if self.eventsFile == None:
+			return
+		record = {'time': time.time(), 'build': self.buildId, 'event': event, **self.labels, **fields}
+		with self.lock:
+			self.eventsFile.write(json.dumps(record) + '\n')
+			self.eventsFile.flush()
+
+#-
+	@contextmanager
+	def phase(self, phaseName: str, recordEvents: bool = True) -> Iterator[None]:
+		""" Time everything run in the with block as phaseName.\n
+		recordEvents: emit phase_start / phase_end, off for phases run very often (ie: job polling), which only go to the histogram
+		"""
+
+		if recordEvents:
+			self.emit('phase_start', phase=phaseName)
+		startTime = time.monotonic()
+		error = None
+		try:
+			yield
+		except BaseException as exception:
+			error = type(exception).__name__
+			raise
+		finally:
+			duration = time.monotonic() - startTime
+			self.observe('phase_duration_seconds', duration, phase=phaseName)
+			if recordEvents:
+				self.emit('phase_end', phase=phaseName, duration=duration, error=error)
+
+#-
+	def jobSpawned(self, pid: int, jobType: str) -> None:
+		with self.lock:
+			self.jobStartTimes[pid] = time.monotonic()
+		self.emit('job_spawn', pid=pid, type=jobType)
+
+#-
+	def jobExited(self, pid: int, jobType: str, exitCode: int, success: bool, cause: str | None = None) -> None:
+		""" cause: why the job failed (ie: timed out), None on success """
+
+		with self.lock:
+			startTime = self.jobStartTimes.pop(pid, None)
+		duration = time.monotonic() - startTime if startTime != None else None
+
+		self.increment('jobs_total', type=jobType, result='success' if success else 'failed')
+		if duration != None:
+			self.observe('job_duration_seconds', duration, type=jobType)
+		self.emit('job_exit', pid=pid, type=jobType, exitCode=exitCode, success=success, duration=duration, cause=cause)
+
+#-
+	def addBytes(self, kind: str, byteCount: int) -> None:
+		""" kind: 'copied' or 'compressed' """
+
+		self.increment(f'bytes_{kind}_total', byteCount)
+		if kind == 'compressed':
+			# one per archive, copies are only summed up (one per asset would flood the events)
+			self.emit('bytes_compressed', bytes=byteCount)
+
+#-
+	def cacheLookup(self, cacheName: str, hit: bool) -> None:
+		self.increment('cache_lookups_total', cache=cacheName, result='hit' if hit else 'miss')
+
+#-
+	def close(self, result: str) -> None:
+		""" End the build: emit build_end (with this build's totals) and update the textfile.\n
+		result: 'success', 'failed', 'cancelled' or 'error'
+		"""
+
+		duration = time.monotonic() - self.startTime
+		self.increment('builds_total', result=result)
+		self.observe('build_duration_seconds', duration)
+		self.emit('build_end', result=result, duration=duration, totals=self.getTotals())
+
+		if self.textfilePath != None:
+			self.writeTextfile()
+		if self.eventsFile != None:
+			self.eventsFile.close()
+			self.eventsFile = None
+
+#---
+# aggregation
+
+	def increment(self, name: str, value: float = 1, **labels: str) -> None:
+		labelKey = json.dumps(labels, sort_keys=True)
+		with self.lock:
+			series = self.counters.setdefault(name, {})
+			series[labelKey] = series.get(labelKey, 0) + value
+
+#-
+	def observe(self, name: str, value: float, **labels: str) -> None:
+		labelKey = json.dumps(labels, sort_keys=True)
+		with self.lock:
+			buckets = self.histograms.setdefault(name, {}).setdefault(labelKey, [0] * (len(DURATION_BUCKETS) + 2))
+			for index, upperBound in enumerate(DURATION_BUCKETS):
+				if value <= upperBound:
+					buckets[index] += 1
+			buckets[-2] += 1
+			buckets[-1] += value
+
+#-
+	def getTotals(self) -> dict[str, float]:
+		""" Return this build's counters summed over their labels (ie: bytes_copied_total, cache hits / misses). """
+
+		with self.lock:
+			totals = {name: sum(series.values()) for name, series in self.counters.items() if name != 'cache_lookups_total'}
+			for labelKey, value in self.counters.get('cache_lookups_total', {}).items():
+				labels = json.loads(labelKey)
+				totals[f'cache_{labels["cache"]}_{"hits" if labels["result"] == "hit" else "misses"}'] = value
+		return totals
+
+#---
+# textfile
+
+	def writeTextfile(self) -> None:
+		""" Merge this build's values into the totals kept next to the textfile (<textfile>.state.json), then rewrite the textfile from them.\n
+		Builds running at the same time on the agent take turns (file lock), the textfile is replaced atomically so the collector never reads a partial one.
+		"""
+
+		statePath = f'{self.textfilePath}.state.json'
+		lock = FileLock(f'{self.textfilePath}.lock')
+		lock.acquire()
+		try:
+			try:
+				with open(statePath, 'r') as file:
+					state = json.load(file)
+			except (FileNotFoundError, ValueError):
+				state = {'counters': {}, 'histograms': {}, 'gauges': {}}
+
+			with self.lock:
+				for name, series in self.counters.items():
+					stateSeries = state['counters'].setdefault(name, {})
+					for labelKey, value in series.items():
+						stateSeries[labelKey] = stateSeries.get(labelKey, 0) + value
+				for name, series in self.histograms.items():
+					stateSeries = state['histograms'].setdefault(name, {})
+					for labelKey, buckets in series.items():
+						stateBuckets = stateSeries.setdefault(labelKey, [0] * len(buckets))
+						stateSeries[labelKey] = [total + value for total, value in zip(stateBuckets, buckets)]
+			state['gauges']['last_build_timestamp_seconds'] = {json.dumps({}): time.time()}
+
+			self._replaceFile(statePath, json.dumps(state))
+			self._replaceFile(self.textfilePath, self.formatTextfile(state))
+		finally:
+			lock.release()
+
+#-
+	@classmethod
+	def formatTextfile(cls, state: dict[str, dict[str, dict[str, Any]]]) -> str:
+		""" Return the Prometheus text exposition of the accumulated state. """
+
+		lines = []
+		for name, (metricType, helpText) in METRICS.items():
+			series = state['counters'].get(name) or state['histograms'].get(name) or state['gauges'].get(name)
+			if not series:
+				continue
+			fullName = METRIC_PREFIX + name
+			lines += [f'# HELP {fullName} {helpText}', f'# TYPE {fullName} {metricType}']
+
+			for labelKey, value in sorted(series.items()):
+				labels = json.loads(labelKey)
+				if metricType != 'histogram':
+					lines.append(f'{fullName}{cls._formatLabels(labels)} {value}')
+					continue
+				for upperBound, count in zip(DURATION_BUCKETS, value):
+					lines.append(f'{fullName}_bucket{cls._formatLabels({**labels, "le": str(upperBound)})} {count}')
+				lines.append(f'{fullName}_bucket{cls._formatLabels({**labels, "le": "+Inf"})} {value[-2]}')
+				lines.append(f'{fullName}_count{cls._formatLabels(labels)} {value[-2]}')
+				lines.append(f'{fullName}_sum{cls._formatLabels(labels)} {value[-1]}')
+		return '\n'.join(lines) + '\n'
+
+#-
+	@classmethod
+	def _formatLabels(cls, labels: dict[str, str]) -> str:
+		if not labels:
+			return ''
+		escapedLabels = []
+		for key, value in sorted(labels.items()):
+			value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+			escapedLabels.append(f'{key}="{value}"')
+		return '{' + ','.join(escapedLabels) + '}'
+
+#-
+	@classmethod
+	def _replaceFile(cls, path: PathLike[str] | str, content: str) -> None:
+		partialPath = f'{path}.{uuid.uuid4().hex[:8]}.partial'
+		with open(partialPath, 'w', encoding='utf-8', newline='\n') as file:
+			file.write(content)
+		os.replace(partialPath, path)
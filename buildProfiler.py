@@ -0,0 +1,147 @@
+from contextlib import contextmanager, ExitStack
+import tracemalloc
+import functools
+import cProfile
+import pstats
+import io
+import os
+
+# import type defs
+from collections.abc import Callable, Iterator
+from typing import Any
+from os import PathLike
+
+# number of allocation sites / functions listed per phase in the reports
+REPORT_TOP_COUNT = 25
+
+#---------------------------------------------------------------------------------------------------
+class BuildProfiler():
+	def __init__(self) -> None:
+		""" Collects cProfile stats and tracemalloc allocation diffs per build phase (see DataManager.enableProfiling).\n
+		Repeated phases (ie: job polling) accumulate into the same stats.
+		"""
+
+		self.profiles: dict[str, cProfile.Profile] = {} # dict(phase name: profile)
+		self.allocations: dict[str, dict[str, list[int]]] = {} # dict(phase name: dict(allocation site: [size diff, count diff]))
+		self.peakSizes: dict[str, int] = {} # dict(phase name: peak traced memory while in the phase)
+		self.callCounts: dict[str, int] = {}
+
+		# only one cProfile profiler can be active at once, outer phases are paused while an inner one runs
+		self.phaseStack: list[str] = []
+		# tracing slows down every allocation, it is stopped when the outermost phase exits unless someone else started it
+		self.startedTracing = False
+
+#-
+	@contextmanager
+	def phase(self, phaseName: str) -> Iterator[None]:
+		""" Profile everything run in the with block as phaseName (calling thread only).\n
+		Work handed to other processes (ie: imageProcessing's process pool) isn't profiled, only the time spent waiting on it.
+		"""
+
+		if not tracemalloc.is_tracing():
+			# 10 frames, enough to get back to DataManager code from library internals
+			tracemalloc.start(10)
+			self.startedTracing = True
+
+		if self.phaseStack:
+			self.profiles[self.phaseStack[-1]].disable()
+		self.phaseStack.append(phaseName)
+
+		profile = self.profiles.setdefault(phaseName, cProfile.Profile())
+		tracemalloc.reset_peak()
+		snapshotBefore = self._takeSnapshot()
+		profile.enable()
+		try:
+			yield
+		finally:
+			profile.disable()
+			snapshotAfter = self._takeSnapshot()
+			self.peakSizes[phaseName] = max(self.peakSizes.get(phaseName, 0), tracemalloc.get_traced_memory()[1])
+			self.callCounts[phaseName] = self.callCounts.get(phaseName, 0) + 1
+
+			phaseAllocations = self.allocations.setdefault(phaseName, {})
+			for statDiff in snapshotAfter.compare_to(snapshotBefore, 'lineno'):
+				site = str(statDiff.traceback[0])
+				siteTotals = phaseAllocations.setdefault(site, [0, 0])
+				siteTotals[0] += statDiff.size_diff
+				siteTotals[1] += statDiff.count_diff
+
+			self.phaseStack.pop()
+			if self.phaseStack:
+				self.profiles[self.phaseStack[-1]].enable()
+			elif self.startedTracing:
+				tracemalloc.stop()
+				self.startedTracing = False
+
+#-
+	def _takeSnapshot(self) -> tracemalloc.Snapshot:
+		# leave out the profiler's own bookkeeping
+		return tracemalloc.take_snapshot().filter_traces([
+			tracemalloc.Filter(False, tracemalloc.__file__),
+			tracemalloc.Filter(False, __file__),
+		])
+
+#-
+	def writeReports(self, outputDir: PathLike[str] | str) -> list[str]:
+		""" Write <phase>.pstats (open with pstats / snakeviz) and <phase>.allocations.txt for every profiled phase.\n
+		Returns the written file paths.
+		"""
+
+		os.makedirs(outputDir, exist_ok=True)
+		writtenPaths = []
+		for phaseName, profile in self.profiles.items():
+			statsPath = os.path.join(outputDir, f'{phaseName}.pstats')
+			profile.dump_stats(statsPath)
+			writtenPaths.append(statsPath)
+
+			reportPath = os.path.join(outputDir, f'{phaseName}.allocations.txt')
+			with open(reportPath, 'w') as file:
+				file.write(self.getPhaseReport(phaseName))
+			writtenPaths.append(reportPath)
+		return writtenPaths
+
+#-
+	def getPhaseReport(self, phaseName: str) -> str:
+		""" Return a text report of a phase: calls, peak memory, top allocation sites and top functions by cumulative time. """
+
+		lines = [
+			f'phase: {phaseName}',
+			f'calls: {self.callCounts.get(phaseName, 0)}',
+			f'peak traced memory: {self.peakSizes.get(phaseName, 0) / 1024:.1f} KiB',
+			'',
+			f'top {REPORT_TOP_COUNT} allocation sites (net size / count change over the phase):',
+		]
+		sortedSites = sorted(self.allocations.get(phaseName, {}).items(), key=lambda item: abs(item[1][0]), reverse=True)
+		for site, (sizeDiff, countDiff) in sortedSites[:REPORT_TOP_COUNT]:
+			lines.append(f'{sizeDiff / 1024:>+12.1f} KiB {countDiff:>+9} blocks  {site}')
+
+		statsStream = io.StringIO()
+		try:
+			pstats.Stats(self.profiles[phaseName], stream=statsStream).sort_stats('cumulative').print_stats(REPORT_TOP_COUNT)
+		except TypeError:
+			# nothing was recorded
+			pass
+		lines += ['', f'top {REPORT_TOP_COUNT} functions by cumulative time:', statsStream.getvalue()]
+		return '\n'.join(lines)
+
+#---------------------------------------------------------------------------------------------------
+def profiledPhase(phaseName: str, recordEvents: bool = True) -> Callable[[Callable], Callable]:
+	""" Method decorator, runs the method as a BuildProfiler phase when the instance has a profiler set (self.profiler), and times it when it has build metrics set (self.metrics).\n
+	recordEvents: emit metrics phase start / end events, off for methods called very often
+	"""
+
+	def _decorator(func: Callable) -> Callable:
+		@functools.wraps(func)
+		def _wrapper(self, *args, **kwargs) -> Any:
+			profiler = getattr(self, 'profiler', None)
+			metrics = getattr(self, 'metrics', None)
+			if profiler == None and metrics == None:
+				return func(self, *args, **kwargs)
+			with ExitStack() as stack:
+				if metrics != None:
+					stack.enter_context(metrics.phase(phaseName, recordEvents))
+				if profiler != None:
+					stack.enter_context(profiler.phase(phaseName))
+				return func(self, *args, **kwargs)
+		return _wrapper
+	return _decorator
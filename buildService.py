@@ -0,0 +1,365 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from headlessBuild import HeadlessBuild
+from buildWorker import BuildWorker
+from io import StringIO
+import itertools
+import threading
+import queue
+import sys
+import json
+import time
+import uuid
+import os
+
+# import type defs
+from collections.abc import Mapping
+from typing import Any
+from os import PathLike
+
+# API (json in / out, localhost only):
+# POST   /jobs                          submit: {"spec": <pack spec>, "priority": <int, lower runs first, default 0>} -> {"id": ...}
+# GET    /jobs                          status of all jobs
+# GET    /jobs/<id>                     status of a job
+# GET    /jobs/<id>/log                 job log, streamed until the job ends
+# GET    /jobs/<id>/artifacts/<name>    download an output file of the job
+# DELETE /jobs/<id>                     cancel a job
+
+# finished jobs kept for status / log / artifact queries, the oldest are dropped past this
+MAX_FINISHED_JOBS = 100
+# max time (s) shutdown waits on running builds to roll back their partial outputs
+SHUTDOWN_TIMEOUT = 60.0
+
+#---------------------------------------------------------------------------------------------------
+class ServiceJob():
+	def __init__(self, spec: Mapping[str, Any], priority: int) -> None:
+		""" A build submitted to the BuildService. """
+
+		self.id = uuid.uuid4().hex[:12]
+		self.spec = spec
+		self.priority = priority
+
+		self.status = 'queued' # queued | running | done | failed | cancelled
+		self.submitTime = time.time()
+		self.startTime: float | None = None
+		self.endTime: float | None = None
+		self.failedJobTypes: list[str] | None = None
+		self.failedJobCauses: list[str] | None = None
+		self.artifacts: dict[str, str] = {} # dict(name: abs path)
+
+		self.log = _JobLog()
+		self.worker: BuildWorker | None = None
+		self.cancelRequested = False
+
+#-
+	def isFinished(self) -> bool:
+		return self.status in ('done', 'failed', 'cancelled')
+
+#-
+	def getStatus(self) -> dict[str, Any]:
+		return {
+			'id':             self.id,
+			'packName':       self.spec.get('packName'),
+			'priority':       self.priority,
+			'status':         self.status,
+			'submitTime':     self.submitTime,
+			'startTime':      self.startTime,
+			'endTime':        self.endTime,
+			'failedJobTypes': self.failedJobTypes,
+			'failedJobCauses': self.failedJobCauses,
+			'artifacts':      sorted(self.artifacts),
+		}
+
+#---------------------------------------------------------------------------------------------------
+class _JobLog(StringIO):
+	def __init__(self) -> None:
+		""" Text stream that can be read from other threads while being written to. """
+		super().__init__()
+		self.condition = threading.Condition()
+		self.closedForWriting = False
+
+#-
+	def write(self, text: str) -> int:
+		with self.condition:
+			writtenCount = super().write(text)
+			self.condition.notify_all()
+		return writtenCount
+
+#-
+	def finish(self) -> None:
+		with self.condition:
+			self.closedForWriting = True
+			self.condition.notify_all()
+
+#-
+	def readFrom(self, offset: int, timeout: float) -> tuple[str, bool]:
+		""" Wait for text past offset (or the log to finish).\n
+		Returns (new text, whether the log is finished)
+		"""
+
+		with self.condition:
+			self.condition.wait_for(lambda: len(self.getvalue()) > offset or self.closedForWriting, timeout)
+			return (self.getvalue()[offset:], self.closedForWriting)
+
+#---------------------------------------------------------------------------------------------------
+class BuildService():
+	def __init__(self, basePath: PathLike[str] | None, unrealPakPath: PathLike[str] | None, artifactsDir: PathLike[str], port: int = 8765, workerCount: int = 1) -> None:
+		""" Long running build daemon, builds are submitted over a local HTTP API and run by a bounded pool of workers.\n
+		DataManager's class level caches (settings, engine paths, dir scans, images) stay warm across jobs.
+		"""
+
+		self.basePath = basePath
+		self.unrealPakPath = unrealPakPath
+		self.artifactsDir = os.path.abspath(artifactsDir)
+		self.port = port
+		self.workerCount = workerCount
+
+		self.jobs: dict[str, ServiceJob] = {}
+		self.jobsLock = threading.Lock()
+		self.jobQueue: queue.PriorityQueue[tuple[int, int, ServiceJob]] = queue.PriorityQueue()
+		self._submitCounter = itertools.count() # keeps FIFO order within a priority
+
+		self.httpServer: ThreadingHTTPServer | None = None
+		self.workerThreads: list[threading.Thread] = []
+
+		os.makedirs(self.artifactsDir, exist_ok=True)
+
+#-
+	def serveForever(self) -> None:
+		""" Start the workers and serve the API until ctrl+c. """
+
+		self.startWorkers()
+		self.httpServer = ThreadingHTTPServer(('127.0.0.1', self.port), _ServiceRequestHandler)
+		self.httpServer.service = self
+		print(f'build service listening on http://127.0.0.1:{self.port} ({self.workerCount} worker(s)), ctrl+c to stop')
+		try:
+			self.httpServer.serve_forever()
+		except KeyboardInterrupt:
+			pass
+		finally:
+			self.httpServer.server_close()
+			self.shutdown()
+
+#-
+	def startWorkers(self) -> None:
+		for i in range(self.workerCount):
+			thread = threading.Thread(target=self._workerLoop, name=f'unrealPackGen_service_{i}', daemon=True)
+			thread.start()
+			self.workerThreads.append(thread)
+
+#-
+	def shutdown(self, timeout: float = SHUTDOWN_TIMEOUT) -> bool:
+		""" Cancel all jobs and stop the workers, waiting on running builds to roll back (workers are daemon threads, the process would exit under them).\n
+		Returns whether all workers stopped within the timeout.
+		"""
+
+		for job in list(self.jobs.values()):
+			self.cancel(job)
+		# one per worker, queued after the (now cancelled) jobs
+		for thread in self.workerThreads:
+			self.jobQueue.put((sys.maxsize, next(self._submitCounter), None))
+
+		deadline = time.monotonic() + timeout
+		for thread in self.workerThreads:
+			thread.join(max(deadline - time.monotonic(), 0))
+		runningCount = sum(thread.is_alive() for thread in self.workerThreads)
+		if runningCount:
+			print(f'{runningCount} build(s) still rolling back after {timeout:.0f}s, their outputs may be left partial')
+		return runningCount == 0
+
+#-
+	def submit(self, spec: Mapping[str, Any], priority: int = 0) -> ServiceJob:
+		job = ServiceJob(spec, priority)
+		with self.jobsLock:
+			self.jobs[job.id] = job
+		self.jobQueue.put((priority, next(self._submitCounter), job))
+		return job
+
+#-
+	def cancel(self, job: ServiceJob) -> None:
+		if job.status == 'queued':
+			# still in the queue, skipped once dequeued
+			job.status = 'cancelled'
+			job.endTime = time.time()
+			job.log.finish()
+			self._dropOldJobs()
+		elif job.status == 'running':
+			job.cancelRequested = True
+			worker = job.worker # cleared by the worker thread once the job ends
+			if worker != None:
+				worker.cancel()
+
+#-
+	def _workerLoop(self) -> None:
+		while True:
+			_, _, job = self.jobQueue.get()
+			# shutdown
+			if job == None:
+				return
+			if job.status == 'queued':
+				self._runJob(job)
+
+#-
+	def _runJob(self, job: ServiceJob) -> None:
+		job.status = 'running'
+		job.startTime = time.time()
+
+		try:
+			# outputs go to a per job dir, unless the spec asks for somewhere specific
+			spec = dict(job.spec)
+			if not spec.get('outputPath'):
+				spec['outputPath'] = os.path.join(self.artifactsDir, job.id)
+				os.makedirs(spec['outputPath'], exist_ok=True)
+
+			dataManager = HeadlessBuild.createDataManager(self.basePath, self.unrealPakPath)
+			dataManager.logStream = job.log
+			exportOptions = dataManager.applyPackSpec(spec)
+
+			job.worker = BuildWorker(dataManager, *exportOptions)
+			if job.cancelRequested:
+				# cancelled while setting up, the worker clears pending cancels when starting
+				job.status = 'cancelled'
+				return
+			job.worker.run()
+
+			job.status = 'failed'
+			for eventType, data in job.worker.getEvents():
+				match eventType:
+					case 'phase':
+						if data[1] == None:
+							print(f'{data[0]}...', file=job.log)
+					case 'done':
+						job.failedJobTypes = dataManager.getFailedJobTypes()
+						job.failedJobCauses = dataManager.getFailedJobCauses()
+						job.status = 'done' if job.failedJobTypes == None else 'failed'
+					case 'cancelled':
+						job.status = 'cancelled'
+					case 'error':
+						print(f'build failed: {data}', file=job.log)
+
+			# outputs written to the output dir are the job's artifacts
+			outputDir = os.path.abspath(dataManager.packInfo['packOutputPath'])
+			for path in dataManager.claimedOutputPaths:
+				if os.path.dirname(path) == outputDir and os.path.isfile(path):
+					job.artifacts[os.path.basename(path)] = path
+			dataManager.cleanup()
+
+		except Exception as error:
+			job.status = 'failed'
+			print(f'build failed: {error}', file=job.log)
+
+		finally:
+			# the worker holds the DataManager with its logs and scan caches
+			job.worker = None
+			job.endTime = time.time()
+			print(f'job {job.id}: {job.status}', file=job.log)
+			job.log.finish()
+			self._dropOldJobs()
+
+#-
+	def _dropOldJobs(self) -> None:
+		""" Forget the oldest finished jobs past MAX_FINISHED_JOBS, their artifacts stay on disk. """
+
+		with self.jobsLock:
+			finishedJobs = sorted((job for job in self.jobs.values() if job.isFinished()), key=lambda job: job.endTime)
+			for job in finishedJobs[:max(0, len(finishedJobs) - MAX_FINISHED_JOBS)]:
+				del self.jobs[job.id]
+
+#---------------------------------------------------------------------------------------------------
+class _ServiceRequestHandler(BaseHTTPRequestHandler):
+	# chunked log streaming needs HTTP/1.1
+	protocol_version = 'HTTP/1.1'
+
+	def do_GET(self) -> None:
+		service: BuildService = self.server.service
+		pathSegments = self.path.strip('/').split('/')
+
+		if pathSegments == ['jobs']:
+			self._sendJson(200, [job.getStatus() for job in list(service.jobs.values())])
+			return
+
+		job = service.jobs.get(pathSegments[1]) if len(pathSegments) >= 2 and pathSegments[0] == 'jobs' else None
+		if job == None:
+			self._sendJson(404, {'error': 'unknown job'})
+			return
+
+		if len(pathSegments) == 2:
+			self._sendJson(200, job.getStatus())
+		elif pathSegments[2:] == ['log']:
+			self._streamLog(job)
+		elif len(pathSegments) == 4 and pathSegments[2] == 'artifacts' and pathSegments[3] in job.artifacts:
+			self._sendFile(job.artifacts[pathSegments[3]])
+		else:
+			self._sendJson(404, {'error': 'not found'})
+
+#-
+	def do_POST(self) -> None:
+		service: BuildService = self.server.service
+		if self.path.strip('/') != 'jobs':
+			self._sendJson(404, {'error': 'not found'})
+			return
+
+		try:
+			body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+			spec = body['spec']
+			priority = int(body.get('priority', 0))
+		except (ValueError, KeyError, TypeError) as error:
+			self._sendJson(400, {'error': f'invalid request: {error}'})
+			return
+
+		job = service.submit(spec, priority)
+		self._sendJson(201, {'id': job.id})
+
+#-
+	def do_DELETE(self) -> None:
+		service: BuildService = self.server.service
+		pathSegments = self.path.strip('/').split('/')
+		job = service.jobs.get(pathSegments[1]) if len(pathSegments) == 2 and pathSegments[0] == 'jobs' else None
+		if job == None:
+			self._sendJson(404, {'error': 'unknown job'})
+			return
+
+		service.cancel(job)
+		self._sendJson(202, job.getStatus())
+
+#-
+	def _sendJson(self, statusCode: int, data: Any) -> None:
+		body = json.dumps(data, indent=2).encode('utf-8')
+		self.send_response(statusCode)
+		self.send_header('Content-Type', 'application/json')
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+#-
+	def _sendFile(self, path: str) -> None:
+		self.send_response(200)
+		self.send_header('Content-Type', 'application/octet-stream')
+		self.send_header('Content-Length', str(os.path.getsize(path)))
+		self.send_header('Content-Disposition', f'attachment; filename="{os.path.basename(path)}"')
+		self.end_headers()
+		with open(path, 'rb') as file:
+			while chunk := file.read(1024 * 1024):
+				self.wfile.write(chunk)
+
+#-
+	def _streamLog(self, job: ServiceJob) -> None:
+		self.send_response(200)
+		self.send_header('Content-Type', 'text/plain; charset=utf-8')
+		self.send_header('Transfer-Encoding', 'chunked')
+		self.end_headers()
+
+		offset = 0
+		finished = False
+		while not finished:
+			text, finished = job.log.readFrom(offset, timeout=1.0)
+			if text:
+				offset += len(text)
+				data = text.encode('utf-8')
+				self.wfile.write(f'{len(data):X}\r\n'.encode('ascii') + data + b'\r\n')
+				self.wfile.flush()
+		self.wfile.write(b'0\r\n\r\n')
+
+#-
+	def log_message(self, format: str, *args) -> None:
+		# keep the console for build output
+		pass
@@ -0,0 +1,97 @@
+from dataManager import DataManager, BuildCancelledError
+import threading
+import queue
+
+# import type defs
+from typing import Any
+
+#---------------------------------------------------------------------------------------------------
+class BuildWorker(threading.Thread):
+	def __init__(self, dataManager: DataManager, exportCompressedPack: bool, exportPackStruct: bool, installToEngine: bool, pollInterval: float = 0.5) -> None:
+		""" Runs the DataManager build pipeline off the UI thread.\n
+		Results are posted to self.events as tuple(event type, data), event types:\n
+		'phase' (phase name, fraction | None), 'jobs' (active count, pending count), 'done' None, 'cancelled' None, 'error' Exception
+		"""
+
+		super().__init__(name='unrealPackGen_build', daemon=True)
+
+		self.dataManager = dataManager
+		self.exportOptions = (exportCompressedPack, exportPackStruct, installToEngine)
+		self.pollInterval = pollInterval
+
+		self.events: queue.Queue[tuple[str, Any]] = queue.Queue()
+
+#-
+	def run(self) -> None:
+		self.dataManager.onProgressFuncs.append(self._onProgressCB)
+		# posted whatever happens, the UI waits on one of 'done', 'cancelled' or 'error'
+		finalEvent: tuple[str, Any] = ('error', RuntimeError('build stopped unexpectedly'))
+		try:
+			self.dataManager.generateFileData()
+			self.dataManager.createPack(*self.exportOptions)
+
+			# wait on subprocesses
+			self._postEvent('phase', ('Waiting on jobs', None))
+			self.dataManager.waitOnJobs(self.pollInterval, self._onJobsPolledCB)
+			# a cancel killing the last job ends the wait above, its output must still be rolled back
+			self.dataManager.checkCancelled()
+
+			self.dataManager.recordBuildResult('success' if self.dataManager.getFailedJobTypes() == None else 'failed')
+			# hashes the assets, kept off the UI thread
+			if self.dataManager.buildResult == 'success':
+				self.dataManager.recordBuild()
+			finalEvent = ('done', None)
+
+		except BuildCancelledError:
+			finalEvent = self._rollback('cancelled', None)
+
+		except Exception as error:
+			# don't leave partial output behind
+			finalEvent = self._rollback('error', error)
+
+		finally:
+			self.dataManager.onProgressFuncs.remove(self._onProgressCB)
+			self._postEvent(*finalEvent)
+
+#-
+	def _rollback(self, result: str, error: Exception | None) -> tuple[str, Any]:
+		""" Roll back the build's partial output, returns the event to post (an 'error' if the rollback itself failed). """
+
+		self.dataManager.recordBuildResult(result)
+		try:
+			self.dataManager.cancel()
+		except Exception as rollbackError:
+			print(f'rollback failed: {rollbackError}', file=self.dataManager.logStream)
+			self.dataManager.recordBuildResult('error')
+			return ('error', rollbackError)
+		return (result, error)
+
+#-
+	def cancel(self) -> None:
+		""" Request the build to stop, returns immediately. Wait for the 'cancelled' event.\n
+		Running jobs are killed right away, rollback of partial output happens on the worker thread.
+		"""
+		self.dataManager.requestCancel()
+
+#-
+	def getEvents(self) -> list[tuple[str, Any]]:
+		""" Return all events posted since the last call, never blocks. """
+
+		events = []
+		while True:
+			try:
+				events.append(self.events.get_nowait())
+			except queue.Empty:
+				return events
+
+#-
+	def _onProgressCB(self, phase: str, fraction: float | None) -> None:
+		self._postEvent('phase', (phase, fraction))
+
+#-
+	def _onJobsPolledCB(self, activeCount: int, pendingCount: int) -> None:
+		self._postEvent('jobs', (activeCount, pendingCount))
+
+#-
+	def _postEvent(self, eventType: str, data: Any) -> None:
+		self.events.put((eventType, data))
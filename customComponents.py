@@ -5,7 +5,7 @@ import customtkinter
 import os
 
 # import type defs
-from collections.abc import Sequence, Mapping
+from collections.abc import Sequence, Mapping, Collection
 from customtkinter import CTkFrame
 from typing import Callable, Any
 from tkinter import Event
@@ -247,6 +247,261 @@ class OptionMenuWithLabel(CTkFrame):
 		return self.optionMenu.get()
 
 
+#---------------------------------------------------------------------------------------------------
+class FileTypeListModel():
+	def __init__(self, files: Sequence[str], defaultType: str) -> None:
+		""" Chosen asset type of each file of a (potentially very long) list, see VirtualFileTypeList.
+
+		files: paths, / separated
+
+		The visible rows (rows) are file indices, or dir paths for the dir headers when grouped by dir.
+		"""
+
+		self.files = list(files)
+		self.types = [defaultType] * len(self.files)
+
+		self.filterText = ''
+		self.groupByDir = False
+		self.collapsedDirs: set[str] = set()
+
+		self.rows: list[int | str] = []
+		self.groupFiles: dict[str, list[int]] = {} # dict(dir path: file indices matching the filter)
+		self._rebuildRows()
+
+#-
+	def setFilter(self, text: str) -> None:
+		""" Only list the files whose path contains text (case insensitive). """
+
+		self.filterText = text.strip().lower()
+		self._rebuildRows()
+
+#-
+	def setGroupByDir(self, groupByDir: bool) -> None:
+		self.groupByDir = groupByDir
+		self._rebuildRows()
+
+#-
+	def toggleDir(self, dirPath: str) -> None:
+		""" Collapse / expand a dir's group. """
+
+		self.collapsedDirs ^= {dirPath}
+		self._rebuildRows()
+
+#-
+	def setType(self, fileIndex: int, assetType: str) -> None:
+		self.types[fileIndex] = assetType
+
+#-
+	def setGroupType(self, dirPath: str, assetType: str) -> None:
+		""" Set the type of all files of a dir's group (that match the filter). """
+
+		for fileIndex in self.groupFiles.get(dirPath, ()):
+			self.types[fileIndex] = assetType
+
+#-
+	def getGroupType(self, dirPath: str) -> str | None:
+		""" Return the type shared by all files of a dir's group, None if they differ. """
+
+		groupTypes = {self.types[fileIndex] for fileIndex in self.groupFiles.get(dirPath, ())}
+		return groupTypes.pop() if len(groupTypes) == 1 else None
+
+#-
+	def getAssignedTypes(self) -> set[str]:
+		return set(self.types)
+
+#-
+	def removeFiles(self, paths: Collection[str]) -> None:
+		""" Drop files from the list, the types chosen for the remaining ones are kept. """
+
+		keptIndices = [index for index, path in enumerate(self.files) if path not in paths]
+		self.files = [self.files[index] for index in keptIndices]
+		self.types = [self.types[index] for index in keptIndices]
+		self._rebuildRows()
+
+#-
+	def _rebuildRows(self) -> None:
+		fileIndices = [index for index, path in enumerate(self.files) if self.filterText in path.lower()]
+
+		self.groupFiles = {}
+		if not self.groupByDir:
+			self.rows = fileIndices
+			return
+
+		for fileIndex in fileIndices:
+			self.groupFiles.setdefault(self.files[fileIndex].rpartition('/')[0], []).append(fileIndex)
+
+		self.rows = []
+		for dirPath in sorted(self.groupFiles):
+			self.rows.append(dirPath)
+			if dirPath not in self.collapsedDirs:
+				self.rows.extend(self.groupFiles[dirPath])
+
+#---------------------------------------------------------------------------------------------------
+class VirtualFileTypeList(CTkFrame):
+	ROW_HEIGHT = 38
+
+	def __init__(self, master: Any, model: FileTypeListModel, options: list[str], optionMenuTheme: dict | None = None) -> None:
+		""" Scrollable list of files with an asset type option menu each, backed by model.
+
+		Only the visible rows have widgets, they are rebound to other files of the model when scrolling, opening is instant regardless of the number of files.
+		"""
+
+		super().__init__(master=master)
+
+		self.model = model
+		self.options = options
+		self.optionMenuTheme = optionMenuTheme or {}
+		self.firstRow = 0
+		self.rowWidgets: list[CTkFrame] = []
+
+		self.fileFont = customtkinter.CTkFont()
+		self.dirFont = customtkinter.CTkFont(weight='bold')
+
+		# components
+		self.filterVar = customtkinter.StringVar()
+		self.filterVar.trace_add('write', self._onFilterChange)
+		self.filterEntry = customtkinter.CTkEntry(master=self, textvariable=self.filterVar, placeholder_text='filter')
+		self.groupCheckbox = customtkinter.CTkCheckBox(master=self, text='group by folder', command=self._onGroupToggle)
+
+		self.body = CTkFrame(master=self, fg_color='transparent')
+		self.body.bind('<Configure>', self._onResizeEvent)
+		self.scrollbar = customtkinter.CTkScrollbar(master=self, command=self._onScrollbar)
+		self._bindMouseWheel(self.body)
+
+		# layout
+		self.filterEntry.grid(  column=0, row=0, padx=(10, 0), pady=10, sticky='ew')
+		self.groupCheckbox.grid(column=1, row=0, padx=10, pady=10, sticky='e')
+		self.body.grid(         column=0, row=1, columnspan=2, padx=(10, 0), pady=(0, 10), sticky='nsew')
+		self.scrollbar.grid(    column=2, row=0, rowspan=2, padx=(0, 5), pady=5, sticky='ns')
+
+		self.columnconfigure(0, weight=1)
+		self.rowconfigure(1, weight=1)
+
+#-
+	def refresh(self) -> None:
+		""" Rebind the row widgets to the rows currently in view. """
+
+		rowCount = len(self.model.rows)
+		self.firstRow = max(0, min(self.firstRow, rowCount - len(self.rowWidgets)))
+
+		for index, rowWidget in enumerate(self.rowWidgets):
+			rowIndex = self.firstRow + index
+			if rowIndex >= rowCount:
+				rowWidget.place_forget()
+				continue
+
+			rowWidget.place(x=0, y=index * self.ROW_HEIGHT, relwidth=1)
+			self._bindRow(rowWidget, self.model.rows[rowIndex])
+
+		if rowCount:
+			self.scrollbar.set(self.firstRow / rowCount, min((self.firstRow + len(self.rowWidgets)) / rowCount, 1))
+		else:
+			self.scrollbar.set(0, 1)
+
+#-
+	def _bindRow(self, rowWidget: CTkFrame, entry: int | str) -> None:
+		rowWidget.entry = entry
+		if isinstance(entry, str):
+			# dir header
+			arrow = '\u25b8' if entry in self.model.collapsedDirs else '\u25be'
+			rowWidget.label.configure(True, text=f'{arrow} {entry or "."}/  ({len(self.model.groupFiles[entry])})', font=self.dirFont)
+			rowWidget.label.grid_configure(sticky='nw')
+			rowWidget.optionMenu.set(self.model.getGroupType(entry) or 'mixed')
+		else:
+			rowWidget.label.configure(True, text=self._truncatePath(self.model.files[entry]), font=self.fileFont)
+			rowWidget.label.grid_configure(sticky='ne')
+			rowWidget.optionMenu.set(self.model.types[entry])
+
+#-
+	def _createRowWidget(self) -> CTkFrame:
+		rowWidget = CTkFrame(master=self.body, fg_color='transparent')
+		rowWidget.entry = None
+
+		rowWidget.label = customtkinter.CTkLabel(master=rowWidget, text='', justify='right')
+		rowWidget.optionMenu = customtkinter.CTkOptionMenu(master=rowWidget, values=self.options, command=lambda value: self._onTypeSelected(rowWidget, value))
+		rowWidget.optionMenu.configure(True, **self.optionMenuTheme)
+		rowWidget.label.bind('<Button-1>', lambda event: self._onLabelClick(rowWidget))
+
+		rowWidget.label.grid(     column=0, row=0, padx=0, pady=0, sticky='ne')
+		rowWidget.optionMenu.grid(column=1, row=0, padx=(20, 10), pady=0, sticky='ne')
+		rowWidget.columnconfigure(0, weight=1)
+
+		for widget in (rowWidget, rowWidget.label, rowWidget.optionMenu):
+			self._bindMouseWheel(widget)
+		return rowWidget
+
+#-
+	def _truncatePath(self, path: str, maxLength: int = 48) -> str:
+		return path if len(path) <= maxLength else '...' + path[-(maxLength - 3):]
+
+#-
+	def _bindMouseWheel(self, widget: Any) -> None:
+		widget.bind('<MouseWheel>', self._onMouseWheel)
+		widget.bind('<Button-4>', self._onMouseWheel)
+		widget.bind('<Button-5>', self._onMouseWheel)
+
+#---
+# events
+
+	def _onResizeEvent(self, event: Event) -> None:
+		""" Keep just enough row widgets to fill the list's height. """
+
+		rowCount = max(1, int(event.height // self._apply_widget_scaling(self.ROW_HEIGHT)))
+		while len(self.rowWidgets) < rowCount:
+			self.rowWidgets.append(self._createRowWidget())
+		while len(self.rowWidgets) > rowCount:
+			self.rowWidgets.pop().destroy()
+		self.refresh()
+
+#-
+	def _onScrollbar(self, action: str, value: str, unit: str | None = None) -> None:
+		if action == 'moveto':
+			self.firstRow = round(float(value) * len(self.model.rows))
+		elif unit == 'pages':
+			self.firstRow += int(value) * len(self.rowWidgets)
+		else:
+			self.firstRow += int(value)
+		self.refresh()
+
+#-
+	def _onMouseWheel(self, event: Event) -> None:
+		if event.num == 4 or event.delta > 0:
+			self.firstRow -= 3
+		else:
+			self.firstRow += 3
+		self.refresh()
+
+#-
+	def _onFilterChange(self, *_) -> None:
+		self.model.setFilter(self.filterVar.get())
+		self.firstRow = 0
+		self.refresh()
+
+#-
+	def _onGroupToggle(self) -> None:
+		self.model.setGroupByDir(bool(self.groupCheckbox.get()))
+		self.firstRow = 0
+		self.refresh()
+
+#-
+	def _onLabelClick(self, rowWidget: CTkFrame) -> None:
+		if isinstance(rowWidget.entry, str):
+			self.model.toggleDir(rowWidget.entry)
+			self.refresh()
+
+#-
+	def _onTypeSelected(self, rowWidget: CTkFrame, assetType: str) -> None:
+		if isinstance(rowWidget.entry, str):
+			self.model.setGroupType(rowWidget.entry, assetType)
+			# the group's files may be in view
+			self.refresh()
+		elif rowWidget.entry != None:
+			self.model.setType(rowWidget.entry, assetType)
+			if self.model.groupByDir:
+				# the header's shared type may have changed
+				self.refresh()
+
+
 #---------------------------------------------------------------------------------------------------
 class InfoModalWindow(customtkinter.CTkToplevel):
 	def __init__(self, parent: Any, text: str) -> None:
@@ -1,26 +1,103 @@
 from pathvalidate import sanitize_filename
-from tempfile import TemporaryDirectory
-from shutil import copy2, copytree
-from sys import stdout as sysStdout
+from shutil import copystat, copytree, rmtree
+from collections import OrderedDict
+from copy import deepcopy
+from sys import stdout as sysStdout, executable as sysExecutable
 from io import StringIO
 from PIL import Image
+from archiveWriter import ArchiveWriter, DEFAULT_ARCHIVE_FORMAT, DEFAULT_ARCHIVE_PRESET, REPRODUCIBLE_EPOCH, DIGEST_EXT, FILE_MANIFEST_EXT, SHARD_MANIFEST_EXT, DELTA_MANIFEST_NAME
+from packDelta import PackDelta
+from treeCopier import TreeCopier, CHECKSUM_EXT, DEFAULT_CHECKSUM_ALGORITHM
+from assetStore import AssetStore
+from buildProfiler import BuildProfiler, profiledPhase
+from buildMetrics import BuildMetrics
+from assetDependencies import AssetDependencyGraph
+from assetTypeRules import AssetTypeRules
+from packAnalysis import PackAnalysis
+from pakBenchmark import PakBenchmark
+from buildJournal import BuildJournal, JOURNAL_EXT
+from imageProcessor import ImageProcessor
+from fileLock import FileLock
+from packCatalog import PackCatalog
+from concurrent.futures import ThreadPoolExecutor
 import subprocess
+import threading
+import sqlite3
+import codecs
 import platform
-import winreg
+import signal
+import stat
 import shlex
+import hashlib
+import uuid
+import time
 import json
 import os
 
 # import type defs
-from collections.abc import Mapping, Sequence, Callable
-from typing import Any
+from collections.abc import Mapping, Sequence, Callable, Iterator
+from typing import Any, TextIO
 from os import PathLike
 
 # since app is intended to be run in a different working dir, CURRENT_FILE_DIR is needed for accessing certain data
 CURRENT_FILE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+#---------------------------------------------------------------------------------------------------
+class BuildCancelledError(Exception):
+	""" Raised from within DataManager ops once a cancel has been requested. """
+
+#---------------------------------------------------------------------------------------------------
+# naming of the dirs created in UEDir, used to find leftovers of previous runs
+TMP_DIR_PREFIX   = 'unrealPackGen_tmp_'
+# journaled builds stage to a persistent dir per pack instead, kept until the build completes (see enableJournal)
+STAGING_DIR_PREFIX = 'unrealPackGen_staging_'
+TRASH_DIR_PREFIX = 'unrealPackGen_trash_'
+# advisory locks of the shared engine locations builds write to (see lockEnginePath)
+ENGINE_LOCKS_DIR = 'unrealPackGen_locks'
+LOCK_FILE_EXT    = '.lock'
+BACKUP_SUFFIX    = '.unrealPackGen_bak'
+# default catalog of built packs (see enableCatalog)
+CATALOG_FILENAME = 'unrealPackGen_catalog.db'
+
+# read/write buffer used for file copies, also the granularity of cancel checks
+COPY_BUFFER_SIZE = 4 * 1024 * 1024
+
+# max number of processed images kept in memory (see _writeResizedImages)
+IMAGE_CACHE_SIZE = 32
+# max number of dir listings kept in memory (see scanDir), enough for the dirs of several large packs
+SCAN_CACHE_SIZE = 20000
+THUMBNAIL_SIZE  = (64, 64)
+SCREENSHOT_SIZE = (400, 200)
+
+# packInfo keys for which None is a valid value (feature disabled), never reported as missing
+OPTIONAL_PACK_INFO = ('packDeltaBasePath', 'packPruneRoots', 'packPakCompressionLevel', 'packPakCompressionBlockSize')
+
+# UnrealPak compression formats (-compressionformats), 'None' for an uncompressed .upack
+PAK_COMPRESSION_METHODS = ('None', 'Zlib', 'Gzip', 'LZ4', 'Oodle')
+
+# how the pack's content is installed to the engine's Samples dir (see exportContentToEngine)
+INSTALL_MODES = ('copy', 'link', 'mirror')
+
+# job watchdog limits per job type (see pollActiveJobs / setJobLimits), None to disable a limit
+# timeout: max wall time (s), stallTimeout: max time without any output (s), only set for jobs that keep printing while working
+# retryCount: attempts after a transient failure (timeout, stall, retryable exit code), the nth retry starts after retryDelay * 2^(n-1) s
+JOB_LIMITS: dict[str, dict[str, float | int | None]] = {
+	'unrealpak': {'timeout': 2 * 3600, 'stallTimeout': 30 * 60, 'retryCount': 1, 'retryDelay': 10.0},
+	'robocopy':  {'timeout': 6 * 3600, 'stallTimeout': 10 * 60, 'retryCount': 3, 'retryDelay': 10.0},
+	'copy':      {'timeout': 6 * 3600, 'stallTimeout': None,    'retryCount': 3, 'retryDelay': 10.0},
+	'archive':   {'timeout': 6 * 3600, 'stallTimeout': None,    'retryCount': 1, 'retryDelay': 10.0},
+	'image':     {'timeout': 30 * 60,  'stallTimeout': None,    'retryCount': 0, 'retryDelay': 0.0},
+}
 #---------------------------------------------------------------------------------------------------
 class DataManager():
-	def __init__(self, basePath: PathLike, packLayoutPath: PathLike, assetTypeTablePath: PathLike, packAdditionsFolder: PathLike, packerPath: PathLike | None) -> None:
+	# caches shared by all instances, they stay warm across builds in long running processes (see buildService)
+	_cacheLock = threading.Lock()
+	_jsonCache: dict[str, tuple[int, Any]] = {} # dict(abs path: (mtime_ns, parsed data))
+	_enginePathsCache: tuple[str, str] | None = None # (UEDir, packerPath)
+	_scanCache: OrderedDict[str, tuple[int, list[str], list[str]]] = OrderedDict() # LRU, dict(dir path: (mtime_ns, subdir names, filenames))
+	_imageCache: OrderedDict[tuple, bytes] = OrderedDict() # LRU, dict((source path, mtime_ns, target size, ext): encoded image)
+
+	def __init__(self, basePath: PathLike, packLayoutPath: PathLike, assetTypeTablePath: PathLike, packAdditionsFolder: PathLike, packerPath: PathLike | None, assetTypeRulesPath: PathLike | None = None) -> None:
 		
 		# paths
 		self.basePath           = basePath
@@ -48,11 +125,18 @@ class DataManager():
 		# get data from json files
 		self.packLayout     = self.fetchJsonData(self.packLayoutPath)
 		self.assetTypeTable = self.fetchJsonData(self.assetTypeTablePath)
+		# path based overrides, take precedence over the prefixes of assetTypeTable
+		self.assetTypeRules = AssetTypeRules.load(assetTypeRulesPath) if assetTypeRulesPath != None else AssetTypeRules()
+
+		# remove tmp dirs left behind by crashed / killed runs
+		self.reclaimStaleDirs()
 
 		# init other vars
-		self.tmpDir = None
+		self.tmpDir: str | None = None
+		self.tmpDirLock: FileLock | None = None
 		self.tmpPackPath = None
 		self.tmpFilePaths: Mapping[str, tuple[PathLike[str], str] | None] = {}
+		self.screenshotFilenames: list[str] = [] # names of the screenshots in the tmp pack, in order
 		
 		self.packInfo: Mapping[str, Any] = {
 			'packName':        None,
@@ -63,9 +147,19 @@ class DataManager():
 			'packTags':        '', # optional
 			'packAssetsPath':  None,
 			'packThumbPath':   '', # optional
-			'packScrShotPath': '', # optional
+			'packScrShotPaths': [], # optional
 			'packOutputPath':  None,
 			'packAssetTypes':  set(),
+			'packArchiveFormat': DEFAULT_ARCHIVE_FORMAT,
+			'packArchivePreset': DEFAULT_ARCHIVE_PRESET,
+			'packReproducible':  False,
+			'packShardCount':    1, # number of archives the compressed pack is split into, written in parallel
+			'packDeltaBasePath': None, # previous build to make a delta pack against (see PackDelta), None for no delta pack
+			'packPruneRoots':    None, # glob patterns (rel to packAssetsPath) of the assets to keep along with their dependencies, None to keep everything
+			'packPakCompressionMethod':    'None', # see PAK_COMPRESSION_METHODS
+			'packPakCompressionLevel':     None, # None for UnrealPak's default (only used by Oodle)
+			'packPakCompressionBlockSize': None, # bytes, None for UnrealPak's default (64 KiB)
+			'packInstallMode': 'copy', # see INSTALL_MODES
 		}
 
 		self.manifestData   = None
@@ -74,17 +168,44 @@ class DataManager():
 		self.packingCmdData = None
 
 		self.activeJobs:  list[tuple[subprocess.Popen, str]] = [] # tuple(running subprocess, process type)
-		self.failedJobs:  list[tuple[subprocess.Popen, str]] = [] # tuple(finished subprocess, process type)
+		self.failedJobs:  list[tuple[subprocess.Popen, str, str]] = [] # tuple(finished subprocess, process type, cause of the failure)
+		self.retryJobs:   list[tuple[float, tuple[Callable[[], subprocess.Popen], str]]] = [] # tuple(time.monotonic() it can start at, (subprocess callable, process type))
+		self.jobInfos:    dict[int, dict[str, Any]] = {} # dict(subprocess PID: watchdog info, see startJob)
+		self.jobLimits = deepcopy(JOB_LIMITS)
 		self.pendingJobs: list[tuple[tuple[Callable[[], subprocess.Popen], str], set[str]]] = [] # tuple(subprocess callable -> activeJobTuple, "waiting on" process type)
 		self.jobStdout: Mapping[int, StringIO] = {} # dict(subprocess PID: subprocess STDOUT so far)
+		self.jobStdoutLock = threading.Lock() # jobStdout is written to by reader threads (see writeJobOutToStream)
 
 		self.onCleanupFuncs: list[Callable[[], None]] = [] # list of functions to execute when cleaning up
+		self.onProgressFuncs: list[Callable[[str, float | None], None]] = [] # list of functions to notify of progress (phase name, fraction done or None if unknown)
+		self.logStream: TextIO = sysStdout # where job output and other messages are written
+		self.assetStore: AssetStore | None = None # when set, assets are staged as hard links to deduplicated store objects
+		self.profiler: BuildProfiler | None = None # when set, build phases are profiled (see enableProfiling)
+		self.metrics: BuildMetrics | None = None # when set, build events / metrics are exported (see enableMetrics)
+		self.catalog: PackCatalog | None = None # when set, successful builds are recorded in it (see enableCatalog)
+		self.catalogPath: str | None = os.path.join(self.UEDir, CATALOG_FILENAME)
+		self.buildResult: str | None = None # see recordBuildResult
+		self.buildRecorded = False # see recordBuild
+		self.prunedRelPaths: set[str] | None = None # asset files left out by pruneAssets (rel to packAssetsPath), None if not pruned
+		self.claimedOutputPaths: dict[str, str | None] = {} # dict(path written outside the tmp dir: path its previous content was moved to, None if it did not exist)
+		self.engineLocks: dict[str, FileLock] = {} # dict(abs engine path: its advisory lock), held until cleanup
+		self.journalMode: str | None = None # None, 'new' or 'resume' (see enableJournal)
+		self.journal: BuildJournal | None = None # journal of the current build, if journaled
+		self.jobOutputs: dict[int, tuple[list[str], str]] = {} # dict(subprocess PID: (paths of the output the job writes, inputs key)), recorded in the journal / metrics once the job succeeds
+		self.archiveInputsKey: str | None = None # see getArchiveInputsKey, journaled builds only
+
+		# set from any thread to stop the current build at the next checkpoint
+		self.cancelEvent = threading.Event()
+		self.copiedFileCount = 0
+		self.totalFileCount  = 0
 
 #---
 # user data management
 
-	def setPackInfo(self, packName: str | None = None, version: str | None = None, descrition: str | None = None, category: str | None = None, tags: str | None = None, assetTypes: list[str] | None = None , assetsPath: PathLike[str] | None = None, tumbnailPath: PathLike[str] | None = None, screenshotPath: PathLike[str] | None = None, outputPath: PathLike[str] | None = None) -> None:
-		""" Set packInfo values. """
+	def setPackInfo(self, packName: str | None = None, version: str | None = None, descrition: str | None = None, category: str | None = None, tags: str | None = None, assetTypes: list[str] | None = None , assetsPath: PathLike[str] | None = None, tumbnailPath: PathLike[str] | None = None, screenshotPath: PathLike[str] | None = None, outputPath: PathLike[str] | None = None, screenshotPaths: Sequence[PathLike[str]] | None = None) -> None:
+		""" Set packInfo values.\n
+		screenshotPath / screenshotPaths: the pack's screenshots, screenshotPath first. Paths that don't exist are left out
+		"""
 
 		if packName and isinstance(packName, str):
 			self.packInfo['packName'] = packName
@@ -120,11 +241,9 @@ class DataManager():
 			else:
 				self.packInfo['packThumbPath'] = ''
 
-		if screenshotPath != None and isinstance(screenshotPath, str):
-			if os.path.exists(screenshotPath):
-				self.packInfo['packScrShotPath'] = screenshotPath
-			else:
-				self.packInfo['packScrShotPath'] = ''
+		if screenshotPath != None or screenshotPaths != None:
+			allScreenshotPaths = ([screenshotPath] if isinstance(screenshotPath, str) else []) + list(screenshotPaths or [])
+			self.packInfo['packScrShotPaths'] = [path for path in allScreenshotPaths if path and os.path.exists(path)]
 
 		if outputPath and isinstance(outputPath, str):
 			if os.path.exists(outputPath):
@@ -132,16 +251,286 @@ class DataManager():
 			else:
 				self.packInfo['packOutputPath'] = None
 
+#-
+	def setExportOptions(self, archiveFormat: str | None = None, archivePreset: str | None = None, reproducible: bool | None = None, shardCount: int | None = None, deltaBasePath: PathLike[str] | None = None, pruneRoots: Sequence[str] | None = None, pakCompressionMethod: str | None = None, pakCompressionLevel: int | str | None = None, pakCompressionBlockSize: int | str | None = None, installMode: str | None = None) -> None:
+		""" Set export related packInfo values.\n
+		archiveFormat / archivePreset: format and compression preset of the compressed pack (see ArchiveWriter.getAvailableFormats)\n
+		reproducible: byte identical output for identical input (sorted, normalized timestamps / permissions)\n
+		shardCount: split the compressed pack into this many size balanced archives, compressed in parallel. 0 for one per core, 1 to disable\n
+		deltaBasePath: also export a delta pack against this previous build (.files.json / .shards.json / .zip / .tar.zst), '' to disable\n
+		pruneRoots: only pack these assets (glob patterns rel to packAssetsPath, ie: Maps/*.umap) and what they reference, empty to disable\n
+		pakCompressionMethod / pakCompressionLevel / pakCompressionBlockSize: compression of the .upack made by UnrealPak (see PAK_COMPRESSION_METHODS), '' for UnrealPak's default level / block size\n
+		installMode: how the content is installed to the engine (see INSTALL_MODES), 'copy': full copy, 'link': the engine's Samples dir links to the assets dir (dev iteration), 'mirror': only changed files are copied, stale ones removed
+		"""
+
+		if archiveFormat != None:
+			if archiveFormat not in ArchiveWriter.getAvailableFormats():
+				raise ValueError(f'unsupported archive format: {archiveFormat}')
+			self.packInfo['packArchiveFormat'] = archiveFormat
+
+		if archivePreset != None:
+			if archivePreset not in ArchiveWriter.getPresets(self.packInfo['packArchiveFormat']):
+				raise ValueError(f'unknown preset "{archivePreset}" for archive format {self.packInfo["packArchiveFormat"]}')
+			self.packInfo['packArchivePreset'] = archivePreset
+
+		if reproducible != None:
+			self.packInfo['packReproducible'] = bool(reproducible)
+
+		if shardCount != None:
+			if int(shardCount) < 0:
+				raise ValueError(f'invalid shard count: {shardCount}')
+			self.packInfo['packShardCount'] = int(shardCount) or os.cpu_count() or 1
+
+		if deltaBasePath != None:
+			if deltaBasePath and not os.path.isfile(deltaBasePath):
+				raise FileNotFoundError(f'delta base not found: {deltaBasePath}')
+			self.packInfo['packDeltaBasePath'] = os.path.abspath(deltaBasePath) if deltaBasePath else None
+
+		if pruneRoots != None:
+			self.packInfo['packPruneRoots'] = list(pruneRoots) or None
+
+		if pakCompressionMethod != None:
+			if pakCompressionMethod not in PAK_COMPRESSION_METHODS:
+				raise ValueError(f'unsupported pak compression method: {pakCompressionMethod}')
+			self.packInfo['packPakCompressionMethod'] = pakCompressionMethod
+
+		if pakCompressionLevel != None:
+			self.packInfo['packPakCompressionLevel'] = int(pakCompressionLevel) if pakCompressionLevel != '' else None
+
+		if pakCompressionBlockSize != None:
+			if pakCompressionBlockSize != '' and (int(pakCompressionBlockSize) < 1024 or int(pakCompressionBlockSize) % 1024):
+				raise ValueError(f'invalid pak compression block size (multiple of 1024 bytes): {pakCompressionBlockSize}')
+			self.packInfo['packPakCompressionBlockSize'] = int(pakCompressionBlockSize) if pakCompressionBlockSize != '' else None
+
+		if installMode != None:
+			if installMode not in INSTALL_MODES:
+				raise ValueError(f'unknown install mode "{installMode}" (expected: {", ".join(INSTALL_MODES)})')
+			self.packInfo['packInstallMode'] = installMode
+
+#-
+	def setJobLimits(self, jobType: str, **limits: float | int | None) -> None:
+		""" Override the watchdog limits of a job type (see JOB_LIMITS), ie: setJobLimits('unrealpak', timeout=4 * 3600, stallTimeout=None). Raises ValueError if invalid. """
+
+		if jobType not in self.jobLimits:
+			raise ValueError(f'unknown job type "{jobType}" (expected: {", ".join(self.jobLimits)})')
+		for key, value in limits.items():
+			if key not in self.jobLimits[jobType]:
+				raise ValueError(f'unknown job limit "{key}" (expected: {", ".join(self.jobLimits[jobType])})')
+			if value != None and value < 0:
+				raise ValueError(f'invalid {jobType} {key}: {value}')
+			self.jobLimits[jobType][key] = value
+
+#-
+	def setAssetStore(self, storeDir: PathLike[str] | str | None) -> None:
+		""" Stage assets through a content addressed store (see AssetStore), None to copy them directly.\n
+		The store should be on the same volume as UEDir (where staging happens) for hard links to work.
+		"""
+
+		self.assetStore = AssetStore(storeDir) if storeDir != None else None
+
+#-
+	def enableProfiling(self, enabled: bool = True) -> None:
+		""" Profile build phases (cProfile + tracemalloc), reports are written to the output dir on cleanup (see getProfileDir).\n
+		Phases: InferAssetTypes, sizeAnalysis, generatePackFileStruct, writeDataToTmpPack, imageProcessing, jobPolling\n
+		Images are resized in worker processes, the imageProcessing phase only covers cached and single images and waiting on the workers.
+		"""
+
+		self.profiler = BuildProfiler() if enabled else None
+
+#-
+	def enableMetrics(self, eventsPath: PathLike[str] | str | None, textfilePath: PathLike[str] | str | None = None) -> None:
+		""" Export build telemetry (see BuildMetrics): events (phase start / end, job spawn / exit, bytes compressed, build end with totals) appended to eventsPath (JSONL),\n
+		and optionally counters / histograms to a Prometheus textfile collector file (textfilePath, .prom), accumulated over all builds writing to it.\n
+		Covers one build, the metrics are closed on cleanup.
+		"""
+
+		self.metrics = BuildMetrics(eventsPath, textfilePath)
+
+#-
+	def enableCatalog(self, path: PathLike[str] | str | None) -> None:
+		""" Record successful builds in a PackCatalog (pack, version, assets with their hashes, artifacts), None to disable.\n
+		Defaults to <UEDir>/unrealPackGen_catalog.db, the catalog is only opened once a build is recorded (see recordBuild).
+		"""
+
+		self.catalogPath = os.path.abspath(path) if path != None else None
+		self.catalog = None
+
+#-
+	def getCatalog(self) -> PackCatalog | None:
+		if self.catalog == None and self.catalogPath != None:
+			self.catalog = PackCatalog(self.catalogPath)
+		return self.catalog
+
+#-
+	def recordBuild(self) -> None:
+		""" Record the build in the catalog (see enableCatalog), once per build. Called by the thread running the build once its jobs succeeded, outputs are still claimed.\n
+		Errors are reported, they don't fail the build.
+		"""
+
+		if self.catalogPath == None or self.buildRecorded:
+			return
+		self.buildRecorded = True
+		try:
+			self.recordBuildInCatalog(list(self.claimedOutputPaths))
+		except (OSError, sqlite3.Error) as error:
+			print(f'unable to record build in catalog: {error}', file=self.logStream)
+
+#-
+	def recordBuildInCatalog(self, outputPaths: Sequence[str]) -> None:
+		""" Record the pack's version in the catalog: every asset packed (rel path, size, mtime, hash, asset type) and the build's outputs.\n
+		Only files that changed since they were last recorded are hashed (catalog's known hashes, then the asset store's index), in parallel.
+		"""
+
+		catalog = self.getCatalog()
+		assetsPath = os.path.abspath(self.packInfo['packAssetsPath'])
+		knownDigests = catalog.getKnownDigests(assetsPath, DEFAULT_CHECKSUM_ALGORITHM)
+		if self.assetStore != None:
+			with self.assetStore.lock:
+				knownDigests = {**self.assetStore.index, **knownDigests}
+
+		def _getAsset(relPath: str) -> tuple[str, int, int, str, str | None]:
+			sourcePath = os.path.join(assetsPath, relPath)
+			sourceStat = os.stat(sourcePath)
+			knownDigest = knownDigests.get(sourcePath)
+			if knownDigest != None and tuple(knownDigest[:2]) == (sourceStat.st_size, sourceStat.st_mtime_ns):
+				digest = knownDigest[2]
+			else:
+				digest = TreeCopier.hashFile(sourcePath, DEFAULT_CHECKSUM_ALGORITHM)
+			assetType = self.getAssetTypeForPath(relPath) if relPath.endswith('.uasset') else None
+			return (relPath, sourceStat.st_size, sourceStat.st_mtime_ns, digest, assetType)
+
+		relPaths = []
+		for dirPath, filenames in self.walkDir(assetsPath):
+			relDirPath = os.path.relpath(dirPath, assetsPath).replace('\\', '/')
+			relPaths.extend(filename if relDirPath == '.' else f'{relDirPath}/{filename}' for filename in filenames)
+		if self.prunedRelPaths:
+			# pruned paths use os.sep
+			prunedRelPaths = {relPath.replace('\\', '/') for relPath in self.prunedRelPaths}
+			relPaths = [relPath for relPath in relPaths if relPath not in prunedRelPaths]
+
+		self.reportProgress('Recording build in catalog')
+		# mostly waiting on I/O, same as TreeCopier.verify
+		with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 2)) as executor:
+			assets = list(executor.map(_getAsset, relPaths))
+
+		artifacts = []
+		for path in outputPaths:
+			if not os.path.lexists(path):
+				continue
+			kind = 'engine' if os.path.commonpath([path, os.path.abspath(self.UEDir)]) == os.path.abspath(self.UEDir) else 'output'
+			if self.isLink(path):
+				size = None
+			elif os.path.isdir(path):
+				size = sum(os.path.getsize(os.path.join(dirPath, filename)) for dirPath, _, filenames in os.walk(path) for filename in filenames)
+			else:
+				size = os.path.getsize(path)
+			artifacts.append((path, kind, size))
+
+		catalog.recordVersion(self.packInfo, assets, artifacts, DEFAULT_CHECKSUM_ALGORITHM, self.metrics.buildId if self.metrics != None else None)
+		print(f'recorded {self.packInfo["packName"]} {self.packInfo["packVersion"]} in {catalog.path} ({len(assets)} assets, {len(artifacts)} artifacts)', file=self.logStream)
+
+#-
+	def recordBuildResult(self, result: str) -> None:
+		""" Set the result reported to the metrics on cleanup: 'success', 'failed', 'cancelled' or 'error'. """
+
+		self.buildResult = result
+
+#-
+	def enableJournal(self, resume: bool = False) -> None:
+		""" Journaled builds stage to a persistent dir (<UEDir>/unrealPackGen_staging_<pack name>), progress is recorded in an append-only journal next to it.\n
+		resume: pick up from where the last build of the pack with the same settings stopped (crash, reboot, cancel), staged files and outputs still intact on disk are reused.\n
+		The staging dir and journal are deleted once a build completes.
+		"""
+
+		self.journalMode = 'resume' if resume else 'new'
+
+#-
+	def getBuildKey(self) -> str:
+		""" Return a key identifying the pack's settings, a journal is only resumed by a build with the same key. """
+
+		packInfo = {key: sorted(value) if isinstance(value, set) else value for key, value in self.packInfo.items()}
+		return hashlib.blake2b(json.dumps(packInfo, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+#-
+	def getArchiveInputsKey(self) -> str:
+		""" Return a key identifying the current content of the compressed pack (size / mtime of every member), outputs made from other content are never reused. """
+
+		roots = self.getArchiveRoots()
+		# the .upack is recreated by every build, its content only depends on the pack's settings
+		upackArchivePath = roots[1][0].replace('\\', '/').strip('/')
+		hasher = hashlib.blake2b(digest_size=16)
+		for archivePath, sourcePath in ArchiveWriter.iterMembers(roots):
+			if archivePath != upackArchivePath:
+				sourceStat = os.stat(sourcePath)
+				hasher.update(f'{archivePath}\0{sourceStat.st_size}\0{sourceStat.st_mtime_ns}\n'.encode())
+		return hasher.hexdigest()
+
+#-
+	def getProfileDir(self) -> str:
+		outputDir = self.packInfo['packOutputPath'] or os.getcwd()
+		return os.path.join(outputDir, f'{self.packInfo["packCleanName"] or "unrealPackGen"}_profile')
+
+#-
+	def applyPackSpec(self, spec: Mapping[str, Any]) -> tuple[bool, bool, bool]:
+		""" Set packInfo and export options from a pack spec (see settings/packSpecExample.json), used for builds without UI.\n
+		Returns the selected exports: (exportCompressedPack, exportPackStruct, installToEngine)
+		"""
+
+		self.setPackInfo(
+			packName       = spec.get('packName'),
+			version        = spec.get('version'),
+			descrition     = spec.get('description', ''),
+			category       = spec.get('category', 'Content'),
+			tags           = spec.get('tags', ''),
+			assetsPath     = spec.get('assetsPath'),
+			tumbnailPath   = spec.get('thumbnailPath', ''),
+			screenshotPath = spec.get('screenshotPath', ''),
+			outputPath     = spec.get('outputPath'),
+			screenshotPaths = spec.get('screenshotPaths', []),
+		)
+		self.setExportOptions(
+			archiveFormat = spec.get('archiveFormat'),
+			archivePreset = spec.get('archivePreset'),
+			reproducible  = spec.get('reproducible'),
+			shardCount    = spec.get('shardCount'),
+			deltaBasePath = spec.get('deltaBasePath'),
+			pruneRoots    = spec.get('pruneRoots'),
+			pakCompressionMethod    = spec.get('pakCompressionMethod'),
+			pakCompressionLevel     = spec.get('pakCompressionLevel'),
+			pakCompressionBlockSize = spec.get('pakCompressionBlockSize'),
+			installMode   = spec.get('installMode'),
+		)
+		if spec.get('assetStorePath'):
+			self.setAssetStore(spec['assetStorePath'])
+		for jobType, limits in spec.get('jobLimits', {}).items():
+			self.setJobLimits(jobType, **limits)
+
+		# asset types: inferred (spec rules first), plus the ones the UI would have asked for
+		for rule in spec.get('assetTypeRules', []):
+			self.addAssetTypeRule(rule['kind'], rule['pattern'], rule['type'])
+		self.packInfo['packAssetTypes'] = set()
+		if self.packInfo['packAssetsPath'] != None:
+			self.InferAssetTypes()
+		self.addAssetTypes(spec.get('assetTypes', []))
+
+		missingInfo = self.getMissingPackInfo()
+		if missingInfo != None:
+			raise ValueError('pack spec is missing/has invalid fields: ' + ', '.join(missingInfo))
+
+		exportOptions = (bool(spec.get('exportCompressedPack', True)), bool(spec.get('exportPackStruct', False)), bool(spec.get('installToEngine', False)))
+		if not any(exportOptions):
+			raise ValueError('pack spec must select at least one export')
+		return exportOptions
+
 #-
 	def getMissingPackInfo(self) -> list | None:
 		""" Return a list of all missing data in packInfo. """
-		# early out if all good
-		if None not in self.packInfo.values():
-			return None
-		
 		# return array of all keys with None values
-		missingInfo = [key for key, value in self.packInfo.items() if value == None]
+		missingInfo = [key for key, value in self.packInfo.items() if value == None and key not in OPTIONAL_PACK_INFO]
 
+		# early out if all good
+		if not len(missingInfo):
+			return None
 		return missingInfo
 
 #-
@@ -156,16 +545,33 @@ class DataManager():
 		NOTE: Data stored in mem, see createPack or writeDataToTmpPack for disk write
 		"""
 
+		# new build, forget about previous results
+		self.cancelEvent.clear()
+		self.failedJobs.clear()
+		self.buildResult = None
+		self.buildRecorded = False
+		if self.metrics != None:
+			self.metrics.labels['pack'] = self.packInfo['packCleanName']
+
+		self.reportProgress('Generating file data')
 		self.generatePackFileStruct()
 		self._generateManifestData()
 		self._generateConfigData()
 		self._generateResponseData()
+		self.checkCancelled()
 
 #-
 	def createPack(self, exportCompressedPack: bool, exportPackStruct: bool, InstallToEngine: bool) -> None:
 		""" Create a pack given already generated file data (see generateFileData). """
 
-		self.writeDataToTmpPack()
+		self.prunedRelPaths = None
+		if self.packInfo['packPruneRoots'] != None:
+			self.pruneAssets()
+		self.writeDataToTmpPack(stageContent=self.needsStagedContent(exportPackStruct, InstallToEngine))
+		self.checkCancelled()
+		# journaled outputs are only reused when made from the same content
+		self.archiveInputsKey = self.getArchiveInputsKey() if self.journal != None else None
+		self.reportProgress('Packing')
 		self.generateUpack()
 
 		if exportCompressedPack:
@@ -176,9 +582,25 @@ class DataManager():
 
 		if InstallToEngine:
 			self.exportContentToEngine()
-		else:
-			upackPath = os.path.join(self.UEDir, 'FeaturePacks', self.tmpFilePaths["upackFile"][1])
-			self.onCleanupFuncs.append(lambda: os.unlink(upackPath))
+
+		if self.journal != None:
+			self.journal.recordPhase('packing')
+
+#-
+	def needsStagedContent(self, exportPackStruct: bool, InstallToEngine: bool) -> bool:
+		""" Return whether the assets have to be staged to the tmp dir.\n
+		Only exports that copy the tmp dir need them, archives stream straight from the sources and link / mirror installs use the assets dir (unless pruned).
+		"""
+
+		return exportPackStruct or (InstallToEngine and self.getInstallMode() == 'copy') or self.prunedRelPaths != None
+
+#-
+	def getInstallMode(self) -> str:
+		""" Return the install mode used, pruned packs are mirrored instead of linked (the link would expose the unreferenced assets). """
+
+		if self.packInfo['packInstallMode'] == 'link' and self.prunedRelPaths != None:
+			return 'mirror'
+		return self.packInfo['packInstallMode']
 
 #---
 # file data generation
@@ -206,7 +628,8 @@ class DataManager():
 			[
 				{
 					'Language': 'en',
-					'Text': ', '.join(self.packInfo['packAssetTypes'])
+					# sorted, set order changes from one run to the next
+					'Text': ', '.join(sorted(self.packInfo['packAssetTypes']))
 				},
 			],
 			'SearchTags':
@@ -219,10 +642,8 @@ class DataManager():
 			'ClassTypes': '',
 			'Category': self.packInfo['packCategory'],
 			'Thumbnail': self.tmpFilePaths['thumbnailFile'][1],
-			'Screenshots':
-			[
-				self.tmpFilePaths['screenshotFile'][1],
-			]
+			# [''] if there are none, same as the single screenshot layout
+			'Screenshots': self.screenshotFilenames or [''],
 		}
 
 #-
@@ -257,12 +678,9 @@ class DataManager():
 			'FOR /F "delims=" %%F IN ("%OutputPath%") DO SET "OutputPath=%%~fF"',
 			'echo packing...',
 			'echo ----------',
-			rf'"{self.packerPath}" -Create="%~dp0{self.tmpFilePaths["responseFile"][1]}" "..\..\..\FeaturePacks\{self.tmpFilePaths["upackFile"][1]}"',
+			rf'"{self.packerPath}" -Create="%~dp0{self.tmpFilePaths["responseFile"][1]}" "%~dp0{os.path.relpath(os.path.join(*self.tmpFilePaths["upackFile"]), self.tmpPackPath)}" {self.getPakCompressionArgs()}',
 			'echo packing Done.',
 			'echo.',
-			'echo exporting...',
-			rf'robocopy "{self.UEDir}\FeaturePacks" "%~dp0ZipContent\FeaturePacks" {self.tmpFilePaths["upackFile"][1]} /w:5',
-			'echo exporting Done.',
 			'echo archiving...',
 			'echo ----------',
 			rf'powershell Compress-Archive -Path "%~dp0ZipContent\*" -DestinationPath "%OutputPath%" -Force',
@@ -275,32 +693,57 @@ class DataManager():
 #---
 # disk ops
 
+	@profiledPhase('InferAssetTypes')
 	def InferAssetTypes(self) -> list | None:
-		""" Attemts to gather all .uasset types (based on UE's naming conventions).\n
-		Returns list of filenames that could not be determined.
+		""" Attemts to gather all .uasset types (based on assetTypeRules, then UE's naming conventions).\n
+		Returns list of the paths (rel to packAssetsPath, / separated) of the files that could not be determined.
 		"""
 
 		unkownTypedFiles = []
-		for _, _, filenames in os.walk(top=self.packInfo['packAssetsPath']):
+		for dirPath, filenames in self.walkDir(self.packInfo['packAssetsPath']):
+			relDirPath = os.path.relpath(dirPath, self.packInfo['packAssetsPath']).replace('\\', '/')
 			for filename in filenames:
 				if not filename.endswith('.uasset'):
 					continue
-				
-				prefixEndIndex = filename.find('_') + 1
-				if prefixEndIndex >= 1:
-					assetType = self.assetTypeTable.get(filename.upper()[:prefixEndIndex], None)
-					if assetType != None:
-						# found a valid prefix
-						self.packInfo['packAssetTypes'].add(assetType)
-						continue
+
+				relPath = filename if relDirPath == '.' else f'{relDirPath}/{filename}'
+				assetType = self.getAssetTypeForPath(relPath)
+				if assetType != None:
+					# found a matching rule / valid prefix
+					self.packInfo['packAssetTypes'].add(assetType)
+					continue
 				# coundn't find a valid prefix
-				unkownTypedFiles.append(filename)
+				unkownTypedFiles.append(relPath)
 		if len(unkownTypedFiles):
 			return unkownTypedFiles
 		else:
 			return None
 
 #-
+	def getAssetType(self, filename: str) -> str | None:
+		""" Return the asset type of a .uasset filename based on its prefix, None if unknown. """
+
+		prefixEndIndex = filename.find('_') + 1
+		if prefixEndIndex >= 1:
+			return self.assetTypeTable.get(filename.upper()[:prefixEndIndex], None)
+		return None
+
+#-
+	def getAssetTypeForPath(self, relPath: str) -> str | None:
+		""" Return the asset type of a .uasset (path rel to packAssetsPath): the first matching assetTypeRules rule, else its prefix. None if unknown. """
+
+		return self.assetTypeRules.match(relPath) or self.getAssetType(os.path.basename(relPath))
+
+#-
+	def addAssetTypeRule(self, kind: str, pattern: str, assetType: str, save: bool = False) -> None:
+		""" Add an assetTypeRules rule (see AssetTypeRules), optionally saved to the rules file for later runs. Raises ValueError if invalid. """
+
+		self.assetTypeRules.addRule(kind, pattern, assetType)
+		if save and self.assetTypeRules.path != None:
+			self.assetTypeRules.save()
+
+#-
+	@profiledPhase('generatePackFileStruct')
 	def generatePackFileStruct(self) -> None:
 		""" Generate file structure for the pack in a tmp dir\n
 		Populates self.tmpFilePaths, self.tmpDir and self.tmpPackPath vars
@@ -311,7 +754,7 @@ class DataManager():
 		def _recursiveCreateDir(dirStruct: dict, baseDir: PathLike[str], pathDict: dict) -> None:
 			for item in dirStruct:
 				if isinstance(dirStruct[item], dict):
-					os.mkdir(os.path.join(baseDir, item))
+					os.makedirs(os.path.join(baseDir, item), exist_ok=True)
 					_recursiveCreateDir(dirStruct[item], os.path.join(baseDir, item), pathDict)
 				elif isinstance(dirStruct[item], str):
 					pathDict[item] = (baseDir, dirStruct[item])
@@ -332,10 +775,23 @@ class DataManager():
 		}
 
 		# create tmp dir in UEDir (due to rel path restrictions)
-		self.tmpDir = TemporaryDirectory(prefix='unrealPackGen_tmp_', dir=self.UEDir)
-		self.onCleanupFuncs.append(self.tmpDir.cleanup)
-		self.tmpPackPath = os.path.join(self.tmpDir.name, self.packInfo['packCleanName'])
-		os.mkdir(self.tmpPackPath)
+		# lock is taken before the dir exists so other instances never see it unlocked
+		if self.journalMode != None:
+			tmpDirPath = os.path.join(self.UEDir, STAGING_DIR_PREFIX + self.packInfo['packCleanName'])
+		else:
+			tmpDirPath = os.path.join(self.UEDir, TMP_DIR_PREFIX + uuid.uuid4().hex[:8])
+		self.tmpDirLock = FileLock(tmpDirPath + LOCK_FILE_EXT)
+		if not self.tmpDirLock.acquire(blocking=False):
+			raise RuntimeError(f'another build is using {tmpDirPath}')
+
+		if self.journalMode != None:
+			self.openJournal(tmpDirPath)
+		else:
+			os.mkdir(tmpDirPath)
+			self.onCleanupFuncs.append(self.discardTmpDir)
+		self.tmpDir = tmpDirPath
+		self.tmpPackPath = os.path.join(self.tmpDir, self.packInfo['packCleanName'])
+		os.makedirs(self.tmpPackPath, exist_ok=True)
 		# create pack dir tree in tmp dir
 		_recursiveCreateDir(self.packLayout, self.tmpPackPath, self.tmpFilePaths)
 
@@ -359,22 +815,27 @@ class DataManager():
 						# set to empty str if not provided
 						self.tmpFilePaths[key] = (self.tmpFilePaths[key][0], '')
 				case 'screenshotFile':
-					if self.packInfo['packScrShotPath']:
-						self.tmpFilePaths[key] = (self.tmpFilePaths[key][0], self.getFilenameFromPattern(key, self.tmpFilePaths[key][1], self.packInfo['packScrShotPath']))
-					else:
-						# set to empty str if not provided
-						self.tmpFilePaths[key] = (self.tmpFilePaths[key][0], '')
+					self.screenshotFilenames = []
+					for index, screenshotPath in enumerate(self.packInfo['packScrShotPaths']):
+						filename = self.getFilenameFromPattern(key, self.tmpFilePaths[key][1], screenshotPath, index)
+						if index and '{INDEX}' not in self.tmpFilePaths[key][1]:
+							# layouts made for a single screenshot
+							filename = f'{os.path.splitext(filename)[0]}_{index + 1}{os.path.splitext(filename)[1]}'
+						self.screenshotFilenames.append(filename)
+					# first screenshot, empty str if not provided
+					self.tmpFilePaths[key] = (self.tmpFilePaths[key][0], self.screenshotFilenames[0] if self.screenshotFilenames else '')
 				# default
 				case _:
 					self.tmpFilePaths[key] = (self.tmpFilePaths[key][0], self.getFilenameFromPattern(key, self.tmpFilePaths[key][1], None))
 
 		# create new dirs for assetFolder
-		os.makedirs(self.tmpFilePaths['assetFolder'][0])
+		os.makedirs(self.tmpFilePaths['assetFolder'][0], exist_ok=True)
 
 #-
-	def writeDataToTmpPack(self) -> None:
+	@profiledPhase('writeDataToTmpPack')
+	def writeDataToTmpPack(self, stageContent: bool = True) -> None:
 		""" Write all generated file data to tmp structure.\n
-		Additionally copy all other required files from their user specified paths.
+		Additionally copy all other required files from their user specified paths, unless stageContent is False (assets / packAdditions).
 		"""
 
 		# ensure all data is available
@@ -388,8 +849,7 @@ class DataManager():
 			self._generatePackingCmdData()
 
 		# manifestFile
-		with open(os.path.join(self.tmpFilePaths['manifestFile'][0], self.tmpFilePaths['manifestFile'][1]), 'w') as file:
-			json.dump(self.manifestData, file, indent=2)
+		self.writeManifestFile()
 
 		# configFile
 		with open(os.path.join(self.tmpFilePaths['configFile'][0], self.tmpFilePaths['configFile'][1]), 'w') as file:
@@ -405,57 +865,414 @@ class DataManager():
 
 		# thumbnailFile / screenshotFile
 		# resize to proper size and write to dest. does not write if image not provided
+		self.reportProgress('Processing images')
+		images = [(screenshotPath, SCREENSHOT_SIZE, os.path.join(self.tmpFilePaths['screenshotFile'][0], filename)) for screenshotPath, filename in zip(self.packInfo['packScrShotPaths'], self.screenshotFilenames)]
 		if self.packInfo['packThumbPath']:
-			with Image.open(self.packInfo['packThumbPath']) as originalImage:
-				self.cropAndResizeImage(originalImage, (64, 64)).save(os.path.join(self.tmpFilePaths['thumbnailFile'][0] , self.tmpFilePaths['thumbnailFile'][1]))
-		if self.packInfo['packScrShotPath']:
-			with Image.open(self.packInfo['packScrShotPath']) as originalImage:
-				self.cropAndResizeImage(originalImage, (400, 200)).save(os.path.join(self.tmpFilePaths['screenshotFile'][0] , self.tmpFilePaths['screenshotFile'][1]))
-		
+			images.append((self.packInfo['packThumbPath'], THUMBNAIL_SIZE, os.path.join(self.tmpFilePaths['thumbnailFile'][0] , self.tmpFilePaths['thumbnailFile'][1])))
+		self._writeResizedImages(images)
+
+		# generated files would otherwise carry the build time
+		if self.packInfo['packReproducible']:
+			filePaths = [os.path.join(*self.tmpFilePaths[key]) for key in ('manifestFile', 'configFile', 'responseFile', 'packingCmdFile', 'thumbnailFile')]
+			filePaths.extend(os.path.join(self.tmpFilePaths['screenshotFile'][0], filename) for filename in self.screenshotFilenames)
+			for filePath in filePaths:
+				if os.path.isfile(filePath):
+					os.utime(filePath, (REPRODUCIBLE_EPOCH, REPRODUCIBLE_EPOCH))
+
+		self.checkCancelled()
+		if not stageContent:
+			return
+
+		# count files ahead of time for progress reporting
+		self.copiedFileCount = 0
+		self.totalFileCount  = sum(len(filenames) for _, _, filenames in os.walk(self.packInfo['packAssetsPath'])) - len(self.prunedRelPaths or ())
+		self.totalFileCount += sum(len(filenames) for _, _, filenames in os.walk(self.packAdditionsDir))
+		self.reportProgress('Copying assets', 0.0)
+
 		# assetFolder
-		copytree(self.packInfo['packAssetsPath'], self.tmpFilePaths['assetFolder'][0], dirs_exist_ok=True)
+		copytree(self.packInfo['packAssetsPath'], self.tmpFilePaths['assetFolder'][0], dirs_exist_ok=True, copy_function=self._copyFileCB, ignore=(self._ignorePrunedCB if self.prunedRelPaths else None))
 
 		# packAdditions
-		copytree(os.path.normpath(self.packAdditionsDir), os.path.join(self.tmpPackPath, 'ZipContent'), dirs_exist_ok=True)
+		copytree(os.path.normpath(self.packAdditionsDir), os.path.join(self.tmpPackPath, 'ZipContent'), dirs_exist_ok=True, copy_function=self._copyFileCB)
+
+		if self.journal != None:
+			# staged by a previous run, but no longer part of the pack
+			for stagedPath in self.journal.getUnvisitedFiles():
+				self.discardPath(stagedPath)
+			self.journal.recordPhase('staging')
+
+#-
+	def pruneAssets(self) -> None:
+		""" Find the assets not needed by packPruneRoots (see AssetDependencyGraph), they are left out of the pack.\n
+		Dropped files and their size are listed in <pack name>_pruned.txt in the output dir.
+		"""
+
+		self.reportProgress('Pruning unreferenced assets')
+		graph = AssetDependencyGraph(self.packInfo['packAssetsPath'])
+		_, droppedRelPaths, droppedSize = graph.prune(self.packInfo['packPruneRoots'])
+		self.prunedRelPaths = set(droppedRelPaths)
+		self.checkCancelled()
+
+		reportPath = os.path.join(self.packInfo['packOutputPath'], f'{self.packInfo["packCleanName"]}_pruned.txt')
+		self.claimOutputPath(reportPath)
+		with open(reportPath, 'w') as file:
+			file.write(f'{len(droppedRelPaths)} files dropped, {droppedSize} bytes saved (roots: {", ".join(self.packInfo["packPruneRoots"])})\n')
+			for relPath in droppedRelPaths:
+				file.write(f'{os.path.getsize(os.path.join(self.packInfo["packAssetsPath"], relPath))}\t{relPath}\n')
+		print(f'pruning: {len(droppedRelPaths)} unreferenced files dropped ({droppedSize} bytes), see {reportPath}', file=self.logStream)
+
+#-
+	def _ignorePrunedCB(self, dirPath: str, names: list[str]) -> list[str]:
+		""" copytree ignore function, leaves out the files dropped by pruneAssets. """
+
+		relDirPath = os.path.relpath(dirPath, self.packInfo['packAssetsPath'])
+		return [name for name in names if os.path.normpath(os.path.join(relDirPath, name)) in self.prunedRelPaths]
+
+#-
+	@profiledPhase('sizeAnalysis')
+	def analyzePackContent(self, largestCount: int = 20, estimateCompression: bool = False) -> PackAnalysis:
+		""" Size breakdown of the assets dir (see PackAnalysis): per asset type, per dir and the largest files.\n
+		estimateCompression: also estimate compressed sizes per type with the current archive format / preset (reads samples of every file).
+		"""
+
+		self.reportProgress('Analyzing pack content')
+		return PackAnalysis(self, largestCount, estimateCompression).run()
+
+#-
+	def writeSizeReports(self, analysis: PackAnalysis) -> list[str]:
+		""" Write <pack name>_sizes.json / .csv to the output dir. Returns the written file paths. """
+
+		reportPaths = analysis.writeReports(self.packInfo['packOutputPath'], self.packInfo['packCleanName'])
+		print(f'size report written to {", ".join(reportPaths)}', file=self.logStream)
+		return reportPaths
+
+#-
+	@profiledPhase('imageProcessing')
+	def _writeResizedImages(self, images: Sequence[tuple[PathLike[str] | str, tuple[int, int], PathLike[str] | str]]) -> None:
+		""" Crop / resize images (source path, target size, dest path) and write them to their dest path.\n
+		Results are cached, unchanged images are only processed once per process. Several uncached images are processed in parallel by an imageProcessor job (process pool, see ImageProcessor).
+		"""
+
+		uncachedImages = []
+		for sourcePath, targetSize, destPath in images:
+			sourcePath = os.path.abspath(sourcePath)
+			cacheKey = (sourcePath, os.stat(sourcePath).st_mtime_ns, targetSize, os.path.splitext(destPath)[1].lower())
+
+			with self._cacheLock:
+				encodedImage = self._imageCache.get(cacheKey)
+				if encodedImage != None:
+					self._imageCache.move_to_end(cacheKey)
+
+			if self.metrics != None:
+				self.metrics.cacheLookup('image', encodedImage != None)
+			if encodedImage == None:
+				uncachedImages.append((sourcePath, targetSize, destPath, cacheKey))
+			else:
+				with open(destPath, 'wb') as file:
+					file.write(encodedImage)
+
+		if len(uncachedImages) == 1:
+			# not worth starting a job for
+			ImageProcessor.processImage(*uncachedImages[0][:3])
+		elif uncachedImages:
+			self.checkCancelled()
+			imageArgs = ' '.join(fr'-image "{sourcePath}" "{os.path.abspath(destPath)}" {targetSize[0]}x{targetSize[1]}' for sourcePath, targetSize, destPath, _ in uncachedImages)
+			job = self.startJob(fr'"{sysExecutable}" "{os.path.join(CURRENT_FILE_DIR, "imageProcessor.py")}" {imageArgs}', os.path.abspath(self.basePath))
+			output, cause = self.communicateJob(job, 'image')
+			if cause != None:
+				outputLines = output.decode(errors='replace').strip().splitlines()
+				raise RuntimeError(f'image processing failed ({cause}): {outputLines[-1] if outputLines else ""}')
+
+		for _, _, destPath, cacheKey in uncachedImages:
+			with open(destPath, 'rb') as file:
+				encodedImage = file.read()
+			with self._cacheLock:
+				self._imageCache[cacheKey] = encodedImage
+				while len(self._imageCache) > IMAGE_CACHE_SIZE:
+					self._imageCache.popitem(last=False)
+
+#-
+	def writeManifestFile(self) -> None:
+		""" Write manifestData to the tmp structure, also used to update it after the asset types changed. """
+
+		filePath = os.path.join(self.tmpFilePaths['manifestFile'][0], self.tmpFilePaths['manifestFile'][1])
+		with open(filePath, 'w') as file:
+			json.dump(self.manifestData, file, indent=2, sort_keys=self.packInfo['packReproducible'])
+
+		if self.packInfo['packReproducible']:
+			os.utime(filePath, (REPRODUCIBLE_EPOCH, REPRODUCIBLE_EPOCH))
+
+#-
+	def _copyFileCB(self, src: str, dst: str) -> str:
+		""" copytree copy_function, adds cancel checkpoints and progress reporting to the copy.\n
+		Assets go through the asset store if one is set.
+		"""
+
+		self.checkCancelled()
+		if self.journal != None:
+			if self.journal.isFileStaged(src, dst):
+				if self.metrics != None:
+					self.metrics.cacheLookup('journal', True)
+				self.copiedFileCount += 1
+				self.reportProgress('Copying assets', self.copiedFileCount / max(self.totalFileCount, 1))
+				return dst
+			# partial copy of a previous run, hard links can't be made over it
+			if os.path.lexists(dst):
+				os.unlink(dst)
+
+		if self.assetStore != None and not os.path.relpath(src, self.packInfo['packAssetsPath']).startswith('..'):
+			wasStored = self.assetStore.stageFile(src, dst)
+			if self.metrics != None:
+				self.metrics.cacheLookup('assetStore', wasStored)
+		else:
+			# chunked so that cancelling doesn't have to wait on multi GB files
+			buffer = memoryview(bytearray(COPY_BUFFER_SIZE))
+			with open(src, 'rb') as srcFile, open(dst, 'wb') as dstFile:
+				while True:
+					readSize = srcFile.readinto(buffer)
+					if not readSize:
+						break
+					dstFile.write(buffer[:readSize])
+					self.checkCancelled()
+			copystat(src, dst)
+
+		if self.journal != None:
+			self.journal.recordStagedFile(src, dst)
+		if self.metrics != None:
+			if self.journal != None:
+				self.metrics.cacheLookup('journal', False)
+			self.metrics.addBytes('copied', os.path.getsize(dst))
+		self.copiedFileCount += 1
+		self.reportProgress('Copying assets', self.copiedFileCount / max(self.totalFileCount, 1))
+		return dst
 
 #-
 	def generateUpack(self) -> None:
-		""" Create .upack file, outputs to engine's FeaturePacks dir. """
+		""" Create .upack file, outputs to the tmp pack (unique to the build, see installUpackToEngine for the engine's FeaturePacks dir). """
 
-		shellCmd = fr'"{self.packerPath}" -Create="{os.path.join(self.tmpFilePaths["responseFile"][0], self.tmpFilePaths["responseFile"][1])}" "..\..\..\FeaturePacks\{self.tmpFilePaths["upackFile"][1]}"'
-		packJob = subprocess.Popen(shlex.split(shellCmd), cwd=os.path.abspath(self.basePath), stderr=subprocess.STDOUT, stdout=subprocess.PIPE)
+		# rel to the packer's dir, same as the response file's content
+		upackPath = os.path.relpath(os.path.join(*self.tmpFilePaths['upackFile']), os.path.join(self.packerPath, '../'))
+		shellCmd = fr'"{self.packerPath}" -Create="{os.path.join(self.tmpFilePaths["responseFile"][0], self.tmpFilePaths["responseFile"][1])}" "{upackPath}" {self.getPakCompressionArgs()}'
+		packJob = self.startJob(shellCmd, os.path.abspath(self.basePath))
 
-		shellCmd = fr'robocopy "{os.path.join(self.UEDir, "FeaturePacks/")}" "{self.tmpFilePaths["upackFile"][0]}" {self.tmpFilePaths["upackFile"][1]} /e /w:5'
-		copyJob = lambda: subprocess.Popen(shlex.split(shellCmd), cwd=os.path.abspath(self.basePath), stderr=subprocess.STDOUT, stdout=subprocess.PIPE)
+		self.activateJob(packJob, 'unrealpak')
 
-		self.activeJobs.append((packJob, 'unrealpak'))
-		self.pendingJobs.append(((copyJob, 'robocopy'), {'unrealpak'}))
+#-
+	def getPakCompressionArgs(self, method: str | None = None, level: int | None = None, blockSize: int | None = None) -> str:
+		""" Return the UnrealPak compression args for the given settings, the pack's ones (packPakCompression*) if method is None. """
+
+		if method == None:
+			method, level, blockSize = self.packInfo['packPakCompressionMethod'], self.packInfo['packPakCompressionLevel'], self.packInfo['packPakCompressionBlockSize']
+		if method == 'None':
+			return ''
+
+		args = [f'-compress -compressionformats={method}']
+		if level != None:
+			args.append(f'-compresslevel={level}')
+		if blockSize != None:
+			args.append(f'-compressionblocksize={blockSize // 1024}KB')
+		return ' '.join(args)
+
+#-
+	def benchmarkPakCompression(self, settings: Sequence[tuple[str, int | None, int | None]], repeatCount: int = 3) -> PakBenchmark:
+		""" Build the .upack under each compression setting (method, level, block size), measuring pack time, size and extraction speed (see PakBenchmark).
+
+		Nothing is written to the engine, results are written to <pack name>_pakBenchmark.json in the output dir.
+		"""
+
+		self.generateFileData()
+		self.writeDataToTmpPack(stageContent=False)
+
+		benchmarkDir = os.path.join(self.tmpDir, 'pakBenchmark')
+		os.mkdir(benchmarkDir)
+		benchmark = PakBenchmark(self, settings, repeatCount).run(benchmarkDir)
+
+		reportPath = os.path.join(self.packInfo['packOutputPath'], f'{self.packInfo["packCleanName"]}_pakBenchmark.json')
+		benchmark.writeReport(reportPath)
+		print(f'pak benchmark written to {reportPath}', file=self.logStream)
+		return benchmark
 
 #-
 	def exportCompressedPack(self) -> None:
-		""" Compress and export pack to specified output dir. """
+		""" Compress and export pack to specified output dir.\n
+		Members are streamed from their source locations (see getArchiveRoots), the ZipContent staging copy is not used.
+		"""
 
-		outputFilePath = os.path.join(self.packInfo['packOutputPath'], f'{self.packInfo["packCleanName"]}.zip')
-		shellCmd = fr'powershell Compress-Archive -Path ".\ZipContent\*" -DestinationPath "{outputFilePath}" -Force'
-		archiveJob = lambda: subprocess.Popen(shlex.split(shellCmd), cwd=os.path.abspath(self.tmpPackPath), stderr=subprocess.STDOUT, stdout=subprocess.PIPE)
-		
-		self.pendingJobs.append(((archiveJob, 'archive'), {'robocopy', 'unrealpak'}))
+		archiveFormat = self.packInfo['packArchiveFormat']
+		outputBasePath = os.path.join(self.packInfo['packOutputPath'], self.packInfo['packCleanName'])
+		rootArgs = ' '.join(f'-root "{archivePath}" "{sourcePath}"' for archivePath, sourcePath in self.getArchiveRoots())
+
+		if self.packInfo['packShardCount'] <= 1:
+			outputFilePaths = [outputBasePath + ArchiveWriter.getExtension(archiveFormat)]
+			shardArgs = ['']
+		else:
+			shardManifestPath, shardFilenames = self.writeShardManifest()
+			outputFilePaths = [os.path.join(self.packInfo['packOutputPath'], filename) for filename in shardFilenames]
+			shardArgs = [f'-shard "{shardManifestPath}" {shardIndex}' for shardIndex in range(len(outputFilePaths))]
+
+		inputsKey = self.archiveInputsKey
+		for outputFilePath, shardArg in zip(outputFilePaths, shardArgs):
+			outputPaths = [outputFilePath, outputFilePath + DIGEST_EXT, outputFilePath + FILE_MANIFEST_EXT]
+			if self.journal != None and self.journal.isOutputDone(outputPaths, inputsKey):
+				# finished by the build being resumed
+				for path in outputPaths:
+					self.adoptOutputPath(path)
+				print(f'resume: reusing {outputFilePath}', file=self.logStream)
+				continue
+			for path in outputPaths:
+				self.claimOutputPath(path)
+
+			shellCmd = fr'"{sysExecutable}" "{os.path.join(CURRENT_FILE_DIR, "archiveWriter.py")}" "{outputFilePath}" {self._getArchiveWriterArgs()} {shardArg} {rootArgs}'
+			# default args, bind the current values
+			archiveJob = lambda shellCmd=shellCmd, outputPaths=outputPaths: self.startJob(shellCmd, os.path.abspath(self.tmpPackPath), (outputPaths, inputsKey))
+
+			# only the .upack is needed from the other jobs, shards run concurrently
+			self.pendingJobs.append(((archiveJob, 'archive'), {'unrealpak'}))
+
+		if self.packInfo['packDeltaBasePath'] != None:
+			self.exportDeltaPack()
+
+#-
+	def exportDeltaPack(self) -> None:
+		""" Export a pack with only the files added / changed since the build at packDeltaBasePath, plus a delta manifest listing removed files.\n
+		Applied on top of the previous version with PackDelta.apply (packDelta.py).
+		"""
+
+		outputBasePath = os.path.join(self.packInfo['packOutputPath'], self.packInfo['packCleanName'] + '.delta')
+		outputFilePath = outputBasePath + ArchiveWriter.getExtension(self.packInfo['packArchiveFormat'])
+		deltaManifestPath = outputBasePath + '.json'
+		outputPaths = [outputFilePath, outputFilePath + DIGEST_EXT, outputFilePath + FILE_MANIFEST_EXT, deltaManifestPath]
+
+		inputsKey = self.archiveInputsKey
+		if self.journal != None and self.journal.isOutputDone(outputPaths, inputsKey):
+			# finished by the build being resumed
+			for path in outputPaths:
+				self.adoptOutputPath(path)
+			print(f'resume: reusing {outputFilePath}', file=self.logStream)
+			return
+
+		self.reportProgress('Comparing with previous version')
+		roots = self.getArchiveRoots()
+		delta = PackDelta(self.packInfo['packDeltaBasePath'])
+		# the .upack is only created by the unrealpak job, and changes along with the manifest anyway
+		delta.compare(ArchiveWriter.iterMembers(roots), alwaysChanged=[roots[1][0].replace('\\', '/').strip('/')])
+		print(f'delta pack: {delta.getSummary()}', file=self.logStream)
+		self.checkCancelled()
+
+		for path in outputPaths:
+			self.claimOutputPath(path)
+		delta.writeManifest(deltaManifestPath, self.packInfo['packName'], self.packInfo['packVersion'])
+
+		# manifest as the first member, streamed formats can read it before the rest
+		rootArgs = ' '.join(f'-root "{archivePath}" "{sourcePath}"' for archivePath, sourcePath in [(DELTA_MANIFEST_NAME, deltaManifestPath)] + roots)
+		shellCmd = fr'"{sysExecutable}" "{os.path.join(CURRENT_FILE_DIR, "archiveWriter.py")}" "{outputFilePath}" {self._getArchiveWriterArgs()} -delta "{deltaManifestPath}" {rootArgs}'
+		archiveJob = lambda: self.startJob(shellCmd, os.path.abspath(self.tmpPackPath), (outputPaths, inputsKey))
+
+		self.pendingJobs.append(((archiveJob, 'archive'), {'unrealpak'}))
+
+#-
+	def _getArchiveWriterArgs(self) -> str:
+		""" Return the archiveWriter.py args shared by all archives of the pack. """
+		return f'-format "{self.packInfo["packArchiveFormat"]}" -preset "{self.packInfo["packArchivePreset"]}" -version "{self.packInfo["packVersion"]}" {"-reproducible" if self.packInfo["packReproducible"] else ""}'
+
+#-
+	def writeShardManifest(self) -> tuple[str, list[str]]:
+		""" Split the compressed pack's members into packShardCount size balanced shards (see ArchiveWriter.planShards).\n
+		The shard manifest lists every shard's archive and members, extracting all shards to the same dir gives the complete pack.\n
+		Returns (path of the shard manifest written to the output dir, filename of each shard's archive)
+		"""
+
+		roots = self.getArchiveRoots()
+		members = [(archivePath, os.path.getsize(sourcePath)) for archivePath, sourcePath in ArchiveWriter.iterMembers(roots)]
+		# the .upack is only created by the unrealpak job, small enough to not matter for balancing
+		upackArchivePath = roots[1][0].replace('\\', '/').strip('/')
+		if upackArchivePath not in (archivePath for archivePath, _ in members):
+			members.append((upackArchivePath, 0))
+
+		memberSizes = dict(members)
+		shardCount = min(self.packInfo['packShardCount'], len(members))
+		extension = ArchiveWriter.getExtension(self.packInfo['packArchiveFormat'])
+		shardManifest = {
+			'packName': self.packInfo['packName'],
+			'version':  self.packInfo['packVersion'],
+			'format':   self.packInfo['packArchiveFormat'],
+			'shards': [
+				{
+					'file':    f'{self.packInfo["packCleanName"]}.part{shardIndex + 1:02d}{extension}',
+					'size':    sum(memberSizes[archivePath] for archivePath in shardMembers),
+					'members': shardMembers,
+				}
+				for shardIndex, shardMembers in enumerate(ArchiveWriter.planShards(members, shardCount))
+			],
+		}
+
+		shardManifestPath = os.path.join(self.packInfo['packOutputPath'], self.packInfo['packCleanName'] + SHARD_MANIFEST_EXT)
+		self.claimOutputPath(shardManifestPath)
+		with open(shardManifestPath, 'w') as file:
+			json.dump(shardManifest, file, indent=2)
+		return (shardManifestPath, [shard['file'] for shard in shardManifest['shards']])
+
+#-
+	def getArchiveRoots(self) -> list[tuple[str, str]]:
+		""" Return tuple(archive path, source path) for all content of the compressed pack.\n
+		Archive paths mirror the ZipContent part of the pack layout.
+		"""
+
+		zipContentPath = os.path.join(self.tmpPackPath, 'ZipContent')
+		toArchivePath = lambda path: os.path.relpath(path, zipContentPath).replace('\\', '/')
+
+		upackName = self.tmpFilePaths['upackFile'][1]
+		# pruned assets only exist as a whole in the staged copy
+		assetsSourcePath = self.tmpFilePaths['assetFolder'][0] if self.prunedRelPaths != None else self.packInfo['packAssetsPath']
+		return [
+			('', os.path.normpath(self.packAdditionsDir)),
+			(toArchivePath(os.path.join(self.tmpFilePaths['upackFile'][0], upackName)), os.path.join(self.tmpFilePaths['upackFile'][0], upackName)),
+			(toArchivePath(self.tmpFilePaths['assetFolder'][0]), os.path.abspath(assetsSourcePath)),
+		]
 
 #-
 	def exportPackStruct(self) -> None:
-		""" Export folder structure from tmp dir to specified output dir. """
+		""" Export folder structure from tmp dir to specified output dir.\n
+		Files are hashed while being copied, the checksums are written next to the structure (see getChecksumManifestPath).
+		"""
 
+		outputPaths = [self.getChecksumManifestPath()] + [os.path.join(self.packInfo['packOutputPath'], entryName) for entryName in os.listdir(self.tmpDir)]
 		self.onCleanupFuncs.append(self.updateExportedResponseFile)
-		shellCmd = fr'robocopy "{os.path.abspath(self.tmpDir.name)}" "{self.packInfo["packOutputPath"]}" * /e /w:5'
-		copyJob = lambda: subprocess.Popen(shlex.split(shellCmd), cwd=os.path.abspath(self.tmpDir.name), stderr=subprocess.STDOUT, stdout=subprocess.PIPE)
 
-		self.pendingJobs.append(((copyJob, 'robocopy'), {'robocopy', 'unrealpak'}))
+		# the manifest is written last, it stands for the whole copy
+		inputsKey = self.archiveInputsKey
+		if self.journal != None and self.journal.isOutputDone(outputPaths[:1], inputsKey):
+			# finished by the build being resumed
+			for path in outputPaths:
+				self.adoptOutputPath(path)
+			print(f'resume: reusing {self.packInfo["packOutputPath"]}', file=self.logStream)
+			return
+		for path in outputPaths:
+			self.claimOutputPath(path)
+
+		shellCmd = fr'"{sysExecutable}" "{os.path.join(CURRENT_FILE_DIR, "treeCopier.py")}" "{os.path.abspath(self.tmpDir)}" "{self.packInfo["packOutputPath"]}" -manifest "{self.getChecksumManifestPath()}"'
+		copyJob = lambda: self.startJob(shellCmd, os.path.abspath(self.tmpDir), (outputPaths[:1], inputsKey))
+
+		# waits on the .upack being packed into the tmp dir
+		self.pendingJobs.append(((copyJob, 'copy'), {'unrealpak'}))
+
+#-
+	def getChecksumManifestPath(self) -> str:
+		return os.path.join(self.packInfo['packOutputPath'], self.packInfo['packCleanName'] + CHECKSUM_EXT)
+
+#-
+	def getEngineChecksumManifestPath(self) -> str:
+		""" Return the path of the checksum manifest of the content installed to the engine (copy / mirror installs). """
+		return os.path.join(self.UEDir, 'Samples', self.packInfo['packCleanName'] + CHECKSUM_EXT)
 
 #-
 	def updateExportedResponseFile(self) -> None:
 		""" Update the path in the response file to work in new dir. """
 		
-		filePath = os.path.join(self.packInfo["packOutputPath"], os.path.relpath(self.tmpFilePaths['responseFile'][0], self.tmpDir.name), self.tmpFilePaths['responseFile'][1])
+		filePath = os.path.join(self.packInfo["packOutputPath"], os.path.relpath(self.tmpFilePaths['responseFile'][0], self.tmpDir), self.tmpFilePaths['responseFile'][1])
+		# nothing to update if the export was cancelled / rolled back
+		if not os.path.exists(filePath):
+			return
 		oldDirPath = os.path.relpath(self.tmpPackPath, os.path.join(self.packerPath, '../'))
 		newDirPath = os.path.abspath(os.path.join(filePath, '../'))
 
@@ -467,20 +1284,173 @@ class DataManager():
 		with open(filePath, 'w') as file:
 			file.write(newResponseData)
 
+		# edited after being copied
+		if os.path.exists(self.getChecksumManifestPath()):
+			TreeCopier.updateManifest(self.getChecksumManifestPath(), [filePath])
+			if self.journal != None:
+				self.journal.refreshOutput(self.getChecksumManifestPath())
+
 #-
 	def exportContentToEngine(self) -> None:
+		""" Install the content to the engine's Samples dir (see getInstallMode), and the .upack to its FeaturePacks dir once packed. """
+
+		match self.getInstallMode():
+			case 'copy':
+				self.copyContentToEngine()
+			case 'link':
+				self.linkContentToEngine()
+			case 'mirror':
+				self.mirrorContentToEngine()
+		self.installUpackToEngine()
+
+#-
+	def getEngineAssetPath(self) -> str:
+		""" Return the path the asset folder is installed to in the engine dir. """
+
+		return os.path.join(self.UEDir, os.path.relpath(self.tmpFilePaths['assetFolder'][0], os.path.join(self.tmpPackPath, 'ZipContent')))
+
+#-
+	def copyContentToEngine(self) -> None:
 		""" Copy Samples folder from the tmp dir to engine's. """
 
 		dirKeyword = 'Samples'
 		endIndex = self.tmpFilePaths['assetFolder'][0].rfind(dirKeyword) + len(dirKeyword)
-		shellCmd = fr'robocopy "{self.tmpFilePaths["assetFolder"][0][:endIndex]}" "{os.path.join(self.UEDir, "Samples")}" * /e /w:5'
-		copyJob = subprocess.Popen(shlex.split(shellCmd), cwd=os.path.abspath(self.tmpDir.name), stderr=subprocess.STDOUT, stdout=subprocess.PIPE)
+		for entryName in os.listdir(self.tmpFilePaths['assetFolder'][0][:endIndex]):
+			self.lockEnginePath(os.path.join(self.UEDir, 'Samples', entryName))
+			self.claimOutputPath(os.path.join(self.UEDir, 'Samples', entryName))
+		self.lockEnginePath(self.getEngineChecksumManifestPath())
+		self.claimOutputPath(self.getEngineChecksumManifestPath())
+
+		shellCmd = fr'"{sysExecutable}" "{os.path.join(CURRENT_FILE_DIR, "treeCopier.py")}" "{self.tmpFilePaths["assetFolder"][0][:endIndex]}" "{os.path.join(self.UEDir, "Samples")}" -manifest "{self.getEngineChecksumManifestPath()}"'
+		copyJob = self.startJob(shellCmd, os.path.abspath(self.tmpDir))
+
+		self.activateJob(copyJob, 'copy')
+
+#-
+	def linkContentToEngine(self) -> None:
+		""" Link the engine's asset folder to the assets dir, nothing is copied and edits show up in the engine right away.\n
+		A previous install is moved aside (rolled back / discarded like any claimed output), an existing link to the assets dir is kept as is.
+		"""
+
+		enginePath = self.getEngineAssetPath()
+		targetPath = os.path.abspath(self.packInfo['packAssetsPath'])
+		self.lockEnginePath(enginePath)
+		if self.isLink(enginePath) and os.path.realpath(enginePath) == os.path.realpath(targetPath):
+			print(f'{enginePath} already links to {targetPath}', file=self.logStream)
+			return
+
+		self.claimOutputPath(enginePath)
+		os.makedirs(os.path.dirname(enginePath), exist_ok=True)
+		self.createDirLink(targetPath, enginePath)
+		print(f'linked {enginePath} to {targetPath}', file=self.logStream)
+
+#-
+	def mirrorContentToEngine(self) -> None:
+		""" Sync the engine's asset folder with the assets (staged ones if pruned), only changed files are copied and stale ones removed (see TreeCopier.mirrorTree).\n
+		The sync is done in place, it is not rolled back: an interrupted sync is completed by the next one.
+		"""
+
+		enginePath = self.getEngineAssetPath()
+		sourcePath = self.tmpFilePaths['assetFolder'][0] if self.prunedRelPaths != None else self.packInfo['packAssetsPath']
+		self.lockEnginePath(enginePath)
+		# left by a link install, syncing through it would write to the assets themselves
+		if self.isLink(enginePath):
+			self.claimOutputPath(enginePath)
+		# rewritten once the sync is done, reused for the files it left unchanged
+		self.lockEnginePath(self.getEngineChecksumManifestPath())
+
+		shellCmd = fr'"{sysExecutable}" "{os.path.join(CURRENT_FILE_DIR, "treeCopier.py")}" -mirror "{os.path.abspath(sourcePath)}" "{enginePath}" -manifest "{self.getEngineChecksumManifestPath()}"'
+		copyJob = self.startJob(shellCmd, os.path.abspath(self.tmpDir))
+
+		self.activateJob(copyJob, 'copy')
+
+#-
+	def installUpackToEngine(self) -> None:
+		""" Copy the .upack to the engine's FeaturePacks dir, once packed (see generateUpack). """
+
+		upackName = self.tmpFilePaths['upackFile'][1]
+		enginePath = os.path.join(self.UEDir, 'FeaturePacks', upackName)
+		self.lockEnginePath(enginePath)
+		self.claimOutputPath(enginePath)
 
-		self.activeJobs.append((copyJob, 'robocopy'))
+		shellCmd = fr'robocopy "{self.tmpFilePaths["upackFile"][0]}" "{os.path.join(self.UEDir, "FeaturePacks")}" {upackName} /r:3 /w:5'
+		copyJob = lambda: self.startJob(shellCmd, os.path.abspath(self.basePath))
+
+		self.pendingJobs.append(((copyJob, 'robocopy'), {'unrealpak'}))
+
+#-
+	def lockEnginePath(self, path: PathLike[str] | str) -> None:
+		""" Take the advisory lock of a shared engine location (ie: FeaturePacks/<pack>.upack) until cleanup, waiting on other builds writing to it.\n
+		Everything else a build writes in the engine dir is unique to it (tmp / staging / trash dirs), and needs no lock.
+		"""
+
+		path = os.path.abspath(path)
+		if path in self.engineLocks:
+			return
+
+		locksDir = os.path.join(self.UEDir, ENGINE_LOCKS_DIR)
+		os.makedirs(locksDir, exist_ok=True)
+		# lock files are never removed, a process waiting on one would otherwise end up locking a file nobody else uses
+		lock = FileLock(os.path.join(locksDir, os.path.relpath(path, self.UEDir).replace('\\', '~').replace('/', '~') + LOCK_FILE_EXT))
+		if not lock.acquire(blocking=False):
+			self.reportProgress(f'Waiting on another build using {os.path.relpath(path, self.UEDir)}')
+			while not lock.acquire(timeout=1.0):
+				self.checkCancelled()
+		self.engineLocks[path] = lock
+
+#-
+	def releaseEngineLocks(self) -> None:
+		for lock in self.engineLocks.values():
+			lock.release()
+		self.engineLocks.clear()
 
 #---
 # subprocess job management
 
+	def startJob(self, shellCmd: str, cwd: PathLike[str] | str, journalOutput: tuple[list[str], str] | None = None, attempt: int = 0) -> subprocess.Popen:
+		""" Start a job subprocess in its own process group, so that it can later be killed along with its children.\n
+		journalOutput: (paths of the output the job writes, inputs key), recorded in the journal once the job succeeds (journaled builds only), the size of paths[0] of archive jobs goes to the metrics\n
+		attempt: number of previous attempts of the same job (see retryJob)
+		"""
+
+		if platform.system() == 'Windows':
+			groupKwargs = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+		else:
+			groupKwargs = {'start_new_session': True}
+
+		job = subprocess.Popen(shlex.split(shellCmd), cwd=cwd, stderr=subprocess.STDOUT, stdout=subprocess.PIPE, **groupKwargs)
+		if journalOutput != None:
+			self.jobOutputs[job.pid] = journalOutput
+		# everything needed to watch / retry the job
+		self.jobInfos[job.pid] = {'shellCmd': shellCmd, 'cwd': cwd, 'journalOutput': journalOutput, 'attempt': attempt, 'startTime': time.monotonic(), 'lastOutputTime': time.monotonic(), 'cause': None, 'reader': None}
+		return job
+
+#-
+	def activateJob(self, job: subprocess.Popen, jobType: str) -> None:
+		""" Add a started job to the active jobs (see pollActiveJobs). """
+
+		self.activeJobs.append((job, jobType))
+		# read in the background, polling never waits on a job's output
+		self.writeJobOutToStream(job)
+		if self.metrics != None:
+			self.metrics.jobSpawned(job.pid, jobType)
+
+#-
+	def communicateJob(self, job: subprocess.Popen, jobType: str) -> tuple[bytes, str | None]:
+		""" Wait on a job run synchronously (instead of being activated), it is killed once past its type's timeout (see JOB_LIMITS).\n
+		Returns (its output, None on success or the cause of the failure)
+		"""
+
+		self.jobInfos.pop(job.pid, None)
+		timeout = self.jobLimits[jobType]['timeout']
+		try:
+			output = job.communicate(timeout=timeout)[0]
+		except subprocess.TimeoutExpired:
+			self.killJobTree(job)
+			return (job.communicate()[0], f'timed out after {timeout:.0f}s')
+		return (output, None if job.returncode == 0 else f'exit code {job.returncode}')
+
+#-
 	def pollJobs(self, noStdOut: bool = False) -> (int, int):
 		""" Process both active and pending jobs\n
 		Returns: (activeJobCount, pendingJobCount)
@@ -490,6 +1460,23 @@ class DataManager():
 		self.pollPendingJobs()
 		return (self.getActiveJobCount(), self.getPendingJobCount())
 
+#-
+	@profiledPhase('jobPolling')
+	def waitOnJobs(self, pollInterval: float = 0.5, onPoll: Callable[[int, int], None] | None = None) -> None:
+		""" Poll jobs until none are active or pending, profiled / timed as one jobPolling phase.\n
+		onPoll: called with (activeJobCount, pendingJobCount) after every poll\n
+		Raises BuildCancelledError if a cancel is requested while jobs are left.
+		"""
+
+		while True:
+			activeCount, pendingCount = self.pollJobs()
+			if onPoll != None:
+				onPoll(activeCount, pendingCount)
+			if activeCount + pendingCount == 0:
+				return
+			self.checkCancelled()
+			time.sleep(pollInterval)
+
 #-
 	def pollActiveJobs(self, noStdOut: bool = False) -> int:
 		""" Process all active jobs that have finished since the last call.\n
@@ -502,6 +1489,8 @@ class DataManager():
 		def _isSuccessExitCode(exitcode: int, jobType: str) -> bool:
 			if jobType == 'robocopy':
 				return bool(exitcode <= 7)
+			if jobType == 'copy':
+				return bool(exitcode == 0)
 			if jobType == 'unrealpak':
 				return bool(exitcode == 0)
 			if jobType == 'archive':
@@ -509,26 +1498,45 @@ class DataManager():
 
 		# main function
 		for i, job in enumerate(self.activeJobs):
-			# dump PIPE buffer to stringio
-			self.writeJobOutToStream(job[0])
 			# get/process exited processes
 			exitCode = job[0].poll()
 			if exitCode is None:
+				self.checkJobLimits(job[0], job[1])
 				continue
 			else:
 				# remove from active jobs
 				self.activeJobs[i] = None
-				if not _isSuccessExitCode(exitCode, job[1]):
-					self.failedJobs.append(job)
+				jobInfo = self.jobInfos.pop(job[0].pid, None) or {}
+				journalOutput = self.jobOutputs.pop(job[0].pid, None)
+				# output written before exiting, still in the pipe
+				if jobInfo.get('reader') != None:
+					jobInfo['reader'].join(timeout=5.0)
+
+				cause = jobInfo.get('cause')
+				success = cause == None and _isSuccessExitCode(exitCode, job[1])
+				if not success and cause == None:
+					cause = f'exit code {exitCode}'
+				if success and journalOutput != None and self.journal != None:
+					self.journal.recordOutput(*journalOutput)
+
+				if self.metrics != None:
+					self.metrics.jobExited(job[0].pid, job[1], exitCode, success, cause)
+					if success and job[1] == 'archive' and journalOutput != None:
+						self.metrics.addBytes('compressed', os.path.getsize(journalOutput[0][0]))
 
 				if noStdOut:
-					self.jobStdout[job[0].pid].close()
-					self.jobStdout[job[0].pid] = None
+					with self.jobStdoutLock:
+						self.jobStdout[job[0].pid].close()
+						self.jobStdout[job[0].pid] = None
 				else:
-					print('===============================================================================')
-					print('outputing subprocess info:\n')
+					print('===============================================================================', file=self.logStream)
+					print('outputing subprocess info:\n', file=self.logStream)
 					self.writeStoredJobOutToConsole(job[0])
 
+				if not success and not self.retryJob(job[1], jobInfo, cause):
+					attemptCount = jobInfo.get('attempt', 0) + 1
+					self.failedJobs.append((job[0], job[1], cause if attemptCount == 1 else f'{cause} (after {attemptCount} attempts)'))
+
 		# removes finshed jobs from activeJobs
 		self.activeJobs = [job for job in self.activeJobs if job is not None]
 		return self.getActiveJobCount()
@@ -536,17 +1544,29 @@ class DataManager():
 #-
 	def pollPendingJobs(self) -> int:
 		""" Process pending jobs, adding them to the active job list if no longer waiting on any other job(s). """
+		# don't start anything new once cancelled
+		if self.cancelEvent.is_set():
+			return self.getPendingJobCount()
+
 		activeJobTypes: set[str] = set()
 		for activeJob in self.activeJobs:
 			activeJobTypes.add(activeJob[1])
 
+		# retries due (see retryJob), jobs waiting on their type keep waiting until they are done
+		now = time.monotonic()
+		for i, (startTime, job) in enumerate(self.retryJobs):
+			if startTime <= now:
+				self.activateJob(job[0](), job[1])
+				self.retryJobs[i] = None
+			activeJobTypes.add(job[1])
+		self.retryJobs = [job for job in self.retryJobs if job is not None]
+
 		for i, job in enumerate(self.pendingJobs):
 				if job[1].isdisjoint(activeJobTypes):
 					# start to run the subprocess
-					activatedJob = (job[0][0](), job[0][1])
 					# add to active jobs and add the job type to activeJobTypes
-					self.activeJobs.append(activatedJob)
-					activeJobTypes.add(activatedJob[1])
+					self.activateJob(job[0][0](), job[0][1])
+					activeJobTypes.add(job[0][1])
 					# prep for removal
 					self.pendingJobs[i] = None
 
@@ -554,6 +1574,87 @@ class DataManager():
 		self.pendingJobs = [job for job in self.pendingJobs if job is not None]
 		return self.getPendingJobCount()
 
+#-
+	def abortJobs(self, timeout: float = 10.0) -> bool:
+		""" Kill all active jobs (including their child processes) and drop pending ones.\n
+		Returns whether all jobs exited within the timeout.
+		"""
+
+		self.pendingJobs.clear()
+		self.retryJobs.clear()
+		# copy, the list may be modified by the thread polling jobs
+		activeJobs = list(self.activeJobs)
+		for job, _ in activeJobs:
+			self.killJobTree(job)
+
+		deadline = time.monotonic() + timeout
+		allExited = True
+		for job, _ in activeJobs:
+			try:
+				job.wait(max(deadline - time.monotonic(), 0))
+			except subprocess.TimeoutExpired:
+				allExited = False
+
+		self.activeJobs.clear()
+		return allExited
+
+#-
+	def checkJobLimits(self, job: subprocess.Popen, jobType: str) -> None:
+		""" Kill a running job past its type's timeout / without output for longer than its stall timeout (see JOB_LIMITS), the cause is reported once it exited. """
+
+		jobInfo = self.jobInfos.get(job.pid)
+		if jobInfo == None or jobInfo['cause'] != None:
+			return
+
+		limits = self.jobLimits.get(jobType, {})
+		now = time.monotonic()
+		if limits.get('timeout') != None and now - jobInfo['startTime'] > limits['timeout']:
+			jobInfo['cause'] = f'timed out after {limits["timeout"]:.0f}s'
+		elif limits.get('stallTimeout') != None and now - jobInfo['lastOutputTime'] > limits['stallTimeout']:
+			jobInfo['cause'] = f'stalled, no output for {limits["stallTimeout"]:.0f}s'
+		else:
+			return
+
+		print(f'{jobType} job {job.pid} {jobInfo["cause"]}, killing it', file=self.logStream)
+		self.killJobTree(job)
+
+#-
+	def retryJob(self, jobType: str, jobInfo: Mapping[str, Any], cause: str) -> bool:
+		""" Schedule another attempt of a failed job if the failure is transient (timeout, stall, failed copies) and it has attempts left (see JOB_LIMITS).\n
+		Returns whether it will be retried.
+		"""
+
+		# robocopy: 8+ means some files could not be copied (ie: locked), copy jobs only fail on I/O errors
+		transient = jobInfo.get('cause') != None or jobType in ('robocopy', 'copy')
+		limits = self.jobLimits.get(jobType, {})
+		attempt = jobInfo.get('attempt', 0)
+		if not transient or 'shellCmd' not in jobInfo or attempt >= limits.get('retryCount', 0) or self.cancelEvent.is_set():
+			return False
+
+		delay = limits['retryDelay'] * 2 ** attempt
+		print(f'{jobType} job failed ({cause}), retrying in {delay:.0f}s (attempt {attempt + 2} of {limits["retryCount"] + 1})', file=self.logStream)
+		retry = lambda: self.startJob(jobInfo['shellCmd'], jobInfo['cwd'], jobInfo['journalOutput'], attempt + 1)
+		self.retryJobs.append((time.monotonic() + delay, (retry, jobType)))
+		if self.metrics != None:
+			self.metrics.increment('job_retries_total', type=jobType)
+		return True
+
+#-
+	@classmethod
+	def killJobTree(cls, job: subprocess.Popen) -> None:
+		""" Forcefully kill a job started with startJob and all of its child processes. """
+
+		if job.poll() is not None:
+			return
+
+		if platform.system() == 'Windows':
+			subprocess.run(shlex.split(f'taskkill /F /T /PID {job.pid}'), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+		else:
+			try:
+				os.killpg(job.pid, signal.SIGKILL)
+			except ProcessLookupError:
+				pass
+
 #-
 	def getActiveJobCount(self) -> int:
 		""" Return the number of active jobs. """
@@ -561,8 +1662,8 @@ class DataManager():
 
 #-
 	def getPendingJobCount(self) -> int:
-		""" Return the number of pending jobs. """
-		return len(self.pendingJobs)
+		""" Return the number of pending jobs, retries waiting on their delay included. """
+		return len(self.pendingJobs) + len(self.retryJobs)
 
 #-
 	def getFailedJobTypes(self) -> list[str] | None:
@@ -572,24 +1673,48 @@ class DataManager():
 		if not len(self.failedJobs):
 			return None
 		# unique list of jobTypes
-		return list({jobType for job, jobType in self.failedJobs})
+		return list({jobType for job, jobType, cause in self.failedJobs})
+
+#-
+	def getFailedJobCauses(self) -> list[str] | None:
+		""" Return a line per failed job: its type and the cause of the failure (ie: 'unrealpak: timed out after 7200s'). """
+
+		if not len(self.failedJobs):
+			return None
+		return [f'{jobType}: {cause}' for job, jobType, cause in self.failedJobs]
 
 #-
 	def writeJobOutToStream(self, job: subprocess.Popen) -> StringIO:
-		""" Write a subprocess' STDOUT into temporary text buffer.\n
-		Create buffer if not already present.
+		""" Write a subprocess' STDOUT into temporary text buffer, from a reader thread (the time of its last output is what stall detection goes by).\n
+		Create buffer if not already present. Jobs not started with startJob are read to the end instead.
 		"""
 
-		storedOutput = self.jobStdout.get(job.pid, None)
-		# create if first write
-		if storedOutput == None:
-			storedOutput = self.jobStdout[job.pid] = StringIO()
+		with self.jobStdoutLock:
+			storedOutput = self.jobStdout.get(job.pid, None)
+			# create if first write
+			if storedOutput == None:
+				storedOutput = self.jobStdout[job.pid] = StringIO()
 
-		for line in job.stdout:
-			storedOutput.write(line.decode('utf-8'))
+		jobInfo = self.jobInfos.get(job.pid)
+		if jobInfo == None:
+			for line in job.stdout:
+				storedOutput.write(line.decode('utf-8', errors='replace'))
+		elif jobInfo['reader'] == None:
+			jobInfo['reader'] = threading.Thread(target=self._readJobOutput, args=(job, storedOutput, jobInfo), name=f'unrealPackGen_job_{job.pid}', daemon=True)
+			jobInfo['reader'].start()
 
 		return storedOutput
 
+#-
+	def _readJobOutput(self, job: subprocess.Popen, storedOutput: StringIO, jobInfo: dict[str, Any]) -> None:
+		# whatever is available, progress output (ie: robocopy's %) doesn't always end lines
+		decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+		while chunk := job.stdout.read1(COPY_BUFFER_SIZE):
+			with self.jobStdoutLock:
+				if not storedOutput.closed:
+					storedOutput.write(decoder.decode(chunk))
+				jobInfo['lastOutputTime'] = time.monotonic()
+
 #-
 	def writeStoredJobOutToConsole(self, job: subprocess.Popen, closeOnComplete: bool = True) -> None:
 		""" Output the stored subprocess' STDOUT into the console.\n
@@ -601,24 +1726,294 @@ class DataManager():
 		if storedoutput == None:
 			storedoutput = self.writeJobOutToStream(job)
 		# write to console
-		sysStdout.write(storedoutput.getvalue())
+		with self.jobStdoutLock:
+			self.logStream.write(storedoutput.getvalue())
+
+			# close and remove ref for GC
+			if closeOnComplete:
+				storedoutput.close()
+				self.jobStdout[job.pid] = None
+
+#---
+# progress / cancellation
+
+	def requestCancel(self) -> None:
+		""" Ask the current build to stop at its next checkpoint, safe to call from any thread.\n
+		Running jobs are killed right away so that a thread blocked polling them is released.
+		"""
+
+		self.cancelEvent.set()
+		for job, _ in list(self.activeJobs):
+			self.killJobTree(job)
+
+#-
+	def cancel(self, timeout: float = 10.0) -> bool:
+		""" Cancel the current build: kill all jobs, drop pending ones and undo everything written outside of the tmp dir.\n
+		Should be called from the thread running the build once it stopped (see BuildCancelledError), or when no build is running.\n
+		Returns whether all jobs exited within the timeout.
+		"""
 
-		# close and remove ref for GC
-		if closeOnComplete:
-			storedoutput.close()
-			self.jobStdout[job.pid] = None
+		self.requestCancel()
+		allExited = self.abortJobs(timeout)
+		self.rollbackOutputs()
+		return allExited
+
+#-
+	def isCancelled(self) -> bool:
+		return self.cancelEvent.is_set()
+
+#-
+	def checkCancelled(self) -> None:
+		""" Cancel checkpoint, raises BuildCancelledError if a cancel was requested. """
+		if self.cancelEvent.is_set():
+			raise BuildCancelledError('build cancelled')
+
+#-
+	def reportProgress(self, phase: str, fraction: float | None = None) -> None:
+		""" Notify all functions present in the onProgressFuncs list. """
+		for func in self.onProgressFuncs:
+			func(phase, fraction)
+
+#---
+# output rollback
+
+	def claimOutputPath(self, path: PathLike[str] | str) -> None:
+		""" Register a path outside of the tmp dir that is about to be written to, so that it can be rolled back.\n
+		Existing content is renamed aside (instant), to be restored on rollback or deleted once committed.
+		"""
+
+		path = os.path.abspath(path)
+		if path in self.claimedOutputPaths:
+			return
+
+		backupPath = None
+		if os.path.lexists(path):
+			backupPath = path + BACKUP_SUFFIX
+			if os.path.lexists(backupPath):
+				if self.journal != None and self.journal.resumed:
+					# the build being resumed already moved the previous content aside, what's there is its unfinished output
+					self.discardPath(path)
+					self.claimedOutputPaths[path] = backupPath
+					return
+				# left over from a run that crashed
+				self.discardPath(backupPath)
+			os.rename(path, backupPath)
+
+		self.claimedOutputPaths[path] = backupPath
+
+#-
+	def adoptOutputPath(self, path: PathLike[str] | str) -> None:
+		""" Register an output finished by the build being resumed as claimed by this one, along with the previous content it moved aside (if any). """
+
+		path = os.path.abspath(path)
+		if path in self.claimedOutputPaths:
+			return
+
+		backupPath = path + BACKUP_SUFFIX
+		self.claimedOutputPaths[path] = backupPath if os.path.lexists(backupPath) else None
+
+#-
+	def restoreOutputPath(self, path: PathLike[str] | str) -> None:
+		""" Discard what was written to a claimed path and put back its previous content. """
+
+		path = os.path.abspath(path)
+		if path not in self.claimedOutputPaths:
+			return
+
+		backupPath = self.claimedOutputPaths.pop(path)
+		self.discardPath(path)
+		if backupPath != None:
+			os.rename(backupPath, path)
+
+#-
+	def commitOutputPath(self, path: PathLike[str] | str) -> None:
+		""" Keep what was written to a claimed path, discarding its previous content. """
+
+		path = os.path.abspath(path)
+		if path not in self.claimedOutputPaths:
+			return
+
+		backupPath = self.claimedOutputPaths.pop(path)
+		if backupPath != None:
+			self.discardPath(backupPath)
+
+#-
+	def rollbackOutputs(self) -> None:
+		""" Restore all claimed paths (LIFO). """
+
+		for path in reversed(list(self.claimedOutputPaths)):
+			try:
+				self.restoreOutputPath(path)
+			except OSError as error:
+				# keep going, the backup (if any) is left in place for manual recovery
+				print(f'unable to roll back {path}: {error}', file=self.logStream)
+
+#-
+	def commitOutputs(self) -> None:
+		""" Commit all claimed paths. """
+
+		for path in list(self.claimedOutputPaths):
+			self.commitOutputPath(path)
+
+#-
+	@classmethod
+	def discardPath(cls, path: PathLike[str] | str) -> None:
+		""" Remove a file, or a dir using the trash + background deletion. """
+
+		# links (ie: link installs) are removed without touching what they point to
+		if os.path.isdir(path) and not cls.isLink(path):
+			cls.deleteDirInBackground(cls.moveToTrash(path))
+		elif os.path.lexists(path):
+			os.unlink(path)
+
+#---
+# tmp dir management
+
+	def openJournal(self, stagingDirPath: str) -> None:
+		""" Open the journal of a journaled build (see enableJournal), the staging dir is emptied unless the previous build is resumed. """
+
+		self.journal = BuildJournal(stagingDirPath + JOURNAL_EXT)
+		if self.journal.open(self.getBuildKey(), self.journalMode == 'resume'):
+			print(f'resume: {len(self.journal.stagedFiles)} staged files and {len(self.journal.outputs)} outputs recorded by the previous build', file=self.logStream)
+		elif os.path.exists(stagingDirPath):
+			self.discardPath(stagingDirPath)
+		os.makedirs(stagingDirPath, exist_ok=True)
+
+#-
+	def closeJournal(self) -> None:
+		""" Close the journal, the staging dir and journal are only deleted once the build completed. """
+
+		completed = not self.isCancelled() and self.getFailedJobTypes() == None and self.getActiveJobCount() + self.getPendingJobCount() == 0 and self.journal.isPhaseDone('packing')
+		if completed:
+			self.journal.discard()
+			self.discardTmpDir()
+		else:
+			self.journal.close()
+			print(f'build incomplete, staging kept in {self.tmpDir} (resume with -resume)', file=self.logStream)
+			self.tmpDir = None
+			self.tmpDirLock.release(removeFile=True)
+			self.tmpDirLock = None
+		self.journal = None
+
+#-
+	def discardTmpDir(self) -> None:
+		""" Move the tmp dir to a trash location and delete it in the background.\n
+		The rename is near instant, the deletion itself can take minutes on large packs.
+		"""
+
+		if self.tmpDir == None:
+			return
+
+		trashPath = self.moveToTrash(self.tmpDir)
+		self.deleteDirInBackground(trashPath)
+		self.tmpDir = None
+
+		if self.tmpDirLock != None:
+			self.tmpDirLock.release(removeFile=True)
+			self.tmpDirLock = None
+
+#-
+	def reclaimStaleDirs(self) -> None:
+		""" Delete tmp and trash dirs left in UEDir by previous runs that did not exit cleanly.\n
+		tmp dirs still locked by a running instance are left untouched.
+		"""
+
+		# trash can also be created in the engine dirs outputs are written to (see discardPath)
+		for dirPath in (os.path.join(self.UEDir, 'Samples'), os.path.join(self.UEDir, 'FeaturePacks')):
+			if os.path.isdir(dirPath):
+				for entry in os.scandir(dirPath):
+					if entry.name.startswith(TRASH_DIR_PREFIX) and entry.is_dir():
+						self.deleteDirInBackground(entry.path)
+
+		for entry in os.scandir(self.UEDir):
+			if entry.name.startswith(TRASH_DIR_PREFIX) and entry.is_dir():
+				# trash is never in use, whoever moved it there gave up ownership
+				self.deleteDirInBackground(entry.path)
+
+			elif entry.name.startswith(TMP_DIR_PREFIX):
+				dirPath = entry.path.removesuffix(LOCK_FILE_EXT)
+				# each dir is visited once, via its lock file if it has one
+				if not entry.name.endswith(LOCK_FILE_EXT) and os.path.exists(dirPath + LOCK_FILE_EXT):
+					continue
+
+				lock = FileLock(dirPath + LOCK_FILE_EXT)
+				if not lock.acquire(blocking=False):
+					# owner is still running
+					continue
+				if os.path.isdir(dirPath):
+					self.deleteDirInBackground(self.moveToTrash(dirPath))
+				lock.release(removeFile=True)
+
+#-
+	@classmethod
+	def moveToTrash(cls, dirPath: PathLike[str] | str) -> str:
+		""" Rename a dir to a unique trash name in the same parent dir (same volume, so no data is moved).\n
+		Returns the new path, or the original one if it could not be renamed.
+		"""
+
+		trashPath = os.path.join(os.path.dirname(os.path.abspath(dirPath)), TRASH_DIR_PREFIX + uuid.uuid4().hex[:8])
+		try:
+			os.rename(dirPath, trashPath)
+		except OSError:
+			# some file is held open (explorer, antivirus...), delete in place instead
+			return str(dirPath)
+		return trashPath
+
+#-
+	@classmethod
+	def deleteDirInBackground(cls, dirPath: PathLike[str] | str) -> None:
+		""" Delete a dir without blocking the caller.\n
+		On windows a detached process is used so that deletion continues after the app exits.
+		"""
+
+		if platform.system() == 'Windows':
+			shellCmd = f'cmd /c rmdir /s /q "{os.path.normpath(dirPath)}"'
+			subprocess.Popen(shlex.split(shellCmd), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, creationflags=subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP)
+		else:
+			threading.Thread(target=rmtree, args=(dirPath, True), daemon=True).start()
 
 #---
 # other
 
 	def cleanup(self) -> None:
-		""" Execute all functions present in the onCleanupFuncs list (LIFO). """
+		""" Execute all functions present in the onCleanupFuncs list (LIFO), then commit claimed outputs. """
 
 		while len(self.onCleanupFuncs):
 			func = self.onCleanupFuncs.pop()
-			func()
+			try:
+				func()
+			except OSError as error:
+				# best effort, remaining funcs still need to run
+				print(f'cleanup error: {error}', file=self.logStream)
 		self.onCleanupFuncs.clear()
 
+		# keep what was hashed for the next build
+		if self.assetStore != None:
+			self.assetStore.saveIndex()
+
+		if self.profiler != None:
+			try:
+				self.profiler.writeReports(self.getProfileDir())
+				print(f'profile written to {self.getProfileDir()}', file=self.logStream)
+			except OSError as error:
+				print(f'unable to write profile: {error}', file=self.logStream)
+
+		# anything not rolled back by now was a successful write
+		self.commitOutputs()
+		self.releaseEngineLocks()
+
+		if self.metrics != None:
+			if self.buildResult == None:
+				self.buildResult = 'cancelled' if self.cancelEvent.is_set() else 'failed' if self.failedJobs else 'success'
+			try:
+				self.metrics.close(self.buildResult)
+			except OSError as error:
+				print(f'unable to write metrics: {error}', file=self.logStream)
+			self.metrics = None
+
+		if self.journal != None:
+			self.closeJournal()
+
 #-
 	def openOutputDir(self) -> None:
 		""" Open output dir in file explorer. """
@@ -626,8 +2021,10 @@ class DataManager():
 		subprocess.Popen(shlex.split(f'explorer "{os.path.normpath(self.packInfo["packOutputPath"])}"'))
 
 #-
-	def getFilenameFromPattern(self, fileKey: str, pattern: str | None, originalFilePath: PathLike[str] | None) -> str | None:
-		""" Return a name given a specific pattern. """
+	def getFilenameFromPattern(self, fileKey: str, pattern: str | None, originalFilePath: PathLike[str] | None, index: int = 0) -> str | None:
+		""" Return a name given a specific pattern.\n
+		index: for files of which there are several (ie: screenshots), {INDEX} is empty for the first one then _2, _3, ...
+		"""
 
 		# sub function
 		@staticmethod
@@ -656,6 +2053,7 @@ class DataManager():
 			PACKNAME = self.packInfo['packCleanName'] or '',
 			BASENAME = basename or '',
 			EXT      = ext or '',
+			INDEX    = f'_{index + 1}' if index else '',
 		)
 
 #-
@@ -666,7 +2064,14 @@ class DataManager():
 
 		if platform.system() != 'Windows':
 			return False
-		
+		# windows only module, imported here so that the rest of DataManager works anywhere (ie: tests)
+		import winreg
+
+		# registry lookup is only done once per process
+		if DataManager._enginePathsCache != None:
+			self.UEDir, self.packerPath = DataManager._enginePathsCache
+			return True
+
 		PackerRelPath = r'.\Engine\Binaries\Win64\UnrealPak.exe'
 		UESubkeyPath = r'SOFTWARE\EpicGames\Unreal Engine\\'
 
@@ -690,38 +2095,111 @@ class DataManager():
 								# return: abs engine path, abs packer path
 								self.UEDir = os.path.abspath(valueData)
 								self.packerPath = os.path.abspath(os.path.join(valueData, PackerRelPath))
+								DataManager._enginePathsCache = (self.UEDir, self.packerPath)
 								return True
 		return False
 
 #-
 	@classmethod
 	def cropAndResizeImage(cls, image: Image.Image, targetSize: tuple[int, int]) -> Image.Image:
-		if (targetSize[0] / targetSize[1]) <= (image.width / image.height):
-			cropHeight = image.height
-			cropWidth  = image.height * (targetSize[0] / targetSize[1])
-		else:
-			cropHeight = image.width * (targetSize[1] / targetSize[0])
-			cropWidth  = image.width
+		return ImageProcessor.cropAndResizeImage(image, targetSize)
+
+#-
+	@classmethod
+	def isLink(cls, path: PathLike[str] | str) -> bool:
+		""" Return whether path is a symlink or a directory junction. """
 
-		cropBbox = (
-			(image.width *0.5) - (cropWidth *0.5),
-			(image.height*0.5) - (cropHeight*0.5),
-			(image.width *0.5) - (cropWidth *0.5) + cropWidth,
-			(image.height*0.5) - (cropHeight*0.5) + cropHeight,
-			)
+		try:
+			pathStat = os.lstat(path)
+		except OSError:
+			return False
+		if stat.S_ISLNK(pathStat.st_mode):
+			return True
+		# junctions only exist on windows
+		return os.name == 'nt' and pathStat.st_reparse_tag == stat.IO_REPARSE_TAG_MOUNT_POINT
+
+#-
+	@classmethod
+	def createDirLink(cls, targetPath: PathLike[str] | str, linkPath: PathLike[str] | str) -> None:
+		""" Create a dir symlink, on windows a directory junction is made instead if symlinks aren't allowed (no developer mode / admin rights). """
 
-		return image.resize(targetSize, Image.BICUBIC, cropBbox)
+		try:
+			os.symlink(targetPath, linkPath, target_is_directory=True)
+		except OSError:
+			if platform.system() != 'Windows':
+				raise
+			result = subprocess.run(['cmd', '/c', 'mklink', '/J', os.path.normpath(linkPath), os.path.normpath(targetPath)], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+			if result.returncode != 0:
+				raise OSError(f'unable to link {linkPath} to {targetPath}: {result.stderr.strip()}')
 
 #-
 	@classmethod
 	def fetchJsonData(cls, filePath: PathLike[str] | str) -> dict | None:
+		""" Return the parsed content of a json file, cached until the file is modified. """
 		try:
-			with open(filePath) as file:
-				data = json.load(file)
-			return data
+			cacheKey = os.path.abspath(filePath)
+			mtime = os.stat(cacheKey).st_mtime_ns
+			with cls._cacheLock:
+				cachedData = cls._jsonCache.get(cacheKey)
+
+			if cachedData == None or cachedData[0] != mtime:
+				with open(filePath) as file:
+					data = json.load(file)
+				with cls._cacheLock:
+					cls._jsonCache[cacheKey] = (mtime, data)
+			else:
+				data = cachedData[1]
+
+			# callers are free to modify what they get
+			return deepcopy(data)
 		except:
 			return None
 
+#-
+	@classmethod
+	def scanDir(cls, dirPath: PathLike[str] | str) -> tuple[list[str], list[str]]:
+		""" Return (subdir names, filenames) of a dir, cached until the dir's mtime changes (ie: an entry is added/removed/renamed). """
+
+		dirPath = os.path.abspath(dirPath)
+		mtime = os.stat(dirPath).st_mtime_ns
+		with cls._cacheLock:
+			cachedEntries = cls._scanCache.get(dirPath)
+			if cachedEntries != None:
+				cls._scanCache.move_to_end(dirPath)
+		if cachedEntries != None and cachedEntries[0] == mtime:
+			return (cachedEntries[1], cachedEntries[2])
+
+		dirNames  = []
+		filenames = []
+		with os.scandir(dirPath) as entries:
+			for entry in entries:
+				if entry.is_dir(follow_symlinks=False):
+					dirNames.append(entry.name)
+				else:
+					filenames.append(entry.name)
+
+		with cls._cacheLock:
+			cls._scanCache[dirPath] = (mtime, dirNames, filenames)
+			cls._scanCache.move_to_end(dirPath)
+			while len(cls._scanCache) > SCAN_CACHE_SIZE:
+				cls._scanCache.popitem(last=False)
+		return (dirNames, filenames)
+
+#-
+	@classmethod
+	def walkDir(cls, top: PathLike[str] | str) -> Iterator[tuple[str, list[str]]]:
+		""" Like os.walk, using the scanDir cache. Yields tuple(dir path, filenames). """
+
+		pendingDirs = [os.path.abspath(top)]
+		while pendingDirs:
+			dirPath = pendingDirs.pop()
+			try:
+				dirNames, filenames = cls.scanDir(dirPath)
+			except OSError:
+				continue
+			yield (dirPath, filenames)
+			pendingDirs.extend(os.path.join(dirPath, dirName) for dirName in reversed(dirNames))
+
 #---
 	def __del__(self) -> None:
 		""" Attempt to cleanup as much as possible in the event of non standard exit. """
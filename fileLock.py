@@ -0,0 +1,90 @@
+import time
+import os
+
+if os.name == 'nt':
+	import msvcrt
+else:
+	import fcntl
+
+# import type defs
+from os import PathLike
+
+#---------------------------------------------------------------------------------------------------
+class FileLock():
+	def __init__(self, path: PathLike[str] | str) -> None:
+		""" Advisory, inter-process lock backed by a file on disk.\n
+		The lock is released automatically by the OS if the holding process dies.
+		"""
+
+		self.path = os.path.abspath(path)
+		self.file = None
+
+#-
+	def acquire(self, blocking: bool = True, timeout: float | None = None) -> bool:
+		""" Attempt to acquire the lock.\n
+		Returns success.
+		"""
+
+		if self.file != None:
+			return True
+
+		startTime = time.monotonic()
+		file = open(self.path, 'a+')
+		while True:
+			try:
+				self._lockFile(file)
+				self.file = file
+				return True
+			except OSError:
+				if not blocking or (timeout != None and time.monotonic() - startTime >= timeout):
+					file.close()
+					return False
+				time.sleep(0.1)
+
+#-
+	def release(self, removeFile: bool = False) -> None:
+		""" Release the lock, optionally removing the lock file. """
+
+		if self.file == None:
+			return
+
+		self._unlockFile(self.file)
+		self.file.close()
+		self.file = None
+
+		if removeFile:
+			try:
+				os.unlink(self.path)
+			except OSError:
+				# another process may have opened / re-locked it since
+				pass
+
+#-
+	def isLocked(self) -> bool:
+		return self.file != None
+
+#-
+	@classmethod
+	def _lockFile(cls, file) -> None:
+		if os.name == 'nt':
+			file.seek(0)
+			msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+		else:
+			fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+#-
+	@classmethod
+	def _unlockFile(cls, file) -> None:
+		if os.name == 'nt':
+			file.seek(0)
+			msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+		else:
+			fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+#---
+	def __enter__(self) -> 'FileLock':
+		self.acquire()
+		return self
+
+	def __exit__(self, *args) -> None:
+		self.release()
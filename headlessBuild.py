@@ -0,0 +1,145 @@
+from dataManager import DataManager
+from buildWorker import BuildWorker
+from assetStore import AssetStore
+from pakBenchmark import PakBenchmark
+import os
+
+# import type defs
+from collections.abc import Sequence
+from os import PathLike
+
+# since app is intended to be run in a different working dir, CURRENT_FILE_DIR is needed for accessing certain data
+CURRENT_FILE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+#---------------------------------------------------------------------------------------------------
+class HeadlessBuild():
+	def __init__(self, basePath: PathLike[str] | None, unrealPakPath: PathLike[str] | None, specPath: PathLike[str], profile: bool = False, journal: bool = False, resume: bool = False, metricsPath: PathLike[str] | None = None, metricsTextfilePath: PathLike[str] | None = None, catalogPath: PathLike[str] | None = None) -> None:
+		""" Build a pack described by a pack spec file (see settings/packSpecExample.json), without UI.\n
+		profile: write per phase profiling reports to the output dir (see DataManager.enableProfiling)\n
+		journal / resume: journaled build, resume picks up where the last one of the same pack stopped (see DataManager.enableJournal)\n
+		metricsPath / metricsTextfilePath: append build events to a JSONL file / update a Prometheus textfile (see DataManager.enableMetrics)\n
+		catalogPath: catalog successful builds are recorded in, None for the default one (see DataManager.enableCatalog)
+		"""
+
+		self.dataManager = self.createDataManager(basePath, unrealPakPath)
+		if catalogPath != None:
+			self.dataManager.enableCatalog(catalogPath)
+		# before the spec is applied, asset types are inferred from it
+		self.dataManager.enableProfiling(profile)
+		if journal or resume:
+			self.dataManager.enableJournal(resume)
+		if metricsPath != None or metricsTextfilePath != None:
+			self.dataManager.enableMetrics(metricsPath, metricsTextfilePath)
+
+		spec = DataManager.fetchJsonData(specPath)
+		if spec == None:
+			raise ValueError(f'unable to read pack spec: {specPath}')
+		self.exportOptions = self.dataManager.applyPackSpec(spec)
+
+#-
+	def run(self) -> bool:
+		""" Run the build, printing progress to the console.\n
+		Returns success.
+		"""
+
+		worker = BuildWorker(self.dataManager, *self.exportOptions)
+		worker.start()
+
+		success = False
+		lastPhase = None
+		try:
+			while worker.is_alive() or not worker.events.empty():
+				worker.join(0.5)
+				for eventType, data in worker.getEvents():
+					match eventType:
+						case 'phase':
+							# skip per file progress updates
+							if data[0] != lastPhase:
+								lastPhase = data[0]
+								print(f'{lastPhase}...')
+						case 'done':
+							failedJobTypes = self.dataManager.getFailedJobTypes()
+							success = failedJobTypes == None
+							print('done.' if success else f'done, with errors in: {", ".join(failedJobTypes)}')
+							for cause in self.dataManager.getFailedJobCauses() or ():
+								print(f'  {cause}')
+						case 'cancelled':
+							print('cancelled.')
+						case 'error':
+							print(f'build failed: {data}')
+		except KeyboardInterrupt:
+			worker.cancel()
+			worker.join()
+		finally:
+			self.dataManager.cleanup()
+
+		return success
+
+#-
+	def analyze(self, estimateCompression: bool = False) -> None:
+		""" Print the pack's size breakdown and write the size reports (see DataManager.analyzePackContent), without building. """
+
+		try:
+			analysis = self.dataManager.analyzePackContent(estimateCompression=estimateCompression)
+			print(analysis.getSummary())
+			for reportPath in self.dataManager.writeSizeReports(analysis):
+				print(f'written: {reportPath}')
+		finally:
+			self.dataManager.cleanup()
+
+#-
+	def benchmarkPak(self, settings: Sequence[str], repeatCount: int = 3) -> bool:
+		""" Compare UnrealPak compression settings (method[:level[:block size in KiB]]) on the pack, without building (see DataManager.benchmarkPakCompression).
+
+		Returns success.
+		"""
+
+		try:
+			benchmark = self.dataManager.benchmarkPakCompression([PakBenchmark.parseSetting(setting) for setting in settings], repeatCount)
+			print(benchmark.getReport())
+			return all(result['error'] == None for result in benchmark.results)
+		finally:
+			self.dataManager.cleanup()
+
+#-
+	@classmethod
+	def runBatch(cls, basePath: PathLike[str] | None, unrealPakPath: PathLike[str] | None, specPaths: Sequence[PathLike[str]], storeDir: PathLike[str] | None = None, profile: bool = False, metricsPath: PathLike[str] | None = None, metricsTextfilePath: PathLike[str] | None = None, catalogPath: PathLike[str] | None = None) -> bool:
+		""" Build several packs one after the other, staging their assets through a shared AssetStore so assets common to several packs are only stored once.\n
+		storeDir defaults to a store in UEDir (same volume as the staging dirs, needed for hard links).\n
+		Returns whether all builds succeeded.
+		"""
+
+		assetStore = None
+		success = True
+		for specPath in specPaths:
+			print(f'=== {specPath}')
+			try:
+				build = cls(basePath, unrealPakPath, specPath, profile, metricsPath=metricsPath, metricsTextfilePath=metricsTextfilePath, catalogPath=catalogPath)
+			except (ValueError, OSError) as error:
+				print(f'build failed: {error}')
+				success = False
+				continue
+
+			if assetStore == None:
+				assetStore = AssetStore(storeDir or os.path.join(build.dataManager.UEDir, 'unrealPackGen_store'))
+			build.dataManager.assetStore = assetStore
+			success = build.run() and success
+
+		if assetStore != None:
+			assetStore.saveIndex()
+			print(assetStore.getReport())
+		return success
+
+#-
+	@classmethod
+	def createDataManager(cls, basePath: PathLike[str] | None, unrealPakPath: PathLike[str] | None) -> DataManager:
+		""" Return a DataManager using the same settings files as the UI. """
+
+		return DataManager(
+			 basePath or os.getcwd()
+			,os.path.join(CURRENT_FILE_DIR, './settings/packLayout.json')
+			,os.path.join(CURRENT_FILE_DIR, './settings/assetTypeTable.json')
+			,os.path.join(CURRENT_FILE_DIR, './settings/packAdditions/')
+			,unrealPakPath
+			,os.path.join(CURRENT_FILE_DIR, './settings/assetTypeRules.json')
+			)
@@ -0,0 +1,112 @@
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from PIL import Image
+import sys
+import os
+
+# import type defs
+from collections.abc import Sequence
+from os import PathLike
+
+# commandline syntax (run as a DataManager job):
+# ./imageProcessor.py -image <sourcePath> <destPath> <width>x<height> [-image ...] [-workers <int>] [-pixelBudget <int>]
+# every image is cropped to the target aspect ratio, resized and encoded (format from the dest ext) by a process pool
+
+# max decoded source pixels in flight across all workers (~512 MiB as RGBA), a larger image still gets processed on its own
+DEFAULT_PIXEL_BUDGET = 128 * 1024 * 1024
+
+#---------------------------------------------------------------------------------------------------
+class ImageProcessor():
+	def __init__(self, workerCount: int | None = None, pixelBudget: int = DEFAULT_PIXEL_BUDGET) -> None:
+		""" Crops / resizes / encodes images in parallel worker processes.\n
+		Images are only submitted while the decoded pixels in flight stay under pixelBudget, memory use doesn't grow with the number or size of images.
+		"""
+
+		self.workerCount = workerCount or os.cpu_count() or 1
+		self.pixelBudget = pixelBudget
+
+#-
+	def run(self, images: Sequence[tuple[str, tuple[int, int], str]]) -> None:
+		""" Process all images: (source path, target size, dest path). Raises the first worker error. """
+
+		if len(images) <= 1 or self.workerCount == 1:
+			for sourcePath, targetSize, destPath in images:
+				self.processImage(sourcePath, targetSize, destPath)
+			return
+
+		inFlight = {} # dict(future: decoded pixels)
+		with ProcessPoolExecutor(min(self.workerCount, len(images))) as pool:
+			for sourcePath, targetSize, destPath in images:
+				pixelCount = self.getDecodedPixelCount(sourcePath, targetSize)
+				while inFlight and sum(inFlight.values()) + pixelCount > self.pixelBudget:
+					doneFutures, _ = wait(inFlight, return_when=FIRST_COMPLETED)
+					for future in doneFutures:
+						del inFlight[future]
+						future.result()
+				inFlight[pool.submit(self.processImage, sourcePath, targetSize, destPath)] = pixelCount
+
+			for future in inFlight:
+				future.result()
+
+#---
+# image ops
+
+	@classmethod
+	def processImage(cls, sourcePath: PathLike[str] | str, targetSize: tuple[int, int], destPath: PathLike[str] | str) -> None:
+		with cls.openImage(sourcePath, targetSize) as image:
+			cls.cropAndResizeImage(image, targetSize).save(destPath)
+
+#-
+	@classmethod
+	def openImage(cls, sourcePath: PathLike[str] | str, targetSize: tuple[int, int]) -> Image.Image:
+		""" Open an image, JPEGs are set to be decoded at the smallest scale still larger than targetSize (see Image.draft). """
+
+		image = Image.open(sourcePath)
+		image.draft('RGB', targetSize)
+		return image
+
+#-
+	@classmethod
+	def getDecodedPixelCount(cls, sourcePath: PathLike[str] | str, targetSize: tuple[int, int]) -> int:
+		""" Return the number of pixels the image will be decoded to, only its header is read. """
+
+		with cls.openImage(sourcePath, targetSize) as image:
+			return image.width * image.height
+
+#-
+	@classmethod
+	def cropAndResizeImage(cls, image: Image.Image, targetSize: tuple[int, int]) -> Image.Image:
+		if (targetSize[0] / targetSize[1]) <= (image.width / image.height):
+			cropHeight = image.height
+			cropWidth  = image.height * (targetSize[0] / targetSize[1])
+		else:
+			cropHeight = image.width * (targetSize[1] / targetSize[0])
+			cropWidth  = image.width
+
+		cropBbox = (
+			(image.width *0.5) - (cropWidth *0.5),
+			(image.height*0.5) - (cropHeight*0.5),
+			(image.width *0.5) - (cropWidth *0.5) + cropWidth,
+			(image.height*0.5) - (cropHeight*0.5) + cropHeight,
+			)
+
+		return image.resize(targetSize, Image.BICUBIC, cropBbox)
+
+#---------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+	arguments = sys.argv[1:]
+
+	images = []
+	for index, argument in enumerate(arguments):
+		if argument == '-image':
+			width, height = arguments[index + 3].split('x')
+			images.append((arguments[index + 1], (int(width), int(height)), arguments[index + 2]))
+
+	workerCount = None
+	if '-workers' in arguments:
+		workerCount = int(arguments[arguments.index('-workers') + 1])
+	pixelBudget = DEFAULT_PIXEL_BUDGET
+	if '-pixelBudget' in arguments:
+		pixelBudget = int(arguments[arguments.index('-pixelBudget') + 1])
+
+	ImageProcessor(workerCount, pixelBudget).run(images)
+	print(f'processed {len(images)} images')
@@ -0,0 +1,205 @@
+from archiveWriter import ARCHIVE_FORMATS
+from assetDependencies import COMPANION_EXTS
+from assetStore import AssetStore
+import heapq
+import zlib
+import lzma
+import json
+import csv
+import os
+
+# optional dependency, used to estimate zstd compressed sizes
+try:
+	import zstandard
+except ImportError:
+	zstandard = None
+
+# import type defs
+from typing import Any
+from os import PathLike
+
+# compression estimates only compress samples of each file: up to SAMPLE_COUNT blocks spread over the file
+SAMPLE_SIZE  = 256 * 1024
+SAMPLE_COUNT = 3
+
+#---------------------------------------------------------------------------------------------------
+class PackAnalysis():
+	def __init__(self, dataManager, largestCount: int = 20, estimateCompression: bool = False) -> None:
+		""" Breakdown of what makes a pack big: bytes per asset type (see assetTypeTable), per dir, and the largest files.\n
+		estimateCompression: also estimate the compressed size per type, using the pack's archive format / preset on samples of every file.
+		"""
+
+		self.dataManager = dataManager
+		self.assetsPath = os.path.abspath(dataManager.packInfo['packAssetsPath'])
+		self.largestCount = largestCount
+		self.estimateCompression = estimateCompression
+
+		self.totalSize = 0
+		self.fileCount = 0
+		self.typeSizes: dict[str, list[int]] = {} # dict(asset type: [total size, file count, sampled size, compressed sample size])
+		self.dirSizes: dict[str, list[int]] = {} # dict(rel dir path: [total size of everything under it, file count])
+		self.largestFiles: list[tuple[int, str, str]] = [] # heap of tuple(size, rel path, asset type)
+
+#-
+	def run(self) -> 'PackAnalysis':
+		""" Scan the assets dir, with the same (cached) scanner as DataManager.InferAssetTypes. """
+
+		compressor = self._getSampleCompressor() if self.estimateCompression else None
+		for dirPath, filenames in self.dataManager.walkDir(self.assetsPath):
+			relDirPath = os.path.relpath(dirPath, self.assetsPath)
+			for filename in filenames:
+				filePath = os.path.join(dirPath, filename)
+				try:
+					size = os.path.getsize(filePath)
+				except OSError:
+					continue
+				relPath = os.path.normpath(os.path.join(relDirPath, filename))
+				assetType = self.getFileType(relPath)
+
+				self.totalSize += size
+				self.fileCount += 1
+				typeTotals = self.typeSizes.setdefault(assetType, [0, 0, 0, 0])
+				typeTotals[0] += size
+				typeTotals[1] += 1
+				if compressor != None:
+					sampledSize, compressedSize = self._sampleFile(filePath, size, compressor)
+					typeTotals[2] += sampledSize
+					typeTotals[3] += compressedSize
+
+				# every dir up to the assets dir itself
+				dirPathSegments = [] if relDirPath == '.' else relDirPath.split(os.sep)
+				for depth in range(len(dirPathSegments) + 1):
+					dirTotals = self.dirSizes.setdefault('/'.join(dirPathSegments[:depth]) or '.', [0, 0])
+					dirTotals[0] += size
+					dirTotals[1] += 1
+
+				if len(self.largestFiles) < self.largestCount:
+					heapq.heappush(self.largestFiles, (size, relPath, assetType))
+				elif size > self.largestFiles[0][0]:
+					heapq.heapreplace(self.largestFiles, (size, relPath, assetType))
+		return self
+
+#-
+	def getFileType(self, relPath: str) -> str:
+		""" Asset type of any file of the pack (path rel to the assets dir), companion files (.uexp / .ubulk) count as their package's type. """
+
+		stem, ext = os.path.splitext(relPath)
+		if ext.lower() in COMPANION_EXTS:
+			ext = '.uasset'
+		if ext.lower() == '.uasset':
+			return self.dataManager.getAssetTypeForPath(stem + ext) or 'Unknown'
+		return f'other ({ext.lower() or "no ext"})'
+
+#---
+# compression estimates
+
+	def _getSampleCompressor(self):
+		""" Return a function compressing bytes like the pack's archive format / preset would. """
+
+		archiveFormat = self.dataManager.packInfo['packArchiveFormat']
+		level = ARCHIVE_FORMATS[archiveFormat]['presets'][self.dataManager.packInfo['packArchivePreset']]
+		if archiveFormat == 'zip (lzma)':
+			return lambda data: lzma.compress(data, format=lzma.FORMAT_RAW, filters=[{'id': lzma.FILTER_LZMA1, 'preset': level}])
+		if archiveFormat in ('tar.zst', 'zip (zstd)') and zstandard != None:
+			return zstandard.ZstdCompressor(level=level).compress
+		# deflate, also the fallback for zstd without the zstandard package
+		return lambda data: zlib.compress(data, min(level, 9))
+
+#-
+	def _sampleFile(self, filePath: str, size: int, compressor) -> tuple[int, int]:
+		""" Returns (sampled size, compressed sample size). """
+
+		if size <= SAMPLE_SIZE * SAMPLE_COUNT:
+			offsets = [0]
+			sampleSize = size
+		else:
+			offsets = [(size - SAMPLE_SIZE) * i // (SAMPLE_COUNT - 1) for i in range(SAMPLE_COUNT)]
+			sampleSize = SAMPLE_SIZE
+
+		sampledSize = compressedSize = 0
+		with open(filePath, 'rb') as file:
+			for offset in offsets:
+				file.seek(offset)
+				data = file.read(sampleSize)
+				sampledSize += len(data)
+				compressedSize += len(compressor(data))
+		return (sampledSize, compressedSize)
+
+#-
+	def getEstimatedCompressedSize(self, assetType: str) -> int | None:
+		""" Total size of the type scaled by the compression ratio of its samples, None without estimateCompression. """
+
+		if not self.estimateCompression:
+			return None
+		typeTotals = self.typeSizes[assetType]
+		if typeTotals[2] == 0:
+			return 0
+		return round(typeTotals[0] * typeTotals[3] / typeTotals[2])
+
+#---
+# reports
+
+	def toDict(self) -> dict[str, Any]:
+		return {
+			'assetsPath': self.assetsPath,
+			'totalSize':  self.totalSize,
+			'fileCount':  self.fileCount,
+			'estimatedCompressedSize': sum(self.getEstimatedCompressedSize(assetType) for assetType in self.typeSizes) if self.estimateCompression else None,
+			'types': [
+				{'type': assetType, 'size': totals[0], 'files': totals[1], 'estimatedCompressedSize': self.getEstimatedCompressedSize(assetType)}
+				for assetType, totals in sorted(self.typeSizes.items(), key=lambda item: item[1][0], reverse=True)
+			],
+			'dirs': [
+				{'dir': relDirPath, 'size': totals[0], 'files': totals[1]}
+				for relDirPath, totals in sorted(self.dirSizes.items(), key=lambda item: item[1][0], reverse=True)
+			],
+			'largestFiles': [
+				{'path': relPath.replace(os.sep, '/'), 'size': size, 'type': assetType}
+				for size, relPath, assetType in sorted(self.largestFiles, reverse=True)
+			],
+		}
+
+#-
+	def writeReports(self, outputDir: PathLike[str] | str, baseName: str) -> list[str]:
+		""" Write <baseName>_sizes.json and <baseName>_sizes.csv (one row per type / dir / largest file) to outputDir.\n
+		Returns the written file paths.
+		"""
+
+		report = self.toDict()
+		jsonPath = os.path.join(outputDir, f'{baseName}_sizes.json')
+		with open(jsonPath, 'w') as file:
+			json.dump(report, file, indent=2)
+
+		csvPath = os.path.join(outputDir, f'{baseName}_sizes.csv')
+		with open(csvPath, 'w', newline='') as file:
+			writer = csv.writer(file)
+			writer.writerow(['kind', 'name', 'size', 'files', 'estimatedCompressedSize'])
+			for entry in report['types']:
+				writer.writerow(['type', entry['type'], entry['size'], entry['files'], entry['estimatedCompressedSize'] if entry['estimatedCompressedSize'] != None else ''])
+			for entry in report['dirs']:
+				writer.writerow(['dir', entry['dir'], entry['size'], entry['files'], ''])
+			for entry in report['largestFiles']:
+				writer.writerow(['file', entry['path'], entry['size'], 1, ''])
+		return [jsonPath, csvPath]
+
+#-
+	def getSummary(self, lineCount: int = 10) -> str:
+		""" Return a short text summary: totals, then the biggest types, dirs and files. """
+
+		formatSize = AssetStore.formatSize
+		report = self.toDict()
+		lines = [f'{report["fileCount"]} files, {formatSize(report["totalSize"])}' + (f' (~{formatSize(report["estimatedCompressedSize"])} compressed)' if self.estimateCompression else '')]
+
+		lines += ['', 'by type:']
+		for entry in report['types'][:lineCount]:
+			estimate = f'  (~{formatSize(entry["estimatedCompressedSize"])} compressed)' if self.estimateCompression else ''
+			lines.append(f'  {formatSize(entry["size"]):>12}  {entry["type"]} ({entry["files"]} files){estimate}')
+
+		lines += ['', 'by dir:']
+		for entry in report['dirs'][:lineCount]:
+			lines.append(f'  {formatSize(entry["size"]):>12}  {entry["dir"]}')
+
+		lines += ['', 'largest files:']
+		for entry in report['largestFiles'][:lineCount]:
+			lines.append(f'  {formatSize(entry["size"]):>12}  {entry["path"]}')
+		return '\n'.join(lines)
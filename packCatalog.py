@@ -0,0 +1,185 @@
+from contextlib import closing
+import sqlite3
+import time
+import json
+import os
+
+# import type defs
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+from os import PathLike
+
+SCHEMA_VERSION = 1
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS packs (
+	id         INTEGER PRIMARY KEY,
+	name       TEXT NOT NULL UNIQUE,
+	clean_name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versions (
+	id          INTEGER PRIMARY KEY,
+	pack_id     INTEGER NOT NULL REFERENCES packs(id) ON DELETE CASCADE,
+	version     TEXT NOT NULL,
+	build_id    TEXT,
+	built_at    REAL NOT NULL,
+	assets_path TEXT NOT NULL,
+	algorithm   TEXT NOT NULL,
+	pack_info   TEXT NOT NULL,
+	UNIQUE (pack_id, version)
+);
+CREATE TABLE IF NOT EXISTS assets (
+	version_id INTEGER NOT NULL REFERENCES versions(id) ON DELETE CASCADE,
+	path       TEXT NOT NULL,
+	size       INTEGER NOT NULL,
+	mtime_ns   INTEGER NOT NULL,
+	digest     TEXT NOT NULL,
+	asset_type TEXT,
+	PRIMARY KEY (version_id, path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS assets_by_path   ON assets(path);
+CREATE INDEX IF NOT EXISTS assets_by_digest ON assets(digest);
+CREATE TABLE IF NOT EXISTS artifacts (
+	version_id INTEGER NOT NULL REFERENCES versions(id) ON DELETE CASCADE,
+	path       TEXT NOT NULL,
+	kind       TEXT NOT NULL,
+	size       INTEGER,
+	PRIMARY KEY (version_id, path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS artifacts_by_path ON artifacts(path);
+CREATE TABLE IF NOT EXISTS source_files (
+	path      TEXT PRIMARY KEY,
+	size      INTEGER NOT NULL,
+	mtime_ns  INTEGER NOT NULL,
+	algorithm TEXT NOT NULL,
+	digest    TEXT NOT NULL
+) WITHOUT ROWID;
+'''
+
+#---------------------------------------------------------------------------------------------------
+class PackCatalog():
+	def __init__(self, path: PathLike[str] | str) -> None:
+		""" SQLite catalog of built packs: their versions, assets (rel path, size, hash, asset type) and artifacts (outputs written by the build).\n
+		Rebuilding a version replaces its record. Source file hashes are kept by (path, size, mtime), a file is only rehashed once it changed.\n
+		Every call uses its own connection, builds on several threads / processes share a catalog (WAL, writers wait on each other).
+		"""
+
+		self.path = os.path.abspath(path)
+		os.makedirs(os.path.dirname(self.path), exist_ok=True)
+		with closing(self.connect()) as connection, connection:
+			if connection.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+				connection.executescript(SCHEMA)
+				connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+#-
+	def connect(self) -> sqlite3.Connection:
+		connection = sqlite3.connect(self.path, timeout=60.0)
+		connection.execute('PRAGMA journal_mode = WAL')
+		connection.execute('PRAGMA foreign_keys = ON')
+		connection.row_factory = sqlite3.Row
+		return connection
+
+#---
+# recording
+
+	def recordVersion(self, packInfo: Mapping[str, Any], assets: Iterable[tuple[str, int, int, str, str | None]], artifacts: Iterable[tuple[str, str, int | None]], algorithm: str, buildId: str | None = None) -> int:
+		""" Record a build of packInfo's pack / version, replacing any previous record of the same version.\n
+		assets: tuple(path rel to the assets dir (/ separated), size, mtime_ns, digest, asset type | None)\n
+		artifacts: tuple(abs path, kind, size | None)\n
+		Returns the id of the version.
+		"""
+
+		# sets aren't serializable, sorted for stable records
+		packInfoJson = json.dumps({key: sorted(value) if isinstance(value, set) else value for key, value in packInfo.items()}, sort_keys=True, default=str)
+		assetsPath = os.path.abspath(packInfo['packAssetsPath'])
+
+		with closing(self.connect()) as connection, connection:
+			connection.execute('INSERT INTO packs (name, clean_name) VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET clean_name = excluded.clean_name', (packInfo['packName'], packInfo['packCleanName']))
+			packId = connection.execute('SELECT id FROM packs WHERE name = ?', (packInfo['packName'],)).fetchone()[0]
+
+			# cascades to the previous record's assets / artifacts
+			connection.execute('DELETE FROM versions WHERE pack_id = ? AND version = ?', (packId, packInfo['packVersion']))
+			versionId = connection.execute(
+				'INSERT INTO versions (pack_id, version, build_id, built_at, assets_path, algorithm, pack_info) VALUES (?, ?, ?, ?, ?, ?, ?)',
+				(packId, packInfo['packVersion'], buildId, time.time(), assetsPath, algorithm, packInfoJson),
+			).lastrowid
+
+			assets = list(assets)
+			connection.executemany('INSERT INTO assets (version_id, path, size, mtime_ns, digest, asset_type) VALUES (?, ?, ?, ?, ?, ?)', ((versionId, *asset) for asset in assets))
+			connection.executemany('INSERT INTO artifacts (version_id, path, kind, size) VALUES (?, ?, ?, ?)', ((versionId, *artifact) for artifact in artifacts))
+			connection.executemany(
+				'INSERT OR REPLACE INTO source_files (path, size, mtime_ns, algorithm, digest) VALUES (?, ?, ?, ?, ?)',
+				((os.path.join(assetsPath, relPath), size, mtimeNs, algorithm, digest) for relPath, size, mtimeNs, digest, _ in assets),
+			)
+		return versionId
+
+#-
+	def getKnownDigests(self, dirPath: PathLike[str] | str, algorithm: str) -> dict[str, tuple[int, int, str]]:
+		""" Return the last recorded hashes of the files under dirPath: dict(abs path: (size, mtime_ns, digest)), only valid while size / mtime match. """
+
+		prefix = os.path.join(os.path.abspath(dirPath), '')
+		with closing(self.connect()) as connection:
+			rows = connection.execute(
+				# range scan on the primary key, LIKE would need escaping and can't use it
+				'SELECT path, size, mtime_ns, digest FROM source_files WHERE path >= ? AND path < ? AND algorithm = ?',
+				(prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1), algorithm),
+			).fetchall()
+		return {row['path']: (row['size'], row['mtime_ns'], row['digest']) for row in rows}
+
+#---
+# queries
+
+	def listVersions(self, packName: str | None = None) -> list[sqlite3.Row]:
+		""" Return (pack, version, built_at, asset_count, total_size) of every recorded version (of one pack), newest first. """
+
+		with closing(self.connect()) as connection:
+			return connection.execute(
+				'SELECT packs.name AS pack, versions.version, versions.built_at, COUNT(assets.path) AS asset_count, COALESCE(SUM(assets.size), 0) AS total_size'
+				' FROM versions JOIN packs ON packs.id = versions.pack_id LEFT JOIN assets ON assets.version_id = versions.id'
+				' WHERE ? IS NULL OR packs.name = ? GROUP BY versions.id ORDER BY versions.built_at DESC',
+				(packName, packName),
+			).fetchall()
+
+#-
+	def findAsset(self, pathOrDigest: str) -> list[sqlite3.Row]:
+		""" Return (pack, version, path, digest) of every recorded asset matching a path (rel to its assets dir) or a digest. """
+
+		pathOrDigest = pathOrDigest.replace('\\', '/')
+		with closing(self.connect()) as connection:
+			return connection.execute(
+				'SELECT packs.name AS pack, versions.version, assets.path, assets.digest'
+				' FROM assets JOIN versions ON versions.id = assets.version_id JOIN packs ON packs.id = versions.pack_id'
+				' WHERE assets.path = ? OR assets.digest = ? ORDER BY packs.name, versions.built_at',
+				(pathOrDigest, pathOrDigest),
+			).fetchall()
+
+#-
+	def diffVersions(self, packName: str, fromVersion: str, toVersion: str) -> dict[str, list[str]]:
+		""" Return the asset paths 'added', 'removed' and 'changed' (different content) from one version of a pack to another.\n
+		Raises KeyError if either version isn't recorded.
+		"""
+
+		with closing(self.connect()) as connection:
+			versionIds = []
+			for version in (fromVersion, toVersion):
+				row = connection.execute('SELECT versions.id FROM versions JOIN packs ON packs.id = versions.pack_id WHERE packs.name = ? AND versions.version = ?', (packName, version)).fetchone()
+				if row == None:
+					raise KeyError(f'{packName} {version} is not in the catalog')
+				versionIds.append(row[0])
+
+			fromAssets = dict(connection.execute('SELECT path, digest FROM assets WHERE version_id = ?', (versionIds[0],)).fetchall())
+			toAssets   = dict(connection.execute('SELECT path, digest FROM assets WHERE version_id = ?', (versionIds[1],)).fetchall())
+
+		return {
+			'added':   sorted(toAssets.keys() - fromAssets.keys()),
+			'removed': sorted(fromAssets.keys() - toAssets.keys()),
+			'changed': sorted(path for path in fromAssets.keys() & toAssets.keys() if fromAssets[path] != toAssets[path]),
+		}
+
+#-
+	@classmethod
+	def formatRows(cls, rows: Sequence[sqlite3.Row]) -> str:
+		""" Return query results as tab separated lines, with a header. """
+
+		if not rows:
+			return '(none)'
+		return '\n'.join(['\t'.join(rows[0].keys())] + ['\t'.join(str(value) for value in row) for row in rows])
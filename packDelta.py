@@ -0,0 +1,285 @@
+from archiveWriter import FILE_MANIFEST_EXT, SHARD_MANIFEST_EXT, DELTA_MANIFEST_NAME, COPY_BUFFER_SIZE
+from zipfile import ZipFile
+from shutil import copyfileobj
+import tarfile
+import hashlib
+import zlib
+import json
+import time
+import sys
+import os
+
+# optional dependency, required for .tar.zst bases / delta packs
+try:
+	import zstandard
+except ImportError:
+	zstandard = None
+
+# import type defs
+from collections.abc import Iterable, Iterator
+from typing import Any, BinaryIO
+from os import PathLike
+
+# commandline syntax (apply step):
+# ./packDelta.py <deltaPackPath> <targetDir>
+# targetDir: dir the previous version's compressed pack was extracted to
+
+#---------------------------------------------------------------------------------------------------
+class PackDelta():
+	def __init__(self, basePath: PathLike[str] | str) -> None:
+		""" Difference between a previous build of a pack and the current one.\n
+		basePath: the previous build's file manifest (.files.json), shard manifest (.shards.json) or compressed pack (.zip / .tar.zst)\n
+		Files are compared on size and mtime first, content is only hashed when those are inconclusive.
+		"""
+
+		self.basePath = os.path.abspath(basePath)
+		self.baseVersion: str | None = None
+
+		# dict(archive path: (size, mtime key, digest or None)), mtime key / digest depend on the kind of base (see _getMtimeKey / _hashSource)
+		self.baseEntries: dict[str, tuple[int, Any, Any]] = {}
+		self.baseKind = self._loadBase()
+
+		self.added:     list[str] = []
+		self.changed:   list[str] = []
+		self.removed:   list[str] = []
+		self.unchanged: list[str] = []
+		self.hashedCount = 0
+
+#-
+	def compare(self, members: Iterable[tuple[str, str]], alwaysChanged: Iterable[str] = ()) -> None:
+		""" Compare the current members (tuple(archive path, source path)) against the base.\n
+		alwaysChanged: archive paths to include regardless (ie: files that don't exist yet)
+		"""
+
+		needsHash: dict[str, str] = {} # dict(archive path: source path), same size but different mtime
+		seenPaths = set(alwaysChanged)
+		for archivePath in alwaysChanged:
+			(self.changed if archivePath in self.baseEntries else self.added).append(archivePath)
+
+		for archivePath, sourcePath in members:
+			if archivePath in seenPaths:
+				continue
+			seenPaths.add(archivePath)
+
+			baseEntry = self.baseEntries.get(archivePath)
+			if baseEntry == None:
+				self.added.append(archivePath)
+				continue
+
+			sourceStat = os.stat(sourcePath)
+			if sourceStat.st_size != baseEntry[0]:
+				self.changed.append(archivePath)
+			elif self._getMtimeKey(sourceStat.st_mtime_ns) == baseEntry[1]:
+				self.unchanged.append(archivePath)
+			else:
+				needsHash[archivePath] = sourcePath
+
+		# .tar.zst bases carry no checksums, their content is hashed in one streaming pass
+		if needsHash and self.baseKind == 'tar.zst':
+			self._hashTarMembers(set(needsHash))
+
+		for archivePath, sourcePath in needsHash.items():
+			self.hashedCount += 1
+			if self.baseEntries[archivePath][2] == self._hashSource(sourcePath):
+				self.unchanged.append(archivePath)
+			else:
+				self.changed.append(archivePath)
+
+		self.removed = sorted(set(self.baseEntries) - seenPaths)
+		self.added.sort()
+		self.changed.sort()
+
+#-
+	def writeManifest(self, path: PathLike[str] | str, packName: str, version: str) -> None:
+		""" Write the delta manifest, shipped inside the delta pack (see apply). """
+
+		with open(path, 'w', encoding='utf-8', newline='\n') as file:
+			json.dump({
+				'packName':    packName,
+				'fromVersion': self.baseVersion,
+				'toVersion':   version,
+				'added':       self.added,
+				'changed':     self.changed,
+				'removed':     self.removed,
+			}, file, indent=2)
+
+#-
+	def getSummary(self) -> str:
+		return f'{len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed, {len(self.unchanged)} unchanged ({self.hashedCount} hashed)'
+
+#---
+# base
+
+	def _loadBase(self) -> str:
+		""" Load the entries of the base.\n
+		Returns the kind of base: 'manifest' | 'zip' | 'tar.zst'
+		"""
+
+		if self.basePath.endswith(SHARD_MANIFEST_EXT):
+			# each shard's archive has its own file manifest
+			shardManifest = self._readJson(self.basePath)
+			self.baseVersion = shardManifest.get('version')
+			for shard in shardManifest['shards']:
+				self._loadFileManifest(os.path.join(os.path.dirname(self.basePath), shard['file'] + FILE_MANIFEST_EXT))
+			return 'manifest'
+
+		if self.basePath.endswith(FILE_MANIFEST_EXT):
+			self._loadFileManifest(self.basePath)
+			return 'manifest'
+
+		if self.basePath.endswith('.zip'):
+			with ZipFile(self.basePath) as archive:
+				for memberInfo in archive.infolist():
+					if not memberInfo.is_dir():
+						self.baseEntries[memberInfo.filename] = (memberInfo.file_size, memberInfo.date_time, memberInfo.CRC)
+			return 'zip'
+
+		if self.basePath.endswith('.tar.zst'):
+			for memberInfo, _ in self._iterTarMembers(self.basePath):
+				self.baseEntries[memberInfo.name] = (memberInfo.size, int(memberInfo.mtime), None)
+			return 'tar.zst'
+
+		raise ValueError(f'unsupported delta base (expected {FILE_MANIFEST_EXT}, {SHARD_MANIFEST_EXT}, .zip or .tar.zst): {self.basePath}')
+
+#-
+	def _loadFileManifest(self, path: str) -> None:
+		fileManifest = self._readJson(path)
+		self.baseVersion = fileManifest.get('version', self.baseVersion)
+		for archivePath, entry in fileManifest['files'].items():
+			# no mtime in reproducible builds' manifests, same size files are hashed
+			self.baseEntries[archivePath] = (entry['size'], entry.get('mtime_ns'), entry['blake2b'])
+
+#-
+	def _getMtimeKey(self, mtimeNs: int) -> Any:
+		""" Return a mtime in the same form / resolution as the base stores it. """
+
+		match self.baseKind:
+			case 'manifest':
+				return mtimeNs
+			case 'zip':
+				# local time, 2 second resolution
+				dateTime = time.localtime(mtimeNs // 1_000_000_000)[:6]
+				return dateTime[:5] + (dateTime[5] // 2 * 2,)
+			case 'tar.zst':
+				return mtimeNs // 1_000_000_000
+
+#-
+	def _hashSource(self, sourcePath: str) -> Any:
+		""" Return the digest of a source file, in the same form as the base stores it. """
+
+		if self.baseKind == 'zip':
+			crc = 0
+			with open(sourcePath, 'rb') as file:
+				while data := file.read(COPY_BUFFER_SIZE):
+					crc = zlib.crc32(data, crc)
+			return crc
+
+		hasher = hashlib.blake2b()
+		with open(sourcePath, 'rb') as file:
+			while data := file.read(COPY_BUFFER_SIZE):
+				hasher.update(data)
+		return hasher.hexdigest()
+
+#-
+	def _hashTarMembers(self, archivePaths: set[str]) -> None:
+		for memberInfo, memberFile in self._iterTarMembers(self.basePath):
+			if memberInfo.name not in archivePaths:
+				continue
+			hasher = hashlib.blake2b()
+			while data := memberFile.read(COPY_BUFFER_SIZE):
+				hasher.update(data)
+			self.baseEntries[memberInfo.name] = self.baseEntries[memberInfo.name][:2] + (hasher.hexdigest(),)
+
+#---
+# apply
+
+	@classmethod
+	def apply(cls, deltaPackPath: PathLike[str] | str, targetDir: PathLike[str] | str) -> dict[str, Any]:
+		""" Turn an installed / extracted previous version into the new one: write the added / changed files, delete the removed ones.\n
+		Returns the delta manifest.
+		"""
+
+		targetDir = os.path.abspath(targetDir)
+		deltaManifest = None
+		for archivePath, memberFile in cls._iterDeltaMembers(deltaPackPath):
+			if archivePath == DELTA_MANIFEST_NAME:
+				deltaManifest = json.load(memberFile)
+				continue
+			cls._writeMember(targetDir, archivePath, memberFile)
+
+		if deltaManifest == None:
+			raise ValueError(f'not a delta pack (no {DELTA_MANIFEST_NAME}): {deltaPackPath}')
+
+		for archivePath in deltaManifest['removed']:
+			targetPath = cls._getTargetPath(targetDir, archivePath)
+			if os.path.isfile(targetPath):
+				os.unlink(targetPath)
+				# drop dirs left empty
+				dirPath = os.path.dirname(targetPath)
+				while dirPath != targetDir and not os.listdir(dirPath):
+					os.rmdir(dirPath)
+					dirPath = os.path.dirname(dirPath)
+
+		return deltaManifest
+
+#-
+	@classmethod
+	def _writeMember(cls, targetDir: str, archivePath: str, memberFile: BinaryIO) -> None:
+		# written aside then renamed, an interrupted apply never leaves a truncated file
+		targetPath = cls._getTargetPath(targetDir, archivePath)
+		os.makedirs(os.path.dirname(targetPath), exist_ok=True)
+		partialPath = targetPath + '.partial'
+		with open(partialPath, 'wb') as file:
+			copyfileobj(memberFile, file, COPY_BUFFER_SIZE)
+		os.replace(partialPath, targetPath)
+
+#-
+	@classmethod
+	def _getTargetPath(cls, targetDir: str, archivePath: str) -> str:
+		targetPath = os.path.abspath(os.path.join(targetDir, archivePath))
+		if os.path.commonpath([targetDir, targetPath]) != targetDir:
+			raise ValueError(f'delta member outside of the target dir: {archivePath}')
+		return targetPath
+
+#-
+	@classmethod
+	def _iterDeltaMembers(cls, deltaPackPath: PathLike[str] | str) -> Iterator[tuple[str, BinaryIO]]:
+		""" Yield tuple(archive path, readable member) for every file of a delta pack, the delta manifest first. """
+
+		if os.fspath(deltaPackPath).endswith('.tar.zst'):
+			# streamed, the manifest is written as the first member
+			for memberInfo, memberFile in cls._iterTarMembers(deltaPackPath):
+				yield (memberInfo.name, memberFile)
+			return
+
+		with ZipFile(deltaPackPath) as archive:
+			memberNames = [name for name in archive.namelist() if not name.endswith('/')]
+			memberNames.sort(key=lambda name: name != DELTA_MANIFEST_NAME)
+			for name in memberNames:
+				with archive.open(name) as memberFile:
+					yield (name, memberFile)
+
+#-
+	@classmethod
+	def _iterTarMembers(cls, path: PathLike[str] | str) -> Iterator[tuple[tarfile.TarInfo, BinaryIO]]:
+		""" Yield tuple(member info, readable member) for every file of a .tar.zst, in one streaming pass. """
+
+		if zstandard == None:
+			raise RuntimeError('the zstandard package is needed to read .tar.zst packs')
+
+		with open(path, 'rb') as file, zstandard.ZstdDecompressor().stream_reader(file) as decompressedStream:
+			with tarfile.open(fileobj=decompressedStream, mode='r|') as archive:
+				for memberInfo in archive:
+					if memberInfo.isfile():
+						yield (memberInfo, archive.extractfile(memberInfo))
+
+#-
+	@classmethod
+	def _readJson(cls, path: str) -> dict[str, Any]:
+		with open(path, 'r', encoding='utf-8') as file:
+			return json.load(file)
+
+#---------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+	deltaManifest = PackDelta.apply(sys.argv[1], sys.argv[2])
+	print(f'updated {deltaManifest["packName"]} from {deltaManifest["fromVersion"]} to {deltaManifest["toVersion"]}: {len(deltaManifest["added"])} added, {len(deltaManifest["changed"])} changed, {len(deltaManifest["removed"])} removed')
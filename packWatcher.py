@@ -0,0 +1,329 @@
+from dataManager import DataManager
+from buildWorker import BuildWorker
+from treeCopier import TreeCopier
+from shutil import copy2
+import threading
+import time
+import os
+
+# optional dependency, native change notifications (inotify / ReadDirectoryChangesW / FSEvents)
+# falls back to polling with scandir snapshots when not installed
+try:
+	from watchdog.observers import Observer
+	from watchdog.events import FileSystemEventHandler
+except ImportError:
+	Observer = None
+	FileSystemEventHandler = object
+
+# import type defs
+from collections.abc import Mapping
+
+#---------------------------------------------------------------------------------------------------
+class _DirtyPathHandler(FileSystemEventHandler):
+	def __init__(self, watcher: 'PackWatcher') -> None:
+		""" Forwards every filesystem event to the watcher as a path to re-check. """
+		super().__init__()
+		self.watcher = watcher
+
+#-
+	def on_any_event(self, event) -> None:
+		self.watcher.markDirty(event.src_path)
+		if getattr(event, 'dest_path', None):
+			self.watcher.markDirty(event.dest_path)
+
+#---------------------------------------------------------------------------------------------------
+class PackWatcher():
+	def __init__(self, dataManager: DataManager, exportCompressedPack: bool, exportPackStruct: bool, installToEngine: bool, debounceDelay: float = 1.0, pollInterval: float = 1.0) -> None:
+		""" Builds a pack once, then keeps its outputs up to date as packAssetsPath changes.\n
+		Only changed files are copied, the .upack is only rebuilt if the pack's asset types changed.\n
+		The compressed pack can't be updated in place, it is rebuilt once when watching stops (if anything changed) rather than on every change.
+		"""
+
+		self.dataManager = dataManager
+		self.exportOptions = (exportCompressedPack, exportPackStruct, installToEngine)
+		self.debounceDelay = debounceDelay
+		self.pollInterval = pollInterval
+
+		self.assetsPath = os.path.abspath(self.dataManager.packInfo['packAssetsPath'])
+		self.snapshot: dict[str, tuple[int, int]] = {} # dict(path rel to assetsPath: (size, mtime_ns)) as of the last (re)build
+		self.targetDirs: list[str] = [] # dirs mirroring assetsPath, updated on every change
+
+		self.assetTypeCounts: dict[str, int] = {} # dict(asset type: number of files inferred as such)
+		self.manualAssetTypes: set[str] = set() # types not inferred from filenames (chosen by the user)
+
+		self.observer = None
+		self.dirtyPaths: set[str] = set() # paths reported by the observer, not yet checked, and changed files not applied yet
+		self.dirtyLock = threading.Lock()
+		self.stopEvent = threading.Event()
+		self.archiveStale = False # changes not in the compressed pack yet
+
+#-
+	def run(self) -> None:
+		""" Build once, then rebuild on changes until stop() is called or ctrl+c. """
+
+		try:
+			if not self.initialBuild():
+				return
+			self.startObserver()
+			print(f'watching {self.assetsPath} ({"native events" if self.observer != None else "polling"}), ctrl+c to stop')
+
+			pendingChanges: dict[str, tuple[int, int] | None] = {}
+			lastChangeTime = 0.0
+			while not self.stopEvent.wait(self.pollInterval):
+				changes = self.collectChanges()
+				# debounce: only rebuild once things have settled
+				if changes != pendingChanges:
+					pendingChanges = changes
+					lastChangeTime = time.monotonic()
+				elif pendingChanges and time.monotonic() - lastChangeTime >= self.debounceDelay:
+					self.applyChanges(pendingChanges)
+					pendingChanges = {}
+
+		except KeyboardInterrupt:
+			pass
+
+		finally:
+			if self.observer != None:
+				self.observer.stop()
+				self.observer.join()
+			try:
+				if self.archiveStale:
+					self.refreshCompressedPack()
+			except KeyboardInterrupt:
+				print('compressed pack not updated')
+			finally:
+				self.dataManager.cleanup()
+
+#-
+	def stop(self) -> None:
+		self.stopEvent.set()
+
+#---
+# builds
+
+	def initialBuild(self) -> bool:
+		""" Full build, also sets up the state used for incremental rebuilds.\n
+		Returns success.
+		"""
+
+		# snapshot first, so changes made during the build get picked up afterwards
+		self.snapshot = self._scan(self.assetsPath)
+		for relPath in self.snapshot:
+			self._countAssetType(relPath, 1)
+		self.manualAssetTypes = set(self.dataManager.packInfo['packAssetTypes']) - set(self.assetTypeCounts)
+
+		# run the worker on this thread, there is no UI to keep responsive
+		worker = BuildWorker(self.dataManager, *self.exportOptions)
+		worker.run()
+		for eventType, data in worker.getEvents():
+			if eventType == 'error':
+				print(f'build failed: {data}')
+				return False
+			if eventType == 'cancelled':
+				return False
+		self._printFailedJobs()
+
+		_, exportPackStruct, installToEngine = self.exportOptions
+		if exportPackStruct:
+			self.dataManager.updateExportedResponseFile()
+		self.dataManager.commitOutputs()
+
+		# dirs that mirror the assets dir
+		assetFolder = self.dataManager.tmpFilePaths['assetFolder'][0]
+		# pruned builds archive from the staged assets too
+		if self.dataManager.needsStagedContent(exportPackStruct, installToEngine):
+			self.targetDirs.append(assetFolder)
+		if exportPackStruct:
+			self.targetDirs.append(os.path.join(os.path.abspath(self.dataManager.packInfo['packOutputPath']), os.path.relpath(assetFolder, self.dataManager.tmpDir)))
+		# a linked install is the assets dir itself
+		if installToEngine and self.dataManager.getInstallMode() != 'link':
+			self.targetDirs.append(self.dataManager.getEngineAssetPath())
+
+		print('initial build done.')
+		return True
+
+#-
+	def applyChanges(self, changes: Mapping[str, tuple[int, int] | None]) -> None:
+		""" Update all outputs for the given changes (dict(rel path: new stat, None if removed)). """
+
+		startTime = time.monotonic()
+		exportCompressedPack, exportPackStruct, installToEngine = self.exportOptions
+
+		previousTypes = {assetType for assetType, count in self.assetTypeCounts.items() if count > 0}
+		exportedPaths = [] # files of the exported structure that changed, their checksums need updating
+		for relPath, newStat in sorted(changes.items()):
+			# left out of the initial build as unreferenced
+			if self.dataManager.prunedRelPaths and relPath in self.dataManager.prunedRelPaths:
+				continue
+			sourcePath = os.path.join(self.assetsPath, relPath)
+			try:
+				for targetDir in self.targetDirs:
+					targetPath = os.path.join(targetDir, relPath)
+					if newStat == None:
+						if os.path.exists(targetPath):
+							os.unlink(targetPath)
+					else:
+						os.makedirs(os.path.dirname(targetPath), exist_ok=True)
+						# staged files can be hard links to asset store objects, replace rather than write through them
+						if os.path.lexists(targetPath):
+							os.unlink(targetPath)
+						copy2(sourcePath, targetPath)
+					if targetDir.startswith(os.path.abspath(self.dataManager.packInfo['packOutputPath'])):
+						exportedPaths.append(targetPath)
+			except OSError as error:
+				# most likely still being written to, it will show up as changed again
+				print(f'unable to update {relPath}: {error}')
+				continue
+
+			# asset type bookkeeping
+			if newStat == None:
+				self.snapshot.pop(relPath, None)
+				self._countAssetType(relPath, -1)
+			else:
+				if relPath not in self.snapshot:
+					self._countAssetType(relPath, 1)
+				self.snapshot[relPath] = newStat
+
+		# .upack only contains the manifest / media / config, it only needs a rebuild if the manifest changed
+		currentTypes = {assetType for assetType, count in self.assetTypeCounts.items() if count > 0}
+		typesChanged = currentTypes != previousTypes
+		if typesChanged:
+			self.dataManager.packInfo['packAssetTypes'] = self.manualAssetTypes | currentTypes
+			self.dataManager._generateManifestData()
+			self.dataManager.writeManifestFile()
+			self.dataManager.generateUpack()
+			if installToEngine:
+				self.dataManager.installUpackToEngine()
+
+		# rebuilt once when watching stops (see refreshCompressedPack), its rebuild time would grow with the pack, not the change
+		if exportCompressedPack:
+			self.archiveStale = True
+
+		self.dataManager.waitOnJobs(0.2)
+		self._printFailedJobs()
+
+		# refresh the non asset files of the exported structure
+		if typesChanged and exportPackStruct:
+			for key in ('manifestFile', 'upackFile'):
+				stagedPath = os.path.join(*self.dataManager.tmpFilePaths[key])
+				exportedPaths.append(os.path.join(self.dataManager.packInfo['packOutputPath'], os.path.relpath(stagedPath, self.dataManager.tmpDir)))
+				copy2(stagedPath, exportedPaths[-1])
+
+		if exportedPaths and os.path.exists(self.dataManager.getChecksumManifestPath()):
+			TreeCopier.updateManifest(self.dataManager.getChecksumManifestPath(), exportedPaths)
+
+		self.dataManager.commitOutputs()
+		print(f'updated {len(changes)} file(s){" and .upack" if typesChanged else ""} in {time.monotonic() - startTime:.1f}s')
+
+#-
+	def refreshCompressedPack(self) -> None:
+		""" Rebuild the compressed pack with all changes made while watching. """
+
+		print('updating compressed pack...')
+		self.dataManager.exportCompressedPack()
+		self.dataManager.waitOnJobs(0.2)
+		self._printFailedJobs()
+		self.dataManager.commitOutputs()
+		self.archiveStale = False
+
+#-
+	def _printFailedJobs(self) -> None:
+		failedJobTypes = self.dataManager.getFailedJobTypes()
+		if failedJobTypes != None:
+			print(f'errors in: {", ".join(failedJobTypes)}')
+			for cause in self.dataManager.getFailedJobCauses():
+				print(f'  {cause}')
+			self.dataManager.failedJobs.clear()
+
+#-
+	def _countAssetType(self, relPath: str, increment: int) -> None:
+		if not relPath.endswith('.uasset'):
+			return
+		assetType = self.dataManager.getAssetTypeForPath(relPath)
+		if assetType != None:
+			self.assetTypeCounts[assetType] = self.assetTypeCounts.get(assetType, 0) + increment
+
+#---
+# change detection
+
+	def startObserver(self) -> None:
+		""" Start native change notifications if available, otherwise every collectChanges call rescans the assets dir. """
+
+		if Observer == None:
+			return
+		self.observer = Observer()
+		self.observer.schedule(_DirtyPathHandler(self), self.assetsPath, recursive=True)
+		self.observer.start()
+
+#-
+	def markDirty(self, path: str) -> None:
+		""" Mark a path as needing to be checked for changes, called from the observer thread. """
+		with self.dirtyLock:
+			self.dirtyPaths.add(os.path.abspath(path))
+
+#-
+	def collectChanges(self) -> dict[str, tuple[int, int] | None]:
+		""" Return all differences between the assets dir and the snapshot, as dict(rel path: current stat, None if removed).\n
+		Only the dirty paths are checked when using native notifications, they are then replaced by the changed files alone:
+		changes keep being reported until applied (see run's debounce), without rescanning the dirs they were reported through.
+		"""
+
+		if self.observer == None:
+			candidatePaths = {self.assetsPath}
+		else:
+			# paths marked dirty from now on are left for the next call
+			with self.dirtyLock:
+				candidatePaths, self.dirtyPaths = self.dirtyPaths, set()
+
+		changes = {}
+		for path in candidatePaths:
+			relPath = os.path.relpath(path, self.assetsPath)
+			if relPath.startswith('..'):
+				continue
+
+			currentFiles = self._scan(path)
+			for fileRelPath, fileStat in currentFiles.items():
+				if self.snapshot.get(fileRelPath) != fileStat:
+					changes[fileRelPath] = fileStat
+
+			# removed files, anything known under that path that no longer exists
+			if relPath == '.':
+				knownRelPaths = self.snapshot.keys()
+			elif relPath in self.snapshot:
+				knownRelPaths = (relPath,)
+			else:
+				prefix = relPath + os.sep
+				knownRelPaths = [knownRelPath for knownRelPath in self.snapshot if knownRelPath.startswith(prefix)]
+			for knownRelPath in knownRelPaths:
+				if knownRelPath not in currentFiles:
+					changes[knownRelPath] = None
+
+		if self.observer != None:
+			with self.dirtyLock:
+				self.dirtyPaths |= {os.path.join(self.assetsPath, relPath) for relPath in changes}
+		return changes
+
+#-
+	def _scan(self, path: str) -> dict[str, tuple[int, int]]:
+		""" Return dict(path rel to assetsPath: (size, mtime_ns)) of all files at / under path. """
+
+		files = {}
+		if os.path.isfile(path):
+			fileStat = os.stat(path)
+			files[os.path.relpath(path, self.assetsPath)] = (fileStat.st_size, fileStat.st_mtime_ns)
+			return files
+
+		pendingDirs = [path] if os.path.isdir(path) else []
+		while pendingDirs:
+			try:
+				entries = os.scandir(pendingDirs.pop())
+			except OSError:
+				continue
+			with entries:
+				for entry in entries:
+					if entry.is_dir(follow_symlinks=False):
+						pendingDirs.append(entry.path)
+					elif entry.is_file():
+						entryStat = entry.stat()
+						files[os.path.relpath(entry.path, self.assetsPath)] = (entryStat.st_size, entryStat.st_mtime_ns)
+		return files
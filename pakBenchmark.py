@@ -0,0 +1,115 @@
+from assetStore import AssetStore
+import time
+import json
+import os
+
+# import type defs
+from collections.abc import Sequence
+from typing import Any
+from os import PathLike
+
+#---------------------------------------------------------------------------------------------------
+class PakBenchmark():
+	def __init__(self, dataManager, settings: Sequence[tuple[str, int | None, int | None]], repeatCount: int = 3) -> None:
+		""" Build the pack's .upack with UnrealPak under several compression settings (method, level, block size), see DataManager.benchmarkPakCompression.\n
+		Each setting is packed then extracted repeatCount times, the fastest run is kept (the first ones pay for cold disk caches).
+		"""
+
+		self.dataManager = dataManager
+		self.settings = list(settings)
+		self.repeatCount = max(repeatCount, 1)
+		self.results: list[dict[str, Any]] = []
+
+#-
+	@classmethod
+	def parseSetting(cls, setting: str) -> tuple[str, int | None, int | None]:
+		""" Parse a setting of the form method[:level[:block size in KiB]] (ie: Oodle:4:256, Zlib, None). """
+
+		method, level, blockSize = (setting.split(':') + ['', ''])[:3]
+		return (method, int(level) if level else None, int(blockSize) * 1024 if blockSize else None)
+
+#-
+	def run(self, benchmarkDir: PathLike[str] | str) -> 'PakBenchmark':
+		""" Run all settings, using the response file already written to the tmp pack (see DataManager.writeDataToTmpPack).\n
+		benchmarkDir: where the .upack files are written / extracted
+		"""
+
+		responsePath = os.path.join(*self.dataManager.tmpFilePaths['responseFile'])
+		packerPath = self.dataManager.packerPath
+		for index, (method, level, blockSize) in enumerate(self.settings):
+			self.dataManager.checkCancelled()
+			self.dataManager.reportProgress(f'Benchmarking {self.formatSetting(method, level, blockSize)}', index / len(self.settings))
+
+			result = {'method': method, 'level': level, 'blockSize': blockSize, 'error': None}
+			upackPath = os.path.join(benchmarkDir, f'{index}.upack')
+			compressionArgs = self.dataManager.getPakCompressionArgs(method, level, blockSize)
+
+			packTimes = []
+			extractTimes = []
+			for _ in range(self.repeatCount):
+				packSeconds, output = self._runTimed(fr'"{packerPath}" -Create="{responsePath}" "{upackPath}" {compressionArgs}')
+				if output != None:
+					result['error'] = f'packing failed: {output}'
+					break
+				packTimes.append(packSeconds)
+
+				extractDir = os.path.join(benchmarkDir, f'{index}_extracted')
+				extractSeconds, output = self._runTimed(fr'"{packerPath}" "{upackPath}" -Extract "{extractDir}"')
+				if output != None:
+					result['error'] = f'extracting failed: {output}'
+					break
+				extractTimes.append(extractSeconds)
+
+			if result['error'] == None:
+				extractedSize = sum(os.path.getsize(os.path.join(dirPath, filename)) for dirPath, _, filenames in os.walk(extractDir) for filename in filenames)
+				result.update({
+					'packSeconds':    min(packTimes),
+					'size':           os.path.getsize(upackPath),
+					'extractSeconds': min(extractTimes),
+					'extractedSize':  extractedSize,
+					# bytes of content out per second
+					'extractThroughput': extractedSize / max(min(extractTimes), 1e-6),
+				})
+			self.results.append(result)
+			print(f'benchmark {self.formatSetting(method, level, blockSize)}: ' + (result['error'] or f'{result["size"]} bytes, packed in {result["packSeconds"]:.2f}s, extracted in {result["extractSeconds"]:.2f}s'), file=self.dataManager.logStream)
+		return self
+
+#-
+	def _runTimed(self, shellCmd: str) -> tuple[float, str | None]:
+		""" Run an UnrealPak command to completion.\n
+		Returns (wall time in seconds, None on success or the command's output on failure)
+		"""
+
+		startTime = time.perf_counter()
+		job = self.dataManager.startJob(shellCmd, os.path.abspath(self.dataManager.basePath))
+		output, cause = self.dataManager.communicateJob(job, 'unrealpak')
+		seconds = time.perf_counter() - startTime
+		if cause != None:
+			outputLines = output.decode(errors='replace').strip().splitlines()
+			return (seconds, f'{cause}: {outputLines[-1]}' if outputLines else cause)
+		return (seconds, None)
+
+#---
+# report
+
+	@classmethod
+	def formatSetting(cls, method: str, level: int | None, blockSize: int | None) -> str:
+		return method + (f' level {level}' if level != None else '') + (f' {blockSize // 1024} KiB blocks' if blockSize != None else '')
+
+#-
+	def writeReport(self, path: PathLike[str] | str) -> None:
+		with open(path, 'w') as file:
+			json.dump({'repeatCount': self.repeatCount, 'results': self.results}, file, indent=2)
+
+#-
+	def getReport(self) -> str:
+		""" Return a text table of the results, smallest .upack first. """
+
+		lines = [f'{"setting":<32} {"size":>12} {"pack time":>10} {"extract time":>13} {"extract speed":>14}']
+		for result in sorted(self.results, key=lambda result: result.get('size', float('inf'))):
+			setting = self.formatSetting(result['method'], result['level'], result['blockSize'])
+			if result['error'] != None:
+				lines.append(f'{setting:<32} {result["error"]}')
+				continue
+			lines.append(f'{setting:<32} {AssetStore.formatSize(result["size"]):>12} {result["packSeconds"]:>9.2f}s {result["extractSeconds"]:>12.2f}s {AssetStore.formatSize(round(result["extractThroughput"])) + "/s":>14}')
+		return '\n'.join(lines)
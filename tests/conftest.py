@@ -0,0 +1,84 @@
+import struct
+import pytest
+import sys
+import os
+
+# import type defs
+from collections.abc import Sequence
+
+# the modules live at the repo root, tests import them as the app does
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+#---------------------------------------------------------------------------------------------------
+@pytest.fixture
+def fakeEngineDir(tmp_path):
+	""" Engine install layout with a (fake) UnrealPak.exe, UEDir of the DataManagers created by makeDataManager. """
+
+	packerPath = tmp_path / 'UE' / 'Engine' / 'Binaries' / 'Win64' / 'UnrealPak.exe'
+	packerPath.parent.mkdir(parents=True)
+	packerPath.write_bytes(b'')
+	return tmp_path / 'UE'
+
+#-
+@pytest.fixture
+def makeDataManager(fakeEngineDir):
+	""" Return a function creating DataManagers on fakeEngineDir. """
+
+	from dataManager import DataManager
+
+	def _makeDataManager():
+		return DataManager(
+			 REPO_DIR
+			,os.path.join(REPO_DIR, 'settings', 'packLayout.json')
+			,os.path.join(REPO_DIR, 'settings', 'assetTypeTable.json')
+			,os.path.join(REPO_DIR, 'settings', 'packAdditions')
+			,str(fakeEngineDir / 'Engine' / 'Binaries' / 'Win64' / 'UnrealPak.exe')
+			)
+
+	return _makeDataManager
+
+#-
+@pytest.fixture
+def dataManager(makeDataManager):
+	""" A DataManager on fakeEngineDir, for tests needing only one (see makeDataManager). """
+	return makeDataManager()
+
+#-
+@pytest.fixture
+def writePackage():
+	""" Return a function writing minimal (header only) package files, see AssetDependencyGraph.readPackageHeader. """
+	return _writePackage
+
+#-
+def _packFString(text: str) -> bytes:
+	data = text.encode('latin-1') + b'\0'
+	return struct.pack('<i', len(data)) + data
+
+#-
+def _writePackage(path, importedPackages: Sequence[str] = (), softReferences: Sequence[str] = ()) -> None:
+	""" Write the header of a cooked UE 4.27 package (legacy version -7, no custom versions): name map and package imports only. """
+
+	from assetDependencies import PACKAGE_FILE_TAG, PKG_FILTER_EDITOR_ONLY
+	names = ['/Script/CoreUObject', 'Package', *importedPackages, *softReferences]
+	nameMap = b''.join(_packFString(name) + b'\0' * 4 for name in names)
+	# ClassPackage, ClassName, OuterIndex, ObjectName
+	imports = b''.join(struct.pack('<qiiiii', 0, 1, 0, 0, names.index(packageName), 0) for packageName in importedPackages)
+
+	def _packSummary(nameOffset: int, importOffset: int) -> bytes:
+		return b''.join([
+			struct.pack('<Iiiii', PACKAGE_FILE_TAG, -7, 864, 522, 0),
+			struct.pack('<i', 0), # custom versions
+			struct.pack('<i', 0), # TotalHeaderSize
+			_packFString('None'),
+			struct.pack('<I', PKG_FILTER_EDITOR_ONLY),
+			struct.pack('<ii', len(names), nameOffset),
+			struct.pack('<ii', 0, 0), # GatherableTextData
+			struct.pack('<ii', 0, 0), # exports
+			struct.pack('<ii', len(importedPackages), importOffset),
+		])
+
+	summarySize = len(_packSummary(0, 0))
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	with open(path, 'wb') as file:
+		file.write(_packSummary(summarySize, summarySize + len(nameMap)) + nameMap + imports + b'\0' * 64)
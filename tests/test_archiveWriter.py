@@ -0,0 +1,186 @@
+from archiveWriter import ArchiveWriter, ARCHIVE_FORMATS, REPRODUCIBLE_EPOCH, REPRODUCIBLE_CREATE_SYSTEM, DIGEST_EXT, FILE_MANIFEST_EXT
+from zipfile import ZipFile
+import tarfile
+import hashlib
+import pytest
+import json
+import time
+import stat
+import sys
+import os
+
+#---------------------------------------------------------------------------------------------------
+@pytest.fixture
+def packDir(tmp_path):
+	""" Source files of a small pack: a content dir and a loose file. """
+
+	contentDir = tmp_path / 'src' / 'Content'
+	(contentDir / 'Meshes').mkdir(parents=True)
+	(contentDir / 'Textures').mkdir()
+	(contentDir / 'Meshes' / 'SM_Rock.uasset').write_bytes(b'rock' * 1000)
+	(contentDir / 'Textures' / 'T_Rock_D.uasset').write_bytes(b'texture' * 500)
+	(contentDir / 'Textures' / 'T_Rock_N.uasset').write_bytes(b'normal' * 300)
+	(tmp_path / 'src' / 'manifest.json').write_text('{}')
+	return tmp_path / 'src'
+
+#-
+def _getRoots(packDir) -> list[tuple[str, str]]:
+	return [('Pack/Content', str(packDir / 'Content')), ('Pack/manifest.json', str(packDir / 'manifest.json'))]
+
+#---
+# members
+
+def test_iterMembersOrder(packDir):
+	members = list(ArchiveWriter.iterMembers(_getRoots(packDir)))
+	assert [archivePath for archivePath, _ in members] == [
+		'Pack/Content/Meshes/SM_Rock.uasset',
+		'Pack/Content/Textures/T_Rock_D.uasset',
+		'Pack/Content/Textures/T_Rock_N.uasset',
+		'Pack/manifest.json',
+	]
+	assert members[0][1] == os.path.join(packDir, 'Content', 'Meshes', 'SM_Rock.uasset')
+
+#-
+def test_iterMembersFilter(packDir):
+	memberFilter = {'Pack/Content/Textures/T_Rock_N.uasset', 'Pack/manifest.json'}
+	members = list(ArchiveWriter.iterMembers(_getRoots(packDir), memberFilter))
+	assert [archivePath for archivePath, _ in members] == sorted(memberFilter)
+
+#---
+# writing
+
+def test_writeZip(packDir, tmp_path):
+	outputPath = tmp_path / 'Pack.zip'
+	writer = ArchiveWriter(outputPath)
+	writer.write(_getRoots(packDir))
+
+	with ZipFile(outputPath) as archive:
+		assert archive.namelist() == [archivePath for archivePath, _ in ArchiveWriter.iterMembers(_getRoots(packDir))]
+		assert archive.read('Pack/Content/Meshes/SM_Rock.uasset') == b'rock' * 1000
+	assert writer.memberCount == 4
+	assert not os.path.exists(str(outputPath) + '.partial')
+
+#---
+# formats
+
+def _readMembers(archivePath, archiveFormat: str) -> dict[str, bytes]:
+	if archiveFormat != 'tar.zst':
+		with ZipFile(archivePath) as archive:
+			return {name: archive.read(name) for name in archive.namelist()}
+
+	zstandard = pytest.importorskip('zstandard')
+	with open(archivePath, 'rb') as file, zstandard.ZstdDecompressor().stream_reader(file) as decompressedStream:
+		with tarfile.open(fileobj=decompressedStream, mode='r|') as archive:
+			return {member.name: archive.extractfile(member).read() for member in archive}
+
+#-
+# every format, the ones needing a newer python / missing packages are skipped
+FORMAT_REQUIREMENTS = {'zip (zstd)': 'python 3.14+', 'tar.zst': 'zstandard'}
+ALL_FORMATS = [
+	pytest.param(archiveFormat, marks=pytest.mark.skipif(archiveFormat not in ArchiveWriter.getAvailableFormats(), reason=f'{archiveFormat} requires {FORMAT_REQUIREMENTS.get(archiveFormat)}'))
+	for archiveFormat in ARCHIVE_FORMATS
+]
+
+@pytest.mark.parametrize('archiveFormat', ALL_FORMATS)
+def test_writeEveryFormat(packDir, tmp_path, archiveFormat):
+	for preset in ArchiveWriter.getPresets(archiveFormat):
+		outputPath = tmp_path / f'Pack_{preset}{ArchiveWriter.getExtension(archiveFormat)}'
+		ArchiveWriter(outputPath, archiveFormat, preset).write(_getRoots(packDir))
+
+		members = _readMembers(outputPath, archiveFormat)
+		assert sorted(members) == [archivePath for archivePath, _ in ArchiveWriter.iterMembers(_getRoots(packDir))]
+		assert members['Pack/Content/Textures/T_Rock_D.uasset'] == b'texture' * 500
+
+#-
+def test_invalidFormatOrPreset(tmp_path):
+	with pytest.raises(ValueError):
+		ArchiveWriter(tmp_path / 'Pack.7z', '7z')
+	with pytest.raises(ValueError):
+		ArchiveWriter(tmp_path / 'Pack.zip', 'zip', 'ultra')
+
+#-
+def test_availableFormats():
+	availableFormats = ArchiveWriter.getAvailableFormats()
+	assert 'zip' in availableFormats
+	assert set(availableFormats) <= set(ARCHIVE_FORMATS)
+	assert ('zip (zstd)' in availableFormats) == (sys.version_info >= (3, 14))
+
+#---
+# reproducible builds
+
+@pytest.mark.parametrize('archiveFormat', ALL_FORMATS)
+def test_reproducibleIsByteIdentical(packDir, tmp_path, archiveFormat):
+	extension = ArchiveWriter.getExtension(archiveFormat)
+	firstWriter = ArchiveWriter(tmp_path / f'first{extension}', archiveFormat, reproducible=True)
+	firstWriter.write(_getRoots(packDir))
+
+	# same content, other timestamps / permissions
+	for dirPath, _, filenames in os.walk(packDir):
+		for filename in filenames:
+			os.utime(os.path.join(dirPath, filename), (1700000000, 1700000000))
+			os.chmod(os.path.join(dirPath, filename), 0o600)
+	secondWriter = ArchiveWriter(tmp_path / f'second{extension}', archiveFormat, reproducible=True)
+	secondWriter.write(_getRoots(packDir))
+
+	assert (tmp_path / f'first{extension}').read_bytes() == (tmp_path / f'second{extension}').read_bytes()
+	assert firstWriter.digest == secondWriter.digest
+	# so is the file manifest (no mtimes)
+	assert (tmp_path / f'first{extension}{FILE_MANIFEST_EXT}').read_bytes() == (tmp_path / f'second{extension}{FILE_MANIFEST_EXT}').read_bytes()
+
+#-
+def test_reproducibleZipMemberInfo(packDir, tmp_path):
+	outputPath = tmp_path / 'Pack.zip'
+	ArchiveWriter(outputPath, reproducible=True).write(_getRoots(packDir))
+
+	with ZipFile(outputPath) as archive:
+		for memberInfo in archive.infolist():
+			# same on every host
+			assert memberInfo.create_system == REPRODUCIBLE_CREATE_SYSTEM
+			assert memberInfo.date_time == time.gmtime(REPRODUCIBLE_EPOCH)[:6]
+			assert stat.S_IMODE(memberInfo.external_attr >> 16) == 0o644
+
+#-
+def test_writeDigest(packDir, tmp_path):
+	outputPath = tmp_path / 'Pack.zip'
+	writer = ArchiveWriter(outputPath)
+	writer.write(_getRoots(packDir))
+
+	# sha256sum -c format
+	assert writer.digest == hashlib.sha256(outputPath.read_bytes()).hexdigest()
+	assert (tmp_path / ('Pack.zip' + DIGEST_EXT)).read_text() == f'{writer.digest} *Pack.zip\n'
+
+#---
+# shards
+
+def test_planShardsBalancesSizes():
+	members = [('a', 100), ('b', 60), ('c', 50), ('d', 40), ('e', 10), ('f', 0)]
+	shards = ArchiveWriter.planShards(members, 2)
+
+	# every member exactly once, largest first to the smallest shard
+	assert sorted(archivePath for shard in shards for archivePath in shard) == ['a', 'b', 'c', 'd', 'e', 'f']
+	sizes = dict(members)
+	assert sorted(sum(sizes[archivePath] for archivePath in shard) for shard in shards) == [120, 140]
+	assert shards == ArchiveWriter.planShards(list(reversed(members)), 2)
+
+#-
+def test_planShardsMoreShardsThanMembers():
+	assert ArchiveWriter.planShards([('b', 5), ('a', 5)], 3) == [['a'], ['b'], []]
+
+#-
+def test_writeShard(packDir, tmp_path):
+	members = [(archivePath, os.path.getsize(sourcePath)) for archivePath, sourcePath in ArchiveWriter.iterMembers(_getRoots(packDir))]
+	shards = ArchiveWriter.planShards(members, 2)
+	shardManifestPath = tmp_path / 'Pack.shards.json'
+	shardManifestPath.write_text(json.dumps({'shards': [{'members': shard} for shard in shards]}))
+
+	extractedMembers = {}
+	for shardIndex, shard in enumerate(shards):
+		writer = ArchiveWriter(tmp_path / f'Pack.part{shardIndex + 1:02d}.zip')
+		writer.setShard(shardManifestPath, shardIndex)
+		writer.write(_getRoots(packDir))
+		shardMembers = _readMembers(writer.outputPath, 'zip')
+		assert sorted(shardMembers) == shard
+		extractedMembers.update(shardMembers)
+
+	# extracting all shards gives the complete pack
+	assert sorted(extractedMembers) == sorted(archivePath for archivePath, _ in members)
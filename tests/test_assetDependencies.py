@@ -0,0 +1,62 @@
+from assetDependencies import AssetDependencyGraph
+import pytest
+import os
+
+#---------------------------------------------------------------------------------------------------
+@pytest.fixture
+def assetsPath(tmp_path, writePackage):
+	""" Pack where a map uses a mesh, which uses a material, which soft references a texture. """
+
+	assetsPath = tmp_path / 'Pack'
+	writePackage(assetsPath / 'Maps' / 'L_Main.umap', ['/Game/Pack/Meshes/SM_Rock'])
+	writePackage(assetsPath / 'Meshes' / 'SM_Rock.uasset', ['/Game/Pack/Materials/M_Rock', '/Engine/BasicShapes/Cube'])
+	(assetsPath / 'Meshes' / 'SM_Rock.uexp').write_bytes(b'mesh data')
+	writePackage(assetsPath / 'Materials' / 'M_Rock.uasset', softReferences=['/Game/Pack/Textures/T_Soft'])
+	writePackage(assetsPath / 'Textures' / 'T_Soft.uasset')
+	writePackage(assetsPath / 'Textures' / 'T_Unused.uasset')
+	(assetsPath / 'Textures' / 'T_Unused.ubulk').write_bytes(b'bulk' * 10)
+	(assetsPath / 'README.txt').write_text('readme')
+	return assetsPath
+
+#---------------------------------------------------------------------------------------------------
+def test_readPackageHeader(assetsPath):
+	importedNames, nameMap = AssetDependencyGraph.readPackageHeader(assetsPath / 'Meshes' / 'SM_Rock.uasset')
+	assert importedNames == {'/Game/Pack/Materials/M_Rock', '/Engine/BasicShapes/Cube'}
+	assert nameMap[:2] == ['/Script/CoreUObject', 'Package']
+
+#-
+def test_readPackageHeaderRejectsOtherFiles(tmp_path):
+	(tmp_path / 'empty.uasset').write_bytes(b'')
+	(tmp_path / 'text.uasset').write_bytes(b'not a package at all')
+	with pytest.raises(ValueError):
+		AssetDependencyGraph.readPackageHeader(tmp_path / 'empty.uasset')
+	with pytest.raises(ValueError):
+		AssetDependencyGraph.readPackageHeader(tmp_path / 'text.uasset')
+
+#-
+def test_resolvePackageName(assetsPath):
+	graph = AssetDependencyGraph(assetsPath)
+	meshPath = os.path.join('Meshes', 'SM_Rock.uasset')
+
+	# mount point / parent dirs differ between projects
+	assert graph.resolvePackageName('/Game/Pack/Meshes/SM_Rock') == meshPath
+	assert graph.resolvePackageName('/Game/Marketplace/Pack/Meshes/SM_Rock') == meshPath
+	assert graph.resolvePackageName('/Engine/BasicShapes/Cube') == None
+
+#-
+def test_prune(assetsPath):
+	keptPaths, droppedPaths, droppedSize = AssetDependencyGraph(assetsPath).prune(['Maps/*.umap'])
+
+	assert keptPaths == {os.path.join(*path.split('/')) for path in ('Maps/L_Main.umap', 'Meshes/SM_Rock.uasset', 'Meshes/SM_Rock.uexp', 'Materials/M_Rock.uasset', 'Textures/T_Soft.uasset', 'README.txt')}
+	assert droppedPaths == [os.path.join('Textures', 'T_Unused.uasset'), os.path.join('Textures', 'T_Unused.ubulk')]
+	assert droppedSize == sum(os.path.getsize(assetsPath / relPath) for relPath in droppedPaths)
+
+#-
+def test_unreadableReachablePackage(assetsPath):
+	(assetsPath / 'Materials' / 'M_Rock.uasset').write_bytes(b'corrupted')
+	graph = AssetDependencyGraph(assetsPath)
+
+	with pytest.raises(ValueError, match='M_Rock'):
+		graph.getReachable(['Maps/*.umap'])
+	# not reachable from these roots, never read
+	assert graph.getReachable(['Textures/T_Soft.uasset']) >= {os.path.join('Textures', 'T_Soft.uasset')}
@@ -0,0 +1,68 @@
+from assetStore import AssetStore
+import hashlib
+import pytest
+import os
+
+#---------------------------------------------------------------------------------------------------
+@pytest.fixture
+def store(tmp_path):
+	return AssetStore(tmp_path / 'store')
+
+#-
+@pytest.fixture
+def sources(tmp_path):
+	""" Two packs sharing one identical asset. """
+
+	for packName in ('PackA', 'PackB'):
+		(tmp_path / packName).mkdir()
+		(tmp_path / packName / 'T_Shared_D.uasset').write_bytes(b'shared' * 100)
+	(tmp_path / 'PackA' / 'SM_Rock.uasset').write_bytes(b'rock')
+	(tmp_path / 'staging').mkdir()
+	return tmp_path
+
+#---------------------------------------------------------------------------------------------------
+def test_identicalContentIsStoredOnce(store, sources):
+	staging = sources / 'staging'
+	assert not store.stageFile(sources / 'PackA' / 'T_Shared_D.uasset', staging / 'a_shared')
+	assert not store.stageFile(sources / 'PackA' / 'SM_Rock.uasset', staging / 'a_rock')
+	# same content from another pack, already stored
+	assert store.stageFile(sources / 'PackB' / 'T_Shared_D.uasset', staging / 'b_shared')
+
+	assert (staging / 'b_shared').read_bytes() == b'shared' * 100
+	objectPath = store.getObjectPath(hashlib.blake2b(b'shared' * 100).hexdigest())
+	assert os.path.samefile(objectPath, staging / 'a_shared')
+	assert os.path.samefile(objectPath, staging / 'b_shared')
+
+	assert store.stagedCount == 3
+	assert store.storedBytes == 600 + 4
+	assert store.getBytesSaved() == 600
+
+#-
+def test_unchangedSourcesAreNotRehashed(store, sources):
+	staging = sources / 'staging'
+	store.stageFile(sources / 'PackA' / 'SM_Rock.uasset', staging / 'first')
+	store.stageFile(sources / 'PackA' / 'SM_Rock.uasset', staging / 'second')
+	assert store.hashedBytes == 4
+
+	# changed since, rehashed and stored again
+	(sources / 'PackA' / 'SM_Rock.uasset').write_bytes(b'rock v2')
+	assert not store.stageFile(sources / 'PackA' / 'SM_Rock.uasset', staging / 'third')
+	assert (staging / 'third').read_bytes() == b'rock v2'
+	assert store.hashedBytes == 4 + 7
+
+#-
+def test_indexIsMergedOnSave(store, sources, tmp_path):
+	store.stageFile(sources / 'PackA' / 'SM_Rock.uasset', sources / 'staging' / 'rock')
+	# another process sharing the store
+	otherStore = AssetStore(tmp_path / 'store')
+	otherStore.stageFile(sources / 'PackB' / 'T_Shared_D.uasset', sources / 'staging' / 'shared')
+
+	otherStore.saveIndex()
+	store.saveIndex()
+	assert set(AssetStore(tmp_path / 'store').index) == {os.path.abspath(sources / 'PackA' / 'SM_Rock.uasset'), os.path.abspath(sources / 'PackB' / 'T_Shared_D.uasset')}
+
+#-
+def test_formatSize():
+	assert AssetStore.formatSize(512) == '512 B'
+	assert AssetStore.formatSize(1536) == '1.5 KiB'
+	assert AssetStore.formatSize(3 * 1024 ** 4) == '3072.0 GiB'
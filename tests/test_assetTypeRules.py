@@ -0,0 +1,67 @@
+from assetTypeRules import AssetTypeRules
+import pytest
+import json
+import re
+
+#---------------------------------------------------------------------------------------------------
+@pytest.mark.parametrize('pattern, matching, notMatching', [
+	('*.uasset',             ['SM_Rock.uasset'],                                   ['Meshes/SM_Rock.uasset']),
+	('Props/**/*_D.uasset',  ['Props/T_D.uasset', 'Props/Rocks/Big/T_Rock_D.uasset'], ['Props/T_Rock_N.uasset', 'Other/T_Rock_D.uasset']),
+	('**/Legacy/*',          ['Legacy/a', 'Meshes/Legacy/b'],                        ['Legacy/Sub/c']),
+	('Props/**',             ['Props/a', 'Props/Sub/b'],                             ['Other/Props/a']),
+	('T_?.uasset',           ['T_A.uasset'],                                        ['T_AB.uasset', 'T_/.uasset']),
+	('T_[ND].uasset',        ['T_N.uasset', 'T_D.uasset'],                          ['T_R.uasset']),
+	('T_[!ND].uasset',       ['T_R.uasset'],                                        ['T_N.uasset']),
+	('T_(1)+.uasset',        ['T_(1)+.uasset'],                                     ['T_11.uasset']),
+])
+def test_globToRegex(pattern, matching, notMatching):
+	regex = re.compile(AssetTypeRules()._globToRegex(pattern))
+	for path in matching:
+		assert regex.fullmatch(path), path
+	for path in notMatching:
+		assert not regex.fullmatch(path), path
+
+#-
+def test_matchKinds():
+	rules = AssetTypeRules([
+		{'kind': 'dir',   'pattern': 'Legacy\\Textures/', 'type': 'Texture'},
+		{'kind': 'glob',  'pattern': 'Props/**/*_D.uasset', 'type': 'Texture'},
+		{'kind': 'regex', 'pattern': r'Meshes/.*_LOD(?P<lod>\d)\.uasset', 'type': 'Static Mesh'},
+	])
+
+	assert rules.match('Legacy/Textures/Rock.uasset') == 'Texture'
+	assert rules.match('legacy/textures/Sub/Rock.uasset') == 'Texture'
+	assert rules.match('Legacy/TexturesOld/Rock.uasset') == None
+	assert rules.match('Props\\Rocks\\Rock_d.uasset') == 'Texture'
+	assert rules.match('Meshes/Rock_LOD0.uasset') == 'Static Mesh'
+	# regex rules are case sensitive and full matches
+	assert rules.match('meshes/Rock_LOD0.uasset') == None
+	assert rules.match('Meshes/Rock_LOD0.uasset.bak') == None
+
+#-
+def test_firstMatchingRuleWins():
+	rules = AssetTypeRules()
+	rules.addRule('glob', '**/*.uasset', 'Blueprint')
+	rules.addRule('dir', 'Textures', 'Texture')
+	assert rules.match('Textures/Rock.uasset') == 'Blueprint'
+	assert AssetTypeRules().match('Textures/Rock.uasset') == None
+
+#-
+def test_invalidRules():
+	rules = AssetTypeRules()
+	with pytest.raises(ValueError):
+		rules.addRule('prefix', 'T_', 'Texture')
+	with pytest.raises(ValueError):
+		rules.addRule('regex', 'Meshes/(unclosed', 'Static Mesh')
+	assert rules.rules == []
+
+#-
+def test_loadSave(tmp_path):
+	rulesPath = tmp_path / 'assetTypeRules.json'
+	rules = AssetTypeRules.load(rulesPath)
+	assert rules.rules == []
+
+	rules.addRule('dir', 'Legacy', 'Texture')
+	rules.save()
+	assert json.loads(rulesPath.read_text()) == [{'kind': 'dir', 'pattern': 'Legacy', 'type': 'Texture'}]
+	assert AssetTypeRules.load(rulesPath).match('Legacy/Rock.uasset') == 'Texture'
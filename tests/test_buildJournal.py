@@ -0,0 +1,105 @@
+from buildJournal import BuildJournal
+import pytest
+import json
+import os
+
+#---------------------------------------------------------------------------------------------------
+@pytest.fixture
+def files(tmp_path):
+	""" A source asset, its staged copy and an archive output. """
+
+	(tmp_path / 'SM_Rock.uasset').write_bytes(b'rock')
+	(tmp_path / 'staging').mkdir()
+	(tmp_path / 'staging' / 'SM_Rock.uasset').write_bytes(b'rock')
+	(tmp_path / 'Pack.zip').write_bytes(b'archive')
+	(tmp_path / 'Pack.zip.sha256').write_text('digest')
+	return tmp_path
+
+#-
+def _recordBuild(journalPath, files) -> None:
+	""" A build that staged a file, finished a phase and an output, then crashed. """
+
+	journal = BuildJournal(journalPath)
+	assert not journal.open('key1', resume=True)
+	journal.recordStagedFile(files / 'SM_Rock.uasset', files / 'staging' / 'SM_Rock.uasset')
+	journal.recordPhase('staging')
+	journal.recordOutput([files / 'Pack.zip', files / 'Pack.zip.sha256'], 'inputs1')
+	journal.close()
+
+#---------------------------------------------------------------------------------------------------
+def test_resumeReplaysRecords(files):
+	journalPath = files / 'Pack.journal'
+	_recordBuild(journalPath, files)
+
+	journal = BuildJournal(journalPath)
+	assert journal.open('key1', resume=True)
+	assert journal.isFileStaged(files / 'SM_Rock.uasset', files / 'staging' / 'SM_Rock.uasset')
+	assert journal.isPhaseDone('staging')
+	assert not journal.isPhaseDone('archive')
+	assert journal.isOutputDone([files / 'Pack.zip', files / 'Pack.zip.sha256'], 'inputs1')
+	# other inputs, made from other content
+	assert not journal.isOutputDone([files / 'Pack.zip', files / 'Pack.zip.sha256'], 'inputs2')
+	journal.close()
+
+#-
+def test_otherBuildStartsOver(files):
+	journalPath = files / 'Pack.journal'
+	_recordBuild(journalPath, files)
+
+	journal = BuildJournal(journalPath)
+	assert not journal.open('key2', resume=True)
+	assert not journal.isPhaseDone('staging')
+	journal.close()
+	with open(journalPath) as file:
+		assert [json.loads(line)['type'] for line in file] == ['build']
+
+#-
+def test_changedFilesAreNotTrusted(files):
+	journalPath = files / 'Pack.journal'
+	_recordBuild(journalPath, files)
+	(files / 'SM_Rock.uasset').write_bytes(b'rock v2')
+	(files / 'Pack.zip').write_bytes(b'truncated')
+
+	journal = BuildJournal(journalPath)
+	journal.open('key1', resume=True)
+	assert not journal.isFileStaged(files / 'SM_Rock.uasset', files / 'staging' / 'SM_Rock.uasset')
+	assert not journal.isOutputDone([files / 'Pack.zip', files / 'Pack.zip.sha256'], 'inputs1')
+	journal.close()
+
+#-
+def test_damagedRecordIsDropped(files):
+	journalPath = files / 'Pack.journal'
+	_recordBuild(journalPath, files)
+	# crashed while writing the next record
+	with open(journalPath, 'a') as file:
+		file.write('{"type": "phase", "na')
+
+	journal = BuildJournal(journalPath)
+	assert journal.open('key1', resume=True)
+	journal.recordPhase('archive')
+	journal.close()
+
+	with open(journalPath) as file:
+		records = [json.loads(line) for line in file]
+	assert [record['type'] for record in records] == ['build', 'file', 'phase', 'output', 'phase']
+	assert records[-1]['name'] == 'archive'
+
+#-
+def test_unvisitedFiles(files):
+	journalPath = files / 'Pack.journal'
+	_recordBuild(journalPath, files)
+	(files / 'staging' / 'T_Old.uasset').write_bytes(b'old')
+	(files / 'T_Old.uasset').write_bytes(b'old')
+
+	journal = BuildJournal(journalPath)
+	journal.open('key1', resume=True)
+	journal.recordStagedFile(files / 'T_Old.uasset', files / 'staging' / 'T_Old.uasset')
+	journal.close()
+
+	# the source of T_Old was deleted since, this run doesn't stage it
+	journal = BuildJournal(journalPath)
+	journal.open('key1', resume=True)
+	journal.isFileStaged(files / 'SM_Rock.uasset', files / 'staging' / 'SM_Rock.uasset')
+	assert journal.getUnvisitedFiles() == [os.path.abspath(files / 'staging' / 'T_Old.uasset')]
+	journal.discard()
+	assert not journalPath.exists()
@@ -0,0 +1,88 @@
+from buildMetrics import BuildMetrics, DURATION_BUCKETS
+import pytest
+import json
+
+#---------------------------------------------------------------------------------------------------
+def _readEvents(path):
+	return [json.loads(line) for line in path.read_text().splitlines()]
+
+#-
+def test_events(tmp_path):
+	eventsPath = tmp_path / 'events.jsonl'
+	metrics = BuildMetrics(eventsPath, labels={'pack': 'My Pack'})
+
+	with metrics.phase('copyAssets'):
+		pass
+	with pytest.raises(KeyError):
+		with metrics.phase('writeManifest'):
+			raise KeyError()
+	with metrics.phase('pollJobs', recordEvents=False):
+		pass
+	metrics.jobSpawned(42, 'copy')
+	metrics.jobExited(42, 'copy', 1, False, 'timeout')
+	metrics.addBytes('copied', 100)
+	metrics.addBytes('compressed', 40)
+	metrics.cacheLookup('assetStore', True)
+	metrics.cacheLookup('assetStore', False)
+	metrics.cacheLookup('assetStore', False)
+	metrics.close('failed')
+
+	events = _readEvents(eventsPath)
+	assert [event['event'] for event in events] == ['build_start', 'phase_start', 'phase_end', 'phase_start', 'phase_end', 'job_spawn', 'job_exit', 'bytes_compressed', 'build_end']
+	assert {event['build'] for event in events} == {metrics.buildId}
+	assert all(event['pack'] == 'My Pack' and 'host' in event for event in events)
+
+	assert events[2]['phase'] == 'copyAssets' and events[2]['error'] == None
+	assert events[4]['phase'] == 'writeManifest' and events[4]['error'] == 'KeyError'
+	assert events[6]['cause'] == 'timeout' and events[6]['exitCode'] == 1 and events[6]['duration'] >= 0
+
+	buildEnd = events[-1]
+	assert buildEnd['result'] == 'failed'
+	assert buildEnd['totals'] == {
+		'builds_total': 1, 'jobs_total': 1, 'bytes_copied_total': 100, 'bytes_compressed_total': 40,
+		'cache_assetStore_hits': 1, 'cache_assetStore_misses': 2,
+	}
+	assert metrics.histograms['phase_duration_seconds'].keys() == {json.dumps({'phase': name}) for name in ('copyAssets', 'writeManifest', 'pollJobs')}
+
+#-
+def test_noEventsFile(tmp_path):
+	metrics = BuildMetrics(None)
+	metrics.emit('anything')
+	metrics.close('success')
+	assert list(tmp_path.iterdir()) == []
+
+#-
+def test_observeBuckets():
+	metrics = BuildMetrics(None)
+	metrics.observe('job_duration_seconds', 0.3, type='copy')
+	metrics.observe('job_duration_seconds', 7200, type='copy')
+
+	buckets = metrics.histograms['job_duration_seconds'][json.dumps({'type': 'copy'})]
+	# cumulative: 0.3 is in every bucket from 0.5, 7200 only in +Inf
+	assert buckets[:len(DURATION_BUCKETS)] == [0] + [1] * (len(DURATION_BUCKETS) - 1)
+	assert buckets[-2:] == [2, 7200.3]
+
+#-
+def test_textfileAccumulates(tmp_path):
+	textfilePath = tmp_path / 'unrealpackgen.prom'
+	for result in ('success', 'success', 'failed'):
+		metrics = BuildMetrics(None, textfilePath)
+		metrics.addBytes('copied', 10)
+		metrics.close(result)
+
+	text = textfilePath.read_text()
+	assert '# TYPE unrealpackgen_builds_total counter' in text
+	assert 'unrealpackgen_builds_total{result="success"} 2' in text
+	assert 'unrealpackgen_builds_total{result="failed"} 1' in text
+	assert 'unrealpackgen_bytes_copied_total 30' in text
+	assert 'unrealpackgen_build_duration_seconds_bucket{le="+Inf"} 3' in text
+	assert 'unrealpackgen_build_duration_seconds_count 3' in text
+	assert '# TYPE unrealpackgen_last_build_timestamp_seconds gauge' in text
+	# metrics without values are left out
+	assert 'cache_lookups_total' not in text
+	assert not any(path.name.endswith('.partial') for path in tmp_path.iterdir())
+
+#-
+def test_formatLabels():
+	assert BuildMetrics._formatLabels({}) == ''
+	assert BuildMetrics._formatLabels({'type': 'copy', 'pack': 'a"b\\c\nd'}) == '{pack="a\\"b\\\\c\\nd",type="copy"}'
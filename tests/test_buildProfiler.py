@@ -0,0 +1,90 @@
+from buildProfiler import BuildProfiler, profiledPhase
+import tracemalloc
+import pstats
+import pytest
+import os
+
+#---------------------------------------------------------------------------------------------------
+@pytest.fixture
+def profiler():
+	yield BuildProfiler()
+	tracemalloc.stop()
+
+#-
+def _allocate() -> list[bytes]:
+	return [bytes(1024) for _ in range(256)]
+
+#-
+class _Pipeline():
+	""" Minimal profiledPhase user, as DataManager. """
+
+	def __init__(self, profiler: BuildProfiler | None) -> None:
+		self.profiler = profiler
+		self.metrics = None
+
+	@profiledPhase('stage')
+	def stage(self) -> list[bytes]:
+		return self.pack() + _allocate()
+
+	@profiledPhase('pack')
+	def pack(self) -> list[bytes]:
+		return _allocate()
+
+#---------------------------------------------------------------------------------------------------
+def test_phaseRecordsAllocations(profiler):
+	with profiler.phase('stage'):
+		kept = _allocate()
+
+	assert profiler.callCounts == {'stage': 1}
+	assert profiler.peakSizes['stage'] >= 256 * 1024
+	assert sum(sizeDiff for sizeDiff, _ in profiler.allocations['stage'].values()) >= 256 * 1024
+	assert len(kept) == 256
+
+#-
+def test_nestedPhasesAreSeparate(profiler):
+	pipeline = _Pipeline(profiler)
+	pipeline.stage()
+	pipeline.pack()
+
+	assert profiler.callCounts == {'stage': 1, 'pack': 2}
+	assert profiler.phaseStack == []
+	# the inner phase's calls are not part of the outer one's profile
+	stageFunctions = {function for _, _, function in pstats.Stats(profiler.profiles['stage']).stats}
+	packFunctions = {function for _, _, function in pstats.Stats(profiler.profiles['pack']).stats}
+	assert '_allocate' in packFunctions
+	assert 'pack' not in stageFunctions
+
+#-
+def test_profiledPhaseWithoutProfiler():
+	assert len(_Pipeline(None).stage()) == 512
+	assert not tracemalloc.is_tracing()
+
+#-
+def test_writeReports(profiler, tmp_path):
+	_Pipeline(profiler).stage()
+	writtenPaths = profiler.writeReports(tmp_path / 'profile')
+
+	assert sorted(os.path.basename(path) for path in writtenPaths) == ['pack.allocations.txt', 'pack.pstats', 'stage.allocations.txt', 'stage.pstats']
+	report = (tmp_path / 'profile' / 'pack.allocations.txt').read_text()
+	assert report.startswith('phase: pack\ncalls: 1\n')
+	assert 'top 25 functions by cumulative time:' in report
+	pstats.Stats(str(tmp_path / 'profile' / 'stage.pstats'))
+
+#-
+def test_tracingStopsAfterOutermostPhase(profiler):
+	pipeline = _Pipeline(profiler)
+	with profiler.phase('build'):
+		pipeline.stage()
+		assert tracemalloc.is_tracing()
+	assert not tracemalloc.is_tracing()
+
+	# a second build traces again
+	pipeline.stage()
+	assert profiler.callCounts['stage'] == 2
+	assert not tracemalloc.is_tracing()
+
+#-
+def test_tracingStartedElsewhereIsLeftOn(profiler):
+	tracemalloc.start()
+	_Pipeline(profiler).stage()
+	assert tracemalloc.is_tracing()
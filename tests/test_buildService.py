@@ -0,0 +1,101 @@
+import buildService
+import threading
+import time
+import pytest
+
+#---------------------------------------------------------------------------------------------------
+@pytest.fixture
+def service(tmp_path):
+	# workers are not started, jobs are run by the tests
+	return buildService.BuildService(None, None, tmp_path / 'artifacts')
+
+#-
+def _failingDataManager(basePath, unrealPakPath):
+	raise FileNotFoundError('Unable to determine a valid path to UnrealPak.exe')
+
+#---------------------------------------------------------------------------------------------------
+def test_jobLogReadFrom():
+	log = buildService._JobLog()
+	log.write('first\n')
+	assert log.readFrom(0, timeout=0) == ('first\n', False)
+
+	# readers wait on new text
+	threading.Timer(0.05, lambda: log.write('second\n')).start()
+	assert log.readFrom(6, timeout=5) == ('second\n', False)
+
+	log.finish()
+	assert log.readFrom(13, timeout=5) == ('', True)
+
+#-
+def test_queueOrder(service):
+	lowJob = service.submit({'packName': 'low'}, priority=5)
+	firstJob = service.submit({'packName': 'first'})
+	secondJob = service.submit({'packName': 'second'})
+
+	queuedJobs = [service.jobQueue.get()[2] for _ in range(3)]
+	assert queuedJobs == [firstJob, secondJob, lowJob]
+
+#-
+def test_cancelQueuedJob(service):
+	job = service.submit({'packName': 'pack'})
+	service.cancel(job)
+
+	assert job.status == 'cancelled'
+	assert job.isFinished()
+	assert job.log.readFrom(0, timeout=0)[1]
+
+#-
+def test_finishedJobReleasesWorker(service, monkeypatch):
+	monkeypatch.setattr(buildService.HeadlessBuild, 'createDataManager', _failingDataManager)
+	job = service.submit({'packName': 'pack'})
+	service._runJob(job)
+
+	assert job.status == 'failed'
+	assert job.worker == None
+	assert 'UnrealPak.exe' in job.log.getvalue()
+
+#-
+def test_finishedJobsAreBounded(service, monkeypatch):
+	monkeypatch.setattr(buildService, 'MAX_FINISHED_JOBS', 2)
+	monkeypatch.setattr(buildService.HeadlessBuild, 'createDataManager', _failingDataManager)
+	queuedJob = service.submit({'packName': 'queued'})
+	finishedJobs = [service.submit({'packName': f'pack{i}'}) for i in range(4)]
+	for job in finishedJobs:
+		service._runJob(job)
+
+	# oldest finished jobs are dropped first, unfinished ones are kept
+	assert list(service.jobs) == [queuedJob.id, finishedJobs[2].id, finishedJobs[3].id]
+
+#-
+def test_shutdownWaitsOnRollback(service, monkeypatch):
+	rolledBackJobs = []
+	def _runJob(job):
+		# a build that takes a while to roll back once cancelled
+		job.status = 'running'
+		while not job.cancelRequested:
+			time.sleep(0.01)
+		time.sleep(0.3)
+		rolledBackJobs.append(job)
+		job.status = 'cancelled'
+	monkeypatch.setattr(service, '_runJob', _runJob)
+
+	service.startWorkers()
+	runningJob = service.submit({'packName': 'running'})
+	while runningJob.status != 'running':
+		time.sleep(0.01)
+	queuedJob = service.submit({'packName': 'queued'})
+
+	assert service.shutdown(timeout=10)
+	assert rolledBackJobs == [runningJob]
+	assert queuedJob.status == 'cancelled'
+	assert not any(thread.is_alive() for thread in service.workerThreads)
+
+#-
+def test_shutdownTimeout(service, monkeypatch, capsys):
+	monkeypatch.setattr(service, '_runJob', lambda job: time.sleep(1.0))
+	service.startWorkers()
+	service.submit({'packName': 'stuck'})
+	time.sleep(0.1)
+
+	assert not service.shutdown(timeout=0.1)
+	assert 'still rolling back' in capsys.readouterr().out
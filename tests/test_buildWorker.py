@@ -0,0 +1,155 @@
+from dataManager import DataManager, BuildCancelledError
+from buildMetrics import BuildMetrics
+import buildWorker
+import json
+import pytest
+import time
+import sys
+import io
+import os
+
+#---------------------------------------------------------------------------------------------------
+class _FakeDataManager():
+	""" Stands in for DataManager, the build pipeline is driven by BuildWorker only through these. """
+
+	def __init__(self, createPackError: Exception | None = None, cancelError: Exception | None = None, jobPolls: int = 1) -> None:
+		self.onProgressFuncs = []
+		self.logStream = io.StringIO()
+		self.createPackError = createPackError
+		self.cancelError = cancelError
+		self.remainingPolls = jobPolls
+		self.cancelRequested = False
+		self.buildResult = None
+		self.calls = []
+
+	def generateFileData(self):
+		self.calls.append('generateFileData')
+		for func in self.onProgressFuncs:
+			func('Staging assets', 0.5)
+
+	def createPack(self, *exportOptions):
+		self.calls.append(('createPack', exportOptions))
+		if self.createPackError != None:
+			raise self.createPackError
+
+	def pollJobs(self):
+		self.remainingPolls -= 1
+		return (max(self.remainingPolls, 0), 0)
+
+	waitOnJobs = DataManager.waitOnJobs
+
+	def checkCancelled(self):
+		if self.cancelRequested:
+			raise BuildCancelledError()
+
+	def requestCancel(self):
+		self.cancelRequested = True
+
+	def cancel(self):
+		self.calls.append('cancel')
+		if self.cancelError != None:
+			raise self.cancelError
+
+	def getFailedJobTypes(self):
+		return None
+
+	def recordBuildResult(self, result):
+		self.buildResult = result
+
+	def recordBuild(self):
+		self.calls.append('recordBuild')
+
+#-
+def _runWorker(dataManager: _FakeDataManager) -> list:
+	worker = buildWorker.BuildWorker(dataManager, True, False, False, pollInterval=0.01)
+	worker.start()
+	worker.join(5)
+	assert not worker.is_alive()
+	assert dataManager.onProgressFuncs == []
+	return worker.getEvents()
+
+#---------------------------------------------------------------------------------------------------
+def test_successfulBuild():
+	dataManager = _FakeDataManager(jobPolls=3)
+	events = _runWorker(dataManager)
+
+	assert ('phase', ('Staging assets', 0.5)) in events
+	assert ('jobs', (0, 0)) in events
+	assert events[-1] == ('done', None)
+	assert dataManager.calls == ['generateFileData', ('createPack', (True, False, False)), 'recordBuild']
+	assert dataManager.buildResult == 'success'
+
+#-
+def test_jobPollingIsOnePhase(tmp_path):
+	dataManager = _FakeDataManager(jobPolls=3)
+	dataManager.metrics = BuildMetrics(tmp_path / 'events.jsonl')
+	events = _runWorker(dataManager)
+	dataManager.metrics.close('success')
+
+	assert [data for eventType, data in events if eventType == 'jobs'] == [(2, 0), (1, 0), (0, 0)]
+	# the whole wait is timed once, not every poll
+	phaseEvents = [json.loads(line) for line in (tmp_path / 'events.jsonl').read_text().splitlines() if '"phase_' in line]
+	assert [(event['event'], event['phase']) for event in phaseEvents] == [('phase_start', 'jobPolling'), ('phase_end', 'jobPolling')]
+	# observation count, before the duration sum
+	assert dataManager.metrics.histograms['phase_duration_seconds'][json.dumps({'phase': 'jobPolling'})][-2] == 1
+
+#-
+def test_failedBuildIsRolledBack():
+	error = OSError('disk full')
+	dataManager = _FakeDataManager(createPackError=error)
+	events = _runWorker(dataManager)
+
+	assert events[-1] == ('error', error)
+	assert 'cancel' in dataManager.calls
+	assert 'recordBuild' not in dataManager.calls
+	assert dataManager.buildResult == 'error'
+
+#-
+def test_cancelledBuild():
+	dataManager = _FakeDataManager(jobPolls=1000)
+	dataManager.requestCancel()
+	events = _runWorker(dataManager)
+
+	assert events[-1] == ('cancelled', None)
+	assert 'cancel' in dataManager.calls
+	assert dataManager.buildResult == 'cancelled'
+
+#-
+def test_failedRollbackStillPostsFinalEvent():
+	rollbackError = PermissionError('output locked')
+	dataManager = _FakeDataManager(createPackError=OSError('disk full'), cancelError=rollbackError)
+	events = _runWorker(dataManager)
+
+	assert events[-1] == ('error', rollbackError)
+	assert [event for event in events if event[0] in ('done', 'cancelled', 'error')] == [('error', rollbackError)]
+	assert dataManager.buildResult == 'error'
+	assert 'rollback failed' in dataManager.logStream.getvalue()
+
+#-
+def test_cancelDuringFinalJob(dataManager, tmp_path):
+	""" The cancel kills the only job left, the worker must still roll back instead of committing. """
+
+	outputPath = tmp_path / 'output' / 'previous.zip'
+	outputPath.parent.mkdir()
+	outputPath.write_text('previous release')
+
+	dataManager.enableCatalog(tmp_path / 'catalog.db')
+	def _createPack(*exportOptions):
+		dataManager.claimOutputPath(outputPath)
+		dataManager.activateJob(dataManager.startJob(f'"{sys.executable}" -c "import time; time.sleep(30)"', tmp_path), 'archive')
+	dataManager.generateFileData = lambda: None
+	dataManager.createPack = _createPack
+
+	worker = buildWorker.BuildWorker(dataManager, True, False, False, pollInterval=0.05)
+	worker.start()
+	time.sleep(0.5)
+	worker.cancel()
+	worker.join(10)
+	assert not worker.is_alive()
+
+	assert worker.getEvents()[-1] == ('cancelled', None)
+	assert dataManager.buildResult == 'cancelled'
+	assert not os.path.exists(tmp_path / 'catalog.db')
+	dataManager.cleanup()
+	assert outputPath.read_text() == 'previous release'
+	assert os.listdir(outputPath.parent) == ['previous.zip']
@@ -0,0 +1,58 @@
+from customComponents import FileTypeListModel
+
+FILES = ['Props/T_Rock.uasset', 'Props/SM_Rock.uasset', 'Meshes/SM_Tree.uasset', 'Meshes/Sub/SM_Bush.uasset']
+
+#---------------------------------------------------------------------------------------------------
+def test_filter():
+	model = FileTypeListModel(FILES, 'Texture')
+	assert model.rows == [0, 1, 2, 3]
+
+	model.setFilter(' ROCK ')
+	assert model.rows == [0, 1]
+	model.setFilter('')
+	assert model.rows == [0, 1, 2, 3]
+
+#-
+def test_groupByDir():
+	model = FileTypeListModel(FILES, 'Texture')
+	model.setGroupByDir(True)
+	assert model.rows == ['Meshes', 2, 'Meshes/Sub', 3, 'Props', 0, 1]
+
+	model.toggleDir('Props')
+	assert model.rows == ['Meshes', 2, 'Meshes/Sub', 3, 'Props']
+	model.toggleDir('Props')
+	assert model.rows == ['Meshes', 2, 'Meshes/Sub', 3, 'Props', 0, 1]
+
+	# empty groups are hidden by the filter
+	model.setFilter('tree')
+	assert model.rows == ['Meshes', 2]
+
+#-
+def test_groupType():
+	model = FileTypeListModel(FILES, 'Texture')
+	model.setGroupByDir(True)
+	assert model.getGroupType('Props') == 'Texture'
+
+	model.setType(1, 'Static Mesh')
+	assert model.getGroupType('Props') == None
+
+	model.setGroupType('Props', 'Blueprint')
+	assert model.getGroupType('Props') == 'Blueprint'
+	assert model.types == ['Blueprint', 'Blueprint', 'Texture', 'Texture']
+	assert model.getAssignedTypes() == {'Blueprint', 'Texture'}
+
+	# only the files matching the filter are changed
+	model.setFilter('SM_')
+	model.setGroupType('Props', 'Static Mesh')
+	assert model.types == ['Blueprint', 'Static Mesh', 'Texture', 'Texture']
+
+#-
+def test_removeFilesKeepsTypes():
+	model = FileTypeListModel(FILES, 'Texture')
+	model.setType(2, 'Static Mesh')
+	model.setType(3, 'Blueprint')
+
+	model.removeFiles({'Props/SM_Rock.uasset'})
+	assert model.files == ['Props/T_Rock.uasset', 'Meshes/SM_Tree.uasset', 'Meshes/Sub/SM_Bush.uasset']
+	assert model.types == ['Texture', 'Static Mesh', 'Blueprint']
+	assert model.rows == [0, 1, 2]
@@ -0,0 +1,446 @@
+from dataManager import DataManager, BuildCancelledError
+from collections import OrderedDict
+from contextlib import closing
+from treeCopier import TreeCopier
+from fileLock import FileLock
+from shutil import copytree
+import threading
+import pytest
+import time
+import sys
+import os
+
+#---------------------------------------------------------------------------------------------------
+def _waitFor(condition, timeout: float = 5.0) -> bool:
+	""" Dirs are deleted in the background, wait for it. """
+
+	endTime = time.monotonic() + timeout
+	while not condition() and time.monotonic() < endTime:
+		time.sleep(0.05)
+	return condition()
+
+#---
+# tmp dir management
+
+def test_moveToTrash(dataManager, tmp_path):
+	dirPath = tmp_path / 'staging'
+	(dirPath / 'sub').mkdir(parents=True)
+
+	trashPath = dataManager.moveToTrash(dirPath)
+	assert not dirPath.exists()
+	assert os.path.basename(trashPath).startswith('unrealPackGen_trash_')
+	assert os.path.isdir(os.path.join(trashPath, 'sub'))
+
+#-
+def test_reclaimStaleDirs(makeDataManager, fakeEngineDir):
+	# left behind by a crashed run: unlocked tmp dir, trash dir
+	staleDir = fakeEngineDir / 'unrealPackGen_tmp_dead0000'
+	(staleDir / 'pack').mkdir(parents=True)
+	(staleDir.parent / 'unrealPackGen_tmp_dead0000.lock').write_text('')
+	trashDir = fakeEngineDir / 'unrealPackGen_trash_dead0000'
+	trashDir.mkdir()
+
+	# still owned by a running instance
+	liveDir = fakeEngineDir / 'unrealPackGen_tmp_live0000'
+	liveDir.mkdir()
+	liveLock = FileLock(str(liveDir) + '.lock')
+	assert liveLock.acquire(blocking=False)
+
+	try:
+		makeDataManager()
+		assert _waitFor(lambda: sorted(os.listdir(fakeEngineDir)) == ['Engine', 'unrealPackGen_tmp_live0000', 'unrealPackGen_tmp_live0000.lock'])
+	finally:
+		liveLock.release(removeFile=True)
+
+#---
+# cancellation / output rollback
+
+def test_rollbackRestoresClaimedPaths(dataManager, tmp_path):
+	existingPath = tmp_path / 'pack.zip'
+	existingPath.write_text('previous build')
+	newPath = tmp_path / 'pack.checksums'
+
+	dataManager.claimOutputPath(existingPath)
+	dataManager.claimOutputPath(newPath)
+	existingPath.write_text('partial')
+	newPath.write_text('partial')
+
+	dataManager.rollbackOutputs()
+	assert existingPath.read_text() == 'previous build'
+	assert not newPath.exists()
+	assert dataManager.claimedOutputPaths == {}
+
+#-
+def test_commitKeepsClaimedPaths(dataManager, tmp_path):
+	outputPath = tmp_path / 'output' / 'pack.zip'
+	outputPath.parent.mkdir()
+	outputPath.write_text('previous build')
+
+	dataManager.claimOutputPath(outputPath)
+	outputPath.write_text('new build')
+	dataManager.commitOutputs()
+
+	assert outputPath.read_text() == 'new build'
+	assert os.listdir(outputPath.parent) == ['pack.zip']
+
+#-
+def test_cancelKillsJobs(dataManager, tmp_path):
+	job = dataManager.startJob(f'"{sys.executable}" -c "import time; time.sleep(60)"', tmp_path)
+	dataManager.activateJob(job, 'copy')
+
+	assert dataManager.cancel(timeout=5)
+	assert job.poll() != None
+	assert dataManager.getActiveJobCount() == 0
+	with pytest.raises(BuildCancelledError):
+		dataManager.checkCancelled()
+
+#---
+# export options
+
+def test_setArchiveOptions(dataManager):
+	dataManager.setExportOptions(archiveFormat='zip (lzma)', archivePreset='small')
+	assert (dataManager.packInfo['packArchiveFormat'], dataManager.packInfo['packArchivePreset']) == ('zip (lzma)', 'small')
+
+	with pytest.raises(ValueError):
+		dataManager.setExportOptions(archiveFormat='7z')
+	with pytest.raises(ValueError):
+		dataManager.setExportOptions(archivePreset='ultra')
+
+#-
+def test_deltaBaseOption(dataManager, tmp_path):
+	# optional, never reported as missing
+	assert 'packDeltaBasePath' not in dataManager.getMissingPackInfo()
+
+	with pytest.raises(FileNotFoundError):
+		dataManager.setExportOptions(deltaBasePath=str(tmp_path / 'missing.files.json'))
+	(tmp_path / 'Pack.zip.files.json').write_text('{}')
+	dataManager.setExportOptions(deltaBasePath=str(tmp_path / 'Pack.zip.files.json'))
+	assert dataManager.packInfo['packDeltaBasePath'] == str(tmp_path / 'Pack.zip.files.json')
+	dataManager.setExportOptions(deltaBasePath='')
+	assert dataManager.packInfo['packDeltaBasePath'] == None
+
+#---
+# pruning
+
+def test_pruneAssets(dataManager, writePackage, tmp_path):
+	assetsPath = tmp_path / 'Pack'
+	writePackage(assetsPath / 'Maps' / 'L_Main.umap', ['/Game/Pack/Meshes/SM_Rock'])
+	writePackage(assetsPath / 'Meshes' / 'SM_Rock.uasset')
+	writePackage(assetsPath / 'Meshes' / 'SM_Unused.uasset')
+	(tmp_path / 'output').mkdir()
+
+	dataManager.setPackInfo(packName='My Pack', assetsPath=str(assetsPath), outputPath=str(tmp_path / 'output'))
+	dataManager.setExportOptions(pruneRoots=['Maps/*.umap'])
+	assert 'packPruneRoots' not in (dataManager.getMissingPackInfo() or [])
+	dataManager.pruneAssets()
+
+	assert dataManager.prunedRelPaths == {os.path.join('Meshes', 'SM_Unused.uasset')}
+	assert dataManager._ignorePrunedCB(str(assetsPath / 'Meshes'), ['SM_Rock.uasset', 'SM_Unused.uasset']) == ['SM_Unused.uasset']
+	report = (tmp_path / 'output' / 'My_Pack_pruned.txt').read_text().splitlines()
+	assert report[0].startswith('1 files dropped')
+	assert report[1].endswith('\t' + os.path.join('Meshes', 'SM_Unused.uasset'))
+
+#---
+# pak compression
+
+def test_pakCompressionArgs(dataManager):
+	assert dataManager.getPakCompressionArgs() == ''
+
+	dataManager.setExportOptions(pakCompressionMethod='Oodle', pakCompressionLevel='4', pakCompressionBlockSize='262144')
+	assert dataManager.getPakCompressionArgs() == '-compress -compressionformats=Oodle -compresslevel=4 -compressionblocksize=256KB'
+	assert dataManager.getPakCompressionArgs('Zlib', None, None) == '-compress -compressionformats=Zlib'
+
+	# '' resets to UnrealPak's defaults
+	dataManager.setExportOptions(pakCompressionLevel='', pakCompressionBlockSize='')
+	assert dataManager.getPakCompressionArgs() == '-compress -compressionformats=Oodle'
+
+#-
+def test_invalidPakCompressionOptions(dataManager):
+	with pytest.raises(ValueError):
+		dataManager.setExportOptions(pakCompressionMethod='Brotli')
+	with pytest.raises(ValueError):
+		dataManager.setExportOptions(pakCompressionBlockSize='1000')
+
+#-
+def test_assetTypeRulesBeforePrefix(dataManager):
+	assert dataManager.getAssetTypeForPath('Legacy/T_Rock.uasset') == 'Texture'
+	assert dataManager.getAssetTypeForPath('Legacy/Rock.uasset') == None
+
+	dataManager.addAssetTypeRule('dir', 'Legacy', 'Static Mesh')
+	assert dataManager.getAssetTypeForPath('Legacy/T_Rock.uasset') == 'Static Mesh'
+	assert dataManager.getAssetTypeForPath('Legacy/Rock.uasset') == 'Static Mesh'
+	assert dataManager.getAssetTypeForPath('Props/T_Rock.uasset') == 'Texture'
+
+#-
+def test_screenshotPaths(dataManager, tmp_path):
+	screenshotPaths = []
+	for name in ('a.png', 'b.png', 'c.png'):
+		(tmp_path / name).write_bytes(b'')
+		screenshotPaths.append(str(tmp_path / name))
+
+	dataManager.setPackInfo(screenshotPath=screenshotPaths[0], screenshotPaths=[screenshotPaths[1], str(tmp_path / 'missing.png'), screenshotPaths[2]])
+	assert dataManager.packInfo['packScrShotPaths'] == screenshotPaths
+
+	dataManager.setPackInfo(packName='My Pack')
+	assert dataManager.packInfo['packScrShotPaths'] == screenshotPaths
+
+	names = [dataManager.getFilenameFromPattern('screenshotFile', '{PACKNAME}_Screenshot{INDEX}{EXT}', path, index) for index, path in enumerate(screenshotPaths)]
+	assert names == ['My_Pack_Screenshot.png', 'My_Pack_Screenshot_2.png', 'My_Pack_Screenshot_3.png']
+
+#---
+# engine locks
+
+def test_concurrentBuildsUseOwnTmpDirs(makeDataManager, fakeEngineDir):
+	dataManagers = [makeDataManager(), makeDataManager()]
+	for dataManager in dataManagers:
+		dataManager.setPackInfo(packName='My Pack')
+		dataManager.generatePackFileStruct()
+
+	tmpDirs = [dataManager.tmpDir for dataManager in dataManagers]
+	assert tmpDirs[0] != tmpDirs[1]
+	assert all(os.path.dirname(tmpDir) == str(fakeEngineDir) for tmpDir in tmpDirs)
+
+	for dataManager in dataManagers:
+		dataManager.cleanup()
+	assert _waitFor(lambda: not any(os.path.exists(tmpDir) for tmpDir in tmpDirs))
+
+#-
+def test_engineLockWaitsOnOtherBuild(makeDataManager, fakeEngineDir):
+	enginePath = fakeEngineDir / 'FeaturePacks' / 'My_Pack.upack'
+	dataManager, otherDataManager = makeDataManager(), makeDataManager()
+
+	dataManager.lockEnginePath(enginePath)
+	# already held: no-op
+	dataManager.lockEnginePath(enginePath)
+	assert os.path.isfile(fakeEngineDir / 'unrealPackGen_locks' / 'FeaturePacks~My_Pack.upack.lock')
+
+	waiter = threading.Thread(target=otherDataManager.lockEnginePath, args=(enginePath,))
+	waiter.start()
+	time.sleep(0.3)
+	assert waiter.is_alive()
+
+	dataManager.releaseEngineLocks()
+	waiter.join(5.0)
+	assert not waiter.is_alive()
+	assert list(otherDataManager.engineLocks) == [str(enginePath)]
+	otherDataManager.releaseEngineLocks()
+
+	# other paths aren't blocked
+	dataManager.lockEnginePath(fakeEngineDir / 'Samples' / 'My_Pack')
+	otherDataManager.lockEnginePath(enginePath)
+	dataManager.releaseEngineLocks()
+	otherDataManager.releaseEngineLocks()
+
+#-
+def test_engineLockWaitCancels(makeDataManager, fakeEngineDir):
+	enginePath = fakeEngineDir / 'FeaturePacks' / 'My_Pack.upack'
+	dataManager, otherDataManager = makeDataManager(), makeDataManager()
+	dataManager.lockEnginePath(enginePath)
+
+	errors = []
+	def _lock():
+		try:
+			otherDataManager.lockEnginePath(enginePath)
+		except BuildCancelledError as error:
+			errors.append(error)
+
+	waiter = threading.Thread(target=_lock)
+	waiter.start()
+	time.sleep(0.3)
+	otherDataManager.requestCancel()
+	waiter.join(5.0)
+
+	assert not waiter.is_alive()
+	assert len(errors) == 1
+	assert otherDataManager.engineLocks == {}
+	dataManager.releaseEngineLocks()
+
+#---
+# install modes
+
+def test_installModes(dataManager):
+	assert dataManager.getInstallMode() == 'copy'
+	with pytest.raises(ValueError):
+		dataManager.setExportOptions(installMode='junction')
+
+	dataManager.setExportOptions(installMode='link')
+	assert dataManager.getInstallMode() == 'link'
+	# pruned packs can't be linked, the link would expose the unreferenced assets
+	dataManager.prunedRelPaths = ['Meshes/SM_Rock.uasset']
+	assert dataManager.getInstallMode() == 'mirror'
+
+#-
+def test_createDirLink(dataManager, tmp_path):
+	targetPath = tmp_path / 'assets'
+	targetPath.mkdir()
+	linkPath = tmp_path / 'UE' / 'Samples' / 'MyPack'
+	linkPath.parent.mkdir(parents=True)
+
+	assert not dataManager.isLink(targetPath)
+	assert not dataManager.isLink(linkPath)
+	dataManager.createDirLink(str(targetPath), str(linkPath))
+	assert dataManager.isLink(linkPath)
+	assert os.path.realpath(linkPath) == os.path.realpath(targetPath)
+
+#---
+# catalog
+
+def test_recordBuild(dataManager, tmp_path):
+	assetsDir = tmp_path / 'assets'
+	(assetsDir / 'Meshes').mkdir(parents=True)
+	(assetsDir / 'Meshes' / 'SM_Rock.uasset').write_bytes(b'rock')
+	(assetsDir / 'T_Rock.uasset').write_bytes(b'texture')
+	(assetsDir / 'readme.txt').write_bytes(b'readme')
+
+	dataManager.setPackInfo(packName='My Pack', version='1.0', assetsPath=str(assetsDir))
+	dataManager.enableCatalog(tmp_path / 'catalog.db')
+	dataManager.recordBuild()
+	# once per build
+	(assetsDir / 'T_Rock.uasset').write_bytes(b'TEXTURE!')
+	dataManager.recordBuild()
+
+	catalog = dataManager.getCatalog()
+	assert [(row['version'], row['asset_count'], row['total_size']) for row in catalog.listVersions('My Pack')] == [('1.0', 3, 17)]
+	assert [row['path'] for row in catalog.findAsset('T_Rock.uasset')] == ['T_Rock.uasset']
+
+	with closing(catalog.connect()) as connection:
+		assetTypes = dict(connection.execute('SELECT path, asset_type FROM assets').fetchall())
+	assert assetTypes == {'Meshes/SM_Rock.uasset': 'Static Mesh', 'T_Rock.uasset': 'Texture', 'readme.txt': None}
+
+#---
+# job watchdog
+
+def _pythonJob(code: str) -> str:
+	return f'"{sys.executable}" -u -c "{code}"'
+
+#-
+def _runJobs(dataManager, timeout: float = 10.0) -> None:
+	endTime = time.monotonic() + timeout
+	while dataManager.pollJobs(noStdOut=True) != (0, 0):
+		assert time.monotonic() < endTime, 'jobs still running'
+		time.sleep(0.05)
+
+#-
+def test_setJobLimits(makeDataManager):
+	dataManager = makeDataManager()
+	dataManager.setJobLimits('unrealpak', timeout=60, stallTimeout=None)
+	assert dataManager.jobLimits['unrealpak']['timeout'] == 60
+	assert dataManager.jobLimits['unrealpak']['stallTimeout'] == None
+	# per instance
+	assert makeDataManager().jobLimits['unrealpak']['timeout'] == 2 * 3600
+
+	with pytest.raises(ValueError):
+		dataManager.setJobLimits('zip', timeout=60)
+	with pytest.raises(ValueError):
+		dataManager.setJobLimits('unrealpak', memory=1024)
+	with pytest.raises(ValueError):
+		dataManager.setJobLimits('unrealpak', retryCount=-1)
+
+#-
+def test_timedOutJobIsKilledAndRetried(dataManager, tmp_path):
+	dataManager.setJobLimits('unrealpak', timeout=0.2, retryCount=1, retryDelay=0.0)
+	job = dataManager.startJob(_pythonJob('import time; time.sleep(60)'), tmp_path)
+	dataManager.activateJob(job, 'unrealpak')
+
+	startTime = time.monotonic()
+	_runJobs(dataManager)
+	assert time.monotonic() - startTime < 10
+	assert job.poll() != None
+	assert dataManager.getFailedJobCauses() == ['unrealpak: timed out after 0s (after 2 attempts)']
+
+#-
+def test_stalledJobIsKilled(dataManager, tmp_path):
+	dataManager.setJobLimits('robocopy', timeout=None, stallTimeout=0.5, retryCount=0)
+	job = dataManager.startJob(_pythonJob("print('copying'); import time; time.sleep(60)"), tmp_path)
+	dataManager.activateJob(job, 'robocopy')
+
+	_runJobs(dataManager)
+	assert dataManager.getFailedJobCauses() == ['robocopy: stalled, no output for 0s']
+
+#-
+def test_transientFailureRetried(dataManager, tmp_path):
+	dataManager.setJobLimits('copy', retryDelay=0.0)
+	# fails on its first attempt only (ie: a locked file)
+	job = dataManager.startJob(_pythonJob("import os, sys; exists = os.path.exists('attempted'); open('attempted', 'w').close(); sys.exit(0 if exists else 1)"), tmp_path)
+	dataManager.activateJob(job, 'copy')
+
+	_runJobs(dataManager)
+	assert job.returncode == 1
+	assert dataManager.getFailedJobCauses() == None
+
+#-
+def test_failureNotRetried(dataManager, tmp_path):
+	dataManager.setJobLimits('unrealpak', retryCount=3)
+	job = dataManager.startJob(_pythonJob('import sys; sys.exit(3)'), tmp_path)
+	dataManager.activateJob(job, 'unrealpak')
+
+	_runJobs(dataManager)
+	assert dataManager.getFailedJobCauses() == ['unrealpak: exit code 3']
+	assert dataManager.getFailedJobTypes() == ['unrealpak']
+
+#-
+def test_retryJobScheduling(dataManager, tmp_path):
+	dataManager.setJobLimits('copy', retryCount=3, retryDelay=10.0)
+	jobInfo = {'shellCmd': _pythonJob('pass'), 'cwd': tmp_path, 'journalOutput': None, 'attempt': 2, 'cause': None}
+
+	# the nth retry waits retryDelay * 2^(n-1)
+	assert dataManager.retryJob('copy', jobInfo, 'exit code 1')
+	assert dataManager.retryJobs[0][0] - time.monotonic() == pytest.approx(40.0, abs=1.0)
+	assert dataManager.getPendingJobCount() == 1
+	# not started before its delay
+	dataManager.pollPendingJobs()
+	assert dataManager.getActiveJobCount() == 0
+
+	# out of attempts
+	assert not dataManager.retryJob('copy', {**jobInfo, 'attempt': 3}, 'exit code 1')
+	# unrealpak failures are only transient when the watchdog killed it
+	assert not dataManager.retryJob('unrealpak', {**jobInfo, 'attempt': 0}, 'exit code 1')
+	assert dataManager.retryJob('unrealpak', {**jobInfo, 'attempt': 0, 'cause': 'timed out after 7200s'}, 'timed out after 7200s')
+
+	# cancelled builds aren't retried, the scheduled retries are dropped
+	assert dataManager.cancel(timeout=5)
+	assert not dataManager.retryJob('copy', {**jobInfo, 'attempt': 0}, 'exit code 1')
+	assert dataManager.getPendingJobCount() == 0
+
+#---
+# caches
+
+def test_scanCacheIsBounded(tmp_path, monkeypatch):
+	monkeypatch.setattr('dataManager.SCAN_CACHE_SIZE', 2)
+	monkeypatch.setattr(DataManager, '_scanCache', OrderedDict())
+	for name in ('a', 'b', 'c'):
+		(tmp_path / name).mkdir()
+		(tmp_path / name / f'{name}.uasset').write_bytes(b'')
+
+	DataManager.scanDir(tmp_path / 'a')
+	DataManager.scanDir(tmp_path / 'b')
+	# a is the most recently used, b gets evicted
+	assert DataManager.scanDir(tmp_path / 'a') == ([], ['a.uasset'])
+	DataManager.scanDir(tmp_path / 'c')
+	assert list(DataManager._scanCache) == [str(tmp_path / 'a'), str(tmp_path / 'c')]
+
+#-
+@pytest.mark.parametrize('installMode', ['copy', 'mirror'])
+def test_engineInstallManifest(dataManager, tmp_path, installMode):
+	assetsDir = tmp_path / 'assets'
+	(assetsDir / 'Meshes').mkdir(parents=True)
+	(assetsDir / 'Meshes' / 'SM_Rock.uasset').write_bytes(b'rock')
+
+	dataManager.setPackInfo(packName='My Pack', assetsPath=str(assetsDir))
+	dataManager.setExportOptions(installMode=installMode)
+	dataManager.generatePackFileStruct()
+	# staged assets, copy installs copy them from the tmp dir
+	copytree(assetsDir, dataManager.tmpFilePaths['assetFolder'][0], dirs_exist_ok=True)
+
+	if installMode == 'copy':
+		dataManager.copyContentToEngine()
+	else:
+		dataManager.mirrorContentToEngine()
+	_runJobs(dataManager)
+	assert dataManager.getFailedJobCauses() == None
+
+	manifestPath = dataManager.getEngineChecksumManifestPath()
+	relPaths = [relPath for _, relPath, _ in TreeCopier.readManifest(manifestPath)]
+	assert [relPath for relPath in relPaths if relPath.endswith('.uasset')] == [os.path.relpath(os.path.join(dataManager.getEngineAssetPath(), 'Meshes', 'SM_Rock.uasset'), os.path.dirname(manifestPath)).replace('\\', '/')]
+	assert all(failReason == None for _, failReason in TreeCopier.verify(manifestPath))
+	dataManager.cleanup()
@@ -0,0 +1,42 @@
+from fileLock import FileLock
+import os
+
+#---------------------------------------------------------------------------------------------------
+def test_lockIsExclusive(tmp_path):
+	lockPath = tmp_path / 'dir.lock'
+	firstLock = FileLock(lockPath)
+	secondLock = FileLock(lockPath)
+
+	assert firstLock.acquire(blocking=False)
+	assert not secondLock.acquire(blocking=False)
+	assert not secondLock.isLocked()
+
+	firstLock.release()
+	assert secondLock.acquire(blocking=False)
+	secondLock.release()
+
+#-
+def test_acquireTimesOut(tmp_path):
+	lockPath = tmp_path / 'dir.lock'
+	with FileLock(lockPath):
+		assert not FileLock(lockPath).acquire(timeout=0.2)
+
+#-
+def test_acquireIsReentrant(tmp_path):
+	lock = FileLock(tmp_path / 'dir.lock')
+	assert lock.acquire(blocking=False)
+	assert lock.acquire(blocking=False)
+	lock.release()
+	assert not lock.isLocked()
+
+#-
+def test_releaseRemovesFile(tmp_path):
+	lockPath = tmp_path / 'dir.lock'
+	lock = FileLock(lockPath)
+	lock.acquire()
+	assert os.path.exists(lockPath)
+
+	lock.release(removeFile=True)
+	assert not os.path.exists(lockPath)
+	# releasing twice is a no-op
+	lock.release(removeFile=True)
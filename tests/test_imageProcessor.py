@@ -0,0 +1,65 @@
+from imageProcessor import ImageProcessor
+from PIL import Image
+import pytest
+
+#---------------------------------------------------------------------------------------------------
+def _writeImage(path, size, color=(255, 0, 0)):
+	Image.new('RGB', size, color).save(path)
+	return str(path)
+
+#-
+def test_cropAndResizeImage():
+	# red | green | blue thirds, a square crop keeps the green center
+	image = Image.new('RGB', (300, 100), (255, 0, 0))
+	image.paste((0, 255, 0), (100, 0, 200, 100))
+	image.paste((0, 0, 255), (200, 0, 300, 100))
+
+	result = ImageProcessor.cropAndResizeImage(image, (50, 50))
+	assert result.size == (50, 50)
+	assert result.getpixel((5, 25)) == (0, 255, 0)
+	assert result.getpixel((44, 25)) == (0, 255, 0)
+
+	# wider target: crops the top & bottom
+	result = ImageProcessor.cropAndResizeImage(Image.new('RGB', (100, 100)), (40, 20))
+	assert result.size == (40, 20)
+
+#-
+def test_processImage(tmp_path):
+	sourcePath = _writeImage(tmp_path / 'source.png', (640, 480))
+	ImageProcessor.processImage(sourcePath, (400, 200), tmp_path / 'dest.jpg')
+
+	with Image.open(tmp_path / 'dest.jpg') as image:
+		assert image.size == (400, 200)
+		assert image.format == 'JPEG'
+
+#-
+def test_getDecodedPixelCount(tmp_path):
+	assert ImageProcessor.getDecodedPixelCount(_writeImage(tmp_path / 'source.png', (64, 32)), (16, 8)) == 64 * 32
+
+	# JPEGs are decoded at a reduced scale, still larger than the target size
+	jpegPath = _writeImage(tmp_path / 'source.jpg', (800, 800))
+	assert 100 * 100 <= ImageProcessor.getDecodedPixelCount(jpegPath, (100, 100)) < 800 * 800
+
+#-
+@pytest.mark.parametrize('workerCount, pixelBudget', [(1, 1), (2, 1), (2, 10**9)])
+def test_run(tmp_path, workerCount, pixelBudget):
+	images = []
+	for index in range(4):
+		sourcePath = _writeImage(tmp_path / f'source{index}.png', (100 + index * 10, 100))
+		images.append((sourcePath, (40, 20), str(tmp_path / f'dest{index}.png')))
+
+	# a budget smaller than any image still processes them, one at a time
+	ImageProcessor(workerCount, pixelBudget).run(images)
+
+	for _, _, destPath in images:
+		with Image.open(destPath) as image:
+			assert image.size == (40, 20)
+
+#-
+def test_runRaisesWorkerError(tmp_path):
+	images = [
+		(_writeImage(tmp_path / 'source.png', (100, 100)), (40, 20), str(tmp_path / 'dest.png')),
+		(_writeImage(tmp_path / 'source2.png', (100, 100)), (40, 20), str(tmp_path / 'missingDir' / 'dest.png')),
+	]
+	with pytest.raises(OSError):
+		ImageProcessor(2).run(images)
@@ -0,0 +1,73 @@
+from packAnalysis import PackAnalysis, SAMPLE_SIZE, SAMPLE_COUNT
+import json
+import csv
+import os
+
+#---------------------------------------------------------------------------------------------------
+class _FakeDataManager():
+	""" Stands in for DataManager, PackAnalysis only uses its packInfo, scanner and asset types. """
+
+	def __init__(self, assetsPath: str) -> None:
+		self.packInfo = {'packAssetsPath': assetsPath, 'packArchiveFormat': 'zip', 'packArchivePreset': 'balanced'}
+
+	def walkDir(self, top):
+		for dirPath, _, filenames in os.walk(top):
+			yield (dirPath, filenames)
+
+	def getAssetTypeForPath(self, relPath):
+		return {'SM_': 'Static Mesh', 'T_': 'Texture'}.get(os.path.basename(relPath).partition('_')[0] + '_')
+
+#-
+def _makePack(tmp_path) -> str:
+	assetsPath = tmp_path / 'Pack'
+	(assetsPath / 'Meshes' / 'Rocks').mkdir(parents=True)
+	(assetsPath / 'Textures').mkdir()
+	(assetsPath / 'Meshes' / 'Rocks' / 'SM_Rock.uasset').write_bytes(b'\0' * 1000)
+	(assetsPath / 'Meshes' / 'Rocks' / 'SM_Rock.uexp').write_bytes(b'\0' * 5000)
+	(assetsPath / 'Textures' / 'T_Rock_D.uasset').write_bytes(os.urandom(3000))
+	(assetsPath / 'Textures' / 'Rock_Legacy.uasset').write_bytes(b'\0' * 200)
+	(assetsPath / 'README.txt').write_bytes(b'readme')
+	return str(assetsPath)
+
+#---------------------------------------------------------------------------------------------------
+def test_breakdown(tmp_path):
+	analysis = PackAnalysis(_FakeDataManager(_makePack(tmp_path)), largestCount=2).run()
+	report = analysis.toDict()
+
+	assert (report['fileCount'], report['totalSize']) == (5, 9206)
+	# companion files count as their package's type
+	assert [(entry['type'], entry['size'], entry['files']) for entry in report['types']] == [('Static Mesh', 6000, 2), ('Texture', 3000, 1), ('Unknown', 200, 1), ('other (.txt)', 6, 1)]
+	dirSizes = {entry['dir']: (entry['size'], entry['files']) for entry in report['dirs']}
+	assert dirSizes == {'.': (9206, 5), 'Meshes': (6000, 2), 'Meshes/Rocks': (6000, 2), 'Textures': (3200, 2)}
+	assert [entry['path'] for entry in report['largestFiles']] == ['Meshes/Rocks/SM_Rock.uexp', 'Textures/T_Rock_D.uasset']
+	assert report['estimatedCompressedSize'] == None
+
+#-
+def test_compressionEstimate(tmp_path):
+	analysis = PackAnalysis(_FakeDataManager(_makePack(tmp_path)), estimateCompression=True).run()
+
+	# zeros compress well, random data doesn't
+	assert analysis.getEstimatedCompressedSize('Static Mesh') < 6000 / 10
+	assert analysis.getEstimatedCompressedSize('Texture') > 3000 * 0.9
+	assert analysis.toDict()['estimatedCompressedSize'] == sum(analysis.getEstimatedCompressedSize(assetType) for assetType in analysis.typeSizes)
+
+#-
+def test_largeFilesAreSampled(tmp_path):
+	(tmp_path / 'T_Huge.uasset').write_bytes(b'\0' * (SAMPLE_SIZE * SAMPLE_COUNT + 1))
+	analysis = PackAnalysis(_FakeDataManager(str(tmp_path)), estimateCompression=True)
+	sampledSize, _ = analysis._sampleFile(str(tmp_path / 'T_Huge.uasset'), SAMPLE_SIZE * SAMPLE_COUNT + 1, analysis._getSampleCompressor())
+	assert sampledSize == SAMPLE_SIZE * SAMPLE_COUNT
+
+#-
+def test_writeReports(tmp_path):
+	analysis = PackAnalysis(_FakeDataManager(_makePack(tmp_path))).run()
+	jsonPath, csvPath = analysis.writeReports(tmp_path, 'My_Pack')
+
+	assert os.path.basename(jsonPath) == 'My_Pack_sizes.json'
+	with open(jsonPath) as file:
+		assert json.load(file)['totalSize'] == 9206
+	with open(csvPath, newline='') as file:
+		rows = list(csv.reader(file))
+	assert rows[0] == ['kind', 'name', 'size', 'files', 'estimatedCompressedSize']
+	assert ['type', 'Static Mesh', '6000', '2', ''] in rows
+	assert analysis.getSummary().startswith('5 files, 9.0 KiB')
@@ -0,0 +1,82 @@
+from packCatalog import PackCatalog
+import itertools
+import pytest
+import os
+
+#---------------------------------------------------------------------------------------------------
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+	# versions are ordered by build time, keep it strictly increasing
+	clock = itertools.count(1000)
+	monkeypatch.setattr('packCatalog.time.time', lambda: next(clock))
+	return PackCatalog(tmp_path / 'catalog' / 'packs.db')
+
+#-
+def _packInfo(tmp_path, version, packName='My Pack'):
+	return {'packName': packName, 'packCleanName': packName.replace(' ', '_'), 'packVersion': version, 'packAssetsPath': str(tmp_path / 'assets'), 'packAssetTypes': {'Texture', 'Material'}}
+
+#-
+def _record(catalog, tmp_path, version, assets, packName='My Pack'):
+	artifacts = [(str(tmp_path / 'out' / f'{packName}_{version}.zip'), 'archive', 100)]
+	return catalog.recordVersion(_packInfo(tmp_path, version, packName), assets, artifacts, 'sha256', 'build-' + version)
+
+#---
+# recording
+
+def test_recordVersionReplacesSameVersion(catalog, tmp_path):
+	_record(catalog, tmp_path, '1.0', [('Meshes/SM_Rock.uasset', 10, 1, 'aa', 'Static Mesh')])
+	_record(catalog, tmp_path, '1.0', [('Meshes/SM_Rock.uasset', 12, 2, 'bb', 'Static Mesh'), ('T_Rock.uasset', 5, 3, 'cc', 'Texture')])
+
+	versions = catalog.listVersions('My Pack')
+	assert [(row['version'], row['asset_count'], row['total_size']) for row in versions] == [('1.0', 2, 17)]
+	assert catalog.findAsset('aa') == []
+
+#-
+def test_getKnownDigests(catalog, tmp_path):
+	_record(catalog, tmp_path, '1.0', [('Meshes/SM_Rock.uasset', 10, 1, 'aa', None)])
+	# a sibling dir sharing the prefix isn't under the assets dir
+	catalog.recordVersion(_packInfo(tmp_path, '1.0', 'Other') | {'packAssetsPath': str(tmp_path / 'assets2')}, [('T.uasset', 1, 1, 'dd', None)], [], 'sha256')
+
+	assetsDir = str(tmp_path / 'assets')
+	assert catalog.getKnownDigests(assetsDir, 'sha256') == {os.path.join(assetsDir, 'Meshes/SM_Rock.uasset'): (10, 1, 'aa')}
+	assert catalog.getKnownDigests(assetsDir, 'md5') == {}
+
+#---
+# queries
+
+def test_listVersions(catalog, tmp_path):
+	_record(catalog, tmp_path, '1.0', [('a.uasset', 1, 1, 'aa', None)])
+	_record(catalog, tmp_path, '1.0', [], 'Other Pack')
+	_record(catalog, tmp_path, '1.1', [('a.uasset', 1, 1, 'aa', None), ('b.uasset', 2, 1, 'bb', None)])
+
+	assert [(row['pack'], row['version'], row['asset_count'], row['total_size']) for row in catalog.listVersions()] == [('My Pack', '1.1', 2, 3), ('Other Pack', '1.0', 0, 0), ('My Pack', '1.0', 1, 1)]
+	assert [row['version'] for row in catalog.listVersions('My Pack')] == ['1.1', '1.0']
+	assert catalog.listVersions('Missing') == []
+
+#-
+def test_findAsset(catalog, tmp_path):
+	_record(catalog, tmp_path, '1.0', [('Meshes/SM_Rock.uasset', 10, 1, 'aa', None)])
+	_record(catalog, tmp_path, '1.1', [('Meshes/SM_Rock.uasset', 10, 2, 'bb', None)])
+	_record(catalog, tmp_path, '1.0', [('Shared/SM_Rock.uasset', 10, 1, 'aa', None)], 'Other Pack')
+
+	assert [tuple(row) for row in catalog.findAsset('Meshes\\SM_Rock.uasset')] == [('My Pack', '1.0', 'Meshes/SM_Rock.uasset', 'aa'), ('My Pack', '1.1', 'Meshes/SM_Rock.uasset', 'bb')]
+	assert [(row['pack'], row['path']) for row in catalog.findAsset('aa')] == [('My Pack', 'Meshes/SM_Rock.uasset'), ('Other Pack', 'Shared/SM_Rock.uasset')]
+
+#-
+def test_diffVersions(catalog, tmp_path):
+	_record(catalog, tmp_path, '1.0', [('kept.uasset', 1, 1, 'aa', None), ('changed.uasset', 1, 1, 'bb', None), ('removed.uasset', 1, 1, 'cc', None)])
+	# touched only (new mtime, same digest) isn't a change
+	_record(catalog, tmp_path, '1.1', [('kept.uasset', 1, 9, 'aa', None), ('changed.uasset', 1, 1, 'b2', None), ('added.uasset', 1, 1, 'dd', None)])
+
+	assert catalog.diffVersions('My Pack', '1.0', '1.1') == {'added': ['added.uasset'], 'removed': ['removed.uasset'], 'changed': ['changed.uasset']}
+	assert catalog.diffVersions('My Pack', '1.1', '1.0') == {'added': ['removed.uasset'], 'removed': ['added.uasset'], 'changed': ['changed.uasset']}
+	with pytest.raises(KeyError):
+		catalog.diffVersions('My Pack', '1.0', '2.0')
+	with pytest.raises(KeyError):
+		catalog.diffVersions('Other Pack', '1.0', '1.1')
+
+#-
+def test_formatRows(catalog, tmp_path):
+	assert PackCatalog.formatRows([]) == '(none)'
+	_record(catalog, tmp_path, '1.0', [('a.uasset', 1, 1, 'aa', None)])
+	assert PackCatalog.formatRows(catalog.findAsset('aa')) == 'pack\tversion\tpath\tdigest\nMy Pack\t1.0\ta.uasset\taa'
@@ -0,0 +1,139 @@
+from archiveWriter import ArchiveWriter, FILE_MANIFEST_EXT, DELTA_MANIFEST_NAME
+from packDelta import PackDelta
+from zipfile import ZipFile
+import hashlib
+import pytest
+import json
+import os
+
+#---------------------------------------------------------------------------------------------------
+@pytest.fixture
+def builds(tmp_path):
+	""" v1 of a pack built to a zip, then its sources edited into v2. Returns (sources dir, v1 zip path). """
+
+	sourceDir = tmp_path / 'src'
+	(sourceDir / 'Meshes').mkdir(parents=True)
+	for name, content in (('Meshes/SM_Rock.uasset', b'rock'), ('Meshes/SM_Tree.uasset', b'tree'), ('T_Touched.uasset', b'same'), ('T_Edited.uasset', b'old!'), ('T_Removed.uasset', b'gone')):
+		(sourceDir / name).write_bytes(content)
+		os.utime(sourceDir / name, (1600000000, 1600000000))
+
+	writer = ArchiveWriter(tmp_path / 'Pack.zip')
+	writer.packVersion = '1.0'
+	writer.write([('', str(sourceDir))])
+
+	# v2
+	(sourceDir / 'Meshes' / 'SM_Tree.uasset').write_bytes(b'bigger tree')
+	(sourceDir / 'T_Edited.uasset').write_bytes(b'new!')
+	os.utime(sourceDir / 'T_Touched.uasset', (1700000000, 1700000000))
+	os.unlink(sourceDir / 'T_Removed.uasset')
+	(sourceDir / 'T_Added.uasset').write_bytes(b'added')
+	return (sourceDir, tmp_path / 'Pack.zip')
+
+#-
+def _compare(basePath, sourceDir) -> PackDelta:
+	delta = PackDelta(basePath)
+	delta.compare(ArchiveWriter.iterMembers([('', str(sourceDir))]))
+	return delta
+
+#-
+def _readTree(dirPath) -> dict[str, bytes]:
+	return {path.relative_to(dirPath).as_posix(): path.read_bytes() for path in dirPath.rglob('*') if path.is_file()}
+
+#---
+# compare
+
+def test_fileManifest(builds):
+	sourceDir, zipPath = builds
+	fileManifest = json.loads(zipPath.with_name(zipPath.name + FILE_MANIFEST_EXT).read_text())
+
+	assert fileManifest['version'] == '1.0'
+	assert fileManifest['files']['T_Removed.uasset'] == {'size': 4, 'mtime_ns': 1600000000 * 1_000_000_000, 'blake2b': hashlib.blake2b(b'gone').hexdigest()}
+
+#-
+@pytest.mark.parametrize('baseExtension', [FILE_MANIFEST_EXT, ''])
+def test_compare(builds, baseExtension):
+	sourceDir, zipPath = builds
+	delta = _compare(str(zipPath) + baseExtension, sourceDir)
+
+	assert delta.added == ['T_Added.uasset']
+	assert delta.changed == ['Meshes/SM_Tree.uasset', 'T_Edited.uasset']
+	assert delta.removed == ['T_Removed.uasset']
+	assert sorted(delta.unchanged) == ['Meshes/SM_Rock.uasset', 'T_Touched.uasset']
+	# only the same size / other mtime files are hashed
+	assert delta.hashedCount == 2
+
+#-
+def test_compareReproducibleBase(tmp_path):
+	sourceDir = tmp_path / 'src'
+	sourceDir.mkdir()
+	(sourceDir / 'T_Rock.uasset').write_bytes(b'rock')
+	(sourceDir / 'T_Edited.uasset').write_bytes(b'old!')
+	ArchiveWriter(tmp_path / 'Pack.zip', reproducible=True).write([('', str(sourceDir))])
+	(sourceDir / 'T_Edited.uasset').write_bytes(b'new!')
+
+	# no mtimes to go by, same size files are hashed
+	delta = _compare(str(tmp_path / 'Pack.zip') + FILE_MANIFEST_EXT, sourceDir)
+	assert delta.changed == ['T_Edited.uasset']
+	assert delta.unchanged == ['T_Rock.uasset']
+	assert delta.hashedCount == 2
+
+#-
+def test_compareAlwaysChanged(builds):
+	sourceDir, zipPath = builds
+	delta = PackDelta(str(zipPath) + FILE_MANIFEST_EXT)
+	delta.compare(ArchiveWriter.iterMembers([('', str(sourceDir))]), alwaysChanged=['Meshes/SM_Rock.uasset', 'Pack.upack'])
+
+	assert 'Meshes/SM_Rock.uasset' in delta.changed
+	assert 'Pack.upack' in delta.added
+
+#-
+def test_unsupportedBase(tmp_path):
+	(tmp_path / 'Pack.rar').write_bytes(b'')
+	with pytest.raises(ValueError):
+		PackDelta(tmp_path / 'Pack.rar')
+
+#---
+# apply
+
+def test_applyRoundTrip(builds, tmp_path):
+	sourceDir, zipPath = builds
+	delta = _compare(str(zipPath) + FILE_MANIFEST_EXT, sourceDir)
+	deltaManifestPath = tmp_path / DELTA_MANIFEST_NAME
+	delta.writeManifest(deltaManifestPath, 'Pack', '2.0')
+
+	deltaWriter = ArchiveWriter(tmp_path / 'Pack.delta.zip')
+	deltaWriter.setDelta(deltaManifestPath)
+	deltaWriter.write([(DELTA_MANIFEST_NAME, str(deltaManifestPath)), ('', str(sourceDir))])
+	assert deltaWriter.memberCount == 1 + len(delta.added) + len(delta.changed)
+
+	# previous version, extracted
+	targetDir = tmp_path / 'installed'
+	with ZipFile(zipPath) as archive:
+		archive.extractall(targetDir)
+
+	deltaManifest = PackDelta.apply(tmp_path / 'Pack.delta.zip', targetDir)
+	assert (deltaManifest['fromVersion'], deltaManifest['toVersion']) == ('1.0', '2.0')
+	assert _readTree(targetDir) == _readTree(sourceDir)
+
+#-
+def test_applyRejectsPathsOutsideTarget(tmp_path):
+	targetDir = tmp_path / 'installed'
+	targetDir.mkdir()
+	with pytest.raises(ValueError):
+		PackDelta._getTargetPath(str(targetDir), '../outside.txt')
+
+	deltaPackPath = tmp_path / 'evil.delta.zip'
+	with ZipFile(deltaPackPath, 'w') as archive:
+		archive.writestr(DELTA_MANIFEST_NAME, json.dumps({'added': ['../outside.txt'], 'changed': [], 'removed': []}))
+		archive.writestr('../outside.txt', b'escaped')
+	with pytest.raises(ValueError):
+		PackDelta.apply(deltaPackPath, targetDir)
+	assert not (tmp_path / 'outside.txt').exists()
+
+#-
+def test_applyNeedsDeltaManifest(tmp_path):
+	deltaPackPath = tmp_path / 'Pack.zip'
+	with ZipFile(deltaPackPath, 'w') as archive:
+		archive.writestr('T_Rock_D.uasset', b'texture')
+	with pytest.raises(ValueError):
+		PackDelta.apply(deltaPackPath, tmp_path / 'installed')
@@ -0,0 +1,123 @@
+from dataManager import DataManager
+import packWatcher
+import pytest
+import os
+
+#---------------------------------------------------------------------------------------------------
+class _FakeDataManager():
+	""" Stands in for DataManager after the initial build, only what incremental updates use. """
+
+	def __init__(self, assetsPath: str, outputPath: str) -> None:
+		self.packInfo = {'packAssetsPath': assetsPath, 'packOutputPath': outputPath, 'packAssetTypes': set()}
+		self.prunedRelPaths = None
+		self.failedJobs = []
+		self.calls = []
+
+	def getAssetTypeForPath(self, relPath):
+		return 'Static Mesh' if os.path.basename(relPath).startswith('SM_') else None
+
+	def exportCompressedPack(self):
+		self.calls.append('exportCompressedPack')
+
+	def pollJobs(self):
+		return (0, 0)
+
+	waitOnJobs = DataManager.waitOnJobs
+
+	def getFailedJobTypes(self):
+		return None
+
+	def commitOutputs(self):
+		self.calls.append('commitOutputs')
+
+	def getChecksumManifestPath(self):
+		return os.path.join(self.packInfo['packOutputPath'], 'pack.checksums')
+
+	def cleanup(self):
+		self.calls.append('cleanup')
+
+#-
+@pytest.fixture
+def watcher(tmp_path):
+	assetsPath = tmp_path / 'assets'
+	(assetsPath / 'Meshes').mkdir(parents=True)
+	(assetsPath / 'Meshes' / 'SM_Rock.uasset').write_bytes(b'rock')
+	(assetsPath / 'Meshes' / 'SM_Tree.uasset').write_bytes(b'tree')
+	(tmp_path / 'output').mkdir()
+
+	watcher = packWatcher.PackWatcher(_FakeDataManager(str(assetsPath), str(tmp_path / 'output')), True, False, False)
+	# state left by initialBuild
+	watcher.snapshot = watcher._scan(watcher.assetsPath)
+	for relPath in watcher.snapshot:
+		watcher._countAssetType(relPath, 1)
+	return watcher
+
+#---------------------------------------------------------------------------------------------------
+def test_collectChanges(watcher):
+	assetsPath = watcher.assetsPath
+	assert watcher.collectChanges() == {}
+
+	with open(os.path.join(assetsPath, 'Meshes', 'SM_Rock.uasset'), 'ab') as file:
+		file.write(b' v2')
+	os.unlink(os.path.join(assetsPath, 'Meshes', 'SM_Tree.uasset'))
+	with open(os.path.join(assetsPath, 'SM_Bush.uasset'), 'wb') as file:
+		file.write(b'bush')
+
+	changes = watcher.collectChanges()
+	assert sorted(changes) == [os.path.join('Meshes', 'SM_Rock.uasset'), os.path.join('Meshes', 'SM_Tree.uasset'), 'SM_Bush.uasset']
+	assert changes[os.path.join('Meshes', 'SM_Rock.uasset')][0] == len(b'rock v2')
+	assert changes[os.path.join('Meshes', 'SM_Tree.uasset')] == None
+
+#-
+def test_applyChangesDefersCompressedPack(watcher, tmp_path):
+	targetDir = tmp_path / 'staged'
+	(targetDir / 'Meshes').mkdir(parents=True)
+	(targetDir / 'Meshes' / 'SM_Tree.uasset').write_bytes(b'tree')
+	watcher.targetDirs = [str(targetDir)]
+
+	with open(os.path.join(watcher.assetsPath, 'SM_Bush.uasset'), 'wb') as file:
+		file.write(b'bush')
+	os.unlink(os.path.join(watcher.assetsPath, 'Meshes', 'SM_Tree.uasset'))
+	watcher.applyChanges(watcher.collectChanges())
+
+	assert (targetDir / 'SM_Bush.uasset').read_bytes() == b'bush'
+	assert not (targetDir / 'Meshes' / 'SM_Tree.uasset').exists()
+	assert watcher.collectChanges() == {}
+	# the compressed pack is only rebuilt once watching stops
+	assert 'exportCompressedPack' not in watcher.dataManager.calls
+	assert watcher.archiveStale
+
+	watcher.refreshCompressedPack()
+	assert watcher.dataManager.calls.count('exportCompressedPack') == 1
+	assert not watcher.archiveStale
+
+#-
+def test_nativeModeOnlyRechecksChanges(watcher, monkeypatch):
+	# native notifications, dirs are reported as modified along with the files written in them
+	watcher.observer = object()
+	scannedPaths = []
+	scan = watcher._scan
+	monkeypatch.setattr(watcher, '_scan', lambda path: scannedPaths.append(path) or scan(path))
+
+	meshesPath = os.path.join(watcher.assetsPath, 'Meshes')
+	rockPath = os.path.join(meshesPath, 'SM_Rock.uasset')
+	# nothing changed: the dir isn't rescanned on the next call
+	watcher.markDirty(meshesPath)
+	assert watcher.collectChanges() == {}
+	assert watcher.collectChanges() == {}
+	assert scannedPaths == [meshesPath]
+
+	# changes are reported until applied, only the changed file is checked again
+	with open(rockPath, 'ab') as file:
+		file.write(b' v2')
+	watcher.markDirty(meshesPath)
+	watcher.markDirty(rockPath)
+	changes = watcher.collectChanges()
+	assert list(changes) == [os.path.join('Meshes', 'SM_Rock.uasset')]
+	scannedPaths.clear()
+	assert watcher.collectChanges() == changes
+	assert scannedPaths == [rockPath]
+
+	watcher.applyChanges(changes)
+	assert watcher.collectChanges() == {}
+	assert watcher.dirtyPaths == set()
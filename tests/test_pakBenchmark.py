@@ -0,0 +1,79 @@
+from pakBenchmark import PakBenchmark
+import shlex
+import json
+import io
+import os
+
+#---------------------------------------------------------------------------------------------------
+class _FakeDataManager():
+	""" Stands in for DataManager, UnrealPak jobs are simulated: .upack sizes depend on the compression method, 'Broken' fails. """
+
+	UPACK_SIZES = {'None': 9000, 'Zlib': 4000, 'Oodle': 3000}
+
+	def __init__(self, tmp_path) -> None:
+		self.basePath = str(tmp_path)
+		self.packerPath = str(tmp_path / 'UnrealPak.exe')
+		self.tmpFilePaths = {'responseFile': (str(tmp_path), 'response.txt')}
+		self.logStream = io.StringIO()
+		self.commands = []
+
+	def checkCancelled(self):
+		pass
+
+	def reportProgress(self, phase, fraction=None):
+		pass
+
+	def getPakCompressionArgs(self, method, level, blockSize):
+		return '' if method == 'None' else f'-compress -compressionformats={method}'
+
+	def startJob(self, shellCmd, cwd):
+		self.commands.append(shellCmd)
+		return shlex.split(shellCmd)
+
+	def communicateJob(self, job, jobType):
+		if '-compressionformats=Broken' in job:
+			return (b'LogPakFile: Display: Loading response file\nLogPakFile: Error: unknown compression format Broken\n', 'exit code 1')
+		if any(arg.startswith('-Create=') for arg in job):
+			method = next((arg.partition('=')[2] for arg in job if arg.startswith('-compressionformats=')), 'None')
+			with open(job[2], 'wb') as file:
+				file.write(b'\0' * self.UPACK_SIZES[method])
+		else:
+			os.makedirs(job[3], exist_ok=True)
+			with open(os.path.join(job[3], 'Pack.uasset'), 'wb') as file:
+				file.write(b'\0' * 10000)
+		return (b'', None)
+
+#---------------------------------------------------------------------------------------------------
+def test_parseSetting():
+	assert PakBenchmark.parseSetting('None') == ('None', None, None)
+	assert PakBenchmark.parseSetting('Zlib') == ('Zlib', None, None)
+	assert PakBenchmark.parseSetting('Oodle:4') == ('Oodle', 4, None)
+	assert PakBenchmark.parseSetting('Oodle:4:256') == ('Oodle', 4, 256 * 1024)
+	assert PakBenchmark.parseSetting('LZ4::128') == ('LZ4', None, 128 * 1024)
+
+#-
+def test_formatSetting():
+	assert PakBenchmark.formatSetting('Oodle', 4, 256 * 1024) == 'Oodle level 4 256 KiB blocks'
+	assert PakBenchmark.formatSetting('Zlib', None, None) == 'Zlib'
+
+#-
+def test_run(tmp_path):
+	dataManager = _FakeDataManager(tmp_path)
+	settings = [PakBenchmark.parseSetting(setting) for setting in ('None', 'Zlib', 'Oodle:4', 'Broken')]
+	benchmark = PakBenchmark(dataManager, settings, repeatCount=2).run(tmp_path)
+
+	# each setting packed / extracted repeatCount times, a failed one stops at its first attempt
+	assert len(dataManager.commands) == 3 * 2 * 2 + 1
+	assert [result['size'] for result in benchmark.results[:3]] == [9000, 4000, 3000]
+	assert benchmark.results[1]['extractedSize'] == 10000
+	assert benchmark.results[3]['error'] == 'packing failed: exit code 1: LogPakFile: Error: unknown compression format Broken'
+
+	# smallest first, failures last
+	reportLines = benchmark.getReport().splitlines()
+	assert [line.split()[0] for line in reportLines[1:]] == ['Oodle', 'Zlib', 'None', 'Broken']
+
+	benchmark.writeReport(tmp_path / 'Pack_pakBenchmark.json')
+	with open(tmp_path / 'Pack_pakBenchmark.json') as file:
+		report = json.load(file)
+	assert report['repeatCount'] == 2
+	assert len(report['results']) == 4
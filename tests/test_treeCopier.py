@@ -0,0 +1,151 @@
+from treeCopier import TreeCopier
+import subprocess
+import hashlib
+import pytest
+import sys
+import os
+
+#---------------------------------------------------------------------------------------------------
+@pytest.fixture
+def sourceDir(tmp_path):
+	sourceDir = tmp_path / 'source'
+	(sourceDir / 'Content' / 'Meshes').mkdir(parents=True)
+	(sourceDir / 'Content' / 'Meshes' / 'SM_Rock.uasset').write_bytes(b'rock' * 1000)
+	(sourceDir / 'Content' / 'T_Rock_D.uasset').write_bytes(b'texture')
+	(sourceDir / 'manifest.json').write_text('{}')
+	return sourceDir
+
+#---
+# copy / checksums
+
+def test_copyTreeHashesCopiedData(sourceDir, tmp_path):
+	destDir = tmp_path / 'dest'
+	copier = TreeCopier()
+	copier.copyTree(sourceDir, destDir)
+
+	assert (destDir / 'Content' / 'Meshes' / 'SM_Rock.uasset').read_bytes() == b'rock' * 1000
+	assert copier.fileCount == 3
+	assert copier.bytesCopied == 4000 + 7 + 2
+	assert copier.checksums[os.path.abspath(destDir / 'Content' / 'T_Rock_D.uasset')] == hashlib.blake2b(b'texture').hexdigest()
+
+#-
+def test_manifestRoundTrip(sourceDir, tmp_path):
+	destDir = tmp_path / 'dest'
+	copier = TreeCopier()
+	copier.copyTree(sourceDir, destDir)
+	manifestPath = destDir / 'pack.checksums'
+	copier.writeManifest(manifestPath)
+
+	# b2sum -c format, / separated paths relative to the manifest
+	assert manifestPath.read_text().splitlines()[0] == f'BLAKE2b (Content/Meshes/SM_Rock.uasset) = {hashlib.blake2b(b"rock" * 1000).hexdigest()}'
+	assert [relPath for _, relPath, _ in TreeCopier.readManifest(manifestPath)] == ['Content/Meshes/SM_Rock.uasset', 'Content/T_Rock_D.uasset', 'manifest.json']
+
+#-
+def test_verify(sourceDir, tmp_path):
+	destDir = tmp_path / 'dest'
+	copier = TreeCopier()
+	copier.copyTree(sourceDir, destDir)
+	manifestPath = destDir / 'pack.checksums'
+	copier.writeManifest(manifestPath)
+	assert all(failReason == None for _, failReason in TreeCopier.verify(manifestPath))
+
+	(destDir / 'Content' / 'T_Rock_D.uasset').write_bytes(b'corrupted')
+	os.unlink(destDir / 'manifest.json')
+	results = dict(TreeCopier.verify(manifestPath))
+	assert results['Content/Meshes/SM_Rock.uasset'] == None
+	assert results['Content/T_Rock_D.uasset'] == 'checksum mismatch'
+	assert results['manifest.json'].startswith('unreadable')
+
+#-
+def test_updateManifest(sourceDir, tmp_path):
+	destDir = tmp_path / 'dest'
+	copier = TreeCopier()
+	copier.copyTree(sourceDir, destDir)
+	manifestPath = destDir / 'pack.checksums'
+	copier.writeManifest(manifestPath)
+
+	(destDir / 'Content' / 'T_Rock_D.uasset').write_bytes(b'edited')
+	(destDir / 'Content' / 'T_Bush_D.uasset').write_bytes(b'new')
+	os.unlink(destDir / 'manifest.json')
+	TreeCopier.updateManifest(manifestPath, [destDir / 'Content' / 'T_Rock_D.uasset', destDir / 'Content' / 'T_Bush_D.uasset', destDir / 'manifest.json'])
+
+	assert [relPath for _, relPath, _ in TreeCopier.readManifest(manifestPath)] == ['Content/Meshes/SM_Rock.uasset', 'Content/T_Bush_D.uasset', 'Content/T_Rock_D.uasset']
+	assert all(failReason == None for _, failReason in TreeCopier.verify(manifestPath))
+
+#-
+def test_unsupportedAlgorithm():
+	with pytest.raises(ValueError):
+		TreeCopier('MD5')
+
+#---
+# mirror
+
+def test_mirrorTree(sourceDir, tmp_path):
+	destDir = tmp_path / 'dest'
+	copier = TreeCopier()
+	copier.mirrorTree(sourceDir, destDir)
+	assert (copier.fileCount, copier.unchangedCount, copier.removedCount) == (3, 0, 0)
+
+	meshPath = sourceDir / 'Content' / 'Meshes' / 'SM_Rock.uasset'
+	texturePath = sourceDir / 'Content' / 'T_Rock_D.uasset'
+	# touched only, same size different content, removed, stale in dest
+	os.utime(meshPath, ns=(0, 10**18))
+	texturePath.write_bytes(b'TEXTURE')
+	(sourceDir / 'manifest.json').unlink()
+	(destDir / 'Content' / 'Old').mkdir()
+	(destDir / 'Content' / 'Old' / 'a.uasset').write_bytes(b'a')
+	(destDir / 'Content' / 'Old' / 'b.uasset').write_bytes(b'b')
+
+	# dest files may be hard links shared with other content
+	sharedPath = tmp_path / 'shared.uasset'
+	os.unlink(destDir / 'Content' / 'T_Rock_D.uasset')
+	sharedPath.write_bytes(b'texture')
+	os.link(sharedPath, destDir / 'Content' / 'T_Rock_D.uasset')
+
+	copier = TreeCopier()
+	copier.mirrorTree(sourceDir, destDir)
+	assert (copier.fileCount, copier.unchangedCount, copier.removedCount) == (1, 1, 3)
+
+	assert sorted(path.relative_to(destDir).as_posix() for path in destDir.rglob('*') if path.is_file()) == ['Content/Meshes/SM_Rock.uasset', 'Content/T_Rock_D.uasset']
+	assert (destDir / 'Content' / 'T_Rock_D.uasset').read_bytes() == b'TEXTURE'
+	assert sharedPath.read_bytes() == b'texture'
+	# unchanged files get the source's mtime, the next mirror skips hashing them
+	assert os.stat(destDir / 'Content' / 'Meshes' / 'SM_Rock.uasset').st_mtime_ns == os.stat(meshPath).st_mtime_ns
+
+#-
+def _runTreeCopier(*arguments):
+	return subprocess.run([sys.executable, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'treeCopier.py'), *map(str, arguments)], capture_output=True, text=True)
+
+#-
+def test_mirrorManifest(sourceDir, tmp_path):
+	destDir = tmp_path / 'Samples' / 'Pack'
+	manifestPath = tmp_path / 'Samples' / 'Pack.checksums'
+	assert _runTreeCopier('-mirror', sourceDir, destDir, '-manifest', manifestPath).returncode == 0
+	assert [relPath for _, relPath, _ in TreeCopier.readManifest(manifestPath)] == ['Pack/Content/Meshes/SM_Rock.uasset', 'Pack/Content/T_Rock_D.uasset', 'Pack/manifest.json']
+	assert all(failReason == None for _, failReason in TreeCopier.verify(manifestPath))
+
+	# unchanged files keep their entry, changed / removed ones are updated
+	(sourceDir / 'Content' / 'T_Rock_D.uasset').write_bytes(b'edited')
+	(sourceDir / 'manifest.json').unlink()
+	assert _runTreeCopier('-mirror', sourceDir, destDir, '-manifest', manifestPath).returncode == 0
+	assert [relPath for _, relPath, _ in TreeCopier.readManifest(manifestPath)] == ['Pack/Content/Meshes/SM_Rock.uasset', 'Pack/Content/T_Rock_D.uasset']
+	assert all(failReason == None for _, failReason in TreeCopier.verify(manifestPath))
+
+#-
+def test_mirrorTreeKnownChecksums(sourceDir, tmp_path):
+	destDir = tmp_path / 'dest'
+	TreeCopier().mirrorTree(sourceDir, destDir)
+
+	# unchanged files are taken from the known checksums, hashed when missing
+	rockPath = str(destDir / 'Content' / 'Meshes' / 'SM_Rock.uasset')
+	copier = TreeCopier()
+	copier.mirrorTree(sourceDir, destDir, {rockPath: 'known'})
+	assert copier.checksums[rockPath] == 'known'
+	assert copier.checksums[str(destDir / 'Content' / 'T_Rock_D.uasset')] == hashlib.blake2b(b'texture').hexdigest()
+	assert len(copier.checksums) == 3
+
+#-
+def test_copyFileDoesNotRetry(tmp_path):
+	# retries are up to the job running the copy
+	with pytest.raises(OSError):
+		TreeCopier().copyFile(tmp_path / 'missing.uasset', tmp_path / 'dest.uasset')
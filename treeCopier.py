@@ -0,0 +1,276 @@
+from concurrent.futures import ThreadPoolExecutor
+from shutil import copystat, rmtree
+import hashlib
+import sys
+import os
+
+# optional dependency, faster non cryptographic hash (XXH128)
+try:
+	import xxhash
+except ImportError:
+	xxhash = None
+
+# import type defs
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from os import PathLike
+
+# commandline syntax (run as a DataManager job):
+# ./treeCopier.py <sourceDir> <destDir> [-manifest <path>] [-algorithm <name>]
+# ./treeCopier.py -verify <manifestPath> [-workers <int>]
+# ./treeCopier.py -mirror <sourceDir> <destDir> [-manifest <path>] [-algorithm <name>]
+# files are hashed from the same buffers they are copied with, the manifest lists every copied file relative to the manifest's dir
+# manifest lines use the BSD tag format, ie: BLAKE2b (path/to/file) = <hex digest>  (checkable with b2sum -c)
+# failed copies aren't retried here, the job is (see DataManager's JOB_LIMITS)
+
+# manifest tag: hash constructor
+CHECKSUM_ALGORITHMS: dict[str, Callable[[], object] | None] = {
+	'BLAKE2b': hashlib.blake2b,
+	'XXH128':  xxhash.xxh3_128 if xxhash != None else None,
+}
+DEFAULT_CHECKSUM_ALGORITHM = 'BLAKE2b'
+
+CHECKSUM_EXT = '.checksums'
+COPY_BUFFER_SIZE = 4 * 1024 * 1024
+
+#---------------------------------------------------------------------------------------------------
+class TreeCopier():
+	def __init__(self, algorithm: str = DEFAULT_CHECKSUM_ALGORITHM) -> None:
+		""" Copies dir trees, hashing every file while it is copied so it never has to be read a second time. """
+
+		if algorithm not in self.getAvailableAlgorithms():
+			raise ValueError(f'unsupported checksum algorithm: {algorithm}')
+
+		self.algorithm = algorithm
+		self.checksums: dict[str, str] = {} # dict(abs dest path: hex digest)
+
+		self.fileCount = 0
+		self.bytesCopied = 0
+		# mirrorTree only
+		self.unchangedCount = 0
+		self.removedCount = 0
+
+#-
+	def copyTree(self, sourceDir: PathLike[str] | str, destDir: PathLike[str] | str) -> None:
+		""" Copy everything under sourceDir into destDir (merging with existing content). """
+
+		for dirPath, _, filenames in os.walk(sourceDir):
+			destDirPath = os.path.join(destDir, os.path.relpath(dirPath, sourceDir))
+			os.makedirs(destDirPath, exist_ok=True)
+			for filename in filenames:
+				self.copyFile(os.path.join(dirPath, filename), os.path.join(destDirPath, filename))
+
+#-
+	def mirrorTree(self, sourceDir: PathLike[str] | str, destDir: PathLike[str] | str, knownChecksums: Mapping[str, str] | None = None) -> None:
+		""" Make destDir an exact copy of sourceDir, only copying what changed and removing what no longer exists in sourceDir.\n
+		Files of the same size and mtime are taken as unchanged, same size but different mtime are hashed and only copied if their content differs.\n
+		knownChecksums: dict(abs dest path: hex digest) of the previous mirror (ie: its manifest), when set every file of destDir ends up in self.checksums, unchanged ones are only hashed if missing from it
+		"""
+
+		for dirPath, _, filenames in os.walk(sourceDir):
+			destDirPath = os.path.join(destDir, os.path.relpath(dirPath, sourceDir))
+			os.makedirs(destDirPath, exist_ok=True)
+			for filename in filenames:
+				sourcePath = os.path.join(dirPath, filename)
+				destPath = os.path.join(destDirPath, filename)
+				if self._isUnchanged(sourcePath, destPath):
+					self.unchangedCount += 1
+					if knownChecksums != None:
+						destPath = os.path.abspath(destPath)
+						self.checksums[destPath] = knownChecksums.get(destPath) or self.hashFile(destPath, self.algorithm)
+					continue
+				# never write through a link / hard link, it may be shared with something else
+				if os.path.lexists(destPath):
+					os.unlink(destPath)
+				self.copyFile(sourcePath, destPath)
+
+		# stale content
+		for dirPath, dirNames, filenames in os.walk(destDir):
+			sourceDirPath = os.path.join(sourceDir, os.path.relpath(dirPath, destDir))
+			for dirName in list(dirNames):
+				if not os.path.isdir(os.path.join(sourceDirPath, dirName)):
+					dirNames.remove(dirName)
+					self.removedCount += sum(len(names) for _, _, names in os.walk(os.path.join(dirPath, dirName)))
+					rmtree(os.path.join(dirPath, dirName))
+			for filename in filenames:
+				if not os.path.isfile(os.path.join(sourceDirPath, filename)):
+					os.unlink(os.path.join(dirPath, filename))
+					self.removedCount += 1
+
+#-
+	def _isUnchanged(self, sourcePath: PathLike[str] | str, destPath: PathLike[str] | str) -> bool:
+		try:
+			destStat = os.stat(destPath)
+		except FileNotFoundError:
+			return False
+		sourceStat = os.stat(sourcePath)
+		if sourceStat.st_size != destStat.st_size:
+			return False
+		if sourceStat.st_mtime_ns == destStat.st_mtime_ns:
+			return True
+
+		# touched (ie: re-saved / checked out again) but maybe not modified
+		if self.hashFile(sourcePath, self.algorithm) != self.hashFile(destPath, self.algorithm):
+			return False
+		copystat(sourcePath, destPath)
+		return True
+
+#-
+	def copyFile(self, sourcePath: PathLike[str] | str, destPath: PathLike[str] | str) -> str:
+		""" Copy a single file.\n
+		Returns the hex digest of the copied data.
+		"""
+
+		digest = self._copyAndHash(sourcePath, destPath)
+		self.checksums[os.path.abspath(destPath)] = digest
+		self.fileCount += 1
+		return digest
+
+#-
+	def _copyAndHash(self, sourcePath: PathLike[str] | str, destPath: PathLike[str] | str) -> str:
+		hasher = CHECKSUM_ALGORITHMS[self.algorithm]()
+		buffer = memoryview(bytearray(COPY_BUFFER_SIZE))
+		copiedSize = 0
+		with open(sourcePath, 'rb') as sourceFile, open(destPath, 'wb') as destFile:
+			while readSize := sourceFile.readinto(buffer):
+				destFile.write(buffer[:readSize])
+				hasher.update(buffer[:readSize])
+				copiedSize += readSize
+		copystat(sourcePath, destPath)
+
+		self.bytesCopied += copiedSize
+		return hasher.hexdigest()
+
+#-
+	def writeManifest(self, manifestPath: PathLike[str] | str) -> None:
+		""" Write the checksums of all files copied so far, paths relative to the manifest's dir. """
+
+		manifestDir = os.path.dirname(os.path.abspath(manifestPath))
+		entries = sorted((os.path.relpath(path, manifestDir).replace('\\', '/'), digest) for path, digest in self.checksums.items())
+		self.writeManifestEntries(manifestPath, [(self.algorithm, relPath, digest) for relPath, digest in entries])
+
+#---
+# manifests
+
+	@classmethod
+	def readManifest(cls, manifestPath: PathLike[str] | str) -> list[tuple[str, str, str]]:
+		""" Return tuple(algorithm, path rel to the manifest's dir, hex digest) for every entry of a manifest. """
+
+		entries = []
+		with open(manifestPath, 'r', encoding='utf-8') as file:
+			for line in file:
+				line = line.rstrip('\n')
+				if not line:
+					continue
+				# <algorithm> (<path>) = <digest>, the path itself may contain ') = '
+				algorithm, _, rest = line.partition(' (')
+				relPath, _, digest = rest.rpartition(') = ')
+				entries.append((algorithm, relPath, digest))
+		return entries
+
+#-
+	@classmethod
+	def writeManifestEntries(cls, manifestPath: PathLike[str] | str, entries: Sequence[tuple[str, str, str]]) -> None:
+		with open(manifestPath, 'w', encoding='utf-8', newline='\n') as file:
+			for algorithm, relPath, digest in entries:
+				file.write(f'{algorithm} ({relPath}) = {digest}\n')
+
+#-
+	@classmethod
+	def updateManifest(cls, manifestPath: PathLike[str] | str, changedPaths: Sequence[PathLike[str] | str], algorithm: str = DEFAULT_CHECKSUM_ALGORITHM) -> None:
+		""" Update the entries of files changed after the copy (ie: edited in place), files that no longer exist are removed.\n
+		New files are added using the given algorithm.
+		"""
+
+		manifestDir = os.path.dirname(os.path.abspath(manifestPath))
+		entries = {relPath: (algorithm, digest) for algorithm, relPath, digest in cls.readManifest(manifestPath)}
+
+		for path in changedPaths:
+			relPath = os.path.relpath(os.path.abspath(path), manifestDir).replace('\\', '/')
+			if not os.path.isfile(path):
+				entries.pop(relPath, None)
+				continue
+			entryAlgorithm = entries[relPath][0] if relPath in entries else algorithm
+			entries[relPath] = (entryAlgorithm, cls.hashFile(path, entryAlgorithm))
+
+		cls.writeManifestEntries(manifestPath, [(entryAlgorithm, relPath, digest) for relPath, (entryAlgorithm, digest) in sorted(entries.items())])
+
+#-
+	@classmethod
+	def verify(cls, manifestPath: PathLike[str] | str, workerCount: int | None = None) -> Iterator[tuple[str, str | None]]:
+		""" Recheck every file listed in a manifest, files are hashed in parallel (hashlib releases the GIL on large buffers).\n
+		Yields tuple(path rel to the manifest's dir, None if ok else the reason it failed) in manifest order.
+		"""
+
+		manifestDir = os.path.dirname(os.path.abspath(manifestPath))
+
+		def _checkEntry(entry: tuple[str, str, str]) -> tuple[str, str | None]:
+			algorithm, relPath, expectedDigest = entry
+			if CHECKSUM_ALGORITHMS.get(algorithm) == None:
+				return (relPath, f'unsupported algorithm {algorithm}')
+			try:
+				digest = cls.hashFile(os.path.join(manifestDir, relPath), algorithm)
+			except OSError as error:
+				return (relPath, f'unreadable ({error.strerror})')
+			return (relPath, None if digest == expectedDigest else 'checksum mismatch')
+
+		# mostly waiting on I/O, more threads than cores helps on network shares
+		with ThreadPoolExecutor(max_workers=workerCount or min(32, (os.cpu_count() or 1) * 2)) as executor:
+			yield from executor.map(_checkEntry, cls.readManifest(manifestPath))
+
+#-
+	@classmethod
+	def hashFile(cls, path: PathLike[str] | str, algorithm: str = DEFAULT_CHECKSUM_ALGORITHM) -> str:
+		hasher = CHECKSUM_ALGORITHMS[algorithm]()
+		buffer = memoryview(bytearray(COPY_BUFFER_SIZE))
+		with open(path, 'rb') as file:
+			while readSize := file.readinto(buffer):
+				hasher.update(buffer[:readSize])
+		return hasher.hexdigest()
+
+#-
+	@classmethod
+	def getAvailableAlgorithms(cls) -> list[str]:
+		return [algorithm for algorithm, constructor in CHECKSUM_ALGORITHMS.items() if constructor != None]
+
+#---------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+	arguments = sys.argv[1:]
+
+	if '-verify' in arguments:
+		workerCount = None
+		if '-workers' in arguments:
+			workerCount = int(arguments[arguments.index('-workers') + 1])
+
+		failedCount = 0
+		for relPath, failReason in TreeCopier.verify(arguments[arguments.index('-verify') + 1], workerCount):
+			if failReason != None:
+				failedCount += 1
+				print(f'{relPath}: {failReason}')
+		print('all files ok' if failedCount == 0 else f'{failedCount} file(s) failed verification')
+		sys.exit(0 if failedCount == 0 else 1)
+
+	algorithm = DEFAULT_CHECKSUM_ALGORITHM
+	if '-algorithm' in arguments:
+		algorithm = arguments[arguments.index('-algorithm') + 1]
+
+	if '-mirror' in arguments:
+		sourceDir, destDir = arguments[arguments.index('-mirror') + 1:arguments.index('-mirror') + 3]
+		copier = TreeCopier(algorithm)
+		if '-manifest' in arguments:
+			manifestPath = arguments[arguments.index('-manifest') + 1]
+			manifestDir = os.path.dirname(os.path.abspath(manifestPath))
+			knownChecksums = {}
+			if os.path.isfile(manifestPath):
+				knownChecksums = {os.path.normpath(os.path.join(manifestDir, relPath)): digest for entryAlgorithm, relPath, digest in TreeCopier.readManifest(manifestPath) if entryAlgorithm == algorithm}
+			copier.mirrorTree(sourceDir, destDir, knownChecksums)
+			copier.writeManifest(manifestPath)
+		else:
+			copier.mirrorTree(sourceDir, destDir)
+		print(f'mirrored to {os.path.abspath(destDir)}: {copier.fileCount} files copied ({copier.bytesCopied} bytes), {copier.unchangedCount} unchanged, {copier.removedCount} removed')
+		sys.exit(0)
+
+	copier = TreeCopier(algorithm)
+	copier.copyTree(arguments[0], arguments[1])
+	if '-manifest' in arguments:
+		copier.writeManifest(arguments[arguments.index('-manifest') + 1])
+	print(f'copied {copier.fileCount} files ({copier.bytesCopied} bytes) to {os.path.abspath(arguments[1])}')
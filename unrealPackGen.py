@@ -1,23 +1,149 @@
-from app import App
 import sys
 
 # commandline syntax:
-# ./init.py [-defaultPath <path>] [-unrealpakPath <path>]
+# ./init.py [-defaultPath <path>] [-unrealpakPath <path>] [-spec <path> [-journal | -resume] [-watch | -analyze [-estimateCompression] | -benchmarkPak <setting>... [-repeat <int>]]] [-serve [-port <int>] [-workers <int>] [-artifactsDir <path>]] [-profile] [-metrics <path>] [-metricsTextfile <path>] [-catalog <path>]
+# -spec: build the pack described by a pack spec file without UI (see settings/packSpecExample.json)
+# -journal: stage to a persistent dir and record progress in a journal next to it, an interrupted build can then be resumed
+# -resume: resume the last journaled build of the pack (same spec), staged files and outputs still intact on disk are reused
+# -watch: after building, keep rebuilding incrementally as the pack's assets change (the compressed pack is rebuilt once, on exit)
+# -analyze: don't build, print / write the pack's size breakdown per asset type, dir and largest files (<output dir>/<pack name>_sizes.json / .csv)
+# -estimateCompression: also estimate compressed sizes per asset type, for the spec's archive format / preset
+# -benchmarkPak: don't build, pack the .upack once per UnrealPak compression setting (method[:level[:block size in KiB]], ie: None Zlib Oodle:4:256) and report time, size and extraction speed
+# -repeat: number of runs per benchmarked setting, the fastest is kept (default: 3)
+# -serve: run as a local build service (see buildService.py for the API)
+# -profile: write cProfile (.pstats) and tracemalloc reports per build phase to <output dir>/<pack name>_profile/
+# -metrics: append build events (phases, jobs, bytes copied / compressed, cache hits) to a JSONL file, one object per line
+# -metricsTextfile: also keep counters / histograms over all builds in a Prometheus textfile collector file (.prom)
+# -catalog: SQLite catalog successful builds are recorded in (packs, versions, assets with their hashes, outputs), default: <engine dir>/unrealPackGen_catalog.db
+# ./init.py -verify <path to .checksums file> [-workers <int>]
+# -verify: recheck an exported pack structure against its checksum manifest
+# ./init.py -batch <path to pack spec>... [-store <path>] [-metrics <path>] [-metricsTextfile <path>] [-catalog <path>]
+# -batch: build several packs, assets shared between packs are staged once through a content addressed store (default: in the engine dir)
+# ./init.py -applyDelta <path to delta pack> <target dir>
+# -applyDelta: update a previous version of a pack (extracted to target dir) with a delta pack
+# ./init.py [-catalog <path>] -listVersions [<pack name>] | -findAsset <asset path | hash> | -diffVersions <pack name> <from version> <to version>
+# -listVersions: list the recorded versions (of a pack) with their asset count / size
+# -findAsset: list the packs / versions containing an asset, by path (rel to the pack's assets dir) or hash
+# -diffVersions: list the assets added / removed / changed between two recorded versions of a pack
 
 # default values
 basepath = None
 packerPath = None
+specPath = None
+port = 8765
+workerCount = 1
+artifactsDir = './unrealPackGen_artifacts'
+storeDir = None
+repeatCount = 3
+metricsPath = None
+metricsTextfilePath = None
+catalogPath = None
 
 # remove first arg (ie path to program), pre-process the rest
 arguments = list(map(lambda arg: arg.strip(), sys.argv[1:]))
+profile = '-profile' in arguments
 # set values
 try:
 	if '-path' in arguments:
 		basepath = arguments[arguments.index('-defaultPath') + 1]
 	if '-UpakPath' in arguments:
 		packerPath = arguments[arguments.index('-unrealpakPath') + 1]
+	if '-spec' in arguments:
+		specPath = arguments[arguments.index('-spec') + 1]
+	if '-port' in arguments:
+		port = int(arguments[arguments.index('-port') + 1])
+	if '-workers' in arguments:
+		workerCount = int(arguments[arguments.index('-workers') + 1])
+	if '-artifactsDir' in arguments:
+		artifactsDir = arguments[arguments.index('-artifactsDir') + 1]
+	if '-store' in arguments:
+		storeDir = arguments[arguments.index('-store') + 1]
+	if '-repeat' in arguments:
+		repeatCount = int(arguments[arguments.index('-repeat') + 1])
+	if '-metrics' in arguments:
+		metricsPath = arguments[arguments.index('-metrics') + 1]
+	if '-metricsTextfile' in arguments:
+		metricsTextfilePath = arguments[arguments.index('-metricsTextfile') + 1]
+	if '-catalog' in arguments:
+		catalogPath = arguments[arguments.index('-catalog') + 1]
 except IndexError:
 	pass
 
-app = App(basepath, packerPath)
-app.mainloop()
\ No newline at end of file
+if '-verify' in arguments:
+	from treeCopier import TreeCopier
+	failedCount = 0
+	for relPath, failReason in TreeCopier.verify(arguments[arguments.index('-verify') + 1], workerCount if '-workers' in arguments else None):
+		if failReason != None:
+			failedCount += 1
+			print(f'{relPath}: {failReason}')
+	print('all files ok' if failedCount == 0 else f'{failedCount} file(s) failed verification')
+	sys.exit(0 if failedCount == 0 else 1)
+
+elif '-applyDelta' in arguments:
+	from packDelta import PackDelta
+	index = arguments.index('-applyDelta')
+	deltaManifest = PackDelta.apply(arguments[index + 1], arguments[index + 2])
+	print(f'updated {deltaManifest["packName"]} from {deltaManifest["fromVersion"]} to {deltaManifest["toVersion"]}')
+
+elif '-listVersions' in arguments or '-findAsset' in arguments or '-diffVersions' in arguments:
+	from packCatalog import PackCatalog
+	if catalogPath == None:
+		from headlessBuild import HeadlessBuild
+		catalogPath = HeadlessBuild.createDataManager(basepath, packerPath).catalogPath
+	catalog = PackCatalog(catalogPath)
+	if '-findAsset' in arguments:
+		print(PackCatalog.formatRows(catalog.findAsset(arguments[arguments.index('-findAsset') + 1])))
+	elif '-diffVersions' in arguments:
+		index = arguments.index('-diffVersions')
+		try:
+			diff = catalog.diffVersions(*arguments[index + 1:index + 4])
+		except KeyError as error:
+			print(error.args[0])
+			sys.exit(1)
+		for change, paths in diff.items():
+			print(f'{change}: {len(paths)}')
+			for path in paths:
+				print(f'  {path}')
+	else:
+		index = arguments.index('-listVersions')
+		packName = arguments[index + 1] if index + 1 < len(arguments) and not arguments[index + 1].startswith('-') else None
+		print(PackCatalog.formatRows(catalog.listVersions(packName)))
+
+elif '-batch' in arguments:
+	from headlessBuild import HeadlessBuild
+	# every following arg up to the next option
+	specPaths = []
+	for argument in arguments[arguments.index('-batch') + 1:]:
+		if argument.startswith('-'):
+			break
+		specPaths.append(argument)
+	sys.exit(0 if HeadlessBuild.runBatch(basepath, packerPath, specPaths, storeDir, profile, metricsPath, metricsTextfilePath, catalogPath) else 1)
+
+elif '-serve' in arguments:
+	from buildService import BuildService
+	BuildService(basepath, packerPath, artifactsDir, port, workerCount).serveForever()
+
+elif specPath == None:
+	from app import App
+	app = App(basepath, packerPath, profile, catalogPath)
+	app.mainloop()
+
+else:
+	from headlessBuild import HeadlessBuild
+	build = HeadlessBuild(basepath, packerPath, specPath, profile, '-journal' in arguments, '-resume' in arguments, metricsPath, metricsTextfilePath, catalogPath)
+
+	if '-watch' in arguments:
+		from packWatcher import PackWatcher
+		PackWatcher(build.dataManager, *build.exportOptions).run()
+	elif '-analyze' in arguments:
+		build.analyze('-estimateCompression' in arguments)
+	elif '-benchmarkPak' in arguments:
+		# every following arg up to the next option
+		settings = []
+		for argument in arguments[arguments.index('-benchmarkPak') + 1:]:
+			if argument.startswith('-'):
+				break
+			settings.append(argument)
+		sys.exit(0 if build.benchmarkPak(settings, repeatCount) else 1)
+	else:
+		sys.exit(0 if build.run() else 1)